@@ -0,0 +1,64 @@
+"""Audit log keyset pagination and search indexes
+
+Revision ID: a7c41e9d2b6f
+Revises: 3fd5b7393728
+Create Date: 2025-07-20 09:12:41.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c41e9d2b6f'
+down_revision: Union[str, None] = '3fd5b7393728'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns covered by the audit log free-text search
+SEARCH_COLUMNS = ('message', 'user_name', 'user_email', 'resource_name')
+
+# Must match AUDIT_SEARCH_DOCUMENT in app/services/audit_service.py so the
+# planner can use the index for full-text searches
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, "
+    "coalesce(message, '') || ' ' || coalesce(user_name, '') || ' ' || "
+    "coalesce(user_email, '') || ' ' || coalesce(resource_name, ''))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Built concurrently so the audit table keeps accepting writes
+    with op.get_context().autocommit_block():
+        # Keyset pagination over (timestamp, id)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_timestamp_id "
+            "ON audit_logs (timestamp, id)"
+        )
+
+        # Trigram indexes serve the substring (ILIKE '%...%') search
+        for column in SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_{column}_trgm "
+                f"ON audit_logs USING gin ({column} gin_trgm_ops)"
+            )
+
+        # Full-text search over all search columns
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_search_fts "
+            f"ON audit_logs USING gin (({SEARCH_DOCUMENT}))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_audit_search_fts")
+        for column in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_audit_{column}_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_audit_timestamp_id")
@@ -0,0 +1,129 @@
+"""Partition audit_logs and metrics by month
+
+Revision ID: b3e8f2a61c07
+Revises: a7c41e9d2b6f
+Create Date: 2025-07-24 14:03:18.274905
+
+Rebuilds both tables as PostgreSQL range-partitioned tables on their
+timestamp column with one partition per month, so retention can drop whole
+partitions instead of running large DELETEs. Indexes and foreign keys are
+carried over from the existing tables, and the primary key becomes
+(id, timestamp) since it must include the partition key. Existing rows are
+copied, so run this in a maintenance window on large installations.
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8f2a61c07'
+down_revision: Union[str, None] = 'a7c41e9d2b6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (partition column, timezone aware)
+PARTITIONED_TABLES = {
+    'audit_logs': ('timestamp', False),
+    'metrics': ('timestamp', True),
+}
+
+# Future monthly partitions created up front; the partition maintenance
+# service keeps this horizon rolling afterwards
+MONTHS_AHEAD = 3
+
+
+def _month_start(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def _bound(value: datetime, timezone_aware: bool) -> str:
+    return f"'{value:%Y-%m-%d %H:%M:%S}{'+00' if timezone_aware else ''}'"
+
+
+def _table_definitions(conn, table: str):
+    """Index and foreign key DDL of table, excluding the primary key."""
+    indexes = conn.execute(sa.text(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE tablename = :table AND indexname NOT IN ("
+        "  SELECT conname FROM pg_constraint "
+        "  WHERE conrelid = to_regclass(:table) AND contype = 'p')"
+    ), {'table': table}).scalars().all()
+    foreign_keys = conn.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+    ), {'table': table}).all()
+    return indexes, foreign_keys
+
+
+def _rebuild(table: str, column: str, timezone_aware: bool, partitioned: bool) -> None:
+    conn = op.get_bind()
+    old_table = f'{table}_old'
+    indexes, foreign_keys = _table_definitions(conn, table)
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {old_table}')
+    partition_clause = f' PARTITION BY RANGE ({column})' if partitioned else ''
+    op.execute(
+        f'CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS '
+        f'INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS){partition_clause}'
+    )
+
+    if partitioned:
+        oldest = conn.execute(sa.text(f'SELECT min({column}) FROM {old_table}')).scalar()
+        current = _month_start(datetime.utcnow())
+        start = _month_start(oldest) if oldest else current
+        while start <= _add_months(current, MONTHS_AHEAD):
+            end = _add_months(start, 1)
+            op.execute(
+                f'CREATE TABLE {table}_p{start:%Y_%m} PARTITION OF {table} '
+                f'FOR VALUES FROM ({_bound(start, timezone_aware)}) '
+                f'TO ({_bound(end, timezone_aware)})'
+            )
+            start = end
+        # Catches rows outside the maintained range instead of failing inserts
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old_table}')
+
+    # Keep the id sequence alive when the old table is dropped
+    sequence = conn.execute(
+        sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': old_table}
+    ).scalar()
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+    op.execute(f'DROP TABLE {old_table}')
+
+    primary_key = f'id, {column}' if partitioned else 'id'
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})')
+
+    # Definitions were read before the rename, so they already target table
+    for indexdef in indexes:
+        indexdef = indexdef.replace(' ON ONLY ', ' ON ', 1)
+        # Unique indexes on a partitioned table must include the partition key
+        if partitioned and indexdef.startswith('CREATE UNIQUE') and column not in indexdef:
+            indexdef = indexdef.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+        op.execute(indexdef)
+    for name, definition in foreign_keys:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (column, timezone_aware) in PARTITIONED_TABLES.items():
+        _rebuild(table, column, timezone_aware, partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (column, timezone_aware) in PARTITIONED_TABLES.items():
+        _rebuild(table, column, timezone_aware, partitioned=False)
@@ -0,0 +1,39 @@
+"""Materialized user effective permissions
+
+Revision ID: c5d17a3e9f42
+Revises: b3e8f2a61c07
+Create Date: 2025-07-26 10:41:07.613320
+
+Rows are computed on first use and kept current by the services that change
+roles and permission grants, so the table starts empty.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d17a3e9f42'
+down_revision: Union[str, None] = 'b3e8f2a61c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_effective_permissions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('permissions', sa.JSON(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'organization_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_effective_permissions')
@@ -0,0 +1,35 @@
+"""Expire materialized effective permissions with their role grants
+
+Revision ID: e4b7d91c3a58
+Revises: c5d17a3e9f42
+Create Date: 2025-07-28 09:12:44.201957
+
+Existing rows have no valid_until; they are dropped so that rows derived
+from expiring role grants are recomputed with one.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d91c3a58'
+down_revision: Union[str, None] = 'c5d17a3e9f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'user_effective_permissions',
+        sa.Column('valid_until', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute('DELETE FROM user_effective_permissions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_effective_permissions', 'valid_until')
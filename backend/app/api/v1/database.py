@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_async_db
 from app.core.database_monitoring import db_monitor
+from app.core.query_profiler import n_plus_one_detector
 
 router = APIRouter(prefix="/database", tags=["database"])
 
@@ -87,6 +88,90 @@ async def get_slow_queries(
         )
 
 
+@router.get("/statements", response_model=Dict[str, Any])
+async def get_statement_statistics(
+    limit: int = 20, order_by: str = "total_time"
+) -> Dict[str, Any]:
+    """
+    Get aggregated statistics per normalized statement.
+
+    Args:
+        limit: Maximum number of statements to return (default: 20)
+        order_by: Sort field - total_time, mean_time, max_time, calls or p99
+
+    Returns:
+        Registry summary and the top statement fingerprints
+    """
+    try:
+        return db_monitor.get_statement_statistics(limit=limit, order_by=order_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get statement statistics: {str(e)}"
+        )
+
+
+@router.get("/statements/tables", response_model=Dict[str, Any])
+async def get_table_statistics() -> Dict[str, Any]:
+    """
+    Get query latency quantiles per table.
+
+    Returns:
+        Dictionary keyed by table name
+    """
+    try:
+        return db_monitor.get_table_statistics()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get table statistics: {str(e)}"
+        )
+
+
+@router.post("/statements/reset", response_model=Dict[str, Any])
+async def reset_statement_statistics() -> Dict[str, Any]:
+    """
+    Discard collected statement statistics.
+
+    Returns:
+        Confirmation of the reset
+    """
+    db_monitor.query_stats.reset()
+    return {"status": "reset"}
+
+
+@router.get("/n-plus-one", response_model=Dict[str, Any])
+async def get_n_plus_one_reports() -> Dict[str, Any]:
+    """
+    Get repeated-shape (N+1) queries detected per endpoint.
+
+    Only available when N+1 detection is enabled (development/staging).
+
+    Returns:
+        Detector settings and reports, worst offenders first
+    """
+    if not n_plus_one_detector.enabled:
+        raise HTTPException(status_code=404, detail="N+1 detection is not enabled")
+    return {
+        "threshold": n_plus_one_detector.threshold,
+        "reports": n_plus_one_detector.get_reports(),
+    }
+
+
+@router.delete("/n-plus-one", response_model=Dict[str, Any])
+async def clear_n_plus_one_reports() -> Dict[str, Any]:
+    """
+    Discard recorded N+1 reports.
+
+    Returns:
+        Confirmation of the reset
+    """
+    if not n_plus_one_detector.enabled:
+        raise HTTPException(status_code=404, detail="N+1 detection is not enabled")
+    n_plus_one_detector.clear()
+    return {"status": "cleared"}
+
+
 @router.get("/connection-info", response_model=Dict[str, Any])
 async def get_connection_info(
     db: AsyncSession = Depends(get_async_db),
@@ -16,9 +16,10 @@ from app.core.cache import CacheService
 from app.core.security_monitor import SecurityMonitor
 from app.models.user import User
 from app.services.alert_ingestion_service import AlertIngestionService, AlertSource
+from app.utils.request_body import CachedBodyRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=CachedBodyRoute)
 
 
 # Pydantic Models
@@ -48,11 +48,12 @@ from app.schemas.alert import (
     AlertNotificationCreate,
 )
 from app.core.config import settings
+from app.utils.request_body import CachedBodyRoute
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=CachedBodyRoute)
 security = HTTPBearer()
 
 
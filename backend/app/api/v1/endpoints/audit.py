@@ -71,6 +71,8 @@ class AuditLogListResponse(BaseModel):
     page: int
     per_page: int
     pages: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class AuditStatisticsResponse(BaseModel):
@@ -133,11 +135,14 @@ async def get_audit_logs(
     team_id: Optional[str] = Query(None, description="Filter by team ID"),
     success: Optional[bool] = Query(None, description="Filter by success status"),
     search_query: Optional[str] = Query(None, description="Search in messages and names"),
+    search_mode: str = Query("substring", pattern="^(substring|fulltext)$", description="Substring or whole-word search"),
     sort_by: str = Query("timestamp", description="Sort field"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor of the previous page; replaces page"),
+    exact_count: bool = Query(False, description="Count matching logs exactly instead of estimating"),
     current_user: User = Depends(get_current_user)
 ):
-    """Get audit logs with filtering and pagination."""
+    """Get audit logs with filtering and keyset or offset pagination."""
     
     async with get_audit_service() as audit_service:
         # Parse comma-separated filters
@@ -148,36 +153,44 @@ async def get_audit_logs(
         # Calculate offset
         offset = (page - 1) * per_page
         
-        logs, total = await audit_service.get_audit_logs(
-            limit=per_page,
-            offset=offset,
-            start_date=start_date,
-            end_date=end_date,
-            event_types=event_types_list,
-            event_categories=event_categories_list,
-            levels=levels_list,
-            user_id=user_id,
-            user_email=user_email,
-            ip_address=ip_address,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            organization_id=organization_id,
-            team_id=team_id,
-            success=success,
-            search_query=search_query,
-            sort_by=sort_by,
-            sort_order=sort_order
-        )
+        try:
+            result = await audit_service.query_audit_logs(
+                limit=per_page,
+                offset=offset,
+                cursor=cursor,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                exact_count=exact_count,
+                search_mode=search_mode,
+                start_date=start_date,
+                end_date=end_date,
+                event_types=event_types_list,
+                event_categories=event_categories_list,
+                levels=levels_list,
+                user_id=user_id,
+                user_email=user_email,
+                ip_address=ip_address,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                organization_id=organization_id,
+                team_id=team_id,
+                success=success,
+                search_query=search_query
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Calculate pagination info
-        pages = (total + per_page - 1) // per_page
+        pages = (result.total + per_page - 1) // per_page
         
         return AuditLogListResponse(
-            logs=[AuditLogResponse.from_orm(log) for log in logs],
-            total=total,
+            logs=[AuditLogResponse.from_orm(log) for log in result.logs],
+            total=result.total,
             page=page,
             per_page=per_page,
-            pages=pages
+            pages=pages,
+            total_is_estimate=result.total_is_estimate,
+            next_cursor=result.next_cursor
         )
 
 
@@ -201,6 +214,17 @@ async def get_audit_statistics(
         return AuditStatisticsResponse(**stats)
 
 
+@router.get("/writer")
+async def get_audit_writer_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get queue depth and flush statistics of the batched audit writer."""
+
+    from app.services.audit_writer import audit_writer
+
+    return audit_writer.get_stats()
+
+
 @router.post("/logs")
 async def create_audit_log(
     request: Request,
@@ -344,7 +368,7 @@ async def create_audit_alert(
 @router.get("/export")
 async def export_audit_logs(
     request: Request,
-    format: str = Query("csv", pattern="^(csv|json|xlsx|zip)$", description="Export format"),
+    format: str = Query("csv", pattern="^(csv|json|ndjson|xlsx|zip)$", description="Export format"),
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
     end_date: Optional[datetime] = Query(None, description="End date filter"),
     event_types: Optional[str] = Query(None, description="Comma-separated event types"),
@@ -354,10 +378,11 @@ async def export_audit_logs(
     organization_id: Optional[str] = Query(None, description="Filter by organization ID"),
     team_id: Optional[str] = Query(None, description="Filter by team ID"),
     success: Optional[bool] = Query(None, description="Filter by success status"),
-    max_records: int = Query(50000, ge=1, le=100000, description="Maximum records to export"),
+    max_records: int = Query(50000, ge=1, le=5000000, description="Maximum records to export"),
+    compress: bool = Query(False, description="Gzip the export on the fly"),
     current_user: User = Depends(get_current_user)
 ):
-    """Export audit logs in various formats."""
+    """Export audit logs in various formats, streamed in constant memory."""
     
     from app.services.audit_export_service import get_audit_export_service
     
@@ -388,7 +413,8 @@ async def export_audit_logs(
         return await export_service.export_logs(
             format=format,
             filters=filters,
-            max_records=max_records
+            max_records=max_records,
+            compress=compress
         )
 
 
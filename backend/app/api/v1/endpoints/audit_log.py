@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Request, status
 from fastapi.responses import JSONResponse
+from app.utils.request_body import CachedBodyRoute
 
-router = APIRouter()
+router = APIRouter(route_class=CachedBodyRoute)
 
 
 @router.post("/api/audit-log", status_code=status.HTTP_201_CREATED)
@@ -20,10 +20,11 @@ from app.services.git_webhook_service import (
     git_webhook_service,
 )
 from app.core.config import settings
+from app.utils.request_body import CachedBodyRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=CachedBodyRoute)
 
 
 class WebhookResponse(BaseModel):
@@ -22,7 +22,7 @@ from app.schemas.metrics import (
     MetricAggregation,
     SystemHealthResponse,
 )
-from app.utils.prometheus_client import EnhancedPrometheusClient
+from app.utils.prometheus_client import get_prometheus_client
 from app.utils.prometheus_queries import KubernetesQueryTemplates
 
 router = APIRouter()
@@ -45,7 +45,7 @@ async def get_system_health(
     """
     try:
         # Initialize Prometheus client
-        prom_client = EnhancedPrometheusClient()
+        prom_client = await get_prometheus_client()
         query_templates = KubernetesQueryTemplates()
         
         # Get service health status
@@ -595,7 +595,7 @@ async def get_live_metrics():
     """
     try:
         # Initialize Prometheus client
-        prom_client = EnhancedPrometheusClient()
+        prom_client = await get_prometheus_client()
         query_templates = KubernetesQueryTemplates()
         
         # Get CPU usage
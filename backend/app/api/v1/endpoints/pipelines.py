@@ -11,6 +11,7 @@ from pydantic import BaseModel, HttpUrl
 
 from app.core.dependencies import get_db, get_async_db
 from app.core.auth import get_current_user
+from app.core.auth.resource_access import project_access_filter
 from app.models.user import User
 from app.models.project import Project
 from app.models.pipeline import Pipeline, PipelineRun
@@ -69,21 +70,17 @@ async def get_pipelines(
     Returns:
         List[PipelineResponse]: List of pipelines
     """
-    query = db.query(Pipeline).join(Project)
-
-    # Apply project-based access control
-    accessible_projects = [
-        p.id for p in db.query(Project).all() if p.is_accessible_by_user(current_user)
-    ]
-
-    if not accessible_projects:
-        return []
-
-    query = query.filter(Project.id.in_(accessible_projects))
+    # Apply project-based access control in the listing query
+    query = db.query(Pipeline).join(Project).filter(project_access_filter(current_user.id))
 
     # Apply filters
     if project_id:
-        if project_id not in accessible_projects:
+        accessible = (
+            db.query(Project.id)
+            .filter(Project.id == project_id, project_access_filter(current_user.id))
+            .first()
+        )
+        if not accessible:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied to specified project",
@@ -12,10 +12,12 @@ from pydantic import BaseModel, Field
 from app.db.database import get_async_db
 from app.core.auth import get_current_user
 from app.models.user import User
-from app.models.team import Team, TeamMember
+from app.models.team import Team
+from app.models.user_team import UserTeam as TeamMember
 from app.models.project import Project
 from app.models.audit_log import AuditLog
 from app.services.team_service import get_team_service
+from app.services.team_dashboard_service import team_dashboard_service
 from app.core.auth.rbac import require_permission
 
 router = APIRouter()
@@ -102,6 +104,9 @@ class TeamDashboardResponse(BaseModel):
     collaboration_metrics: TeamCollaborationMetrics
     recent_alerts: List[Dict[str, Any]]
     upcoming_deadlines: List[Dict[str, Any]]
+    section_timings: Dict[str, float] = Field(default_factory=dict)  # milliseconds
+    cached: bool = False
+    generated_at: Optional[datetime] = None
 
 
 @router.get("/teams/{team_id}/dashboard", response_model=TeamDashboardResponse)
@@ -110,295 +115,51 @@ async def get_team_dashboard(
     team_id: int,
     request: Request,
     period_days: int = Query(30, ge=1, le=365, description="Period for metrics in days"),
+    refresh: bool = Query(False, description="Bypass the cached snapshot"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_db)
 ):
     """Get comprehensive team dashboard data."""
     
-    # Verify user has access to this team
-    team_query = select(Team).where(Team.id == team_id)
-    team_result = await session.execute(team_query)
-    team = team_result.scalar_one_or_none()
+    # Verify the team exists and the user has access in a single query
+    team, is_member = await team_dashboard_service.get_team_access(
+        session, team_id, current_user.id
+    )
     
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    # Check if user is member of team or has admin access
-    member_query = select(TeamMember).where(
-        and_(TeamMember.team_id == team_id, TeamMember.user_id == current_user.id)
-    )
-    member_result = await session.execute(member_query)
-    is_member = member_result.scalar_one_or_none() is not None
-    
-    if not is_member and not current_user.is_admin:
+    if not is_member and not current_user.is_admin():
         raise HTTPException(status_code=403, detail="Access denied to team dashboard")
     
-    # Calculate date ranges
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=period_days)
-    previous_start_date = start_date - timedelta(days=period_days)
+    # Sections are built concurrently and cached per team/period
+    snapshot = await team_dashboard_service.get_snapshot(
+        team_id, period_days, use_cache=not refresh
+    )
     
-    # Get team information
     team_info = {
         "id": team.id,
         "name": team.name,
         "description": team.description,
         "created_at": team.created_at,
         "status": getattr(team, 'status', 'active'),
-        "total_members": 0,  # Will be filled below
-        "total_projects": 0  # Will be filled below
+        "total_members": len(snapshot["members"]),
+        "total_projects": len(snapshot["projects"])
     }
     
-    # Get team members with activity data
-    members_query = select(
-        TeamMember,
-        User,
-        func.count(AuditLog.id).label('activity_count')
-    ).select_from(
-        TeamMember.__table__.join(User.__table__)
-        .outerjoin(
-            AuditLog.__table__,
-            and_(
-                AuditLog.user_id == User.id,
-                AuditLog.team_id == str(team_id),
-                AuditLog.timestamp >= start_date
-            )
-        )
-    ).where(
-        TeamMember.team_id == team_id
-    ).group_by(TeamMember.id, User.id)
-    
-    members_result = await session.execute(members_query)
-    members_data = members_result.all()
-    
-    members = []
-    for member_data in members_data:
-        team_member, user, activity_count = member_data
-        
-        # Get project count for user
-        projects_query = select(func.count(Project.id)).where(
-            Project.team_id == team_id
-        )
-        projects_result = await session.execute(projects_query)
-        projects_count = projects_result.scalar() or 0
-        
-        members.append(TeamMemberSummary(
-            id=team_member.id,
-            user_id=user.id,
-            user_name=user.full_name or f"{user.first_name} {user.last_name}",
-            user_email=user.email,
-            role=team_member.role or 'member',
-            is_active=getattr(team_member, 'is_active', True),
-            last_activity=getattr(user, 'last_login', None),
-            projects_count=projects_count,
-            contributions_this_week=activity_count or 0
-        ))
-    
-    team_info["total_members"] = len(members)
-    
-    # Get team projects
-    projects_query = select(Project).where(Project.team_id == team_id)
-    projects_result = await session.execute(projects_query)
-    projects_data = projects_result.scalars().all()
-    
-    projects = []
-    for project in projects_data:
-        # Calculate completion percentage (simplified)
-        completion_percentage = 75.0  # This would be calculated based on actual project metrics
-        
-        # Get recent activity count
-        activity_query = select(func.count(AuditLog.id)).where(
-            and_(
-                AuditLog.resource_type == 'project',
-                AuditLog.resource_id == str(project.id),
-                AuditLog.timestamp >= start_date
-            )
-        )
-        activity_result = await session.execute(activity_query)
-        recent_activity_count = activity_result.scalar() or 0
-        
-        projects.append(TeamProjectSummary(
-            id=project.id,
-            name=project.name,
-            description=project.description,
-            status=getattr(project, 'status', 'active'),
-            priority=getattr(project, 'priority', 'medium'),
-            completion_percentage=completion_percentage,
-            last_updated=project.updated_at or project.created_at,
-            assigned_members=len([m for m in members]),  # Simplified
-            recent_activity_count=recent_activity_count
-        ))
-    
-    team_info["total_projects"] = len(projects)
-    
-    # Get activity metrics
-    activity_metrics = await _get_team_activity_metrics(session, team_id, start_date, end_date, previous_start_date)
-    
-    # Get performance metrics
-    performance_metrics = await _get_team_performance_metrics(session, team_id, start_date, end_date)
-    
-    # Get resource utilization
-    resource_utilization = await _get_team_resource_utilization(session, team_id)
-    
-    # Get collaboration metrics
-    collaboration_metrics = await _get_team_collaboration_metrics(session, team_id, start_date, end_date)
-    
-    # Get recent alerts
-    recent_alerts = await _get_team_recent_alerts(session, team_id)
-    
-    # Get upcoming deadlines
-    upcoming_deadlines = await _get_team_upcoming_deadlines(session, team_id)
-    
     return TeamDashboardResponse(
         team_info=team_info,
-        members=members,
-        projects=projects,
-        activity_metrics=activity_metrics,
-        performance_metrics=performance_metrics,
-        resource_utilization=resource_utilization,
-        collaboration_metrics=collaboration_metrics,
-        recent_alerts=recent_alerts,
-        upcoming_deadlines=upcoming_deadlines
-    )
-
-
-async def _get_team_activity_metrics(
-    session: AsyncSession,
-    team_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    previous_start_date: datetime
-) -> TeamActivityMetrics:
-    """Get team activity metrics."""
-    
-    # Total activities in period
-    total_query = select(func.count(AuditLog.id)).where(
-        and_(
-            AuditLog.team_id == str(team_id),
-            AuditLog.timestamp >= start_date,
-            AuditLog.timestamp <= end_date
-        )
-    )
-    total_result = await session.execute(total_query)
-    total_activities = total_result.scalar() or 0
-    
-    # Activities this week
-    week_ago = end_date - timedelta(days=7)
-    week_query = select(func.count(AuditLog.id)).where(
-        and_(
-            AuditLog.team_id == str(team_id),
-            AuditLog.timestamp >= week_ago,
-            AuditLog.timestamp <= end_date
-        )
-    )
-    week_result = await session.execute(week_query)
-    activities_this_week = week_result.scalar() or 0
-    
-    # Activities this month
-    month_ago = end_date - timedelta(days=30)
-    month_query = select(func.count(AuditLog.id)).where(
-        and_(
-            AuditLog.team_id == str(team_id),
-            AuditLog.timestamp >= month_ago,
-            AuditLog.timestamp <= end_date
-        )
-    )
-    month_result = await session.execute(month_query)
-    activities_this_month = month_result.scalar() or 0
-    
-    # Previous period activities for trend calculation
-    previous_query = select(func.count(AuditLog.id)).where(
-        and_(
-            AuditLog.team_id == str(team_id),
-            AuditLog.timestamp >= previous_start_date,
-            AuditLog.timestamp < start_date
-        )
-    )
-    previous_result = await session.execute(previous_query)
-    previous_activities = previous_result.scalar() or 0
-    
-    # Calculate trend
-    if previous_activities > 0:
-        activity_trend = ((total_activities - previous_activities) / previous_activities) * 100
-    else:
-        activity_trend = 100.0 if total_activities > 0 else 0.0
-    
-    # Top activity types
-    types_query = select(
-        AuditLog.event_type,
-        func.count(AuditLog.id).label('count')
-    ).where(
-        and_(
-            AuditLog.team_id == str(team_id),
-            AuditLog.timestamp >= start_date,
-            AuditLog.timestamp <= end_date
-        )
-    ).group_by(AuditLog.event_type).order_by(desc('count')).limit(5)
-    
-    types_result = await session.execute(types_query)
-    top_activity_types = {row[0]: row[1] for row in types_result.fetchall()}
-    
-    # Recent activities
-    recent_query = select(AuditLog).where(
-        AuditLog.team_id == str(team_id)
-    ).order_by(desc(AuditLog.timestamp)).limit(10)
-    
-    recent_result = await session.execute(recent_query)
-    recent_logs = recent_result.scalars().all()
-    
-    recent_activities = [
-        {
-            "id": log.id,
-            "event_type": log.event_type,
-            "message": log.message,
-            "user_email": log.user_email,
-            "timestamp": log.timestamp,
-            "success": log.success
-        }
-        for log in recent_logs
-    ]
-    
-    return TeamActivityMetrics(
-        total_activities=total_activities,
-        activities_this_week=activities_this_week,
-        activities_this_month=activities_this_month,
-        activity_trend=round(activity_trend, 2),
-        top_activity_types=top_activity_types,
-        recent_activities=recent_activities
-    )
-
-
-async def _get_team_performance_metrics(
-    session: AsyncSession,
-    team_id: int,
-    start_date: datetime,
-    end_date: datetime
-) -> TeamPerformanceMetrics:
-    """Get team performance metrics."""
-    
-    # Get project counts by status
-    projects_query = select(Project).where(Project.team_id == team_id)
-    projects_result = await session.execute(projects_query)
-    projects = projects_result.scalars().all()
-    
-    projects_completed = len([p for p in projects if getattr(p, 'status', 'active') == 'completed'])
-    projects_in_progress = len([p for p in projects if getattr(p, 'status', 'active') == 'in_progress'])
-    projects_planned = len([p for p in projects if getattr(p, 'status', 'active') == 'planned'])
-    
-    # Calculate averages (simplified for demo)
-    average_project_completion_time = 45.5  # days
-    team_velocity = 2.3  # projects per month
-    success_rate = 87.5  # percentage
-    quality_score = 92.1  # score
-    
-    return TeamPerformanceMetrics(
-        projects_completed=projects_completed,
-        projects_in_progress=projects_in_progress,
-        projects_planned=projects_planned,
-        average_project_completion_time=average_project_completion_time,
-        team_velocity=team_velocity,
-        success_rate=success_rate,
-        quality_score=quality_score
+        members=snapshot["members"],
+        projects=snapshot["projects"],
+        activity_metrics=snapshot["activity_metrics"],
+        performance_metrics=snapshot["performance_metrics"],
+        resource_utilization=await _get_team_resource_utilization(session, team_id),
+        collaboration_metrics=snapshot["collaboration_metrics"],
+        recent_alerts=await _get_team_recent_alerts(session, team_id),
+        upcoming_deadlines=await _get_team_upcoming_deadlines(session, team_id),
+        section_timings=snapshot["section_timings"],
+        cached=snapshot["cached"],
+        generated_at=snapshot["generated_at"]
     )
 
 
@@ -423,41 +184,6 @@ async def _get_team_resource_utilization(
     )
 
 
-async def _get_team_collaboration_metrics(
-    session: AsyncSession,
-    team_id: int,
-    start_date: datetime,
-    end_date: datetime
-) -> TeamCollaborationMetrics:
-    """Get team collaboration metrics."""
-    
-    # Get team member count
-    members_query = select(func.count(TeamMember.id)).where(TeamMember.team_id == team_id)
-    members_result = await session.execute(members_query)
-    total_team_members = members_result.scalar() or 0
-    
-    # Active members this week (simplified)
-    week_ago = end_date - timedelta(days=7)
-    active_query = select(func.count(func.distinct(AuditLog.user_id))).where(
-        and_(
-            AuditLog.team_id == str(team_id),
-            AuditLog.timestamp >= week_ago
-        )
-    )
-    active_result = await session.execute(active_query)
-    active_members_this_week = active_result.scalar() or 0
-    
-    # Demo data for other metrics
-    return TeamCollaborationMetrics(
-        total_team_members=total_team_members,
-        active_members_this_week=active_members_this_week,
-        cross_team_collaborations=8,
-        knowledge_sharing_sessions=3,
-        peer_reviews_completed=15,
-        mentoring_relationships=4
-    )
-
-
 async def _get_team_recent_alerts(
     session: AsyncSession,
     team_id: int
@@ -25,9 +25,10 @@ from app.schemas.webhook import (
     WebhookResponse
 )
 from app.utils.security import verify_webhook_signature
+from app.utils.request_body import CachedBodyRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CachedBodyRoute)
 
 
 @router.post("/alerts", response_model=WebhookResponse)
@@ -47,7 +48,7 @@ async def receive_generic_alert_webhook(
         
         # Parse JSON payload
         try:
-            payload = json.loads(body.decode('utf-8'))
+            payload = await request.json()
         except json.JSONDecodeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -103,7 +104,7 @@ async def receive_slack_event(
     """
     try:
         body = await request.body()
-        payload = json.loads(body.decode('utf-8'))
+        payload = await request.json()
         
         # Handle Slack URL verification challenge
         if payload.get('type') == 'url_verification':
@@ -20,8 +20,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_async_db
 from app.core.auth import get_current_user_websocket, get_current_user
+from app.core.auth.resource_access import accessible_project_ids
 from app.models.user import User
-from app.models.project import Project
 from app.services.websocket_service import websocket_manager, MessageType
 from app.services.background_tasks import background_task_manager
 
@@ -62,11 +62,7 @@ async def websocket_endpoint(
             return
 
         # Get user's accessible projects
-        user_projects = await db.execute(
-            Project.query.filter(Project.is_accessible_by_user(current_user))
-        )
-
-        project_ids = [project.id for project in user_projects.scalars().all()]
+        project_ids = await accessible_project_ids(db, current_user.id)
 
         # Connect to WebSocket manager
         connection_id = await websocket_manager.connect(
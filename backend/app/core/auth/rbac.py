@@ -4,7 +4,7 @@ Provides decorators, dependencies, and utilities for permission checking.
 """
 
 from functools import wraps
-from typing import List, Optional, Callable, Union
+from typing import Any, Dict, Iterable, List, Optional, Callable, Set, Union
 from fastapi import Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +17,10 @@ from app.models.role import PermissionType, SystemRole
 from app.models.team import TeamRole
 from app.models.user_team import UserTeam
 from app.services.role_service import RoleService
+from app.core.auth.resource_access import (
+    filter_accessible_projects,
+    filter_accessible_resources,
+)
 
 # from app.api.v1.endpoints.auth import get_current_user
 from app.db.database import get_db, get_async_db
@@ -101,6 +105,38 @@ class RBACContext:
             resource_user_id
         ) or await self.has_system_permission(required_permission)
 
+    async def accessible_owned_resources(
+        self, resource_owners: Dict[int, int], required_permission: PermissionType
+    ) -> Set[int]:
+        """
+        Batch form of can_access_resource for a page of resources.
+
+        Args:
+            resource_owners: Owner user ID of each resource, keyed by resource ID
+            required_permission: Permission granting access to resources the user does not own
+
+        Returns:
+            Set[int]: IDs of the resources the user can access
+        """
+        owned = {
+            resource_id
+            for resource_id, owner_id in resource_owners.items()
+            if self.is_resource_owner(owner_id)
+        }
+        if len(owned) < len(resource_owners) and await self.has_system_permission(
+            required_permission
+        ):
+            return set(resource_owners)
+        return owned
+
+    async def accessible_projects(self, project_ids: Iterable[int]) -> Set[int]:
+        """Subset of project IDs the user can access, checked in one query."""
+        return await filter_accessible_projects(self.db, self.user.id, project_ids)
+
+    async def accessible_resources(self, model: Any, resource_ids: Iterable[int]) -> Set[int]:
+        """Subset of project-scoped resource IDs (e.g. Pipeline, Alert) the user can access."""
+        return await filter_accessible_resources(self.db, self.user.id, model, resource_ids)
+
 
 def require_permissions(
     permissions: Union[PermissionType, List[PermissionType]], all_required: bool = True
@@ -329,11 +365,11 @@ def require_enhanced_permission(permission: PermissionType, organization_id: Opt
             
             # Check permission using the enhanced permission service
             from app.services.permission_service import PermissionService
-            permission_check = await PermissionService.check_user_permission(
-                db, current_user.id, permission.value, org_id
+            permission_check = await PermissionService.check_permissions(
+                db, current_user.id, [permission.value], org_id
             )
             
-            if not permission_check["has_permission"]:
+            if not permission_check[permission.value]:
                 logger.warning(
                     f"User {current_user.id} denied access. Required permission: {permission.value}"
                 )
@@ -347,7 +383,7 @@ def require_enhanced_permission(permission: PermissionType, organization_id: Opt
                 raise PermissionDeniedError(f"Required permission: {permission.value}")
             
             logger.info(
-                f"User {current_user.id} granted access with permission: {permission.value} from sources: {permission_check['sources']}"
+                f"User {current_user.id} granted access with permission: {permission.value}"
             )
             return context
             
@@ -385,19 +421,14 @@ def require_any_enhanced_permission(*permissions: PermissionType, organization_i
             
             context = RBACContext(current_user, db)
             
-            # Check each permission until one passes
+            # Check all permissions in one lookup
             from app.services.permission_service import PermissionService
-            granted_permissions = []
-            
-            for permission in permissions:
-                permission_check = await PermissionService.check_user_permission(
-                    db, current_user.id, permission.value, org_id
-                )
-                if permission_check["has_permission"]:
-                    granted_permissions.append({
-                        "permission": permission.value,
-                        "sources": permission_check["sources"]
-                    })
+            permission_checks = await PermissionService.check_permissions(
+                db, current_user.id, [permission.value for permission in permissions], org_id
+            )
+            granted_permissions = [
+                permission for permission, granted in permission_checks.items() if granted
+            ]
             
             if not granted_permissions:
                 permission_names = [p.value for p in permissions]
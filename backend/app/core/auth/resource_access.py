@@ -0,0 +1,129 @@
+"""
+Batch resource authorization.
+
+Project-scoped resources (projects, pipelines, infrastructure changes,
+alerts, clusters) are accessible to a user when their project is public or
+belongs to a team the user is an active member of. Rather than loading each
+resource's project and team memberships to check them one by one, these
+helpers express that rule as SQL, either to filter a listing query directly
+or to reduce a set of resource IDs to the accessible subset in one query.
+"""
+
+import logging
+from typing import Any, Iterable, List, Set
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.models.project import Project
+from app.models.user_team import UserTeam
+
+logger = logging.getLogger(__name__)
+
+
+def member_team_ids(user_id: int):
+    """Subquery of the teams a user is an active member of."""
+    user_teams = UserTeam.__table__
+    return select(user_teams.c.team_id).where(
+        user_teams.c.user_id == user_id,
+        user_teams.c.is_active.is_(True),
+    )
+
+
+def project_access_filter(user_id: int) -> ColumnElement:
+    """
+    Filter on the projects table keeping projects the user can access.
+
+    Usable in any query that selects from or joins projects, e.g.
+    select(Pipeline).join(Project).where(project_access_filter(user_id)).
+    """
+    projects = Project.__table__
+    return or_(
+        projects.c.is_public.is_(True),
+        projects.c.team_id.in_(member_team_ids(user_id)),
+    )
+
+
+def resource_access_filter(project_id_column: Any, user_id: int) -> ColumnElement:
+    """
+    Filter keeping rows whose project the user can access, without a join.
+
+    Args:
+        project_id_column: Column holding the resource's project ID, e.g. Alert.project_id
+        user_id: User to authorize
+    """
+    projects = Project.__table__
+    return project_id_column.in_(
+        select(projects.c.id).where(project_access_filter(user_id))
+    )
+
+
+async def accessible_project_ids(db: AsyncSession, user_id: int) -> List[int]:
+    """IDs of every project the user can access."""
+    projects = Project.__table__
+    result = await db.execute(
+        select(projects.c.id).where(project_access_filter(user_id))
+    )
+    return list(result.scalars().all())
+
+
+async def filter_accessible_projects(
+    db: AsyncSession, user_id: int, project_ids: Iterable[int]
+) -> Set[int]:
+    """
+    Subset of project IDs the user can access, checked in one query.
+
+    Args:
+        db: Database session
+        user_id: User to authorize
+        project_ids: Candidate project IDs
+
+    Returns:
+        Set[int]: Accessible project IDs
+    """
+    project_ids = set(project_ids)
+    if not project_ids:
+        return set()
+
+    projects = Project.__table__
+    result = await db.execute(
+        select(projects.c.id).where(
+            projects.c.id.in_(project_ids), project_access_filter(user_id)
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def filter_accessible_resources(
+    db: AsyncSession, user_id: int, model: Any, resource_ids: Iterable[int]
+) -> Set[int]:
+    """
+    Subset of project-scoped resource IDs the user can access, checked in one query.
+
+    Args:
+        db: Database session
+        user_id: User to authorize
+        model: Resource model with id and project_id columns, e.g. Pipeline
+        resource_ids: Candidate resource IDs
+
+    Returns:
+        Set[int]: Accessible resource IDs
+    """
+    resource_ids = set(resource_ids)
+    if not resource_ids:
+        return set()
+
+    table = model.__table__
+    result = await db.execute(
+        select(table.c.id).where(
+            table.c.id.in_(resource_ids),
+            resource_access_filter(table.c.project_id, user_id),
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def can_access_project(db: AsyncSession, user_id: int, project_id: int) -> bool:
+    """Check access to a single project without loading it or its team."""
+    return project_id in await filter_accessible_projects(db, user_id, [project_id])
@@ -18,6 +18,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 
 from app.core.config import settings
+from app.core.auth_context import auth_context_cache
 from app.models.user import User
 from app.schemas.auth import JWTTokenClaims, SSOSession
 
@@ -240,6 +241,7 @@ class TokenManager:
     
     async def revoke_all_user_tokens(self, user_id: str) -> None:
         """Revoke all tokens for a user."""
+        auth_context_cache.invalidate_user(user_id)
         # This would typically involve querying all active tokens for the user
         # For now, we'll implement a simple version
         if self.redis_client:
@@ -339,6 +341,7 @@ class TokenManager:
     
     async def _blacklist_token(self, token: str) -> None:
         """Add token to blacklist."""
+        auth_context_cache.invalidate_token(token)
         try:
             # Get token expiration for TTL
             payload = jwt.decode(
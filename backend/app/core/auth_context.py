@@ -0,0 +1,235 @@
+"""
+Request authentication context cache.
+
+Verified bearer tokens are cached by a hash of the full token as a compact
+principal, until the token expires. Each user's effective permissions are
+cached per organization as a bitset over PermissionType, so checking the
+permissions an endpoint requires is a mask comparison. Entries are dropped
+when tokens are revoked and when roles, permissions or their assignments
+change; a maximum TTL bounds staleness for changes made by other processes.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.role import PermissionType
+
+# Bit position of each permission; stable for the lifetime of the process
+PERMISSION_BITS: Dict[PermissionType, int] = {
+    permission: 1 << index for index, permission in enumerate(PermissionType)
+}
+ALL_PERMISSIONS = sum(PERMISSION_BITS.values())
+
+
+def permission_mask(permissions: Iterable[Any]) -> int:
+    """
+    Bitset of the given permissions.
+
+    Accepts PermissionType members or their string values; unknown names are
+    ignored since they cannot be required by any endpoint.
+    """
+    mask = 0
+    for permission in permissions:
+        permission = getattr(permission, "value", permission)
+        try:
+            mask |= PERMISSION_BITS[PermissionType(permission)]
+        except ValueError:
+            continue
+    return mask
+
+
+@lru_cache(maxsize=256)
+def required_mask(permissions: Tuple[PermissionType, ...]) -> int:
+    """permission_mask for the fixed permission tuples endpoints require."""
+    return permission_mask(permissions)
+
+
+def mask_permissions(mask: int) -> List[PermissionType]:
+    """Permissions set in a bitset, in PermissionType order."""
+    return [permission for permission, bit in PERMISSION_BITS.items() if mask & bit]
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handling, detached from the ORM."""
+
+    id: int
+    email: Optional[str] = None
+    github_username: Optional[str] = None
+    full_name: Optional[str] = None
+    organization_id: Optional[int] = None
+    role_id: Optional[int] = None
+    is_active: bool = True
+    is_superuser: bool = False
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=user.id,
+            email=getattr(user, "email", None),
+            github_username=getattr(user, "github_username", None),
+            full_name=getattr(user, "full_name", None),
+            organization_id=getattr(user, "organization_id", None),
+            role_id=getattr(user, "role_id", None),
+            is_active=bool(getattr(user, "is_active", True)),
+            is_superuser=bool(getattr(user, "is_superuser", False)),
+        )
+
+    @property
+    def username(self) -> Optional[str]:
+        return self.github_username
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Principal":
+        return cls(**data)
+
+
+def token_digest(token: str) -> bytes:
+    """Cache key for a bearer token: SHA-256 of the whole token."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class AuthContextCache:
+    """
+    In-process cache of verified principals and permission bitsets.
+
+    Principals are keyed by token digest and expire with the token (or after
+    max_ttl, whichever is sooner). Permission bitsets are keyed by
+    (user_id, organization_id) and expire after max_ttl, or sooner when a
+    role grant behind them expires. Both maps are bounded and evict least recently used entries.
+    """
+
+    def __init__(self, max_tokens: int = 10000, max_permission_sets: int = 10000, max_ttl: float = 60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_tokens: Maximum number of cached principals
+            max_permission_sets: Maximum number of cached permission bitsets
+            max_ttl: Upper bound in seconds on how long any entry is trusted
+        """
+        self.max_tokens = max_tokens
+        self.max_permission_sets = max_permission_sets
+        self.max_ttl = max_ttl
+        self._tokens: "OrderedDict[bytes, Tuple[Principal, float]]" = OrderedDict()
+        self._permissions: "OrderedDict[Tuple[int, Optional[int]], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, entries: OrderedDict, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del entries[key]
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _store(self, entries: OrderedDict, key: Any, value: Any, ttl: float, limit: int) -> None:
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            entries[key] = (value, time.monotonic() + ttl)
+            entries.move_to_end(key)
+            while len(entries) > limit:
+                entries.popitem(last=False)
+
+    def get_principal(self, token: str) -> Optional[Principal]:
+        """Principal for a previously verified, unexpired token."""
+        return self._lookup(self._tokens, token_digest(token))
+
+    def put_principal(self, token: str, principal: Principal, expires_at: Optional[float] = None) -> None:
+        """
+        Cache the principal a token was verified as.
+
+        Args:
+            token: Bearer token
+            principal: Principal the token authenticates
+            expires_at: The token's exp claim (epoch seconds), if any
+        """
+        ttl = self.max_ttl if expires_at is None else expires_at - time.time()
+        self._store(self._tokens, token_digest(token), principal, ttl, self.max_tokens)
+
+    def get_permissions(self, user_id: int, organization_id: Optional[int]) -> Optional[int]:
+        """Cached permission bitset of a user in an organization."""
+        return self._lookup(self._permissions, (user_id, organization_id))
+
+    def put_permissions(
+        self, user_id: int, organization_id: Optional[int], mask: int, expires_at: Optional[float] = None
+    ) -> None:
+        """
+        Cache a permission bitset.
+
+        Args:
+            expires_at: When a grant behind the bitset expires (epoch seconds), if any
+        """
+        ttl = self.max_ttl if expires_at is None else expires_at - time.time()
+        self._store(
+            self._permissions, (user_id, organization_id), mask, ttl, self.max_permission_sets
+        )
+
+    def invalidate_token(self, token: str) -> None:
+        """Forget a token, e.g. when it is revoked."""
+        with self._lock:
+            self._tokens.pop(token_digest(token), None)
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """Forget a user's principals and permission bitsets."""
+        user_id = int(user_id)
+        with self._lock:
+            for key in [key for key, (principal, _) in self._tokens.items() if principal.id == user_id]:
+                del self._tokens[key]
+            for key in [key for key in self._permissions if key[0] == user_id]:
+                del self._permissions[key]
+
+    def invalidate_user_permissions(self, user_id: Any) -> None:
+        """Forget a user's permission bitsets, keeping their verified tokens."""
+        user_id = int(user_id)
+        with self._lock:
+            for key in [key for key in self._permissions if key[0] == user_id]:
+                del self._permissions[key]
+
+    def invalidate_permissions(self) -> None:
+        """Forget every permission bitset, e.g. after a role's permissions change."""
+        with self._lock:
+            self._permissions.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._permissions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "tokens": len(self._tokens),
+            "permission_sets": len(self._permissions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global auth context cache instance
+auth_context_cache = AuthContextCache(
+    max_tokens=settings.AUTH_CONTEXT_CACHE_SIZE,
+    max_permission_sets=settings.AUTH_CONTEXT_CACHE_SIZE,
+    max_ttl=settings.AUTH_CONTEXT_CACHE_TTL,
+)
@@ -5,7 +5,7 @@ This module uses Pydantic's BaseSettings for type-safe configuration
 management, loading values from environment variables.
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, RedisDsn, HttpUrl, field_validator, Field
 import json
@@ -146,6 +146,73 @@ class Settings(BaseSettings):
     # API Settings
     API_V1_STR: str = "/api/v1"
 
+    # Query Profiling Settings
+    N_PLUS_ONE_DETECTION: Optional[bool] = Field(
+        default=None,
+        env="N_PLUS_ONE_DETECTION",
+        description="Detect repeated queries per request; defaults to on in development and staging"
+    )
+    N_PLUS_ONE_THRESHOLD: int = Field(default=5, env="N_PLUS_ONE_THRESHOLD")
+
+    @property
+    def N_PLUS_ONE_DETECTION_ENABLED(self) -> bool:
+        if self.N_PLUS_ONE_DETECTION is not None:
+            return self.N_PLUS_ONE_DETECTION
+        return self.ENVIRONMENT.lower() in ("development", "staging")
+
+    # Audit Writer Settings
+    AUDIT_WRITER_QUEUE_SIZE: int = Field(default=10000, env="AUDIT_WRITER_QUEUE_SIZE")
+    AUDIT_WRITER_BATCH_SIZE: int = Field(default=500, env="AUDIT_WRITER_BATCH_SIZE")
+    AUDIT_WRITER_FLUSH_INTERVAL: float = Field(
+        default=1.0,
+        env="AUDIT_WRITER_FLUSH_INTERVAL",
+        description="Maximum seconds an audit event waits in the queue before being written"
+    )
+    AUDIT_WRITER_OVERFLOW_POLICY: str = Field(
+        default="spill",
+        env="AUDIT_WRITER_OVERFLOW_POLICY",
+        description="What to do with audit events when the queue is full: 'spill' to disk or 'drop'"
+    )
+    AUDIT_WRITER_SPILL_PATH: str = Field(
+        default="/tmp/opssight-audit-spill.jsonl",
+        env="AUDIT_WRITER_SPILL_PATH"
+    )
+
+    # Partitioning and Retention Settings
+    PARTITION_MONTHS_AHEAD: int = Field(default=3, env="PARTITION_MONTHS_AHEAD")
+    PARTITION_MAINTENANCE_INTERVAL_HOURS: int = Field(
+        default=6, env="PARTITION_MAINTENANCE_INTERVAL_HOURS"
+    )
+    PARTITION_RETENTION_MODE: str = Field(
+        default="drop",
+        env="PARTITION_RETENTION_MODE",
+        description="Expire partitions by 'drop' or 'detach' (keep as standalone tables for archiving)"
+    )
+    AUDIT_LOG_RETENTION_DAYS: int = Field(default=2555, env="AUDIT_LOG_RETENTION_DAYS")
+    METRICS_RETENTION_DAYS: int = Field(default=395, env="METRICS_RETENTION_DAYS")
+
+    # Auth Context Cache Settings
+    AUTH_CONTEXT_CACHE_SIZE: int = Field(default=10000, env="AUTH_CONTEXT_CACHE_SIZE")
+    AUTH_CONTEXT_CACHE_TTL: float = Field(
+        default=60.0,
+        env="AUTH_CONTEXT_CACHE_TTL",
+        description="Maximum seconds a verified token or permission set is reused; 0 disables the cache"
+    )
+
+    # Prometheus Query Cache Settings
+    PROMETHEUS_QUERY_CACHE_SIZE: int = Field(default=2048, env="PROMETHEUS_QUERY_CACHE_SIZE")
+    PROMETHEUS_QUERY_CACHE_TTL: float = Field(
+        default=30.0,
+        env="PROMETHEUS_QUERY_CACHE_TTL",
+        description="Seconds a Prometheus query result is reused; 0 disables the cache"
+    )
+    PROMETHEUS_MAX_CONCURRENT_QUERIES: int = Field(default=8, env="PROMETHEUS_MAX_CONCURRENT_QUERIES")
+    PROMETHEUS_MAX_CLUSTERS_PER_QUERY: int = Field(
+        default=50,
+        env="PROMETHEUS_MAX_CLUSTERS_PER_QUERY",
+        description="Clusters selected by one batched multi-cluster query"
+    )
+
     # Slack Settings
     SLACK_SIGNING_SECRET: str = "dummy"
     SLACK_BOT_TOKEN: str = Field(default="dummy", env="SLACK_BOT_TOKEN")
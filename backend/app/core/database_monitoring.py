@@ -11,6 +11,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
 import asyncio
+import weakref
 
 from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncEngine
@@ -18,6 +19,8 @@ from sqlalchemy.pool import Pool
 from sqlalchemy import event
 import prometheus_client
 from app.core.monitoring import DB_QUERY_DURATION
+from app.core.query_stats import QueryStatsRegistry, extract_table_name
+from app.core.query_profiler import n_plus_one_detector
 
 logger = logging.getLogger(__name__)
 
@@ -79,26 +82,36 @@ class DatabaseMonitor:
     slow query logging and alerting capabilities.
     """
 
-    def __init__(self, slow_query_threshold: float = 1.0):
+    def __init__(
+        self, slow_query_threshold: float = 1.0, max_statements: int = 5000
+    ):
         """
         Initialize database monitor.
 
         Args:
             slow_query_threshold: Threshold in seconds for slow query detection
+            max_statements: Maximum number of statement fingerprints tracked
         """
         self.slow_query_threshold = slow_query_threshold
         self.query_metrics: deque = deque(maxlen=1000)  # Keep last 1000 queries
         self.pool_metrics: deque = deque(maxlen=100)  # Keep last 100 pool snapshots
-        self.query_stats: Dict[str, List[float]] = defaultdict(list)
+        self.query_stats = QueryStatsRegistry(max_statements=max_statements)
         self._monitoring_active = False
+        self._monitored_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
 
     def setup_engine_monitoring(self, engine: AsyncEngine) -> None:
         """
         Set up monitoring for an async SQLAlchemy engine.
 
+        Hooks are attached once per engine, so calling this again (e.g. on
+        every application startup in one process) does not count queries twice.
+
         Args:
             engine: SQLAlchemy async engine to monitor
         """
+        if engine.sync_engine in self._monitored_engines:
+            return
+        self._monitored_engines.add(engine.sync_engine)
 
         # Monitor connection pool events
         @event.listens_for(engine.sync_engine.pool, "connect")
@@ -130,6 +143,19 @@ class DatabaseMonitor:
         ):
             duration = time.time() - context._query_start_time
             self._record_query_metrics(statement, duration)
+            n_plus_one_detector.record(statement)
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def handle_error(exception_context):
+            context = exception_context.execution_context
+            start_time = getattr(context, "_query_start_time", None)
+            if start_time is None or exception_context.statement is None:
+                return
+            self._record_query_metrics(
+                exception_context.statement,
+                time.time() - start_time,
+                error=str(exception_context.original_exception),
+            )
 
         self._monitoring_active = True
         logger.info("Database monitoring enabled")
@@ -153,7 +179,9 @@ class DatabaseMonitor:
         except Exception as e:
             logger.error(f"Error updating pool metrics: {e}")
 
-    def _record_query_metrics(self, statement: str, duration: float) -> None:
+    def _record_query_metrics(
+        self, statement: str, duration: float, error: Optional[str] = None
+    ) -> None:
         """Record metrics for a database query."""
         try:
             # Extract query type and table name
@@ -166,10 +194,17 @@ class DatabaseMonitor:
                 timestamp=datetime.now(),
                 table=table,
                 query_type=query_type,
+                error=error,
             )
 
             self.query_metrics.append(metrics)
-            self.query_stats[query_type].append(duration)
+            self.query_stats.record(
+                statement,
+                duration,
+                query_type=query_type,
+                slow=duration > self.slow_query_threshold,
+                error=error is not None,
+            )
 
             # Update Prometheus metrics
             if DB_QUERY_DURATION is not None:
@@ -212,18 +247,9 @@ class DatabaseMonitor:
     def _extract_table_name(self, statement: str) -> Optional[str]:
         """Extract table name from SQL statement."""
         try:
-            statement = statement.strip().upper()
-            words = statement.split()
-
-            if statement.startswith("SELECT") and "FROM" in words:
-                from_index = words.index("FROM")
-                if from_index + 1 < len(words):
-                    return words[from_index + 1].strip('`"[]').lower()
-
+            return extract_table_name(statement)
         except Exception:
-            pass
-
-        return None
+            return None
 
     @asynccontextmanager
     async def query_timer(self, query_name: str):
@@ -306,6 +332,30 @@ class DatabaseMonitor:
 
         return stats
 
+    def get_statement_statistics(
+        self, limit: int = 20, order_by: str = "total_time"
+    ) -> Dict[str, Any]:
+        """
+        Get aggregated statistics per statement fingerprint.
+
+        Args:
+            limit: Maximum number of statements to return
+            order_by: Sort field (total_time, mean_time, max_time, calls, p99)
+
+        Returns:
+            Dictionary with registry summary and the top statements
+        """
+        return {
+            "summary": self.query_stats.summary(),
+            "statements": self.query_stats.top_statements(
+                limit=limit, order_by=order_by
+            ),
+        }
+
+    def get_table_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get latency quantiles per table."""
+        return self.query_stats.table_statistics()
+
     def get_pool_statistics(self) -> Dict[str, Any]:
         """Get connection pool statistics."""
         if not self.pool_metrics:
@@ -0,0 +1,238 @@
+"""
+Per-request query profiling and N+1 detection.
+Groups the statements executed while handling a request by fingerprint and
+reports statement shapes that repeat more often than a threshold.
+"""
+
+import logging
+import os
+import threading
+import traceback
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.query_stats import extract_table_name, fingerprint_id, fingerprint_statement
+
+logger = logging.getLogger(__name__)
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class RequestQueryLog:
+    """Statements executed while handling one request."""
+
+    method: str
+    path: str
+    endpoint: Optional[str] = None
+    total_queries: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+    stacks: Dict[str, List[str]] = field(default_factory=dict)
+
+
+@dataclass
+class NPlusOneReport:
+    """Aggregated report for one repeated statement shape on one endpoint."""
+
+    endpoint: str
+    query_id: str
+    fingerprint: str
+    table: Optional[str]
+    max_repetitions: int
+    occurrences: int = 1
+    stack: List[str] = field(default_factory=list)
+    first_seen: datetime = field(default_factory=datetime.now)
+    last_seen: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "query_id": self.query_id,
+            "query": self.fingerprint,
+            "table": self.table,
+            "max_repetitions": self.max_repetitions,
+            "occurrences": self.occurrences,
+            "stack": self.stack,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+        }
+
+
+_current_request: ContextVar[Optional[RequestQueryLog]] = ContextVar(
+    "query_profiler_request", default=None
+)
+
+
+def _application_stack(limit: int = 8) -> List[str]:
+    """Capture the innermost application frames of the current stack."""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(_APP_ROOT)
+        and not frame.filename.endswith(("query_profiler.py", "database_monitoring.py"))
+    ]
+    return [
+        f"{os.path.relpath(frame.filename, os.path.dirname(_APP_ROOT))}:{frame.lineno} "
+        f"in {frame.name}"
+        for frame in frames[-limit:]
+    ]
+
+
+class NPlusOneDetector:
+    """
+    Detects repeated-shape queries within a single request.
+
+    Statements are recorded from the SQLAlchemy cursor hooks into a
+    request-scoped log held in a context variable. Only SELECT statements
+    are considered. A stack trace is captured once per request and
+    fingerprint, when the repetition count first reaches the threshold.
+    """
+
+    def __init__(self, threshold: int = 5, max_reports: int = 200):
+        """
+        Initialize detector.
+
+        Args:
+            threshold: Number of executions of one statement shape within a
+                request at which it is reported
+            max_reports: Maximum number of endpoint/statement reports kept
+        """
+        self.threshold = threshold
+        self.max_reports = max_reports
+        self.enabled = False
+        self._reports: "OrderedDict[tuple, NPlusOneReport]" = OrderedDict()
+        self._fingerprint_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start_request(self, method: str, path: str) -> Optional[object]:
+        """Begin collecting statements for the current request context."""
+        if not self.enabled:
+            return None
+        return _current_request.set(RequestQueryLog(method=method, path=path))
+
+    def current_request(self) -> Optional[RequestQueryLog]:
+        return _current_request.get()
+
+    def record(self, statement: str) -> None:
+        """Record a statement against the current request, if any."""
+        log = _current_request.get()
+        if log is None:
+            return
+
+        log.total_queries += 1
+        if not statement.lstrip()[:6].upper() == "SELECT":
+            return
+
+        query_id, fingerprint = self._fingerprint(statement)
+        count = log.counts.get(query_id, 0) + 1
+        log.counts[query_id] = count
+        if count == 1:
+            log.fingerprints[query_id] = fingerprint
+        elif count == self.threshold:
+            log.stacks[query_id] = _application_stack()
+
+    def _fingerprint(self, statement: str) -> tuple:
+        with self._lock:
+            cached = self._fingerprint_cache.get(statement)
+            if cached is None:
+                fingerprint = fingerprint_statement(statement)
+                cached = (fingerprint_id(fingerprint), fingerprint)
+                self._fingerprint_cache[statement] = cached
+                if len(self._fingerprint_cache) > 5000:
+                    self._fingerprint_cache.popitem(last=False)
+            return cached
+
+    def finish_request(
+        self, token: Optional[object], endpoint: Optional[str] = None
+    ) -> List[NPlusOneReport]:
+        """
+        Stop collecting for the current request and report repeated shapes.
+
+        Args:
+            token: Token returned by start_request
+            endpoint: Route template or handler name for the request
+
+        Returns:
+            Reports for statement shapes at or above the threshold
+        """
+        if token is None:
+            return []
+        log = _current_request.get()
+        _current_request.reset(token)
+        if log is None:
+            return []
+
+        endpoint_name = f"{log.method} {endpoint or log.endpoint or log.path}"
+        flagged = []
+        for query_id, count in log.counts.items():
+            if count < self.threshold:
+                continue
+            report = self._store_report(
+                endpoint_name,
+                query_id,
+                log.fingerprints[query_id],
+                count,
+                log.stacks.get(query_id, []),
+            )
+            flagged.append(report)
+            logger.warning(
+                f"Possible N+1 query on {endpoint_name}: statement executed "
+                f"{count} times in one request ({log.total_queries} queries total) - "
+                f"{report.fingerprint[:200]}\n  " + "\n  ".join(report.stack)
+            )
+        return flagged
+
+    def _store_report(
+        self,
+        endpoint: str,
+        query_id: str,
+        fingerprint: str,
+        count: int,
+        stack: List[str],
+    ) -> NPlusOneReport:
+        key = (endpoint, query_id)
+        with self._lock:
+            report = self._reports.get(key)
+            if report is None:
+                report = NPlusOneReport(
+                    endpoint=endpoint,
+                    query_id=query_id,
+                    fingerprint=fingerprint[:2000],
+                    table=extract_table_name(fingerprint),
+                    max_repetitions=count,
+                    stack=stack,
+                )
+                self._reports[key] = report
+                if len(self._reports) > self.max_reports:
+                    self._reports.popitem(last=False)
+            else:
+                report.occurrences += 1
+                report.max_repetitions = max(report.max_repetitions, count)
+                report.last_seen = datetime.now()
+                if stack:
+                    report.stack = stack
+                self._reports.move_to_end(key)
+            return report
+
+    def get_reports(self) -> List[Dict[str, Any]]:
+        """Get recorded N+1 reports, worst offenders first."""
+        with self._lock:
+            reports = sorted(
+                self._reports.values(),
+                key=lambda r: (r.max_repetitions, r.occurrences),
+                reverse=True,
+            )
+            return [report.to_dict() for report in reports]
+
+    def clear(self) -> None:
+        """Discard recorded reports."""
+        with self._lock:
+            self._reports.clear()
+
+
+# Global detector instance
+n_plus_one_detector = NPlusOneDetector()
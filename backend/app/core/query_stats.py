@@ -0,0 +1,331 @@
+"""
+Statement-level query statistics.
+Provides SQL fingerprinting and fixed-memory latency histograms aggregated per
+statement shape and per table, similar to pg_stat_statements on the app side.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Literal and placeholder patterns replaced when fingerprinting a statement
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMBER_RE = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_BOOL_NULL_RE = re.compile(r"\b(?:TRUE|FALSE|NULL)\b", re.IGNORECASE)
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(
+    r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.IGNORECASE
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Clauses that are followed by the statement's primary table
+_TABLE_RE = re.compile(
+    r"\b(?:FROM|INTO|UPDATE|JOIN)\s+((?:[\"`\[]?\w+[\"`\]]?\.)?[\"`\[]?\w+[\"`\]]?)",
+    re.IGNORECASE,
+)
+
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    Normalize a SQL statement so that queries differing only in literal
+    values, bind parameters, IN-list lengths or whitespace share one shape.
+
+    Args:
+        statement: Raw SQL statement
+
+    Returns:
+        Normalized statement text
+    """
+    normalized = _COMMENT_RE.sub(" ", statement)
+    normalized = _STRING_RE.sub("?", normalized)
+    normalized = _PLACEHOLDER_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _BOOL_NULL_RE.sub("?", normalized)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    normalized = _VALUES_RE.sub("VALUES (...)", normalized)
+    return normalized
+
+
+def fingerprint_id(fingerprint: str) -> str:
+    """Stable short identifier for a fingerprint (akin to a queryid)."""
+    return hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def extract_table_name(statement: str) -> Optional[str]:
+    """
+    Extract the primary table of a SELECT, INSERT, UPDATE or DELETE statement.
+
+    Args:
+        statement: SQL statement
+
+    Returns:
+        Lower-cased table name (without schema), or None
+    """
+    match = _TABLE_RE.search(statement)
+    if not match:
+        return None
+    table = match.group(1).split(".")[-1]
+    return table.strip('`"[]').lower() or None
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with bounded relative error.
+
+    Bucket boundaries grow geometrically, so the number of buckets is fixed by
+    the tracked range and precision rather than by the number of samples.
+    Buckets are stored sparsely since most statements occupy a narrow range.
+    """
+
+    def __init__(
+        self,
+        min_value: float = 1e-5,
+        max_value: float = 3600.0,
+        precision: float = 0.05,
+    ):
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_base = math.log1p(precision)
+        self.max_bucket = self._bucket_for(max_value)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+
+    def _bucket_for(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_base) + 1
+
+    def _value_for(self, bucket: int) -> float:
+        if bucket == 0:
+            return self.min_value
+        # Geometric midpoint of the bucket
+        return self.min_value * math.exp((bucket - 0.5) * self._log_base)
+
+    def record(self, value: float) -> None:
+        bucket = min(self._bucket_for(value), self.max_bucket)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile q (0..1)."""
+        if self.count == 0:
+            return 0.0
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return self._value_for(bucket)
+        return self._value_for(max(self.buckets))
+
+    def quantiles(self, qs: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        return {f"p{int(q * 100)}": self.quantile(q) for q in qs}
+
+
+@dataclass
+class StatementStats:
+    """Aggregated statistics for one statement fingerprint."""
+
+    fingerprint: str
+    query_id: str
+    query_type: Optional[str] = None
+    table: Optional[str] = None
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    min_time: float = float("inf")
+    max_time: float = 0.0
+    slow_calls: int = 0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    first_seen: datetime = field(default_factory=datetime.now)
+    last_seen: datetime = field(default_factory=datetime.now)
+
+    def record(self, duration: float, slow: bool, error: bool) -> None:
+        self.calls += 1
+        self.total_time += duration
+        self.min_time = min(self.min_time, duration)
+        self.max_time = max(self.max_time, duration)
+        self.histogram.record(duration)
+        self.last_seen = datetime.now()
+        if slow:
+            self.slow_calls += 1
+        if error:
+            self.errors += 1
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "query_id": self.query_id,
+            "query": self.fingerprint,
+            "query_type": self.query_type,
+            "table": self.table,
+            "calls": self.calls,
+            "errors": self.errors,
+            "slow_calls": self.slow_calls,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "min_time": self.min_time if self.calls else 0.0,
+            "max_time": self.max_time,
+            **self.histogram.quantiles(),
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+        }
+
+
+class QueryStatsRegistry:
+    """
+    Fixed-memory registry of statement statistics.
+
+    Keeps at most ``max_statements`` fingerprints and ``max_tables`` tables,
+    evicting the least recently executed entries. Safe to call from the
+    SQLAlchemy event hooks, which may run on several threads.
+    """
+
+    ORDER_FIELDS = ("total_time", "mean_time", "max_time", "calls", "p99")
+
+    def __init__(
+        self,
+        max_statements: int = 5000,
+        max_tables: int = 500,
+        max_fingerprint_cache: int = 10000,
+    ):
+        self.max_statements = max_statements
+        self.max_tables = max_tables
+        self.max_fingerprint_cache = max_fingerprint_cache
+        self._statements: "OrderedDict[str, StatementStats]" = OrderedDict()
+        self._tables: "OrderedDict[str, LatencyHistogram]" = OrderedDict()
+        # Raw statement text -> (fingerprint, query id, table); ORM statements
+        # repeat verbatim, so most calls skip the regex normalization.
+        self._fingerprint_cache: "OrderedDict[str, Tuple[str, str, Optional[str]]]" = (
+            OrderedDict()
+        )
+        self.evicted_statements = 0
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, statement: str) -> Tuple[str, str, Optional[str]]:
+        cached = self._fingerprint_cache.get(statement)
+        if cached is not None:
+            self._fingerprint_cache.move_to_end(statement)
+            return cached
+        fingerprint = fingerprint_statement(statement)
+        cached = (fingerprint, fingerprint_id(fingerprint), extract_table_name(statement))
+        self._fingerprint_cache[statement] = cached
+        if len(self._fingerprint_cache) > self.max_fingerprint_cache:
+            self._fingerprint_cache.popitem(last=False)
+        return cached
+
+    def record(
+        self,
+        statement: str,
+        duration: float,
+        query_type: Optional[str] = None,
+        slow: bool = False,
+        error: bool = False,
+    ) -> StatementStats:
+        """Record one execution of a statement."""
+        with self._lock:
+            fingerprint, query_id, table = self._fingerprint(statement)
+
+            stats = self._statements.get(query_id)
+            if stats is None:
+                stats = StatementStats(
+                    fingerprint=fingerprint[:2000],
+                    query_id=query_id,
+                    query_type=query_type,
+                    table=table,
+                )
+                self._statements[query_id] = stats
+                if len(self._statements) > self.max_statements:
+                    self._statements.popitem(last=False)
+                    self.evicted_statements += 1
+            else:
+                self._statements.move_to_end(query_id)
+            stats.record(duration, slow, error)
+
+            if table:
+                histogram = self._tables.get(table)
+                if histogram is None:
+                    histogram = self._tables[table] = LatencyHistogram()
+                    if len(self._tables) > self.max_tables:
+                        self._tables.popitem(last=False)
+                else:
+                    self._tables.move_to_end(table)
+                histogram.record(duration)
+
+            return stats
+
+    def lookup(self, statement: str) -> Tuple[str, str, Optional[str]]:
+        """Return (fingerprint, query id, table) for a statement."""
+        with self._lock:
+            return self._fingerprint(statement)
+
+    def top_statements(
+        self, limit: int = 20, order_by: str = "total_time"
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the top statements ordered by the given field.
+
+        Args:
+            limit: Maximum number of statements to return
+            order_by: One of total_time, mean_time, max_time, calls, p99
+
+        Returns:
+            List of statement statistics dictionaries
+        """
+        if order_by not in self.ORDER_FIELDS:
+            raise ValueError(
+                f"order_by must be one of {', '.join(self.ORDER_FIELDS)}"
+            )
+        with self._lock:
+            statements = list(self._statements.values())
+            if order_by == "p99":
+                keyed = [(s.histogram.quantile(0.99), s) for s in statements]
+            else:
+                keyed = [(getattr(s, order_by), s) for s in statements]
+            keyed.sort(key=lambda item: item[0], reverse=True)
+            return [s.to_dict() for _, s in keyed[:limit]]
+
+    def table_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get latency statistics per table."""
+        with self._lock:
+            return {
+                table: {"count": histogram.count, **histogram.quantiles()}
+                for table, histogram in self._tables.items()
+            }
+
+    def summary(self) -> Dict[str, Any]:
+        """Get registry-wide totals."""
+        with self._lock:
+            overall = LatencyHistogram()
+            for stats in self._statements.values():
+                overall.merge(stats.histogram)
+            return {
+                "tracked_statements": len(self._statements),
+                "tracked_tables": len(self._tables),
+                "evicted_statements": self.evicted_statements,
+                "total_calls": overall.count,
+                **overall.quantiles(),
+            }
+
+    def reset(self) -> None:
+        """Discard all collected statistics."""
+        with self._lock:
+            self._statements.clear()
+            self._tables.clear()
+            self.evicted_statements = 0
@@ -0,0 +1,288 @@
+"""
+Time-based range partitioning helpers for PostgreSQL.
+
+High-volume, append-only tables (audit logs, metrics) are partitioned by
+month on their timestamp column. Future partitions are created ahead of time
+and retention is applied by detaching or dropping whole partitions, which is
+instant and leaves no dead tuples behind, unlike large DELETEs.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """A table range-partitioned by month on a timestamp column."""
+
+    name: str
+    column: str = "timestamp"
+    timezone_aware: bool = False
+
+
+# Tables converted to monthly range partitions by migration b3e8f2a61c07
+PARTITIONED_TABLES: Dict[str, PartitionedTable] = {
+    "audit_logs": PartitionedTable("audit_logs", "timestamp", timezone_aware=False),
+    "metrics": PartitionedTable("metrics", "timestamp", timezone_aware=True),
+}
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One monthly partition and its [start, end) bounds (naive UTC)."""
+
+    name: str
+    start: datetime
+    end: datetime
+    estimated_rows: int = 0
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing value, as naive UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month start by a number of months."""
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    """Name of the partition of table starting at start."""
+    return f"{table}_p{start:%Y_%m}"
+
+
+def _bound_literal(table: PartitionedTable, value: datetime) -> str:
+    suffix = "+00" if table.timezone_aware else ""
+    return f"'{value:%Y-%m-%d %H:%M:%S}{suffix}'"
+
+
+def create_partition_sql(table: PartitionedTable, start: datetime) -> str:
+    """DDL creating the monthly partition of table that starts at start."""
+    start = month_start(start)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table.name, start)} "
+        f"PARTITION OF {table.name} FOR VALUES FROM ({_bound_literal(table, start)}) "
+        f"TO ({_bound_literal(table, end)})"
+    )
+
+
+def parse_partition_bound(bound: str) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Parse a range partition bound as returned by pg_get_expr(relpartbound).
+
+    Returns:
+        (start, end) as naive UTC datetimes, or None for the default partition
+    """
+    match = _BOUND_RE.search(bound)
+    if not match:
+        return None
+    return tuple(_parse_bound_value(value) for value in match.groups())
+
+
+def _parse_bound_value(value: str) -> datetime:
+    # PostgreSQL renders offsets as +00 or +05:30; fromisoformat needs +00:00
+    if re.search(r"[+-]\d{2}$", value):
+        value += ":00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def expired_partitions(partitions: List[Partition], older_than: datetime) -> List[Partition]:
+    """Partitions whose whole range lies before older_than."""
+    cutoff = older_than
+    if cutoff.tzinfo is not None:
+        cutoff = cutoff.astimezone(timezone.utc).replace(tzinfo=None)
+    return [partition for partition in partitions if partition.end <= cutoff]
+
+
+class PartitionManager:
+    """Creates and expires monthly partitions of the partitioned tables."""
+
+    def __init__(self, months_ahead: int = 3):
+        """
+        Initialize partition manager.
+
+        Args:
+            months_ahead: Number of future monthly partitions kept in place
+        """
+        self.months_ahead = months_ahead
+
+    @staticmethod
+    def get_table(table: str) -> PartitionedTable:
+        try:
+            return PARTITIONED_TABLES[table]
+        except KeyError:
+            raise ValueError(f"Table '{table}' is not partitioned")
+
+    @staticmethod
+    async def is_partitioned(session: AsyncSession, table: str) -> bool:
+        """Whether table exists as a partitioned table in the database."""
+        if session.get_bind().dialect.name != "postgresql":
+            return False
+        result = await session.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        )
+        return result.scalar() == "p"
+
+    @staticmethod
+    async def _child_tables(session: AsyncSession, table: str) -> List[Tuple[str, str, int]]:
+        """(name, partition bound, estimated rows) of every partition of table."""
+        result = await session.execute(
+            text(
+                "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), "
+                "child.reltuples::bigint "
+                "FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(:table)"
+            ),
+            {"table": table},
+        )
+        return result.all()
+
+    @staticmethod
+    def _range_partitions(children: List[Tuple[str, str, int]]) -> List[Partition]:
+        partitions = []
+        for name, bound, estimated_rows in children:
+            bounds = parse_partition_bound(bound or "")
+            if bounds:
+                partitions.append(
+                    Partition(
+                        name=name,
+                        start=bounds[0],
+                        end=bounds[1],
+                        estimated_rows=max(int(estimated_rows or 0), 0),
+                    )
+                )
+        return sorted(partitions, key=lambda partition: partition.start)
+
+    @staticmethod
+    def _default_partition(children: List[Tuple[str, str, int]]) -> Optional[str]:
+        for name, bound, _ in children:
+            if (bound or "").strip().upper() == "DEFAULT":
+                return name
+        return None
+
+    async def list_partitions(self, session: AsyncSession, table: str) -> List[Partition]:
+        """List the range partitions of table ordered by start, excluding the default."""
+        return self._range_partitions(await self._child_tables(session, table))
+
+    async def ensure_partitions(
+        self, session: AsyncSession, table: str, now: Optional[datetime] = None
+    ) -> List[str]:
+        """
+        Create any missing partitions from the current month to months_ahead.
+
+        PostgreSQL refuses to create a partition while the default partition
+        holds rows in its range, so such rows are moved into the new
+        partition: the default is detached, the partition created, the rows
+        moved and the default re-attached, all in one transaction.
+
+        Returns:
+            Names of the partitions created
+        """
+        partitioned = self.get_table(table)
+        current = month_start(now or datetime.utcnow())
+        children = await self._child_tables(session, table)
+        existing = {p.start for p in self._range_partitions(children)}
+        default = self._default_partition(children)
+
+        created = []
+        for offset in range(self.months_ahead + 1):
+            start = add_months(current, offset)
+            if start in existing:
+                continue
+            await self._create_partition(session, partitioned, start, default)
+            created.append(partition_name(table, start))
+
+        if created:
+            await session.commit()
+            logger.info(f"Created partitions for {table}: {', '.join(created)}")
+        return created
+
+    async def _create_partition(
+        self,
+        session: AsyncSession,
+        table: PartitionedTable,
+        start: datetime,
+        default: Optional[str],
+    ) -> None:
+        create = text(create_partition_sql(table, start))
+        if default is None:
+            await session.execute(create)
+            return
+
+        name = partition_name(table.name, start)
+        in_range = (
+            f'"{table.column}" >= {_bound_literal(table, start)} '
+            f'AND "{table.column}" < {_bound_literal(table, add_months(start, 1))}'
+        )
+        result = await session.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")
+        )
+        if not result.scalar():
+            await session.execute(create)
+            return
+
+        await session.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {default}"))
+        await session.execute(create)
+        await session.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"))
+        await session.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+        await session.execute(text(f"ALTER TABLE {table.name} ATTACH PARTITION {default} DEFAULT"))
+        logger.warning(f"Moved rows of {name} out of default partition {default}")
+
+    async def expire_partitions(
+        self,
+        session: AsyncSession,
+        table: str,
+        older_than: datetime,
+        detach_only: bool = False,
+    ) -> List[Partition]:
+        """
+        Detach, and unless detach_only also drop, partitions entirely older than older_than.
+
+        Detached partitions become ordinary tables that can be archived and
+        dropped separately.
+
+        Returns:
+            The partitions expired
+        """
+        self.get_table(table)
+        expired = expired_partitions(await self.list_partitions(session, table), older_than)
+
+        for partition in expired:
+            await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+            if not detach_only:
+                await session.execute(text(f"DROP TABLE {partition.name}"))
+
+        if expired:
+            await session.commit()
+            action = "Detached" if detach_only else "Dropped"
+            logger.info(
+                f"{action} {len(expired)} expired partitions of {table}: "
+                f"{', '.join(p.name for p in expired)}"
+            )
+        return expired
+
+
+# Global partition manager instance
+partition_manager = PartitionManager(months_ahead=settings.PARTITION_MONTHS_AHEAD)
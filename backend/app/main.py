@@ -30,6 +30,7 @@ from app.core.exceptions import (
 from app.core.error_handlers import setup_error_handlers
 from app.core.monitoring import init_metrics
 from app.middleware import configure_middleware
+from app.middleware.request_context import RequestContextMiddleware, SecurityHeadersMiddleware
 
 # Import API routers
 from app.api.v1.api import api_router
@@ -74,6 +75,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         # Database connection will be tested when first used
         logger.info("✅ Database configured (connection will be tested on first use)")
 
+        # Attach the monitoring hooks to the async engine; they feed the
+        # statement registry behind /database/statements and the N+1 detector
+        from app.core.database_monitoring import db_monitor
+        from app.db.database import async_engine
+
+        db_monitor.setup_engine_monitoring(async_engine)
+        logger.info("✅ Database query monitoring enabled")
+
         # Initialize cache manager
         try:
             await get_cache_manager()
@@ -105,6 +114,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         await start_token_cleanup_service()
         logger.info("✅ Token cleanup service started")
 
+        # Start batched audit log writer
+        from app.services.audit_writer import start_audit_writer
+        await start_audit_writer()
+        logger.info("✅ Audit writer started")
+
+        # Start partition maintenance for audit logs and metrics
+        from app.services.partition_maintenance_service import start_partition_maintenance_service
+        await start_partition_maintenance_service()
+        logger.info("✅ Partition maintenance service started")
+
         logger.info("🎉 Application startup completed successfully")
 
         yield
@@ -122,6 +141,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         await stop_token_cleanup_service()
         logger.info("✅ Token cleanup service stopped")
 
+        # Stop partition maintenance service
+        from app.services.partition_maintenance_service import stop_partition_maintenance_service
+        await stop_partition_maintenance_service()
+        logger.info("✅ Partition maintenance service stopped")
+
+        # Drain queued audit events before closing connections
+        from app.services.audit_writer import stop_audit_writer
+        await stop_audit_writer()
+        logger.info("✅ Audit writer drained")
+
+        # Close shared Prometheus connection pools
+        from app.utils.prometheus_client import close_prometheus_client
+        await close_prometheus_client()
+
         # Close cache manager connections
         await close_cache_manager()
         logger.info("✅ Cache manager closed")
@@ -320,67 +353,10 @@ app = FastAPI(
 
 
 # Security Headers Middleware
-@app.middleware("http")
-async def security_headers_middleware(request: Request, call_next):
-    """
-    Add security headers to all responses.
-    """
-    response = await call_next(request)
-
-    # Security headers for DevOps applications
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = (
-        "max-age=31536000; includeSubDomains"
-    )
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = "default-src 'self'"
-
-    return response
-
+app.add_middleware(SecurityHeadersMiddleware)
 
 # Request ID and Timing Middleware
-@app.middleware("http")
-async def request_middleware(request: Request, call_next):
-    """
-    Add request ID and timing information.
-    """
-    import uuid
-    import time
-
-    # Generate unique request ID
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
-
-    # Add request timing
-    start_time = time.time()
-
-    # Process request
-    response = await call_next(request)
-
-    # Calculate processing time
-    process_time = time.time() - start_time
-
-    # Add headers
-    response.headers["X-Request-ID"] = request_id
-    response.headers["X-Process-Time"] = str(process_time)
-
-    # Log request (structured logging)
-    logger.info(
-        "Request processed",
-        extra={
-            "request_id": request_id,
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "process_time": process_time,
-            "user_agent": request.headers.get("user-agent"),
-            "remote_addr": request.client.host if request.client else None,
-        },
-    )
-
-    return response
+app.add_middleware(RequestContextMiddleware)
 
 
 # CORS Middleware with environment-specific configuration
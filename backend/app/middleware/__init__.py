@@ -7,12 +7,14 @@ Provides centralized middleware configuration and management.
 from .rbac_middleware import RBACMiddleware, require_rbac_permissions
 from .security_middleware import SecurityMiddleware
 from .logging_middleware import LoggingMiddleware
+from .query_profiler_middleware import QueryProfilerMiddleware
 
 __all__ = [
     "RBACMiddleware",
     "require_rbac_permissions", 
     "SecurityMiddleware",
     "LoggingMiddleware",
+    "QueryProfilerMiddleware",
     "configure_middleware"
 ]
 
@@ -33,4 +35,12 @@ def configure_middleware(app, config=None):
     app.add_middleware(RBACMiddleware, permission_config=rbac_config.get("permissions"))
     
     # Logging middleware (should be last)
-    app.add_middleware(LoggingMiddleware)
\ No newline at end of file
+    app.add_middleware(LoggingMiddleware)
+    
+    # Query profiler for N+1 detection (development/staging only)
+    from app.core.config import settings
+    if settings.N_PLUS_ONE_DETECTION_ENABLED:
+        app.add_middleware(
+            QueryProfilerMiddleware,
+            config={"threshold": settings.N_PLUS_ONE_THRESHOLD},
+        )
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Pure ASGI middleware base.
+
+BaseHTTPMiddleware runs every downstream app in a separate task and pipes the
+response body through a memory stream, which costs a task, a stream and a
+copy of each body chunk per middleware per request, and buffers streaming
+responses. Middleware built on ASGIMiddleware calls the downstream app
+directly and only observes or edits the response start message as it passes.
+"""
+
+from typing import Callable, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class ResponseInfo:
+    """
+    Status and headers of the response sent by the downstream app.
+
+    Headers may be edited from the on_start callback, which runs before the
+    start message is passed on; afterwards they are read-only in effect.
+    """
+
+    def __init__(self, on_start: Optional[Callable[["ResponseInfo"], None]] = None):
+        self.on_start = on_start
+        self.status_code: Optional[int] = None
+        self.headers: MutableHeaders = MutableHeaders()
+        self.started = False
+
+    @property
+    def media_type(self) -> Optional[str]:
+        content_type = self.headers.get("content-type")
+        return content_type.split(";")[0].strip() if content_type else None
+
+    def _start(self, message: Message) -> None:
+        self.status_code = message["status"]
+        self.headers = MutableHeaders(scope=message)
+        self.started = True
+        if self.on_start is not None:
+            self.on_start(self)
+
+
+def _downstream_receive(request: Request) -> Receive:
+    """Receive channel for the downstream app, replaying a body already read."""
+    body = getattr(request, "_body", None)
+    if body is None:
+        return request.receive
+
+    replayed = False
+
+    async def receive() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await request.receive()
+
+    return receive
+
+
+class ASGIMiddleware:
+    """
+    Base class for pure ASGI HTTP middleware.
+
+    Subclasses implement handle(request, send) and use call_next to run the
+    downstream app and send_response to answer without calling it.
+    Non-HTTP scopes (websocket, lifespan) pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.handle(Request(scope, receive), send)
+
+    async def handle(self, request: Request, send: Send) -> None:
+        raise NotImplementedError
+
+    async def call_next(
+        self,
+        request: Request,
+        send: Send,
+        response: Optional[ResponseInfo] = None,
+    ) -> ResponseInfo:
+        """
+        Run the downstream app, streaming its response straight to the client.
+
+        Args:
+            request: Current request; a body read from it is replayed downstream
+            send: ASGI send channel
+            response: Collects the status and headers; its on_start callback
+                may edit headers before they are sent
+
+        Returns:
+            The response status and headers
+        """
+        response = response or ResponseInfo()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response._start(message)
+            await send(message)
+
+        await self.app(request.scope, _downstream_receive(request), send_wrapper)
+        return response
+
+    @staticmethod
+    async def send_response(request: Request, send: Send, response: Response) -> None:
+        """Send a response generated by the middleware itself."""
+        await response(request.scope, request.receive, send)
@@ -5,18 +5,19 @@ Audit Middleware for automatic tracking of API requests and responses.
 import time
 import uuid
 import json
-from typing import Callable, Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import asyncio
+from starlette.types import ASGIApp, Send
 
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
 from app.models.audit_log import AuditEventType, AuditLogLevel
-from app.services.audit_service import get_audit_service
+from app.services.audit_service import AuditService
+from app.services.audit_writer import audit_writer
+from app.utils.request_body import read_body
 
 
-class AuditMiddleware(BaseHTTPMiddleware):
+class AuditMiddleware(ASGIMiddleware):
     """Middleware for automatic audit logging of API requests."""
     
     def __init__(
@@ -46,16 +47,18 @@ class AuditMiddleware(BaseHTTPMiddleware):
         self.log_response_body = log_response_body
         self.max_body_size = max_body_size
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         """Process request and response for audit logging."""
         
         # Skip excluded paths
         if request.url.path in self.excluded_paths:
-            return await call_next(request)
+            await self.call_next(request, send)
+            return
         
         # Skip static files and health checks
         if any(request.url.path.startswith(prefix) for prefix in ["/static/", "/assets/", "/_"]):
-            return await call_next(request)
+            await self.call_next(request, send)
+            return
         
         # Generate request ID for correlation
         request_id = str(uuid.uuid4())
@@ -66,20 +69,28 @@ class AuditMiddleware(BaseHTTPMiddleware):
         # Extract request information
         request_info = await self._extract_request_info(request, request_id)
         
+        # Add request ID to response headers
+        def add_request_id(response: ResponseInfo) -> None:
+            response.headers["X-Request-ID"] = request_id
+        
         # Process the request
-        response = None
-        error_occurred = False
-        error_message = None
+        response: Union[ResponseInfo, Response] = ResponseInfo(on_start=add_request_id)
+        error: Optional[Exception] = None
+        error_sent = False
         
         try:
-            response = await call_next(request)
+            await self.call_next(request, send, response)
         except Exception as e:
-            error_occurred = True
-            error_message = str(e)
-            response = JSONResponse(
-                status_code=500,
-                content={"error": "Internal server error", "request_id": request_id}
-            )
+            error = e
+            if not response.started:
+                error_response = JSONResponse(
+                    status_code=500,
+                    content={"error": "Internal server error", "request_id": request_id}
+                )
+                error_response.headers["X-Request-ID"] = request_id
+                await self.send_response(request, send, error_response)
+                response = error_response
+                error_sent = True
         
         # Calculate duration
         duration_ms = int((time.time() - start_time) * 1000)
@@ -88,23 +99,20 @@ class AuditMiddleware(BaseHTTPMiddleware):
         response_info = self._extract_response_info(response)
         
         # Determine if this was a successful operation
-        success = not error_occurred and 200 <= response.status_code < 400
-        
-        # Log the audit event asynchronously
-        asyncio.create_task(
-            self._log_audit_event(
-                request_info=request_info,
-                response_info=response_info,
-                duration_ms=duration_ms,
-                success=success,
-                error_message=error_message
-            )
+        success = error is None and 200 <= response.status_code < 400
+        
+        # Queue the audit event for the batched writer
+        self._log_audit_event(
+            request_info=request_info,
+            response_info=response_info,
+            duration_ms=duration_ms,
+            success=success,
+            error_message=str(error) if error is not None else None
         )
         
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
+        # The response was already partly sent, so the error can only propagate
+        if error is not None and not error_sent:
+            raise error
     
     async def _extract_request_info(self, request: Request, request_id: str) -> Dict[str, Any]:
         """Extract relevant information from the request."""
@@ -130,9 +138,9 @@ class AuditMiddleware(BaseHTTPMiddleware):
             request.method in ["POST", "PUT", "PATCH"] and
             request.headers.get("content-type", "").startswith("application/json")):
             try:
-                body = await request.body()
+                body = await read_body(request)
                 if len(body) <= self.max_body_size:
-                    request_body = body.decode("utf-8")
+                    request_body = body.text()
             except Exception:
                 request_body = "<unable to read body>"
         
@@ -152,7 +160,7 @@ class AuditMiddleware(BaseHTTPMiddleware):
             "user_info": user_info
         }
     
-    def _extract_response_info(self, response: Response) -> Dict[str, Any]:
+    def _extract_response_info(self, response: Union[ResponseInfo, Response]) -> Dict[str, Any]:
         """Extract relevant information from the response."""
         
         # Get response headers (filter sensitive ones)
@@ -190,7 +198,7 @@ class AuditMiddleware(BaseHTTPMiddleware):
         
         return user_info
     
-    async def _log_audit_event(
+    def _log_audit_event(
         self,
         request_info: Dict[str, Any],
         response_info: Dict[str, Any],
@@ -198,7 +206,7 @@ class AuditMiddleware(BaseHTTPMiddleware):
         success: bool,
         error_message: Optional[str] = None
     ):
-        """Log the audit event."""
+        """Queue the audit event on the batched audit writer."""
         
         try:
             # Determine event type based on HTTP method and endpoint
@@ -248,22 +256,21 @@ class AuditMiddleware(BaseHTTPMiddleware):
             # Get user information
             user_info = request_info["user_info"]
             
-            async with get_audit_service() as audit_service:
-                await audit_service.log_event(
-                    event_type=event_type,
-                    message=message,
-                    user_id=user_info.get("user_id"),
-                    user_email=user_info.get("user_email"),
-                    user_name=user_info.get("user_name"),
-                    ip_address=request_info["client_host"],
-                    user_agent=request_info["user_agent"],
-                    request_id=request_info["request_id"],
-                    metadata=metadata,
-                    success=success,
-                    error_message=error_message,
-                    duration_ms=duration_ms,
-                    level=level
-                )
+            audit_writer.enqueue(AuditService.build_event_record(
+                event_type=event_type,
+                message=message,
+                user_id=user_info.get("user_id"),
+                user_email=user_info.get("user_email"),
+                user_name=user_info.get("user_name"),
+                ip_address=request_info["client_host"],
+                user_agent=request_info["user_agent"],
+                request_id=request_info["request_id"],
+                metadata=metadata,
+                success=success,
+                error_message=error_message,
+                duration_ms=duration_ms,
+                level=level
+            ))
         
         except Exception as e:
             # Don't let audit logging errors break the application
@@ -8,15 +8,18 @@ import time
 import uuid
 import json
 from typing import Optional
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.types import Send
 import logging
 from datetime import datetime
 
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
+from app.utils.request_body import read_body
+
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware(ASGIMiddleware):
     """
     Logging middleware providing:
     - Request/response logging
@@ -44,20 +47,18 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             "/health", "/metrics", "/docs", "/redoc", "/openapi.json"
         ])
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         """
-        Main logging middleware dispatch.
+        Main logging middleware entry point.
         
         Args:
             request: FastAPI request object
-            call_next: Next middleware/handler in chain
-            
-        Returns:
-            Response: HTTP response
+            send: ASGI send channel
         """
         # Skip logging for excluded paths
         if request.url.path in self.excluded_paths:
-            return await call_next(request)
+            await self.call_next(request, send)
+            return
         
         # Generate correlation ID
         correlation_id = str(uuid.uuid4())
@@ -69,16 +70,19 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         if self.log_requests:
             await self._log_request(request, correlation_id)
         
+        # Add correlation ID to response headers
+        def add_correlation_id(response: ResponseInfo) -> None:
+            response.headers["X-Correlation-ID"] = correlation_id
+        
         try:
             # Process request
-            response = await call_next(request)
+            response = await self.call_next(
+                request, send, ResponseInfo(on_start=add_correlation_id)
+            )
             
             # Calculate duration
             duration = time.time() - start_time
             
-            # Add correlation ID to response headers
-            response.headers["X-Correlation-ID"] = correlation_id
-            
             # Log response
             if self.log_responses:
                 await self._log_response(request, response, duration, correlation_id)
@@ -87,8 +91,6 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             if duration > self.slow_request_threshold:
                 await self._log_slow_request(request, duration, correlation_id)
             
-            return response
-            
         except Exception as e:
             # Calculate duration
             duration = time.time() - start_time
@@ -117,9 +119,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             # Add request body if configured
             if self.log_request_body and request.method in ["POST", "PUT", "PATCH"]:
                 try:
-                    body = await request.body()
-                    if body:
-                        body_str = body.decode("utf-8")
+                    body = await read_body(request)
+                    if body.raw:
+                        body_str = body.text()
                         if len(body_str) > self.max_body_length:
                             body_str = body_str[:self.max_body_length] + "... [truncated]"
                         log_data["body"] = body_str
@@ -134,7 +136,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     async def _log_response(
         self, 
         request: Request, 
-        response: Response, 
+        response: ResponseInfo, 
         duration: float, 
         correlation_id: str
     ):
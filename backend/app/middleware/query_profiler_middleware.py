@@ -0,0 +1,64 @@
+"""
+Query Profiler Middleware for FastAPI Application
+
+Collects the database statements executed per request and reports
+repeated-shape (N+1) queries. Intended for development and staging.
+"""
+
+from typing import Optional
+from fastapi import Request
+from starlette.types import Send
+import logging
+
+from app.core.query_profiler import NPlusOneDetector, n_plus_one_detector
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
+
+logger = logging.getLogger(__name__)
+
+
+class QueryProfilerMiddleware(ASGIMiddleware):
+    """
+    Query profiler middleware providing:
+    - Per-request statement grouping by fingerprint
+    - N+1 query detection with endpoint and stack reporting
+    - X-Query-Count response header
+    """
+    
+    def __init__(self, app, config: Optional[dict] = None,
+                 detector: Optional[NPlusOneDetector] = None):
+        super().__init__(app)
+        self.config = config or {}
+        self.detector = detector or n_plus_one_detector
+        self.detector.enabled = True
+        if "threshold" in self.config:
+            self.detector.threshold = self.config["threshold"]
+        
+        self.excluded_paths = self.config.get("excluded_paths", [
+            "/health", "/metrics", "/docs", "/redoc", "/openapi.json"
+        ])
+    
+    async def handle(self, request: Request, send: Send) -> None:
+        """
+        Profile queries executed while handling the request.
+        
+        Args:
+            request: FastAPI request object
+            send: ASGI send channel
+        """
+        if request.url.path in self.excluded_paths:
+            await self.call_next(request, send)
+            return
+        
+        token = self.detector.start_request(request.method, request.url.path)
+        log = self.detector.current_request()
+        
+        # Queries made while streaming the body are not included in the header
+        def add_query_count(response: ResponseInfo) -> None:
+            if log is not None:
+                response.headers["X-Query-Count"] = str(log.total_queries)
+        
+        try:
+            await self.call_next(request, send, ResponseInfo(on_start=add_query_count))
+        finally:
+            route = request.scope.get("route")
+            self.detector.finish_request(token, getattr(route, "path", None))
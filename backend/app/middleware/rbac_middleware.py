@@ -10,8 +10,8 @@ import re
 from typing import Dict, List, Optional, Tuple, Callable, Any
 from fastapi import Request, Response, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import Send
 import logging
 from datetime import datetime
 import json
@@ -20,15 +20,25 @@ from app.models.role import PermissionType
 from app.models.user import User
 from app.core.auth.rbac import audit_access_attempt, PermissionDeniedError, get_rbac_context, RBACContext
 from app.services.user_permission import UserPermissionService
+from app.services.permission_service import PermissionService
+from app.services.effective_permission_index import effective_permission_index
 from app.core.dependencies import get_async_db
 from app.core.auth.jwt import verify_jwt_token
 from app.core.cache import get_cache
+from app.core.auth_context import (
+    ALL_PERMISSIONS,
+    Principal,
+    auth_context_cache,
+    mask_permissions,
+    required_mask,
+)
 from app.core.config import settings
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
 
 logger = logging.getLogger(__name__)
 
 
-class RBACMiddleware(BaseHTTPMiddleware):
+class RBACMiddleware(ASGIMiddleware):
     """
     Middleware to enforce RBAC permissions on API endpoints.
     
@@ -46,6 +56,8 @@ class RBACMiddleware(BaseHTTPMiddleware):
         self.permission_config = permission_config or self._default_permission_config()
         self.permission_service = UserPermissionService()
         self.cache = get_cache()
+        self.auth_cache = auth_context_cache
+        self.permission_index = effective_permission_index
         self.public_endpoints = {
             "/docs", "/redoc", "/openapi.json", "/health", "/metrics",
             "/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/callback",
@@ -166,35 +178,36 @@ class RBACMiddleware(BaseHTTPMiddleware):
             }
         }
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         """
-        Main middleware dispatch method.
+        Main middleware entry point.
         
         Args:
             request: FastAPI request object
-            call_next: Next middleware/handler in chain
-            
-        Returns:
-            Response: HTTP response
+            send: ASGI send channel
         """
         start_time = datetime.utcnow()
+        response = ResponseInfo()
         
         try:
             # Skip RBAC for public endpoints
             if self._is_public_endpoint(request.url.path):
-                return await call_next(request)
+                await self.call_next(request, send, response)
+                return
             
             # Skip RBAC for preflight OPTIONS requests
             if request.method == "OPTIONS":
-                return await call_next(request)
+                await self.call_next(request, send, response)
+                return
             
             # Extract user and check authentication
             user = await self._get_current_user(request)
             if not user:
-                return JSONResponse(
+                await self.send_response(request, send, JSONResponse(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     content={"detail": "Authentication required"}
-                )
+                ))
+                return
             
             # Get organization context from URL
             organization_id = self._extract_organization_id(request)
@@ -210,7 +223,7 @@ class RBACMiddleware(BaseHTTPMiddleware):
             request.state.organization_id = organization_id
             
             # Process request
-            response = await call_next(request)
+            await self.call_next(request, send, response)
             
             # Log successful access
             await self._log_access_attempt(
@@ -221,9 +234,10 @@ class RBACMiddleware(BaseHTTPMiddleware):
                 duration=(datetime.utcnow() - start_time).total_seconds()
             )
             
-            return response
-            
         except PermissionDeniedError as e:
+            if response.started:
+                raise
+            
             # Log denied access
             if 'user' in locals():
                 await self._log_access_attempt(
@@ -235,23 +249,28 @@ class RBACMiddleware(BaseHTTPMiddleware):
                     duration=(datetime.utcnow() - start_time).total_seconds()
                 )
             
-            return JSONResponse(
+            await self.send_response(request, send, JSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={"detail": str(e)}
-            )
+            ))
             
         except HTTPException as e:
-            return JSONResponse(
+            if response.started:
+                raise
+            await self.send_response(request, send, JSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail}
-            )
+            ))
             
         except Exception as e:
             logger.error(f"RBAC Middleware error: {e}")
-            return JSONResponse(
+            # The response is already on its way; nothing can replace it
+            if response.started:
+                raise
+            await self.send_response(request, send, JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal server error"}
-            )
+            ))
     
     def _is_public_endpoint(self, path: str) -> bool:
         """Check if endpoint is public and should bypass RBAC."""
@@ -270,15 +289,18 @@ class RBACMiddleware(BaseHTTPMiddleware):
         
         return False
     
-    async def _get_current_user(self, request: Request) -> Optional[User]:
+    async def _get_current_user(self, request: Request) -> Optional[Principal]:
         """
         Extract and validate user from request.
         
+        Verified tokens are cached by a hash of the whole token until they
+        expire, so repeat requests skip JWT verification and the user lookup.
+        
         Args:
             request: FastAPI request object
             
         Returns:
-            Optional[User]: Authenticated user or None
+            Optional[Principal]: Authenticated user or None
         """
         try:
             # Try to get authorization header
@@ -293,10 +315,9 @@ class RBACMiddleware(BaseHTTPMiddleware):
             token = authorization.split(" ", 1)[1]
             
             # Check cache first
-            cache_key = f"user_token:{token[:20]}"  # Use first 20 chars for cache key
-            cached_user = await self.cache.get(cache_key)
-            if cached_user:
-                return cached_user
+            principal = self.auth_cache.get_principal(token)
+            if principal:
+                return principal
             
             # Validate JWT token
             payload = verify_jwt_token(token)
@@ -312,9 +333,9 @@ class RBACMiddleware(BaseHTTPMiddleware):
                 try:
                     user = await db.get(User, user_id)
                     if user and user.is_active:
-                        # Cache user for 5 minutes
-                        await self.cache.set(cache_key, user, ttl=300)
-                        return user
+                        principal = Principal.from_user(user)
+                        self.auth_cache.put_principal(token, principal, payload.get("exp"))
+                        return principal
                     break
                 except Exception as e:
                     logger.error(f"Error fetching user from database: {e}")
@@ -362,7 +383,7 @@ class RBACMiddleware(BaseHTTPMiddleware):
     async def _check_endpoint_permissions(
         self, 
         request: Request, 
-        user: User, 
+        user: Principal, 
         organization_id: Optional[int]
     ) -> None:
         """
@@ -390,38 +411,19 @@ class RBACMiddleware(BaseHTTPMiddleware):
             # Check rate limiting first
             await self._check_rate_limit(user.id, request)
             
-            # Get database session for permission checking
-            async for db in get_async_db():
-                try:
-                    # Create RBAC context
-                    rbac_context = RBACContext(user, db)
-                    
-                    # Check each required permission
-                    missing_permissions = []
-                    for permission in required_permissions:
-                        has_perm = await self.permission_service.has_permission(
-                            db, user.id, permission, organization_id or user.organization_id
-                        )
-                        
-                        if not has_perm:
-                            missing_permissions.append(permission.value)
-                    
-                    if missing_permissions:
-                        raise PermissionDeniedError(
-                            f"Missing required permissions: {', '.join(missing_permissions)}"
-                        )
-                    
-                    logger.info(
-                        f"User {user.id} granted access to {method} {path} "
-                        f"with permissions: {[p.value for p in required_permissions]}"
-                    )
-                    break
-                    
-                except Exception as e:
-                    if isinstance(e, PermissionDeniedError):
-                        raise
-                    logger.error(f"Error checking permissions: {e}")
-                    raise PermissionDeniedError("Permission check failed")
+            # Compare against the user's cached permission bitset
+            granted = await self._get_permission_mask(user, organization_id or user.organization_id)
+            missing = required_mask(tuple(required_permissions)) & ~granted
+            if missing:
+                raise PermissionDeniedError(
+                    f"Missing required permissions: "
+                    f"{', '.join(p.value for p in mask_permissions(missing))}"
+                )
+            
+            logger.info(
+                f"User {user.id} granted access to {method} {path} "
+                f"with permissions: {[p.value for p in required_permissions]}"
+            )
             
         except PermissionDeniedError:
             raise
@@ -429,6 +431,36 @@ class RBACMiddleware(BaseHTTPMiddleware):
             logger.error(f"Error in permission check: {e}")
             raise PermissionDeniedError("Permission validation failed")
     
+    async def _get_permission_mask(self, user: Principal, organization_id: Optional[int]) -> int:
+        """
+        Bitset of the user's effective permissions in an organization.
+        
+        Served from the auth context cache, falling back to the materialized
+        effective permission index.
+        
+        Args:
+            user: Authenticated user
+            organization_id: Organization context
+            
+        Returns:
+            int: Permission bitset (see app.core.auth_context)
+        """
+        if user.is_superuser:
+            return ALL_PERMISSIONS
+        
+        mask = self.auth_cache.get_permissions(user.id, organization_id)
+        if mask is not None:
+            return mask
+        
+        async for db in get_async_db():
+            try:
+                return await self.permission_index.get_mask(db, user.id, organization_id)
+            except Exception as e:
+                logger.error(f"Error checking permissions: {e}")
+                raise PermissionDeniedError("Permission check failed")
+        
+        raise PermissionDeniedError("Permission check failed")
+    
     def _get_required_permissions(self, path: str, method: str) -> List[PermissionType]:
         """
         Get required permissions for a specific path and method.
@@ -457,7 +489,7 @@ class RBACMiddleware(BaseHTTPMiddleware):
     
     async def _log_access_attempt(
         self,
-        user: User,
+        user: Principal,
         request: Request,
         granted: bool,
         reason: Optional[str] = None,
@@ -536,7 +568,7 @@ class RBACMiddleware(BaseHTTPMiddleware):
             logger.error(f"Error checking rate limit: {e}")
             # Don't fail the request if rate limiting fails
     
-    async def _check_suspicious_activity(self, user: User, request: Request) -> None:
+    async def _check_suspicious_activity(self, user: Principal, request: Request) -> None:
         """
         Check for suspicious activity patterns.
         
@@ -0,0 +1,73 @@
+"""
+Request context middleware.
+
+Adds the request ID, timing and security headers to every response and logs
+each processed request.
+"""
+
+import logging
+import time
+import uuid
+
+from fastapi import Request
+from starlette.types import Send
+
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
+
+logger = logging.getLogger("app.main")
+
+# Security headers for DevOps applications
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Content-Security-Policy": "default-src 'self'",
+}
+
+
+class SecurityHeadersMiddleware(ASGIMiddleware):
+    """Add security headers to all responses."""
+
+    async def handle(self, request: Request, send: Send) -> None:
+        def add_security_headers(response: ResponseInfo) -> None:
+            response.headers.update(SECURITY_HEADERS)
+
+        await self.call_next(request, send, ResponseInfo(on_start=add_security_headers))
+
+
+class RequestContextMiddleware(ASGIMiddleware):
+    """Add request ID and timing information."""
+
+    async def handle(self, request: Request, send: Send) -> None:
+        # Generate unique request ID
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+
+        # Add request timing
+        start_time = time.time()
+        process_time = 0.0
+
+        def add_headers(response: ResponseInfo) -> None:
+            nonlocal process_time
+            # Time to the first response byte, as reported to the client
+            process_time = time.time() - start_time
+            response.headers["X-Request-ID"] = request_id
+            response.headers["X-Process-Time"] = str(process_time)
+
+        response = await self.call_next(request, send, ResponseInfo(on_start=add_headers))
+
+        # Log request (structured logging)
+        logger.info(
+            "Request processed",
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "url": str(request.url),
+                "status_code": response.status_code,
+                "process_time": process_time,
+                "user_agent": request.headers.get("user-agent"),
+                "remote_addr": request.client.host if request.client else None,
+            },
+        )
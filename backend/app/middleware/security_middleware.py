@@ -7,22 +7,24 @@ input validation, threat detection, and security monitoring.
 
 import time
 import asyncio
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from fastapi import Request, Response, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import Send
 import logging
 from collections import defaultdict, deque
 from datetime import datetime, timedelta
 
 from app.core.security_config import get_security_config
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
 from app.utils.rate_limiter import get_rate_limiter
 from app.utils.input_validator import input_validator
+from app.utils.request_body import read_body
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+class SecurityMiddleware(ASGIMiddleware):
     """
     Enhanced security middleware providing:
     - Dynamic security headers with CSP
@@ -51,19 +53,17 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         
         logger.info(f"Security middleware initialized with level: {self.security_config.settings.security_level.value}")
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         """
-        Enhanced security middleware dispatch with comprehensive protection.
+        Enhanced security middleware with comprehensive protection.
         
         Args:
             request: FastAPI request object
-            call_next: Next middleware/handler in chain
-            
-        Returns:
-            Response: HTTP response with security headers and validation
+            send: ASGI send channel
         """
         start_time = time.time()
         client_ip = self._get_client_ip(request)
+        response = ResponseInfo(on_start=lambda r: self._add_security_headers(request, r))
         
         # Initialize rate limiter if not already done
         if self.rate_limiter is None:
@@ -89,11 +89,8 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             # Apply rate limiting
             await self._apply_rate_limiting(client_ip, request)
             
-            # Process request
-            response = await call_next(request)
-            
-            # Add security headers
-            self._add_security_headers(request, response)
+            # Process request; security headers are added as the response starts
+            await self.call_next(request, send, response)
             
             # Validate response if needed
             await self._validate_response_security(request, response)
@@ -104,18 +101,19 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             # Detect potential threats
             await self._detect_threats(client_ip, request, response)
             
-            return response
-            
         except HTTPException as e:
+            if response.started:
+                raise
+            
             # Handle security violations
             await self._handle_security_violation(client_ip, request, e)
             
-            response = JSONResponse(
+            error_response = JSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail, "error_code": "SECURITY_VIOLATION"}
             )
-            self._add_security_headers(request, response)
-            return response
+            self._add_security_headers(request, error_response)
+            await self.send_response(request, send, error_response)
             
         except Exception as e:
             # Handle unexpected errors securely
@@ -125,12 +123,16 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 client_ip, request, "middleware_error", f"Unexpected error: {str(e)[:100]}"
             )
             
-            response = JSONResponse(
+            # The response is already on its way; nothing can replace it
+            if response.started:
+                raise
+            
+            error_response = JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal server error", "error_code": "SYSTEM_ERROR"}
             )
-            self._add_security_headers(request, response)
-            return response
+            self._add_security_headers(request, error_response)
+            await self.send_response(request, send, error_response)
     
     def _get_client_ip(self, request: Request) -> str:
         """Get client IP address, considering proxies."""
@@ -208,7 +210,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         buckets["hour"] = deque([t for t in buckets["hour"] if t > hour_ago])
         buckets["burst"] = deque([t for t in buckets["burst"] if t > burst_window])
     
-    def _add_security_headers(self, request: Request, response: Response):
+    def _add_security_headers(self, request: Request, response: Union[Response, ResponseInfo]):
         """Add dynamic security headers to response."""
         headers = self.security_config.get_security_headers(request.url.path)
         
@@ -423,11 +425,13 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 content_type = request.headers.get("content-type", "")
                 
                 if "application/json" in content_type:
-                    # Read and validate JSON body
-                    body = await request.body()
-                    if body:
-                        json_str = body.decode('utf-8')
-                        result = input_validator.validate_json(json_str, "request_body")
+                    # Read and validate JSON body; the bytes and the parsed
+                    # document are cached for the audit middleware and endpoint
+                    body = await read_body(request, self.max_request_size)
+                    if body.raw:
+                        result = input_validator.validate_json(
+                            body.text(), "request_body", parse=body.json
+                        )
                         if not result.is_valid:
                             raise HTTPException(
                                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -483,7 +487,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         # Store successful result for headers
         request.state.rate_limit_result = result
     
-    async def _validate_response_security(self, request: Request, response: Response):
+    async def _validate_response_security(self, request: Request, response: ResponseInfo):
         """Validate response for security issues."""
         # Check for sensitive data in response
         if hasattr(response, 'body') and response.body:
@@ -516,7 +520,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             except Exception as e:
                 logger.warning(f"Response validation error: {e}")
     
-    async def _track_request_metrics(self, request: Request, response: Response, 
+    async def _track_request_metrics(self, request: Request, response: ResponseInfo, 
                                    duration: float, client_ip: str):
         """Track request metrics and performance."""
         try:
@@ -537,7 +541,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             logger.error(f"Error tracking request metrics: {e}")
     
-    async def _detect_threats(self, client_ip: str, request: Request, response: Response):
+    async def _detect_threats(self, client_ip: str, request: Request, response: ResponseInfo):
         """Detect potential security threats."""
         if not self.rate_limiter:
             return
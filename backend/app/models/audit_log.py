@@ -158,6 +158,7 @@ class AuditLog(Base):
         Index('idx_audit_ip_timestamp', 'ip_address', 'timestamp'),
         Index('idx_audit_level_timestamp', 'level', 'timestamp'),
         Index('idx_audit_success_timestamp', 'success', 'timestamp'),
+        Index('idx_audit_timestamp_id', 'timestamp', 'id'),
     )
     
     def __repr__(self):
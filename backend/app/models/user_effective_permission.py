@@ -0,0 +1,46 @@
+"""
+UserEffectivePermission model: materialized effective permissions.
+One row per user and organization scope, maintained by
+app.services.effective_permission_index.
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    DateTime,
+    ForeignKey,
+    JSON,
+    func,
+)
+from app.db.database import Base
+
+# organization_id stored for system-wide (no organization) scope, since it is
+# part of the primary key and cannot be NULL
+SYSTEM_SCOPE = 0
+
+
+class UserEffectivePermission(Base):
+    """
+    Effective permissions of a user in one organization scope.
+    Combines role grants and direct grants that apply in the scope.
+    """
+
+    __tablename__ = "user_effective_permissions"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    organization_id = Column(Integer, primary_key=True, default=SYSTEM_SCOPE)
+    permissions = Column(JSON, nullable=False, default=list)
+    computed_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # Earliest expiry of the role grants behind the row; the row is treated
+    # as missing, and recomputed, once it has passed
+    valid_until = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserEffectivePermission(user_id={self.user_id}, "
+            f"organization_id={self.organization_id}, permissions={len(self.permissions or [])})>"
+        )
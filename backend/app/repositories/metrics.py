@@ -6,9 +6,10 @@ Handles metrics-specific database operations and aggregations.
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc, text
+from sqlalchemy import select, func, and_, delete, desc, text
 from uuid import UUID
 
+from app.db.partitioning import partition_manager
 from app.models.metrics import Metric
 from app.schemas.metrics import MetricCreate, MetricUpdate
 from app.repositories.base import BaseRepository
@@ -157,15 +158,34 @@ class MetricsRepository(BaseRepository[Metric, MetricCreate, MetricUpdate]):
         """
         Delete metrics older than specified timestamp.
 
+        When the metrics table is partitioned and no metric names are given,
+        months lying entirely before older_than are removed by dropping their
+        partitions; only the remaining rows of the boundary month are deleted,
+        and partition pruning confines that DELETE to a single partition.
+
         Args:
             older_than: Delete metrics older than this timestamp
             metric_names: Optional list of metric names to filter
 
         Returns:
-            Number of deleted metrics
+            Number of deleted metrics (estimated for dropped partitions)
         """
-        # Placeholder implementation - will be updated when models are available
-        return 0
+        deleted = 0
+        if not metric_names and await partition_manager.is_partitioned(
+            self.db, Metric.__tablename__
+        ):
+            expired = await partition_manager.expire_partitions(
+                self.db, Metric.__tablename__, older_than
+            )
+            deleted += sum(partition.estimated_rows for partition in expired)
+
+        query = delete(Metric.__table__).where(Metric.timestamp < older_than)
+        if metric_names:
+            query = query.where(Metric.metric_name.in_(metric_names))
+
+        result = await self.db.execute(query)
+        await self.db.commit()
+        return deleted + result.rowcount
 
     async def get_unique_metric_names(self) -> List[str]:
         """
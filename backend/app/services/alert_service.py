@@ -14,6 +14,7 @@ from sqlalchemy import select
 
 from app.models.alert import Alert, AlertSeverity, AlertStatus, AlertChannel
 from app.models.project import Project
+from app.core.auth.resource_access import can_access_project
 from app.schemas.alert import (
     AlertCreate,
     AlertUpdate,
@@ -106,9 +107,7 @@ class AlertService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return []
 
@@ -381,9 +380,7 @@ class AlertService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return []
 
@@ -426,9 +423,7 @@ class AlertService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return None
 
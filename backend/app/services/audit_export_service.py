@@ -1,214 +1,216 @@
 """
 Audit Log Export Service for comprehensive data export functionality.
+
+Exports are streamed: rows are read in keyset-paginated batches and encoded
+batch by batch, so memory use does not grow with the size of the export.
 """
 
 import csv
 import json
 import io
+import os
+import tempfile
 import zipfile
-from typing import List, Dict, Any, Optional
+import zlib
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional
 from datetime import datetime
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 import xlsxwriter
 
+from app.db.database import AsyncSessionLocal
 from app.models.audit_log import AuditLog
 from app.services.audit_service import AuditService
 
+# Rows fetched per keyset page while exporting
+EXPORT_BATCH_SIZE = 1000
 
-class AuditExportService:
-    """Service for exporting audit logs in various formats."""
-    
-    def __init__(self, audit_service: AuditService):
-        self.audit_service = audit_service
-    
-    async def export_logs(
-        self,
-        format: str,
-        filters: Dict[str, Any],
-        max_records: int = 50000
-    ) -> StreamingResponse:
-        """Export audit logs in the specified format."""
-        
-        # Get audit logs based on filters
-        logs, total = await self.audit_service.get_audit_logs(
-            limit=max_records,
-            offset=0,
-            **filters
-        )
-        
-        if not logs:
-            raise HTTPException(status_code=404, detail="No audit logs found matching the criteria")
-        
-        # Generate filename with timestamp
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"audit_logs_{timestamp}"
-        
-        if format.lower() == "csv":
-            return await self._export_csv(logs, filename)
-        elif format.lower() == "json":
-            return await self._export_json(logs, filename)
-        elif format.lower() == "xlsx":
-            return await self._export_xlsx(logs, filename)
-        elif format.lower() == "zip":
-            return await self._export_zip(logs, filename)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported export format")
-    
-    async def _export_csv(self, logs: List[AuditLog], filename: str) -> StreamingResponse:
-        """Export audit logs as CSV."""
-        
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        headers = [
-            "ID", "Timestamp", "Event Type", "Event Category", "Level", "Message",
-            "User ID", "User Email", "User Name", "Session ID", "SSO Provider",
-            "IP Address", "User Agent", "Request ID", "Resource Type", "Resource ID",
-            "Resource Name", "Organization ID", "Team ID", "Success", "Error Code",
-            "Error Message", "Duration (ms)", "Metadata", "Tags", "Compliance Tags"
-        ]
-        writer.writerow(headers)
-        
-        # Write data rows
-        for log in logs:
-            row = [
-                log.id,
-                log.timestamp.isoformat(),
-                log.event_type,
-                log.event_category,
-                log.level,
-                log.message,
-                log.user_id or "",
-                log.user_email or "",
-                log.user_name or "",
-                log.session_id or "",
-                log.sso_provider or "",
-                log.ip_address or "",
-                log.user_agent or "",
-                log.request_id or "",
-                log.resource_type or "",
-                log.resource_id or "",
-                log.resource_name or "",
-                log.organization_id or "",
-                log.team_id or "",
-                log.success,
-                log.error_code or "",
-                log.error_message or "",
-                log.duration_ms or "",
-                json.dumps(log.metadata) if log.metadata else "",
-                json.dumps(log.tags) if log.tags else "",
-                json.dumps(log.compliance_tags) if log.compliance_tags else ""
-            ]
-            writer.writerow(row)
-        
-        output.seek(0)
-        
-        def iter_csv():
-            yield output.getvalue().encode('utf-8')
-        
-        return StreamingResponse(
-            iter_csv(),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}.csv"}
-        )
-    
-    async def _export_json(self, logs: List[AuditLog], filename: str) -> StreamingResponse:
-        """Export audit logs as JSON."""
-        
-        # Convert logs to dictionaries
-        log_data = []
-        for log in logs:
-            log_dict = {
-                "id": log.id,
-                "timestamp": log.timestamp.isoformat(),
-                "event_type": log.event_type,
-                "event_category": log.event_category,
-                "level": log.level,
-                "message": log.message,
-                "user_id": log.user_id,
-                "user_email": log.user_email,
-                "user_name": log.user_name,
-                "session_id": log.session_id,
-                "sso_provider": log.sso_provider,
-                "ip_address": log.ip_address,
-                "user_agent": log.user_agent,
-                "request_id": log.request_id,
-                "resource_type": log.resource_type,
-                "resource_id": log.resource_id,
-                "resource_name": log.resource_name,
-                "organization_id": log.organization_id,
-                "team_id": log.team_id,
-                "success": log.success,
-                "error_code": log.error_code,
-                "error_message": log.error_message,
-                "duration_ms": log.duration_ms,
-                "metadata": log.metadata,
-                "tags": log.tags,
-                "compliance_tags": log.compliance_tags,
-                "retention_policy": log.retention_policy
-            }
-            log_data.append(log_dict)
-        
-        # Create export package
-        export_data = {
-            "export_info": {
-                "generated_at": datetime.utcnow().isoformat(),
-                "total_records": len(logs),
-                "format": "json",
-                "version": "1.0"
-            },
-            "audit_logs": log_data
-        }
-        
-        json_content = json.dumps(export_data, indent=2, ensure_ascii=False)
-        
-        def iter_json():
-            yield json_content.encode('utf-8')
-        
-        return StreamingResponse(
-            iter_json(),
-            media_type="application/json",
-            headers={"Content-Disposition": f"attachment; filename={filename}.json"}
-        )
+# Read size when streaming spooled files (xlsx, zip) back to the client
+FILE_CHUNK_SIZE = 64 * 1024
+
+CSV_HEADERS = [
+    "ID", "Timestamp", "Event Type", "Event Category", "Level", "Message",
+    "User ID", "User Email", "User Name", "Session ID", "SSO Provider",
+    "IP Address", "User Agent", "Request ID", "Resource Type", "Resource ID",
+    "Resource Name", "Organization ID", "Team ID", "Success", "Error Code",
+    "Error Message", "Duration (ms)", "Metadata", "Tags", "Compliance Tags"
+]
+
+XLSX_HEADERS = [
+    "ID", "Timestamp", "Event Type", "Event Category", "Level", "Message",
+    "User Email", "User Name", "IP Address", "Resource Type", "Resource Name",
+    "Success", "Error Message", "Duration (ms)"
+]
+
+# Rows per Excel worksheet, including the header row
+XLSX_MAX_ROWS = 1_048_576
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "zip": ("application/zip", "zip"),
+}
+
+
+def _csv_row(log: Row) -> list:
+    """Convert an audit log row to CSV values."""
+    return [
+        log.id,
+        log.timestamp.isoformat(),
+        log.event_type,
+        log.event_category,
+        log.level,
+        log.message,
+        log.user_id or "",
+        log.user_email or "",
+        log.user_name or "",
+        log.session_id or "",
+        log.sso_provider or "",
+        log.ip_address or "",
+        log.user_agent or "",
+        log.request_id or "",
+        log.resource_type or "",
+        log.resource_id or "",
+        log.resource_name or "",
+        log.organization_id or "",
+        log.team_id or "",
+        log.success,
+        log.error_code or "",
+        log.error_message or "",
+        log.duration_ms or "",
+        json.dumps(log.event_metadata) if log.event_metadata else "",
+        json.dumps(log.tags) if log.tags else "",
+        json.dumps(log.compliance_tags) if log.compliance_tags else ""
+    ]
+
+
+def _log_dict(log: Row) -> Dict[str, Any]:
+    """Convert an audit log row to a JSON-serializable dictionary."""
+    return {
+        "id": log.id,
+        "timestamp": log.timestamp.isoformat(),
+        "event_type": log.event_type,
+        "event_category": log.event_category,
+        "level": log.level,
+        "message": log.message,
+        "user_id": log.user_id,
+        "user_email": log.user_email,
+        "user_name": log.user_name,
+        "session_id": log.session_id,
+        "sso_provider": log.sso_provider,
+        "ip_address": log.ip_address,
+        "user_agent": log.user_agent,
+        "request_id": log.request_id,
+        "resource_type": log.resource_type,
+        "resource_id": log.resource_id,
+        "resource_name": log.resource_name,
+        "organization_id": log.organization_id,
+        "team_id": log.team_id,
+        "success": log.success,
+        "error_code": log.error_code,
+        "error_message": log.error_message,
+        "duration_ms": log.duration_ms,
+        "metadata": log.event_metadata,
+        "tags": log.tags,
+        "compliance_tags": log.compliance_tags,
+        "retention_policy": log.retention_policy
+    }
+
+
+def _dump_json(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _encode_csv_header() -> bytes:
+    return _encode_csv_rows([CSV_HEADERS])
+
+
+def _encode_csv_rows(rows) -> bytes:
+    output = io.StringIO()
+    csv.writer(output).writerows(rows)
+    return output.getvalue().encode('utf-8')
+
+
+def _encode_json_header() -> bytes:
+    export_info = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "format": "json",
+        "version": "1.1"
+    }
+    return f'{{"export_info": {_dump_json(export_info)}, "audit_logs": ['.encode('utf-8')
+
+
+def _encode_json_rows(logs: List[Row], first: bool) -> bytes:
+    chunk = ",\n".join(_dump_json(_log_dict(log)) for log in logs)
+    return (("\n" if first else ",\n") + chunk).encode('utf-8')
+
+
+def _encode_json_footer(total_records: int) -> bytes:
+    # The record count is only known once the stream is exhausted
+    return f'\n], "export_summary": {{"total_records": {total_records}}}}}\n'.encode('utf-8')
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into gzip format on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def _iter_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class _XlsxExport:
+    """Incremental Excel writer backed by a file in constant-memory mode."""
     
-    async def _export_xlsx(self, logs: List[AuditLog], filename: str) -> StreamingResponse:
-        """Export audit logs as Excel file."""
-        
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    def __init__(self, path: str):
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
         
         # Create main worksheet
-        worksheet = workbook.add_worksheet('Audit Logs')
+        self.worksheet = self.workbook.add_worksheet('Audit Logs')
         
         # Define formats
-        header_format = workbook.add_format({
+        self.header_format = self.workbook.add_format({
             'bold': True,
             'bg_color': '#4472C4',
             'font_color': 'white',
             'border': 1
         })
+        self.date_format = self.workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        self.success_format = self.workbook.add_format({'bg_color': '#C6EFCE'})
+        self.error_format = self.workbook.add_format({'bg_color': '#FFC7CE'})
         
-        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
-        success_format = workbook.add_format({'bg_color': '#C6EFCE'})
-        error_format = workbook.add_format({'bg_color': '#FFC7CE'})
-        
-        # Write headers
-        headers = [
-            "ID", "Timestamp", "Event Type", "Event Category", "Level", "Message",
-            "User Email", "User Name", "IP Address", "Resource Type", "Resource Name",
-            "Success", "Error Message", "Duration (ms)"
-        ]
+        # Auto-fit columns
+        for col in range(len(XLSX_HEADERS)):
+            self.worksheet.set_column(col, col, 15)
         
-        for col, header in enumerate(headers):
-            worksheet.write(0, col, header, header_format)
+        for col, header in enumerate(XLSX_HEADERS):
+            self.worksheet.write(0, col, header, self.header_format)
         
-        # Write data
-        for row, log in enumerate(logs, 1):
+        self.row = 0
+        self.success_count = 0
+        self.event_types: Dict[str, int] = {}
+    
+    def add_rows(self, logs: List[Row]) -> None:
+        worksheet = self.worksheet
+        for log in logs:
+            self.row += 1
+            row = self.row
             worksheet.write(row, 0, log.id)
-            worksheet.write(row, 1, log.timestamp, date_format)
+            worksheet.write(row, 1, log.timestamp, self.date_format)
             worksheet.write(row, 2, log.event_type)
             worksheet.write(row, 3, log.event_category)
             worksheet.write(row, 4, log.level)
@@ -220,29 +222,25 @@ class AuditExportService:
             worksheet.write(row, 10, log.resource_name or "")
             
             # Apply conditional formatting for success/failure
-            cell_format = success_format if log.success else error_format
+            cell_format = self.success_format if log.success else self.error_format
             worksheet.write(row, 11, "Success" if log.success else "Failed", cell_format)
             
             worksheet.write(row, 12, log.error_message or "")
             worksheet.write(row, 13, log.duration_ms or "")
+            
+            if log.success:
+                self.success_count += 1
+            self.event_types[log.event_type] = self.event_types.get(log.event_type, 0) + 1
+    
+    def close(self) -> None:
+        """Write the summary worksheet and finish the workbook."""
+        summary_ws = self.workbook.add_worksheet('Summary')
+        header_format = self.header_format
         
-        # Auto-fit columns
-        for col in range(len(headers)):
-            worksheet.set_column(col, col, 15)
-        
-        # Create summary worksheet
-        summary_ws = workbook.add_worksheet('Summary')
-        
-        # Count statistics
-        total_logs = len(logs)
-        success_count = sum(1 for log in logs if log.success)
+        total_logs = self.row
+        success_count = self.success_count
         error_count = total_logs - success_count
         
-        # Event type breakdown
-        event_types = {}
-        for log in logs:
-            event_types[log.event_type] = event_types.get(log.event_type, 0) + 1
-        
         # Write summary
         summary_ws.write(0, 0, "Audit Log Export Summary", header_format)
         summary_ws.write(2, 0, "Total Records:", header_format)
@@ -256,69 +254,189 @@ class AuditExportService:
         
         # Event type breakdown
         summary_ws.write(7, 0, "Event Type Breakdown", header_format)
-        for i, (event_type, count) in enumerate(sorted(event_types.items(), key=lambda x: x[1], reverse=True), 8):
+        for i, (event_type, count) in enumerate(sorted(self.event_types.items(), key=lambda x: x[1], reverse=True), 8):
             summary_ws.write(i, 0, event_type)
             summary_ws.write(i, 1, count)
         
-        workbook.close()
-        output.seek(0)
+        self.workbook.close()
+
+
+class AuditExportService:
+    """Service for exporting audit logs in various formats."""
+    
+    def __init__(
+        self,
+        audit_service: AuditService,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ):
+        self.audit_service = audit_service
+        # Streamed bodies outlive the request handler, so rows are read
+        # through a session owned by the stream itself
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size
+    
+    async def export_logs(
+        self,
+        format: str,
+        filters: Dict[str, Any],
+        max_records: int = 50000,
+        compress: bool = False
+    ) -> StreamingResponse:
+        """
+        Export audit logs in the specified format as a streamed response.
+        
+        Args:
+            format: One of csv, json, ndjson, xlsx or zip
+            filters: Filters accepted by AuditService.get_audit_logs
+            max_records: Maximum number of records to export
+            compress: Gzip the response body on the fly
+        
+        Returns:
+            Streaming response producing the export
+        """
+        
+        format = format.lower()
+        if format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail="Unsupported export format")
+        
+        # xlsx (also part of zip) exports write a single worksheet
+        if format in ("xlsx", "zip") and max_records > XLSX_MAX_ROWS - 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{format} exports are limited to {XLSX_MAX_ROWS - 1} records; use csv or ndjson for larger exports"
+            )
+        
+        if not await self.audit_service.has_audit_logs(**filters):
+            raise HTTPException(status_code=404, detail="No audit logs found matching the criteria")
+        
+        # Generate filename with timestamp
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        filename = f"audit_logs_{timestamp}"
+        media_type, extension = EXPORT_FORMATS[format]
+        
+        batches = self._iter_batches(filters, max_records)
+        if format == "csv":
+            body = self._export_csv(batches)
+        elif format == "json":
+            body = self._export_json(batches)
+        elif format == "ndjson":
+            body = self._export_ndjson(batches)
+        elif format == "xlsx":
+            body = self._export_xlsx(batches)
+        else:
+            body = self._export_zip(batches, filename)
         
-        def iter_xlsx():
-            yield output.getvalue()
+        if compress:
+            body = gzip_stream(body)
+            media_type = "application/gzip"
+            extension = f"{extension}.gz"
         
         return StreamingResponse(
-            iter_xlsx(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}.xlsx"}
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"}
         )
     
-    async def _export_zip(self, logs: List[AuditLog], filename: str) -> StreamingResponse:
-        """Export audit logs as ZIP file containing multiple formats."""
+    async def _iter_batches(
+        self, filters: Dict[str, Any], max_records: int
+    ) -> AsyncIterator[List[Row]]:
+        """Read matching audit logs in batches through a dedicated session."""
+        async with self.session_factory() as session:
+            audit_service = AuditService(session)
+            async for batch in audit_service.iter_audit_log_batches(
+                batch_size=self.batch_size,
+                max_records=max_records,
+                **filters
+            ):
+                # End the read transaction so the connection goes back to the
+                # pool while the client consumes this batch
+                await session.rollback()
+                yield batch
+    
+    async def _export_csv(self, batches: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+        """Export audit logs as CSV."""
+        
+        yield _encode_csv_header()
+        async for batch in batches:
+            yield _encode_csv_rows(_csv_row(log) for log in batch)
+    
+    async def _export_json(self, batches: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+        """Export audit logs as a JSON document, written as a streamed array."""
+        
+        yield _encode_json_header()
+        total_records = 0
+        async for batch in batches:
+            yield _encode_json_rows(batch, first=total_records == 0)
+            total_records += len(batch)
+        yield _encode_json_footer(total_records)
+    
+    async def _export_ndjson(self, batches: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+        """Export audit logs as newline-delimited JSON, one record per line."""
         
-        zip_buffer = io.BytesIO()
+        async for batch in batches:
+            yield "".join(_dump_json(_log_dict(log)) + "\n" for log in batch).encode('utf-8')
+    
+    async def _export_xlsx(self, batches: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+        """Export audit logs as Excel file."""
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "export.xlsx")
+            export = _XlsxExport(path)
+            async for batch in batches:
+                export.add_rows(batch)
+            export.close()
+            
+            async for chunk in _iter_file(path):
+                yield chunk
+    
+    async def _export_zip(
+        self, batches: AsyncIterator[List[Row]], filename: str
+    ) -> AsyncIterator[bytes]:
+        """Export audit logs as ZIP file containing multiple formats."""
         
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add CSV export
-            csv_response = await self._export_csv(logs, filename)
-            csv_content = b''.join([chunk async for chunk in csv_response.body_iterator])
-            zip_file.writestr(f"{filename}.csv", csv_content)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "export.csv")
+            json_path = os.path.join(tmp_dir, "export.json")
+            xlsx_path = os.path.join(tmp_dir, "export.xlsx")
+            zip_path = os.path.join(tmp_dir, "export.zip")
             
-            # Add JSON export
-            json_response = await self._export_json(logs, filename)
-            json_content = b''.join([chunk async for chunk in json_response.body_iterator])
-            zip_file.writestr(f"{filename}.json", json_content)
+            # Write all three formats from a single pass over the rows
+            xlsx = _XlsxExport(xlsx_path)
+            with open(csv_path, "wb") as csv_file, open(json_path, "wb") as json_file:
+                csv_file.write(_encode_csv_header())
+                json_file.write(_encode_json_header())
+                async for batch in batches:
+                    csv_file.write(_encode_csv_rows(_csv_row(log) for log in batch))
+                    json_file.write(_encode_json_rows(batch, first=xlsx.row == 0))
+                    xlsx.add_rows(batch)
+                json_file.write(_encode_json_footer(xlsx.row))
+            total_records = xlsx.row
+            xlsx.close()
             
-            # Add Excel export
-            xlsx_response = await self._export_xlsx(logs, filename)
-            xlsx_content = b''.join([chunk async for chunk in xlsx_response.body_iterator])
-            zip_file.writestr(f"{filename}.xlsx", xlsx_content)
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                zip_file.write(csv_path, f"{filename}.csv")
+                zip_file.write(json_path, f"{filename}.json")
+                zip_file.write(xlsx_path, f"{filename}.xlsx")
+                
+                # Add metadata file
+                metadata = {
+                    "export_info": {
+                        "generated_at": datetime.utcnow().isoformat(),
+                        "total_records": total_records,
+                        "formats_included": ["csv", "json", "xlsx"],
+                        "version": "1.0"
+                    },
+                    "files": [
+                        {"name": f"{filename}.csv", "format": "csv", "description": "Comma-separated values format"},
+                        {"name": f"{filename}.json", "format": "json", "description": "JSON format with metadata"},
+                        {"name": f"{filename}.xlsx", "format": "xlsx", "description": "Excel format with summary"}
+                    ]
+                }
+                zip_file.writestr("export_metadata.json", json.dumps(metadata, indent=2))
             
-            # Add metadata file
-            metadata = {
-                "export_info": {
-                    "generated_at": datetime.utcnow().isoformat(),
-                    "total_records": len(logs),
-                    "formats_included": ["csv", "json", "xlsx"],
-                    "version": "1.0"
-                },
-                "files": [
-                    {"name": f"{filename}.csv", "format": "csv", "description": "Comma-separated values format"},
-                    {"name": f"{filename}.json", "format": "json", "description": "JSON format with metadata"},
-                    {"name": f"{filename}.xlsx", "format": "xlsx", "description": "Excel format with summary"}
-                ]
-            }
-            zip_file.writestr("export_metadata.json", json.dumps(metadata, indent=2))
-        
-        zip_buffer.seek(0)
-        
-        def iter_zip():
-            yield zip_buffer.getvalue()
-        
-        return StreamingResponse(
-            iter_zip(),
-            media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={filename}.zip"}
-        )
+            async for chunk in _iter_file(zip_path):
+                yield chunk
     
     async def generate_compliance_report(
         self,
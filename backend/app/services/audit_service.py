@@ -2,13 +2,16 @@
 Comprehensive Audit Service for security and activity tracking.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import Row, delete, select, func, and_, or_, desc, asc, tuple_, literal_column
 from sqlalchemy.orm import selectinload
+import base64
 import json
 import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from app.models.audit_log import (
@@ -22,8 +25,53 @@ from app.models.audit_log import (
 )
 from app.models.user import User
 from app.db.database import get_async_db
+from app.db.partitioning import partition_manager
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Search document for full-text audit search; must match the expression of
+# the idx_audit_search_fts index for the planner to use it
+AUDIT_SEARCH_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, "
+    "coalesce(message, '') || ' ' || coalesce(user_name, '') || ' ' || "
+    "coalesce(user_email, '') || ' ' || coalesce(resource_name, ''))"
+)
+
+# Below this planner estimate the exact count is cheap enough to run
+EXACT_COUNT_THRESHOLD = 10000
+
+
+@dataclass
+class AuditLogPage:
+    """One page of audit logs."""
+
+    logs: List[AuditLog]
+    total: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(timestamp: datetime, log_id: int) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque cursor."""
+    payload = json.dumps([timestamp.isoformat(), log_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, log_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
+
 
 class AuditService:
     """Service for managing audit logs and security events."""
@@ -60,14 +108,9 @@ class AuditService:
     ) -> AuditLog:
         """Log a security or activity event."""
         
-        # Determine event category
-        event_category = self._get_event_category(event_type)
-        
         # Create audit log entry
-        audit_log = AuditLog(
+        audit_log = AuditLog(**self.build_event_record(
             event_type=event_type,
-            event_category=event_category,
-            level=level,
             message=message,
             user_id=user_id,
             user_email=user_email,
@@ -88,10 +131,10 @@ class AuditService:
             error_code=error_code,
             error_message=error_message,
             duration_ms=duration_ms,
+            level=level,
             compliance_tags=compliance_tags,
-            retention_policy=retention_policy,
-            timestamp=datetime.utcnow()
-        )
+            retention_policy=retention_policy
+        ))
         
         self.session.add(audit_log)
         await self.session.commit()
@@ -101,7 +144,73 @@ class AuditService:
         
         return audit_log
     
-    def _get_event_category(self, event_type: AuditEventType) -> str:
+    @classmethod
+    def build_event_record(
+        cls,
+        event_type: AuditEventType,
+        message: str,
+        user_id: Optional[int] = None,
+        user_email: Optional[str] = None,
+        user_name: Optional[str] = None,
+        session_id: Optional[str] = None,
+        sso_provider: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        request_id: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        resource_name: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+        success: bool = True,
+        error_code: Optional[str] = None,
+        error_message: Optional[str] = None,
+        duration_ms: Optional[int] = None,
+        level: AuditLogLevel = AuditLogLevel.INFO,
+        compliance_tags: Optional[List[str]] = None,
+        retention_policy: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the column values of an audit log row.
+        
+        Used both for immediate writes through log_event and for events
+        queued on the batched audit writer.
+        """
+        
+        return {
+            "event_type": event_type,
+            # Determine event category
+            "event_category": cls._get_event_category(event_type),
+            "level": level,
+            "message": message,
+            "user_id": user_id,
+            "user_email": user_email,
+            "user_name": user_name,
+            "session_id": session_id,
+            "sso_provider": sso_provider,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "request_id": request_id,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "resource_name": resource_name,
+            "organization_id": organization_id,
+            "team_id": team_id,
+            "event_metadata": metadata,
+            "tags": tags,
+            "success": success,
+            "error_code": error_code,
+            "error_message": error_message,
+            "duration_ms": duration_ms,
+            "compliance_tags": compliance_tags,
+            "retention_policy": retention_policy,
+            "timestamp": datetime.utcnow()
+        }
+    
+    @staticmethod
+    def _get_event_category(event_type: AuditEventType) -> str:
         """Determine event category based on event type."""
         category_map = {
             # Authentication
@@ -177,10 +286,8 @@ class AuditService:
         
         return category_map.get(event_type, "other")
     
-    async def get_audit_logs(
-        self,
-        limit: int = 100,
-        offset: int = 0,
+    @staticmethod
+    def _build_filter_conditions(
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         event_types: Optional[List[str]] = None,
@@ -195,14 +302,16 @@ class AuditService:
         team_id: Optional[str] = None,
         success: Optional[bool] = None,
         search_query: Optional[str] = None,
-        sort_by: str = "timestamp",
-        sort_order: str = "desc"
-    ) -> tuple[List[AuditLog], int]:
-        """Get audit logs with filtering and pagination."""
+        search_mode: str = "substring"
+    ) -> list:
+        """
+        Build WHERE conditions for audit log queries.
         
-        query = select(AuditLog)
+        search_mode "substring" matches search_query anywhere in the message,
+        user name, user email or resource name (served by trigram indexes);
+        "fulltext" matches whole words against the full-text index.
+        """
         
-        # Apply filters
         conditions = []
         
         if start_date:
@@ -231,7 +340,13 @@ class AuditService:
             conditions.append(AuditLog.team_id == team_id)
         if success is not None:
             conditions.append(AuditLog.success == success)
-        if search_query:
+        if search_query and search_mode == "fulltext":
+            conditions.append(
+                literal_column(AUDIT_SEARCH_DOCUMENT).op("@@")(
+                    func.websearch_to_tsquery(literal_column("'simple'::regconfig"), search_query)
+                )
+            )
+        elif search_query:
             conditions.append(
                 or_(
                     AuditLog.message.ilike(f"%{search_query}%"),
@@ -241,29 +356,238 @@ class AuditService:
                 )
             )
         
+        return conditions
+    
+    @staticmethod
+    def _keyset_condition(position: Tuple[datetime, int], descending: bool = True):
+        """Condition selecting rows after a (timestamp, id) position."""
+        key = tuple_(AuditLog.timestamp, AuditLog.id)
+        return key < position if descending else key > position
+    
+    async def get_audit_logs(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        event_types: Optional[List[str]] = None,
+        event_categories: Optional[List[str]] = None,
+        levels: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        user_email: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        success: Optional[bool] = None,
+        search_query: Optional[str] = None,
+        sort_by: str = "timestamp",
+        sort_order: str = "desc",
+        exact_count: bool = True
+    ) -> tuple[List[AuditLog], int]:
+        """Get audit logs with filtering and pagination."""
+        
+        page = await self.query_audit_logs(
+            limit=limit,
+            offset=offset,
+            start_date=start_date,
+            end_date=end_date,
+            event_types=event_types,
+            event_categories=event_categories,
+            levels=levels,
+            user_id=user_id,
+            user_email=user_email,
+            ip_address=ip_address,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            organization_id=organization_id,
+            team_id=team_id,
+            success=success,
+            search_query=search_query,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            exact_count=exact_count
+        )
+        return page.logs, page.total
+    
+    async def query_audit_logs(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        sort_by: str = "timestamp",
+        sort_order: str = "desc",
+        exact_count: bool = False,
+        search_mode: str = "substring",
+        **filters
+    ) -> AuditLogPage:
+        """
+        Get one page of audit logs.
+        
+        With a cursor the page starts right after the cursor position using a
+        (timestamp, id) index seek, so deep pages cost the same as the first
+        one; offset is ignored and only timestamp sorting is supported. The
+        total is estimated from planner statistics unless exact_count is set
+        or the estimate is small enough to count exactly.
+        
+        Args:
+            limit: Page size
+            offset: Rows to skip (offset pagination)
+            cursor: Cursor returned as next_cursor by the previous page
+            sort_by: Sort column
+            sort_order: 'asc' or 'desc'
+            exact_count: Run an exact count(*) instead of estimating
+            search_mode: 'substring' or 'fulltext' matching of search_query
+            **filters: Filters accepted by get_audit_logs
+        
+        Returns:
+            Page of audit logs
+        
+        Raises:
+            ValueError: If the cursor is invalid or combined with a non-timestamp sort
+        """
+        
+        conditions = self._build_filter_conditions(search_mode=search_mode, **filters)
+        descending = sort_order == "desc"
+        
+        query = select(AuditLog)
+        if cursor is not None:
+            if sort_by != "timestamp":
+                raise ValueError("Cursor pagination only supports sorting by timestamp")
+            page_conditions = conditions + [self._keyset_condition(decode_cursor(cursor), descending)]
+        else:
+            page_conditions = conditions
+        if page_conditions:
+            query = query.where(and_(*page_conditions))
+        
+        # Apply sorting; id breaks timestamp ties so cursors are stable
+        sort_column = getattr(AuditLog, sort_by, AuditLog.timestamp)
+        order = desc if descending else asc
+        query = query.order_by(order(sort_column), order(AuditLog.id))
+        
+        if cursor is None:
+            query = query.offset(offset)
+        result = await self.session.execute(query.limit(limit))
+        logs = result.scalars().all()
+        
+        total, is_estimate = await self.count_audit_logs(conditions, exact=exact_count)
+        
+        next_cursor = None
+        if len(logs) == limit and sort_by == "timestamp":
+            next_cursor = encode_cursor(logs[-1].timestamp, logs[-1].id)
+        
+        return AuditLogPage(
+            logs=logs,
+            total=total,
+            total_is_estimate=is_estimate,
+            next_cursor=next_cursor
+        )
+    
+    async def count_audit_logs(self, conditions: list, exact: bool = False) -> Tuple[int, bool]:
+        """
+        Count audit logs matching the conditions.
+        
+        Returns:
+            Tuple of (count, whether the count is a planner estimate)
+        """
+        
+        count_query = select(func.count()).select_from(AuditLog.__table__)
+        if conditions:
+            count_query = count_query.where(and_(*conditions))
+        
+        if not exact and self.session.get_bind().dialect.name == "postgresql":
+            estimate = await self._estimate_rows(conditions)
+            if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+                return estimate, True
+        
+        result = await self.session.execute(count_query)
+        return result.scalar(), False
+    
+    async def _estimate_rows(self, conditions: list) -> Optional[int]:
+        """Row estimate for the filtered audit log scan from EXPLAIN."""
+        
+        query = select(AuditLog.__table__.c.id)
         if conditions:
             query = query.where(and_(*conditions))
+        try:
+            compiled = query.compile(
+                dialect=self.session.get_bind().dialect,
+                compile_kwargs={"literal_binds": True}
+            )
+            # A failed EXPLAIN only rolls back its savepoint, so the exact
+            # count can still run in the caller's transaction
+            async with self.session.begin_nested():
+                connection = await self.session.connection()
+                result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+                plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.debug(f"Audit log row estimate unavailable: {e}")
+            return None
+    
+    async def has_audit_logs(self, **filters) -> bool:
+        """Check whether any audit log matches the filters."""
         
-        # Apply sorting
-        sort_column = getattr(AuditLog, sort_by, AuditLog.timestamp)
-        if sort_order == "desc":
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
+        query = select(AuditLog.__table__.c.id)
+        conditions = self._build_filter_conditions(**filters)
+        if conditions:
+            query = query.where(and_(*conditions))
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_count = await self.session.execute(count_query)
-        total_count = total_count.scalar()
+        result = await self.session.execute(query.limit(1))
+        return result.first() is not None
+    
+    async def iter_audit_log_batches(
+        self,
+        batch_size: int = 1000,
+        max_records: Optional[int] = None,
+        **filters
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Iterate over matching audit logs, newest first, in keyset-paginated batches.
         
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
+        Each batch is a separate query seeking past the last (timestamp, id)
+        seen, so the cost per batch stays flat however deep the export goes.
+        Rows are plain column tuples rather than ORM instances and are not
+        held in the session identity map.
         
-        # Execute query
-        result = await self.session.execute(query)
-        logs = result.scalars().all()
+        Args:
+            batch_size: Number of rows fetched per query
+            max_records: Maximum total number of rows to yield
+            **filters: Filters accepted by get_audit_logs
+        
+        Yields:
+            Lists of audit log rows
+        """
         
-        return logs, total_count
+        conditions = self._build_filter_conditions(**filters)
+        last_key = None
+        remaining = max_records
+        
+        while remaining is None or remaining > 0:
+            limit = batch_size if remaining is None else min(batch_size, remaining)
+            query = select(AuditLog.__table__)
+            page_conditions = list(conditions)
+            if last_key is not None:
+                page_conditions.append(self._keyset_condition(last_key))
+            if page_conditions:
+                query = query.where(and_(*page_conditions))
+            query = query.order_by(desc(AuditLog.timestamp), desc(AuditLog.id)).limit(limit)
+            
+            result = await self.session.execute(query)
+            rows = result.all()
+            if not rows:
+                break
+            
+            yield rows
+            
+            if len(rows) < limit:
+                break
+            last_key = (rows[-1].timestamp, rows[-1].id)
+            if remaining is not None:
+                remaining -= len(rows)
     
     async def get_audit_statistics(
         self,
@@ -372,6 +696,10 @@ class AuditService:
     
     async def _check_alerts(self, audit_log: AuditLog):
         """Check if audit log triggers any alerts."""
+        await self.check_alerts_for_batch([audit_log])
+    
+    async def check_alerts_for_batch(self, audit_logs: List[AuditLog]):
+        """Check a batch of audit logs against the active alerts, loaded once."""
         
         # Get active alerts
         alerts_query = select(AuditLogAlert).where(AuditLogAlert.is_active == True)
@@ -379,8 +707,9 @@ class AuditService:
         alerts = result.scalars().all()
         
         for alert in alerts:
-            if await self._should_trigger_alert(alert, audit_log):
-                await self._trigger_alert(alert, audit_log)
+            for audit_log in audit_logs:
+                if await self._should_trigger_alert(alert, audit_log):
+                    await self._trigger_alert(alert, audit_log)
     
     async def _should_trigger_alert(self, alert: AuditLogAlert, audit_log: AuditLog) -> bool:
         """Check if alert should be triggered for this log entry."""
@@ -489,6 +818,61 @@ class AuditService:
         
         return policy
     
+    async def get_retention_days(self) -> int:
+        """
+        Retention horizon for whole audit log partitions.
+        
+        Partitions hold every event type, so a partition may only be expired
+        once the longest retention required by any active policy has passed.
+        """
+        
+        result = await self.session.execute(
+            select(func.max(AuditLogRetentionPolicy.retention_days)).where(
+                AuditLogRetentionPolicy.is_active == True
+            )
+        )
+        longest_policy = result.scalar()
+        return max(longest_policy or 0, settings.AUDIT_LOG_RETENTION_DAYS)
+    
+    async def apply_retention(self, detach_only: bool = False) -> Dict[str, Any]:
+        """
+        Expire audit logs older than the retention horizon.
+        
+        On a partitioned audit_logs table whole monthly partitions are
+        detached or dropped; otherwise expired rows are deleted.
+        
+        Args:
+            detach_only: Detach expired partitions instead of dropping them
+        
+        Returns:
+            Summary of the retention run
+        """
+        
+        retention_days = await self.get_retention_days()
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        
+        if await partition_manager.is_partitioned(self.session, AuditLog.__tablename__):
+            expired = await partition_manager.expire_partitions(
+                self.session, AuditLog.__tablename__, cutoff, detach_only=detach_only
+            )
+            return {
+                "retention_days": retention_days,
+                "cutoff": cutoff.isoformat(),
+                "expired_partitions": [partition.name for partition in expired],
+                "estimated_rows": sum(partition.estimated_rows for partition in expired)
+            }
+        
+        result = await self.session.execute(
+            delete(AuditLog.__table__).where(AuditLog.timestamp < cutoff)
+        )
+        await self.session.commit()
+        return {
+            "retention_days": retention_days,
+            "cutoff": cutoff.isoformat(),
+            "expired_partitions": [],
+            "deleted_rows": result.rowcount
+        }
+    
     async def create_alert(
         self,
         alert_name: str,
@@ -0,0 +1,423 @@
+"""
+Buffered, batched audit log writer.
+
+Audit events recorded on the request path are appended to a bounded
+in-process queue and written by a single background flusher as multi-row
+INSERTs, either when a batch fills up or when the oldest queued event has
+waited for the flush interval. When the queue is full, events are spilled to
+a local JSON-lines file (or dropped, depending on policy) instead of piling
+up in memory, and spilled events are replayed once the database catches up.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import prometheus_client
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_SPILL = "spill"
+OVERFLOW_DROP = "drop"
+
+# Prometheus metrics
+audit_writer_queue_depth = None
+audit_writer_flush_duration = None
+audit_writer_events_total = None
+_audit_writer_metrics_initialized = False
+
+
+def init_audit_writer_metrics():
+    global audit_writer_queue_depth, audit_writer_flush_duration, audit_writer_events_total
+    global _audit_writer_metrics_initialized
+    if _audit_writer_metrics_initialized:
+        return
+    audit_writer_queue_depth = prometheus_client.Gauge(
+        "audit_writer_queue_depth", "Audit events waiting to be written"
+    )
+    audit_writer_flush_duration = prometheus_client.Histogram(
+        "audit_writer_flush_duration_seconds",
+        "Time spent writing one batch of audit events",
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    )
+    audit_writer_events_total = prometheus_client.Counter(
+        "audit_writer_events_total",
+        "Audit events handled by the batched writer",
+        ["outcome"],
+    )
+    _audit_writer_metrics_initialized = True
+
+
+init_audit_writer_metrics()
+
+
+def _default_session_factory() -> AsyncSession:
+    from app.db.database import AsyncSessionLocal
+
+    return AsyncSessionLocal()
+
+
+def _normalize(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert enum members to their values so rows can be inserted and spilled."""
+    return {
+        key: value.value if isinstance(value, Enum) else value
+        for key, value in record.items()
+    }
+
+
+class AuditLogWriter:
+    """
+    Bounded queue of audit events with a background batch flusher.
+
+    Events are plain column dictionaries as produced by
+    AuditService.build_event_record. enqueue() never awaits the database, so
+    request latency is unaffected by audit write latency.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        overflow_policy: str = OVERFLOW_SPILL,
+        spill_path: Optional[str] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        check_alerts: bool = True,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            max_queue_size: Maximum number of events buffered in memory
+            batch_size: Maximum number of events written per INSERT
+            flush_interval: Maximum seconds an event waits before being flushed
+            overflow_policy: 'spill' to append overflow to spill_path, or 'drop'
+            spill_path: JSON-lines file used for overflow and failed batches
+            session_factory: Factory for the sessions used to write batches
+            check_alerts: Evaluate audit alerts against each written batch
+        """
+        if overflow_policy not in (OVERFLOW_SPILL, OVERFLOW_DROP):
+            raise ValueError("overflow_policy must be 'spill' or 'drop'")
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy if spill_path else OVERFLOW_DROP
+        self.spill_path = spill_path
+        self.session_factory = session_factory or _default_session_factory
+        self.check_alerts = check_alerts
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "rejected": 0,
+            "failed_batches": 0,
+            "last_flush_seconds": 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue an audit event for writing.
+
+        Args:
+            record: Audit log column values
+
+        Returns:
+            True if the event was queued, False if it overflowed the queue
+        """
+        if not self.is_running and not self._stopping:
+            self._start_in_running_loop()
+
+        if len(self._queue) >= self.max_queue_size:
+            self._overflow([_normalize(record)])
+            return False
+
+        self._queue.append(_normalize(record))
+        self.stats["enqueued"] += 1
+        audit_writer_queue_depth.set(len(self._queue))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        """Start the background flusher."""
+        self._stopping = False
+        self._start_in_running_loop()
+        logger.info(
+            f"Audit writer started (batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval}s, overflow={self.overflow_policy})"
+        )
+
+    def _start_in_running_loop(self) -> None:
+        if self.is_running:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the flusher after draining queued events.
+
+        Args:
+            timeout: Maximum seconds to spend draining; anything left after
+                that is spilled (or dropped, depending on policy)
+        """
+        self._stopping = True
+        if self._task is None:
+            if self._queue:
+                await self.flush()
+            return
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        finally:
+            self._task = None
+        if self._queue:
+            remaining = list(self._queue)
+            self._queue.clear()
+            self._overflow(remaining)
+        audit_writer_queue_depth.set(0)
+        logger.info("Audit writer stopped")
+
+    async def flush(self) -> int:
+        """Write everything currently queued. Returns the number of events written."""
+        written = 0
+        while self._queue:
+            written += await self._flush_batch()
+        return written
+
+    async def _run(self) -> None:
+        await self._replay_spill()
+        while True:
+            if not self._queue and not self._stopping:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            elif len(self._queue) < self.batch_size and not self._stopping:
+                # Give a partial batch until the flush interval to fill up
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            if self._queue:
+                await self._flush_batch()
+                if not self._queue:
+                    await self._replay_spill()
+            elif self._stopping:
+                return
+
+    async def _flush_batch(self) -> int:
+        batch = [
+            self._queue.popleft()
+            for _ in range(min(self.batch_size, len(self._queue)))
+        ]
+        audit_writer_queue_depth.set(len(self._queue))
+        if await self._write_batch(batch):
+            return len(batch)
+        self._overflow(batch)
+        return 0
+
+    async def _write_batch(self, batch: List[Dict[str, Any]], attempts: int = 3) -> bool:
+        """Write a batch as one multi-row INSERT, retrying transient failures."""
+        for attempt in range(attempts):
+            start_time = time.perf_counter()
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(insert(AuditLog.__table__), batch)
+                    await session.commit()
+                    if self.check_alerts:
+                        await self._check_alerts(session, batch)
+            except Exception as e:
+                logger.warning(
+                    f"Audit batch write failed (attempt {attempt + 1}/{attempts}, "
+                    f"{len(batch)} events): {e}"
+                )
+                if attempt + 1 < attempts and not self._stopping:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+
+            duration = time.perf_counter() - start_time
+            audit_writer_flush_duration.observe(duration)
+            audit_writer_events_total.labels(outcome="written").inc(len(batch))
+            self.stats["written"] += len(batch)
+            self.stats["last_flush_seconds"] = duration
+            return True
+
+        self.stats["failed_batches"] += 1
+        return False
+
+    async def _check_alerts(self, session: AsyncSession, batch: List[Dict[str, Any]]) -> None:
+        from app.services.audit_service import AuditService
+
+        try:
+            audit_logs = [AuditLog(**record) for record in batch]
+            await AuditService(session).check_alerts_for_batch(audit_logs)
+        except Exception as e:
+            logger.error(f"Audit alert evaluation failed: {e}")
+
+    def _overflow(self, records: List[Dict[str, Any]]) -> None:
+        """Spill or drop events that cannot be queued or written."""
+        if self.overflow_policy == OVERFLOW_SPILL:
+            try:
+                with open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                    for record in records:
+                        spill_file.write(json.dumps(record, default=str) + "\n")
+                self.stats["spilled"] += len(records)
+                audit_writer_events_total.labels(outcome="spilled").inc(len(records))
+                return
+            except OSError as e:
+                logger.error(f"Failed to spill audit events to {self.spill_path}: {e}")
+
+        self.stats["dropped"] += len(records)
+        audit_writer_events_total.labels(outcome="dropped").inc(len(records))
+        logger.warning(f"Dropped {len(records)} audit events (queue full or database unavailable)")
+
+    async def _replay_spill(self) -> None:
+        """Write spilled events back to the database once the queue is idle."""
+        if not self.spill_path:
+            return
+
+        # Every worker process shares the spill file; only the holder of the
+        # lock replays it, so events are not replayed twice
+        try:
+            lock_file = open(f"{self.spill_path}.lock", "a")
+        except OSError as e:
+            logger.error(f"Failed to open audit spill lock for {self.spill_path}: {e}")
+            return
+        try:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+            await self._replay_locked()
+        finally:
+            lock_file.close()
+
+    async def _replay_locked(self) -> None:
+        # A leftover replay file means a previous replay was interrupted
+        replay_path = f"{self.spill_path}.replay"
+        if not os.path.exists(replay_path):
+            if not os.path.exists(self.spill_path):
+                return
+            try:
+                os.replace(self.spill_path, replay_path)
+            except OSError:
+                return
+
+        batch: List[Dict[str, Any]] = []
+        replayed = 0
+        failed = False
+        with open(replay_path, encoding="utf-8") as replay_file:
+            for line_number, line in enumerate(replay_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if record.get("timestamp"):
+                        record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+                except (ValueError, TypeError, AttributeError) as e:
+                    self._reject(line, f"line {line_number}: {e}")
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    failed = failed or not await self._write_batch(batch, attempts=1)
+                    if failed:
+                        # Database still unavailable; keep the rest on disk
+                        self._overflow(batch)
+                    else:
+                        replayed += len(batch)
+                    batch = []
+            if batch:
+                if not failed and await self._write_batch(batch, attempts=1):
+                    replayed += len(batch)
+                else:
+                    self._overflow(batch)
+        os.remove(replay_path)
+
+        if replayed:
+            self.stats["replayed"] += replayed
+            logger.info(f"Replayed {replayed} spilled audit events")
+
+    def _reject(self, line: str, reason: str) -> None:
+        """Move an unreadable spill line aside so it does not block the replay."""
+        self.stats["rejected"] += 1
+        audit_writer_events_total.labels(outcome="rejected").inc()
+        logger.error(f"Skipping malformed spilled audit event ({reason})")
+        try:
+            with open(f"{self.spill_path}.rejected", "a", encoding="utf-8") as rejected_file:
+                rejected_file.write(line if line.endswith("\n") else line + "\n")
+        except OSError as e:
+            logger.error(f"Failed to quarantine malformed audit event: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        return {
+            **self.stats,
+            "queue_depth": len(self._queue),
+            "max_queue_size": self.max_queue_size,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "overflow_policy": self.overflow_policy,
+            "is_running": self.is_running,
+        }
+
+
+# Global audit writer instance
+audit_writer = AuditLogWriter(
+    max_queue_size=settings.AUDIT_WRITER_QUEUE_SIZE,
+    batch_size=settings.AUDIT_WRITER_BATCH_SIZE,
+    flush_interval=settings.AUDIT_WRITER_FLUSH_INTERVAL,
+    overflow_policy=settings.AUDIT_WRITER_OVERFLOW_POLICY,
+    spill_path=settings.AUDIT_WRITER_SPILL_PATH,
+)
+
+
+async def start_audit_writer():
+    """Start the global audit writer."""
+    await audit_writer.start()
+
+
+async def stop_audit_writer():
+    """Drain and stop the global audit writer."""
+    await audit_writer.stop()
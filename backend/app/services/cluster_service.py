@@ -14,6 +14,7 @@ from sqlalchemy.future import select
 
 from app.models.cluster import Cluster, ClusterStatus, NodeStatus
 from app.models.project import Project
+from app.core.auth.resource_access import can_access_project
 from app.schemas.cluster import (
     ClusterCreate,
     ClusterUpdate,
@@ -104,9 +105,7 @@ class ClusterService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return []
 
@@ -343,9 +342,7 @@ class ClusterService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return None
 
@@ -446,9 +443,7 @@ class ClusterService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return []
 
@@ -0,0 +1,354 @@
+"""
+Effective Permission Index
+
+Materializes each user's effective permissions (role grants plus direct
+grants) per organization scope in the user_effective_permissions table, with
+the in-process auth context cache in front of it. Permission checks read one
+row, or nothing at all on a cache hit, instead of joining roles, role
+permissions and direct grants on every call. The services that change roles,
+permissions and grants refresh the affected users' rows.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Integer, and_, cast, delete, func, null, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth_context import (
+    ALL_PERMISSIONS,
+    AuthContextCache,
+    auth_context_cache,
+    mask_permissions,
+    permission_mask,
+)
+from app.models.role import Permission, role_permissions
+from app.models.user import User
+from app.models.user_effective_permission import SYSTEM_SCOPE, UserEffectivePermission
+from app.models.user_permission import UserPermission
+from app.models.user_role import UserRole
+
+logger = logging.getLogger(__name__)
+
+# (organization the grant applies in, permission name, organization of the permission)
+Grant = Tuple[Optional[int], Any, Optional[int]]
+ScopeKey = Tuple[int, Optional[int]]
+# Permission bitset and when the earliest grant behind it expires
+ScopeMask = Tuple[int, Optional[datetime]]
+
+
+def effective_mask(grants: Iterable[Grant], organization_id: Optional[int]) -> int:
+    """
+    Permission bitset of a user's grants in one organization scope.
+
+    A grant applies when it is system-wide or made in the organization, and
+    only for permissions that are system-wide or belong to the organization.
+    """
+    return permission_mask(
+        name
+        for grant_organization_id, name, permission_organization_id in grants
+        if grant_organization_id in (None, organization_id)
+        and permission_organization_id in (None, organization_id)
+    )
+
+
+def grants_valid_until(
+    grants: Iterable[Grant], expirations: Iterable[Optional[datetime]], organization_id: Optional[int]
+) -> Optional[datetime]:
+    """Earliest expiry among the grants that apply in an organization scope."""
+    applicable = [
+        expires_at
+        for (grant_organization_id, _, permission_organization_id), expires_at in zip(grants, expirations)
+        if expires_at is not None
+        and grant_organization_id in (None, organization_id)
+        and permission_organization_id in (None, organization_id)
+    ]
+    return min(applicable) if applicable else None
+
+
+def _default_session_factory() -> AsyncSession:
+    from app.db.database import AsyncSessionLocal
+
+    return AsyncSessionLocal()
+
+
+def _scope(organization_id: Optional[int]) -> int:
+    return organization_id if organization_id is not None else SYSTEM_SCOPE
+
+
+def _organization(scope: int) -> Optional[int]:
+    return scope if scope != SYSTEM_SCOPE else None
+
+
+class EffectivePermissionIndex:
+    """Materialized effective permissions per user and organization scope."""
+
+    def __init__(
+        self,
+        cache: AuthContextCache = auth_context_cache,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            cache: In-process cache of permission bitsets in front of the table
+            session_factory: Factory for the sessions computed rows are stored
+                with, so storing never commits or rolls back a caller's session
+        """
+        self.cache = cache
+        self.table = UserEffectivePermission.__table__
+        self.session_factory = session_factory or _default_session_factory
+
+    async def get_mask(
+        self, db: AsyncSession, user_id: int, organization_id: Optional[int] = None
+    ) -> int:
+        """
+        Permission bitset of a user in an organization scope.
+
+        Superusers hold every permission. Rows missing from the table, or
+        past the expiry of a role grant they were computed from, are computed
+        and stored on first use.
+        """
+        mask = self.cache.get_permissions(user_id, organization_id)
+        if mask is not None:
+            return mask
+
+        users = User.__table__
+        result = await db.execute(
+            select(users.c.is_superuser, self.table.c.permissions, self.table.c.valid_until)
+            .select_from(
+                users.outerjoin(
+                    self.table,
+                    and_(
+                        self.table.c.user_id == users.c.id,
+                        self.table.c.organization_id == _scope(organization_id),
+                        or_(self.table.c.valid_until.is_(None), self.table.c.valid_until > func.now()),
+                    ),
+                )
+            )
+            .where(users.c.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return 0
+
+        is_superuser, stored, valid_until = row
+        if is_superuser:
+            mask, valid_until = ALL_PERMISSIONS, None
+        elif stored is not None:
+            mask = permission_mask(stored)
+        else:
+            key = (user_id, organization_id)
+            computed = await self._compute(db, [key])
+            mask, valid_until = computed[key]
+            await self._store(computed)
+
+        self.cache.put_permissions(
+            user_id, organization_id, mask,
+            expires_at=valid_until.timestamp() if valid_until is not None else None,
+        )
+        return mask
+
+    async def check_permissions(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        permissions: Sequence[Any],
+        organization_id: Optional[int] = None,
+    ) -> Dict[str, bool]:
+        """
+        Check several permissions at once.
+
+        Returns:
+            Whether the user holds each permission, keyed by permission value
+        """
+        mask = await self.get_mask(db, user_id, organization_id)
+        return {
+            getattr(permission, "value", permission): bool(mask & permission_mask((permission,)))
+            for permission in permissions
+        }
+
+    async def refresh_users(self, db: AsyncSession, user_ids: Iterable[int]) -> None:
+        """
+        Recompute the stored rows of users whose grants changed.
+
+        Call after the change is committed. Stale rows are deleted first, so
+        if recomputing fails they are rebuilt on next use.
+        """
+        user_ids = {int(user_id) for user_id in user_ids}
+        if not user_ids:
+            return
+
+        try:
+            result = await db.execute(
+                delete(self.table)
+                .where(self.table.c.user_id.in_(user_ids))
+                .returning(self.table.c.user_id, self.table.c.organization_id)
+            )
+            keys = [(user_id, _organization(scope)) for user_id, scope in result.all()]
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error clearing effective permissions of users {sorted(user_ids)}: {e}")
+            raise
+        finally:
+            for user_id in user_ids:
+                self.cache.invalidate_user_permissions(user_id)
+
+        if keys:
+            try:
+                await self._store(await self._compute(db, keys))
+            except Exception as e:
+                logger.warning(f"Effective permissions of users {sorted(user_ids)} will be rebuilt on use: {e}")
+
+    async def refresh_role(self, db: AsyncSession, role_id: int) -> None:
+        """Recompute the stored rows of every user holding a role."""
+        user_roles = UserRole.__table__
+        users = User.__table__
+        result = await db.execute(
+            union_all(
+                select(user_roles.c.user_id).where(user_roles.c.role_id == role_id),
+                select(users.c.id).where(users.c.role_id == role_id),
+            )
+        )
+        await self.refresh_users(db, result.scalars().all())
+
+    async def refresh_all(self, db: AsyncSession) -> None:
+        """
+        Drop every stored row, e.g. after a permission is renamed or deleted.
+
+        Rows are rebuilt on next use rather than all at once.
+        """
+        try:
+            await db.execute(delete(self.table))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error clearing effective permissions: {e}")
+            raise
+        finally:
+            self.cache.invalidate_permissions()
+
+    async def _compute(self, db: AsyncSession, keys: List[ScopeKey]) -> Dict[ScopeKey, ScopeMask]:
+        """Compute the bitsets of (user, organization) keys, and their expiry, with one query."""
+        user_ids = {user_id for user_id, _ in keys}
+        grants: Dict[int, List[Grant]] = defaultdict(list)
+        expirations: Dict[int, List[Optional[datetime]]] = defaultdict(list)
+        for user_id, grant_organization_id, name, permission_organization_id, expires_at in (
+            await db.execute(self._grants_query(user_ids))
+        ).all():
+            grants[user_id].append((grant_organization_id, name, permission_organization_id))
+            expirations[user_id].append(expires_at)
+
+        return {
+            (user_id, organization_id): (
+                effective_mask(grants[user_id], organization_id),
+                grants_valid_until(grants[user_id], expirations[user_id], organization_id),
+            )
+            for user_id, organization_id in keys
+        }
+
+    @staticmethod
+    def _grants_query(user_ids: Set[int]):
+        """Role grants (per-organization and legacy user role) and direct grants of users, with their expiry."""
+        permissions = Permission.__table__
+        user_roles = UserRole.__table__
+        users = User.__table__
+        user_permissions = UserPermission.__table__
+
+        return union_all(
+            select(
+                user_roles.c.user_id,
+                user_roles.c.organization_id,
+                permissions.c.name,
+                permissions.c.organization_id,
+                user_roles.c.expires_at,
+            )
+            .select_from(
+                user_roles.join(
+                    role_permissions, role_permissions.c.role_id == user_roles.c.role_id
+                ).join(permissions, permissions.c.id == role_permissions.c.permission_id)
+            )
+            .where(
+                user_roles.c.user_id.in_(user_ids),
+                user_roles.c.is_active.is_(True),
+                or_(user_roles.c.expires_at.is_(None), user_roles.c.expires_at > func.now()),
+                permissions.c.is_active.is_(True),
+            ),
+            select(
+                users.c.id,
+                cast(null(), Integer),
+                permissions.c.name,
+                permissions.c.organization_id,
+                cast(null(), user_roles.c.expires_at.type),
+            )
+            .select_from(
+                users.join(
+                    role_permissions, role_permissions.c.role_id == users.c.role_id
+                ).join(permissions, permissions.c.id == role_permissions.c.permission_id)
+            )
+            .where(users.c.id.in_(user_ids), permissions.c.is_active.is_(True)),
+            select(
+                user_permissions.c.user_id,
+                user_permissions.c.organization_id,
+                permissions.c.name,
+                permissions.c.organization_id,
+                cast(null(), user_roles.c.expires_at.type),
+            )
+            .select_from(
+                user_permissions.join(
+                    permissions, permissions.c.id == user_permissions.c.permission_id
+                )
+            )
+            .where(
+                user_permissions.c.user_id.in_(user_ids),
+                user_permissions.c.is_active.is_(True),
+                permissions.c.is_active.is_(True),
+            ),
+        )
+
+    async def _store(self, masks: Dict[ScopeKey, ScopeMask]) -> None:
+        """
+        Upsert computed bitsets in a session of their own.
+
+        Lookups run inside callers' request sessions, which must not be
+        committed or rolled back here; failures only cost a recompute later.
+        """
+        if not masks:
+            return
+        rows = [
+            {
+                "user_id": user_id,
+                "organization_id": _scope(organization_id),
+                "permissions": [permission.value for permission in mask_permissions(mask)],
+                "valid_until": valid_until,
+            }
+            for (user_id, organization_id), (mask, valid_until) in masks.items()
+        ]
+        statement = pg_insert(self.table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.table.c.user_id, self.table.c.organization_id],
+            set_={
+                "permissions": statement.excluded.permissions,
+                "valid_until": statement.excluded.valid_until,
+                "computed_at": func.now(),
+            },
+        )
+        try:
+            async with self.session_factory() as session:
+                try:
+                    await session.execute(statement)
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+        except Exception as e:
+            logger.warning(f"Could not store effective permissions: {e}")
+
+
+# Global effective permission index instance
+effective_permission_index = EffectivePermissionIndex()
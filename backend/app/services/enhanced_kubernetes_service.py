@@ -9,7 +9,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple, Union
 import json
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 
 import httpx
@@ -21,6 +21,7 @@ from app.models.cluster import Cluster, ClusterStatus, NodeStatus
 from app.schemas.cluster import ClusterMetricsUpdate, KubernetesMetrics
 from app.services.cluster_service import ClusterService
 from app.core.config import settings
+from app.utils.prometheus_batch import ClusterQueryPlanner
 from app.utils.prometheus_client import get_prometheus_client, EnhancedPrometheusClient
 from app.utils.prometheus_queries import (
     create_query_builder,
@@ -152,6 +153,10 @@ class EnhancedKubernetesMonitoringService:
         self.prometheus_client: Optional[EnhancedPrometheusClient] = None
         self.query_builders: Dict[str, AdvancedQueryBuilder] = {}
         self.transformer = MetricTransformer()
+        self.planner = ClusterQueryPlanner(
+            max_concurrency=settings.PROMETHEUS_MAX_CONCURRENT_QUERIES,
+            max_clusters_per_query=settings.PROMETHEUS_MAX_CLUSTERS_PER_QUERY,
+        )
 
         # Multi-level cache for different types of metrics
         self.cache: Dict[str, CachedMetric] = {}
@@ -180,7 +185,7 @@ class EnhancedKubernetesMonitoringService:
     async def _initialize_prometheus_client(self):
         """Initialize the enhanced Prometheus client."""
         if not self.prometheus_client:
-            self.prometheus_client = await get_prometheus_client()
+            self.prometheus_client = await get_prometheus_client(self.prometheus_url)
 
     def _get_query_builder(self, cluster_name: str) -> AdvancedQueryBuilder:
         """
@@ -282,49 +287,26 @@ class EnhancedKubernetesMonitoringService:
             cluster_queries = query_builder.get_cluster_overview_queries()
 
             # Execute all queries concurrently
-            tasks = []
-            for query_name, query in cluster_queries.items():
-                task = self.prometheus_client.query(query, use_cache=use_cache)
-                tasks.append((query_name, task))
+            responses = await asyncio.gather(
+                *(
+                    self.prometheus_client.query(query, use_cache=use_cache)
+                    for query in cluster_queries.values()
+                ),
+                return_exceptions=True,
+            )
 
-            # Wait for all queries to complete
             results = {}
-            for query_name, task in tasks:
-                try:
-                    result = await task
-                    if result:
-                        results[query_name] = {
-                            "resultType": result.resultType,
-                            "result": [asdict(metric) for metric in result.result],
-                        }
-                except Exception as e:
-                    logger.error(f"Error executing query {query_name}: {e}")
-                    results[query_name] = {"error": str(e)}
-
-            # Build comprehensive overview
-            overview = {
-                "cluster_name": cluster_name,
-                "timestamp": datetime.utcnow().isoformat(),
-                "capacity": {},
-                "utilization": {},
-                "health": {},
-                "raw_metrics": results,
-            }
-
-            # Extract capacity information
-            if "cluster_cpu_capacity" in results:
-                cpu_data = results["cluster_cpu_capacity"]
-                if cpu_data.get("result"):
-                    overview["capacity"]["cpu_cores"] = float(
-                        cpu_data["result"][0]["value"][1]
-                    )
-
-            if "cluster_memory_capacity" in results:
-                memory_data = results["cluster_memory_capacity"]
-                if memory_data.get("result"):
-                    overview["capacity"]["memory_bytes"] = float(
-                        memory_data["result"][0]["value"][1]
-                    )
+            for query_name, result in zip(cluster_queries, responses):
+                if isinstance(result, Exception):
+                    logger.error(f"Error executing query {query_name}: {result}")
+                    results[query_name] = {"error": str(result)}
+                elif result:
+                    results[query_name] = {
+                        "resultType": result.resultType,
+                        "result": [metric.model_dump() for metric in result.result],
+                    }
+
+            overview = self._build_cluster_overview(cluster_name, results)
 
             # Cache the result
             if use_cache:
@@ -345,6 +327,102 @@ class EnhancedKubernetesMonitoringService:
                 "error": str(e),
             }
 
+    @staticmethod
+    def _build_cluster_overview(
+        cluster_name: str, results: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build a cluster overview from its overview query results."""
+        overview = {
+            "cluster_name": cluster_name,
+            "timestamp": datetime.utcnow().isoformat(),
+            "capacity": {},
+            "utilization": {},
+            "health": {},
+            "raw_metrics": results,
+        }
+
+        # Extract capacity information
+        if "cluster_cpu_capacity" in results:
+            cpu_data = results["cluster_cpu_capacity"]
+            if cpu_data.get("result"):
+                overview["capacity"]["cpu_cores"] = float(
+                    cpu_data["result"][0]["value"][1]
+                )
+
+        if "cluster_memory_capacity" in results:
+            memory_data = results["cluster_memory_capacity"]
+            if memory_data.get("result"):
+                overview["capacity"]["memory_bytes"] = float(
+                    memory_data["result"][0]["value"][1]
+                )
+
+        return overview
+
+    async def get_clusters_overview(
+        self,
+        cluster_names: List[str],
+        use_cache: bool = True,
+        cache_level: CacheLevel = CacheLevel.SHORT_TERM,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get overviews of several clusters with one query per overview metric.
+
+        Args:
+            cluster_names (List[str]): Names of the clusters to monitor
+            use_cache (bool): Whether to use cached results
+            cache_level (CacheLevel): Cache level for the results
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Cluster overview by cluster name
+        """
+        overviews = {}
+        pending = []
+        for cluster_name in dict.fromkeys(cluster_names):
+            cached_result = None
+            if use_cache:
+                cached_result = self._get_cached_metric(
+                    self._get_cache_key(cluster_name, "cluster", "overview")
+                )
+            if cached_result:
+                overviews[cluster_name] = cached_result
+            else:
+                pending.append(cluster_name)
+
+        if not pending:
+            return overviews
+
+        await self._initialize_prometheus_client()
+        query_builder = self._get_query_builder(pending[0])
+        templates = query_builder.get_templates(query_builder.CLUSTER_OVERVIEW_TEMPLATES)
+
+        results = await self.planner.execute(
+            lambda query: self.prometheus_client.get_data(
+                "/api/v1/query", {"query": query}, use_cache=use_cache
+            ),
+            templates,
+            pending,
+            interval=query_builder.interval,
+        )
+
+        for cluster_name in pending:
+            cluster_results = {
+                query_name: data
+                for query_name, data in results[cluster_name].items()
+                if data is not None
+            }
+            overview = self._build_cluster_overview(cluster_name, cluster_results)
+            if use_cache:
+                self._cache_metric(
+                    self._get_cache_key(cluster_name, "cluster", "overview"),
+                    overview,
+                    cache_level,
+                    MetricType.CLUSTER,
+                    cluster_name,
+                )
+            overviews[cluster_name] = overview
+
+        return overviews
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Get cache performance statistics.
@@ -410,8 +488,8 @@ class EnhancedKubernetesMonitoringService:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.prometheus_client:
-            await self.prometheus_client.close()
+        # The Prometheus client is shared; it is closed on application shutdown
+        self.prometheus_client = None
 
 
 # Global service instance
@@ -20,6 +20,7 @@ from app.models.infrastructure_change import (
     ResourceType,
 )
 from app.models.project import Project
+from app.core.auth.resource_access import can_access_project
 from app.schemas.infrastructure_change import (
     InfrastructureChangeCreate,
     InfrastructureChangeUpdate,
@@ -110,9 +111,7 @@ class InfrastructureChangeService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return []
 
@@ -351,9 +350,7 @@ class InfrastructureChangeService:
         """
         try:
             # Check project access
-            project = await db.execute(select(Project).filter(Project.id == project_id))
-            project = project.scalars().first()
-            if not project or not project.is_accessible_by_user(user_id):
+            if not await can_access_project(db, user_id, project_id):
                 logger.warning(f"User {user_id} denied access to project {project_id}")
                 return None
 
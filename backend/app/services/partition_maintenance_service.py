@@ -0,0 +1,178 @@
+"""
+Partition Maintenance Service
+
+Keeps the monthly partitions of audit_logs and metrics rolling: creates
+upcoming partitions ahead of time and expires partitions past retention.
+This service should be run as a background task alongside the application;
+every worker starts it, and an advisory lock lets one of them run each cycle.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.partitioning import PARTITIONED_TABLES, partition_manager
+from app.services.audit_service import AuditService
+
+logger = logging.getLogger(__name__)
+
+# Key of the advisory lock held while a worker runs a maintenance cycle
+MAINTENANCE_LOCK_KEY = 7_302_114_901
+
+
+class PartitionMaintenanceService:
+    """Service for creating upcoming partitions and expiring old ones."""
+
+    def __init__(self, interval_hours: int = 6, session_factory=AsyncSessionLocal):
+        """
+        Initialize the partition maintenance service.
+
+        Args:
+            interval_hours: How often to run maintenance (default: 6 hours)
+            session_factory: Factory for the sessions maintenance runs in
+        """
+        self.interval = timedelta(hours=interval_hours)
+        self.session_factory = session_factory
+        self.is_running = False
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the partition maintenance service."""
+        if self.is_running:
+            logger.warning("Partition maintenance service is already running")
+            return
+
+        self.is_running = True
+        self._task = asyncio.create_task(self._maintenance_loop())
+        logger.info(f"Partition maintenance service started (interval: {self.interval})")
+
+    async def stop(self):
+        """Stop the partition maintenance service."""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        logger.info("Partition maintenance service stopped")
+
+    async def _maintenance_loop(self):
+        """Main maintenance loop that runs periodically."""
+        while self.is_running:
+            try:
+                await self.run_maintenance()
+                await asyncio.sleep(self.interval.total_seconds())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in partition maintenance loop: {e}")
+                # Wait a bit before retrying on error
+                await asyncio.sleep(300)
+
+    async def run_maintenance(self) -> Dict[str, Any]:
+        """
+        Create missing partitions and apply retention to every partitioned table.
+
+        Retention is applied at partition granularity, so rows are kept until
+        their whole month has passed the retention horizon. Tables that are
+        not partitioned (e.g. before the migration has run) are skipped.
+
+        The cycle is skipped when another worker holds the maintenance lock.
+        Each table is maintained in its own session, so a failure is rolled
+        back and reported without affecting the other tables.
+
+        Returns:
+            Per-table summary of created and expired partitions, or of the error
+        """
+        detach_only = settings.PARTITION_RETENTION_MODE == "detach"
+        summary: Dict[str, Any] = {}
+
+        # The lock is transaction-scoped and released when lock_session closes
+        async with self.session_factory() as lock_session:
+            if not await self._try_lock(lock_session):
+                logger.info("Partition maintenance is running in another worker, skipping")
+                return summary
+
+            for table in PARTITIONED_TABLES:
+                async with self.session_factory() as session:
+                    try:
+                        result = await self._maintain_table(session, table, detach_only)
+                    except Exception as e:
+                        await session.rollback()
+                        logger.error(f"Partition maintenance of {table} failed: {e}")
+                        summary[table] = {"error": str(e)}
+                        continue
+                if result is not None:
+                    summary[table] = result
+
+        self.last_run = {"completed_at": datetime.utcnow().isoformat(), "tables": summary}
+        return summary
+
+    @staticmethod
+    async def _try_lock(session: AsyncSession) -> bool:
+        """Take the maintenance lock for the session's transaction, if no one else holds it."""
+        if session.get_bind().dialect.name != "postgresql":
+            return True
+        result = await session.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        )
+        return bool(result.scalar())
+
+    @staticmethod
+    async def _maintain_table(
+        session: AsyncSession, table: str, detach_only: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Create upcoming and expire old partitions of one table."""
+        if not await partition_manager.is_partitioned(session, table):
+            return None
+
+        created = await partition_manager.ensure_partitions(session, table)
+        if table == "audit_logs":
+            retention = await AuditService(session).apply_retention(detach_only=detach_only)
+            expired = retention["expired_partitions"]
+        else:
+            cutoff = datetime.utcnow() - timedelta(days=settings.METRICS_RETENTION_DAYS)
+            expired = [
+                partition.name
+                for partition in await partition_manager.expire_partitions(
+                    session, table, cutoff, detach_only=detach_only
+                )
+            ]
+        return {"created": created, "expired": expired}
+
+    def get_status(self) -> dict:
+        """Get the current status of the maintenance service."""
+        return {
+            "is_running": self.is_running,
+            "interval_hours": self.interval.total_seconds() / 3600,
+            "retention_mode": settings.PARTITION_RETENTION_MODE,
+            "last_run": self.last_run
+        }
+
+
+# Global partition maintenance service instance
+partition_maintenance_service = PartitionMaintenanceService(
+    interval_hours=settings.PARTITION_MAINTENANCE_INTERVAL_HOURS
+)
+
+
+async def start_partition_maintenance_service():
+    """Start the global partition maintenance service."""
+    await partition_maintenance_service.start()
+
+
+async def stop_partition_maintenance_service():
+    """Stop the global partition maintenance service."""
+    await partition_maintenance_service.stop()
@@ -11,6 +11,7 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.services.effective_permission_index import effective_permission_index
 from app.models.role import (
     Role,
     Permission,
@@ -186,6 +187,7 @@ class PermissionService:
                 setattr(permission, field, value)
 
             await db.commit()
+            await effective_permission_index.refresh_all(db)
             await db.refresh(permission)
 
             logger.info(f"Updated permission: {permission.name}")
@@ -220,6 +222,7 @@ class PermissionService:
 
             await db.delete(permission)
             await db.commit()
+            await effective_permission_index.refresh_all(db)
 
             logger.info(f"Deleted permission: {permission.name}")
             return True
@@ -335,6 +338,7 @@ class PermissionService:
                     )
 
             await db.commit()
+            await effective_permission_index.refresh_all(db)
 
             logger.info(f"Bulk updated {len(results['updated'])} permissions")
             return results
@@ -383,6 +387,7 @@ class PermissionService:
                     assigned_count += 1
 
             await db.commit()
+            await effective_permission_index.refresh_role(db, role_id)
 
             result = {
                 "role_id": role_id,
@@ -438,6 +443,7 @@ class PermissionService:
                     revoked_count += 1
 
             await db.commit()
+            await effective_permission_index.refresh_role(db, role_id)
 
             result = {
                 "role_id": role_id,
@@ -736,6 +742,32 @@ class PermissionService:
             logger.error(f"Error checking permission {permission_name} for user {user_id}: {e}")
             raise
 
+    @staticmethod
+    async def check_permissions(
+        db: AsyncSession,
+        user_id: int,
+        permission_names: List[str],
+        organization_id: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """
+        Check several permissions for a user at once.
+        
+        Answered from the materialized effective permission index, so each
+        permission costs a bit test rather than a query.
+        
+        Args:
+            db: Database session
+            user_id: ID of the user
+            permission_names: Names of the permissions to check
+            organization_id: Optional organization context
+            
+        Returns:
+            Dict mapping each permission name to whether the user has it
+        """
+        return await effective_permission_index.check_permissions(
+            db, user_id, permission_names, organization_id
+        )
+
     @staticmethod
     async def get_permissions_by_resource(
         db: AsyncSession,
@@ -14,6 +14,8 @@ from sqlalchemy import select
 
 from app.models.project import Project
 from app.models.user import User
+from app.core.auth.resource_access import project_access_filter
+from app.services.team_dashboard_service import invalidate_team_dashboard
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectAccessCreate
 from app.schemas.project import ProjectSummary, ProjectStats, ProjectResourceSummary
 
@@ -89,12 +91,7 @@ class ProjectService:
             List[Project]: List of accessible projects
         """
         try:
-            query = select(Project).filter(
-                or_(
-                    Project.owner_user_id == user_id,
-                    # Add team access check here when teams are implemented
-                )
-            )
+            query = select(Project).filter(project_access_filter(user_id))
 
             if is_active is not None:
                 query = query.filter(Project.is_active == is_active)
@@ -140,6 +137,7 @@ class ProjectService:
             db.add(project)
             await db.commit()
             await db.refresh(project)
+            await invalidate_team_dashboard(project.team_id)
 
             logger.info(f"Created new project: {project.name} (ID: {project.id})")
             return project
@@ -195,6 +193,7 @@ class ProjectService:
             # Save changes
             await db.commit()
             await db.refresh(project)
+            await invalidate_team_dashboard(project.team_id)
 
             logger.info(f"Updated project: {project.name} (ID: {project.id})")
             return project
@@ -232,6 +231,7 @@ class ProjectService:
             # Soft delete
             project.is_active = False
             await db.commit()
+            await invalidate_team_dashboard(project.team_id)
 
             logger.info(f"Deleted project: {project.name} (ID: {project.id})")
             return True
@@ -312,10 +312,7 @@ class ProjectService:
                 Project.description.ilike(f"%{query}%"),
             )
 
-            access_filter = or_(
-                Project.owner_user_id == user_id,
-                # Add team access check here when teams are implemented
-            )
+            access_filter = project_access_filter(user_id)
 
             projects = await db.execute(
                 select(Project)
@@ -35,6 +35,7 @@ from app.schemas.role import (
     RBACAnalytics,
 )
 from app.core.cache_decorators import cached, DataType, invalidate_cache_pattern
+from app.services.effective_permission_index import effective_permission_index
 
 logger = logging.getLogger(__name__)
 
@@ -182,6 +183,7 @@ class RoleService:
                 role.permissions.extend(permissions)
 
             await db.commit()
+            await effective_permission_index.refresh_role(db, role_id)
             await db.refresh(role)
 
             # Invalidate cache for role-related endpoints
@@ -232,6 +234,7 @@ class RoleService:
 
             await db.delete(role)
             await db.commit()
+            await effective_permission_index.refresh_all(db)
 
             logger.info(f"Deleted role: {role.name} (ID: {role.id})")
             return True
@@ -314,6 +317,7 @@ class RoleService:
 
             user.role_id = role_id
             await db.commit()
+            await effective_permission_index.refresh_users(db, [user_id])
 
             logger.info(f"Assigned role {role.name} to user {user.github_username}")
             return True
@@ -334,6 +338,7 @@ class RoleService:
 
             user.role_id = None
             await db.commit()
+            await effective_permission_index.refresh_users(db, [user_id])
 
             logger.info(f"Removed role from user {user.github_username}")
             return True
@@ -520,6 +525,7 @@ class RoleService:
                         created_roles.append(role.name.value)
 
             await db.commit()
+            await effective_permission_index.refresh_all(db)
 
             # Assign super admin role if requested
             if setup_data.assign_super_admin:
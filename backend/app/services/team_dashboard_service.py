@@ -0,0 +1,451 @@
+"""
+Team dashboard snapshot service.
+Assembles team dashboard sections concurrently on separate pooled connections,
+caches the assembled snapshot per team and period, and records section timings.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, and_, cast, desc, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheLevel, DataType, get_cache_manager
+from app.db.database import AsyncSessionLocal
+from app.models.audit_log import AuditLog
+from app.models.project import Project
+from app.models.team import Team
+from app.models.user import User
+from app.models.user_team import UserTeam
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], Any]
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class TeamDashboardService:
+    """
+    Builds and caches team dashboard snapshots.
+
+    Each section runs on its own session (and therefore its own pooled
+    connection) so independent queries execute concurrently. Activity
+    counters are combined into single queries using aggregate FILTER
+    clauses. Snapshots are cached per team and period under a per-team
+    generation number; membership and project changes bump the generation,
+    and audit activity is bounded by the snapshot TTL.
+    """
+
+    SNAPSHOT_TTL = 60
+    GENERATION_TTL = 7 * 24 * 3600
+
+    def __init__(self, session_factory: SessionFactory = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    async def get_team_access(
+        session: AsyncSession, team_id: int, user_id: int
+    ) -> Tuple[Optional[Team], bool]:
+        """
+        Load a team and the user's membership in a single query.
+
+        Args:
+            session: Database session
+            team_id: Team ID
+            user_id: User ID to check membership for
+
+        Returns:
+            Tuple of (team or None, whether the user is a member)
+        """
+        is_member = exists().where(
+            and_(UserTeam.team_id == team_id, UserTeam.user_id == user_id)
+        )
+        result = await session.execute(
+            select(Team, is_member.label("is_member")).where(Team.id == team_id)
+        )
+        row = result.first()
+        if row is None:
+            return None, False
+        return row[0], bool(row[1])
+
+    def _generation_key(self, team_id: int) -> str:
+        return f"team_dashboard:{team_id}:generation"
+
+    async def _snapshot_key(self, cache_manager, team_id: int, period_days: int) -> str:
+        generation = await cache_manager.get(self._generation_key(team_id)) or 0
+        return f"team_dashboard:{team_id}:v{generation}:{period_days}"
+
+    async def get_snapshot(
+        self, team_id: int, period_days: int, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Get the dashboard snapshot for a team, building it on cache miss.
+
+        Concurrent misses for the same snapshot share a single build, which
+        runs as its own task so a cancelled caller does not cancel it for the
+        others.
+
+        Args:
+            team_id: Team ID
+            period_days: Period for metrics in days
+            use_cache: Whether to read and write the snapshot cache
+
+        Returns:
+            Snapshot dictionary including per-section timings
+        """
+        if not use_cache:
+            return await self.build_snapshot(team_id, period_days)
+
+        cache_manager = await get_cache_manager()
+        cache_key = await self._snapshot_key(cache_manager, team_id, period_days)
+
+        cached = await cache_manager.get(cache_key, DataType.COMPUTED_RESULT)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._build_and_cache(cache_manager, cache_key, team_id, period_days)
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._build_done(cache_key, done))
+        return await asyncio.shield(task)
+
+    async def _build_and_cache(
+        self, cache_manager, cache_key: str, team_id: int, period_days: int
+    ) -> Dict[str, Any]:
+        snapshot = await self.build_snapshot(team_id, period_days)
+        await cache_manager.set(
+            cache_key,
+            snapshot,
+            DataType.COMPUTED_RESULT,
+            ttl=self.SNAPSHOT_TTL,
+        )
+        return snapshot
+
+    def _build_done(self, cache_key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # Retrieve the exception so it is not logged as never retrieved when
+        # every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def invalidate_team(self, team_id: int) -> None:
+        """Invalidate all cached snapshots of a team by bumping its generation."""
+        cache_manager = await get_cache_manager()
+        key = self._generation_key(team_id)
+        generation = await cache_manager.get(key) or 0
+        await cache_manager.set(
+            key,
+            generation + 1,
+            DataType.COMPUTED_RESULT,
+            ttl=self.GENERATION_TTL,
+            cache_levels=[CacheLevel.MEMORY, CacheLevel.REDIS],
+        )
+
+    async def build_snapshot(self, team_id: int, period_days: int) -> Dict[str, Any]:
+        """
+        Build a dashboard snapshot, running independent sections concurrently.
+
+        Args:
+            team_id: Team ID
+            period_days: Period for metrics in days
+
+        Returns:
+            Snapshot dictionary
+        """
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=period_days)
+        previous_start_date = start_date - timedelta(days=period_days)
+        timings: Dict[str, float] = {}
+
+        started = time.perf_counter()
+        members, projects, activity, collaboration = await asyncio.gather(
+            self._timed("members", timings, self._members_section, team_id, start_date),
+            self._timed("projects", timings, self._projects_section, team_id, start_date),
+            self._timed(
+                "activity",
+                timings,
+                self._activity_section,
+                team_id,
+                start_date,
+                end_date,
+                previous_start_date,
+            ),
+            self._timed(
+                "collaboration", timings, self._collaboration_section, team_id, end_date
+            ),
+        )
+        timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+
+        for project in projects:
+            project["assigned_members"] = len(members)
+
+        logger.debug(f"Built dashboard snapshot for team {team_id}: {timings}")
+
+        return {
+            "team_id": team_id,
+            "period_days": period_days,
+            "generated_at": end_date.isoformat(),
+            "members": members,
+            "projects": projects,
+            "activity_metrics": activity,
+            "performance_metrics": self._performance_section(projects),
+            "collaboration_metrics": collaboration,
+            "section_timings": timings,
+            "cached": False,
+        }
+
+    async def _timed(
+        self,
+        name: str,
+        timings: Dict[str, float],
+        section: Callable[..., Awaitable[Any]],
+        *args: Any,
+    ) -> Any:
+        """Run a section on its own session and record its duration in ms."""
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                return await section(session, *args)
+        finally:
+            timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _members_section(
+        self, session: AsyncSession, team_id: int, start_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """Members with activity counts and the team project count in one query."""
+        activity = (
+            select(AuditLog.user_id, func.count(AuditLog.id).label("activity_count"))
+            .where(
+                and_(
+                    AuditLog.team_id == str(team_id),
+                    AuditLog.timestamp >= start_date,
+                )
+            )
+            .group_by(AuditLog.user_id)
+            .subquery()
+        )
+        project_count = (
+            select(func.count(Project.id))
+            .where(Project.team_id == team_id)
+            .scalar_subquery()
+        )
+
+        result = await session.execute(
+            select(
+                UserTeam,
+                User,
+                func.coalesce(activity.c.activity_count, 0),
+                project_count,
+            )
+            .join(User, User.id == UserTeam.user_id)
+            .outerjoin(activity, activity.c.user_id == User.id)
+            .where(UserTeam.team_id == team_id)
+        )
+
+        members = []
+        for membership, user, activity_count, projects_count in result.all():
+            role = membership.role
+            members.append(
+                {
+                    "id": user.id,
+                    "user_id": user.id,
+                    "user_name": user.full_name or user.email,
+                    "user_email": user.email,
+                    "role": getattr(role, "value", role) or "member",
+                    "is_active": membership.is_active,
+                    "last_activity": _iso(user.last_login),
+                    "projects_count": projects_count or 0,
+                    "contributions_this_week": activity_count or 0,
+                }
+            )
+        return members
+
+    async def _projects_section(
+        self, session: AsyncSession, team_id: int, start_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """Projects with recent activity counts in one query."""
+        activity = (
+            select(
+                AuditLog.resource_id,
+                func.count(AuditLog.id).label("activity_count"),
+            )
+            .where(
+                and_(
+                    AuditLog.resource_type == "project",
+                    AuditLog.timestamp >= start_date,
+                )
+            )
+            .group_by(AuditLog.resource_id)
+            .subquery()
+        )
+
+        result = await session.execute(
+            select(Project, func.coalesce(activity.c.activity_count, 0))
+            .outerjoin(activity, activity.c.resource_id == cast(Project.id, String))
+            .where(Project.team_id == team_id)
+        )
+
+        return [
+            {
+                "id": project.id,
+                "name": project.name,
+                "description": project.description,
+                "status": getattr(project, "status", "active"),
+                "priority": getattr(project, "priority", "medium"),
+                # This would be calculated based on actual project metrics
+                "completion_percentage": 75.0,
+                "last_updated": _iso(project.updated_at or project.created_at),
+                "assigned_members": 0,
+                "recent_activity_count": activity_count or 0,
+            }
+            for project, activity_count in result.all()
+        ]
+
+    async def _activity_section(
+        self,
+        session: AsyncSession,
+        team_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        previous_start_date: datetime,
+    ) -> Dict[str, Any]:
+        """Activity counters in one aggregate query plus top types and recent events."""
+        week_ago = end_date - timedelta(days=7)
+        month_ago = end_date - timedelta(days=30)
+        in_team = AuditLog.team_id == str(team_id)
+        in_period = and_(AuditLog.timestamp >= start_date, AuditLog.timestamp <= end_date)
+
+        counts = await session.execute(
+            select(
+                func.count(AuditLog.id).filter(in_period),
+                func.count(AuditLog.id).filter(AuditLog.timestamp >= week_ago),
+                func.count(AuditLog.id).filter(AuditLog.timestamp >= month_ago),
+                func.count(AuditLog.id).filter(
+                    and_(AuditLog.timestamp >= previous_start_date, AuditLog.timestamp < start_date)
+                ),
+            ).where(
+                and_(
+                    in_team,
+                    AuditLog.timestamp >= min(previous_start_date, month_ago, week_ago),
+                    AuditLog.timestamp <= end_date,
+                )
+            )
+        )
+        total, this_week, this_month, previous = counts.one()
+
+        if previous:
+            activity_trend = ((total - previous) / previous) * 100
+        else:
+            activity_trend = 100.0 if total else 0.0
+
+        types_result = await session.execute(
+            select(AuditLog.event_type, func.count(AuditLog.id).label("count"))
+            .where(and_(in_team, in_period))
+            .group_by(AuditLog.event_type)
+            .order_by(desc("count"))
+            .limit(5)
+        )
+
+        recent_result = await session.execute(
+            select(
+                AuditLog.id,
+                AuditLog.event_type,
+                AuditLog.message,
+                AuditLog.user_email,
+                AuditLog.timestamp,
+                AuditLog.success,
+            )
+            .where(in_team)
+            .order_by(desc(AuditLog.timestamp))
+            .limit(10)
+        )
+
+        return {
+            "total_activities": total or 0,
+            "activities_this_week": this_week or 0,
+            "activities_this_month": this_month or 0,
+            "activity_trend": round(activity_trend, 2),
+            "top_activity_types": {row[0]: row[1] for row in types_result.all()},
+            "recent_activities": [
+                {
+                    "id": row.id,
+                    "event_type": row.event_type,
+                    "message": row.message,
+                    "user_email": row.user_email,
+                    "timestamp": _iso(row.timestamp),
+                    "success": row.success,
+                }
+                for row in recent_result.all()
+            ],
+        }
+
+    async def _collaboration_section(
+        self, session: AsyncSession, team_id: int, end_date: datetime
+    ) -> Dict[str, Any]:
+        """Member count and weekly active members in one query."""
+        week_ago = end_date - timedelta(days=7)
+        member_count = (
+            select(func.count())
+            .select_from(UserTeam)
+            .where(UserTeam.team_id == team_id)
+            .scalar_subquery()
+        )
+        active_count = (
+            select(func.count(func.distinct(AuditLog.user_id)))
+            .where(
+                and_(AuditLog.team_id == str(team_id), AuditLog.timestamp >= week_ago)
+            )
+            .scalar_subquery()
+        )
+        result = await session.execute(select(member_count, active_count))
+        total_team_members, active_members_this_week = result.one()
+
+        # Demo data for other metrics
+        return {
+            "total_team_members": total_team_members or 0,
+            "active_members_this_week": active_members_this_week or 0,
+            "cross_team_collaborations": 8,
+            "knowledge_sharing_sessions": 3,
+            "peer_reviews_completed": 15,
+            "mentoring_relationships": 4,
+        }
+
+    @staticmethod
+    def _performance_section(projects: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Performance metrics derived from the already loaded projects."""
+        statuses = [project["status"] for project in projects]
+        # Averages are simplified for demo
+        return {
+            "projects_completed": statuses.count("completed"),
+            "projects_in_progress": statuses.count("in_progress"),
+            "projects_planned": statuses.count("planned"),
+            "average_project_completion_time": 45.5,
+            "team_velocity": 2.3,
+            "success_rate": 87.5,
+            "quality_score": 92.1,
+        }
+
+
+# Global service instance
+team_dashboard_service = TeamDashboardService()
+
+
+async def invalidate_team_dashboard(team_id: Optional[int]) -> None:
+    """Invalidate cached dashboard snapshots of a team, never raising."""
+    if team_id is None:
+        return
+    try:
+        await team_dashboard_service.invalidate_team(team_id)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate dashboard cache for team {team_id}: {e}")
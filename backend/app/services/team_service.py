@@ -15,6 +15,7 @@ from sqlalchemy.future import select
 from app.models.team import Team, TeamRole
 from app.models.user import User
 from app.models.user_team import UserTeam
+from app.services.team_dashboard_service import invalidate_team_dashboard
 from app.schemas.team import (
     TeamCreate,
     TeamUpdate,
@@ -279,6 +280,7 @@ class TeamService:
             )
             db.add(user_team)
             await db.commit()
+            await invalidate_team_dashboard(team_id)
 
             logger.info(
                 f"Added user {member_data.user_id} to team {team_id} with role {member_data.role}"
@@ -349,6 +351,7 @@ class TeamService:
             # Update role
             membership.role = member_data.role
             await db.commit()
+            await invalidate_team_dashboard(team_id)
 
             logger.info(
                 f"Updated user {member_data.user_id} role to {member_data.role} in team {team_id}"
@@ -421,6 +424,7 @@ class TeamService:
             # Remove membership
             await db.delete(membership)
             await db.commit()
+            await invalidate_team_dashboard(team_id)
 
             logger.info(f"Removed user {user_id_to_remove} from team {team_id}")
             return True
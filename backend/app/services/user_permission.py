@@ -7,6 +7,8 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.services.effective_permission_index import effective_permission_index
+
 
 class UserPermissionService:
     """Service for managing user permissions."""
@@ -72,6 +74,7 @@ async def assign_user_permission(
             user_permission.is_active = True
             user_permission.updated_at = datetime.utcnow()
             await db.commit()
+            await effective_permission_index.refresh_users(db, [user_id])
         return user_permission
     user_permission = UserPermission(
         user_id=user_id,
@@ -81,6 +84,7 @@ async def assign_user_permission(
     )
     db.add(user_permission)
     await db.commit()
+    await effective_permission_index.refresh_users(db, [user_id])
     await db.refresh(user_permission)
     return user_permission
 
@@ -115,6 +119,7 @@ async def revoke_user_permission(
         user_permission.is_active = False
         user_permission.updated_at = datetime.utcnow()
         await db.commit()
+        await effective_permission_index.refresh_users(db, [user_id])
         return True
     return False
 
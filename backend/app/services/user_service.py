@@ -11,6 +11,7 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.auth_context import auth_context_cache
 from app.models.user import User
 from app.schemas.user import UserCreate
 
@@ -219,6 +220,7 @@ class UserService:
         try:
             user.is_active = False
             await db.commit()
+            auth_context_cache.invalidate_user(user.id)
             logger.info(f"Deactivated user: {user.id}")
             return True
         except Exception as e:
@@ -9,7 +9,8 @@ import re
 import html
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse, parse_qs
 from pydantic import BaseModel, ValidationError
 import bleach
@@ -17,6 +18,62 @@ from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# Values made only of these characters cannot match any threat pattern: every
+# pattern needs whitespace or punctuation outside this set
+_SAFE_VALUE = re.compile(r'[\w.@-]*')
+
+# Longer values are scanned every time rather than kept in the verdict cache
+_MAX_CACHED_VALUE_LENGTH = 1024
+
+
+def _required_literal(pattern: str) -> str:
+    """
+    Longest lowercase literal that every match of pattern contains.
+    
+    Understands the subset of regex syntax the threat patterns use: escapes,
+    character classes and quantifiers end a literal run, and a literal
+    followed by an optional quantifier is dropped. Returns '' (matches
+    everything) for patterns with groups or alternation.
+    """
+    runs, run = [], ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isalnum():
+                # \b, \s, \w, ... are not literals
+                runs.append(run)
+                run = ''
+            else:
+                run += escaped
+            continue
+        if char in '*?{':
+            run = run[:-1]
+            runs.append(run)
+            run = ''
+            if char == '{':
+                i = pattern.index('}', i)
+        elif char == '+':
+            runs.append(run)
+            run = ''
+        elif char == '[':
+            runs.append(run)
+            run = ''
+            i = pattern.index(']', i + 2)
+        elif char in '.^$':
+            runs.append(run)
+            run = ''
+        elif char in '()|':
+            # Groups may be optional or alternate: no literal is proven
+            return ''
+        else:
+            run += char
+        i += 1
+    runs.append(run)
+    return max(runs, key=len).lower()
+
 
 class ValidationResult:
     """Result of validation with details about what was found."""
@@ -110,6 +167,15 @@ class InputValidator:
         r'%28%2a%29',
     ]
     
+    # Threat categories in reporting order: (error label, patterns)
+    THREAT_CATEGORIES = [
+        ("XSS", XSS_PATTERNS),
+        ("SQL injection", SQL_INJECTION_PATTERNS),
+        ("Command injection", COMMAND_INJECTION_PATTERNS),
+        ("Path traversal", PATH_TRAVERSAL_PATTERNS),
+        ("LDAP injection", LDAP_INJECTION_PATTERNS),
+    ]
+    
     def __init__(self, config: Optional[Dict] = None):
         """Initialize validator with configuration."""
         self.config = config or {}
@@ -120,6 +186,11 @@ class InputValidator:
         
         # Compile regex patterns for performance
         self._compile_patterns()
+        
+        # Verdicts for repeated values (enum-like query params, IDs, names)
+        self._cached_threats = lru_cache(
+            maxsize=self.config.get("verdict_cache_size", 4096)
+        )(self._find_threats)
     
     def _compile_patterns(self):
         """Compile regex patterns for better performance."""
@@ -128,12 +199,58 @@ class InputValidator:
         self.cmd_regex = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in self.COMMAND_INJECTION_PATTERNS]
         self.path_regex = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in self.PATH_TRAVERSAL_PATTERNS]
         self.ldap_regex = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in self.LDAP_INJECTION_PATTERNS]
+        
+        # Every pattern paired with a literal any match must contain, so a
+        # scan only runs the regexes whose literal occurs in the input
+        self._threat_scanners = [
+            (label, [(_required_literal(regex.pattern), regex) for regex in compiled])
+            for (label, _), compiled in zip(
+                self.THREAT_CATEGORIES,
+                [self.xss_regex, self.sql_regex, self.cmd_regex, self.path_regex, self.ldap_regex],
+            )
+        ]
+    
+    def _find_threats(self, value: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """Matched patterns per threat category, in reporting order."""
+        # Lowercasing mirrors re.IGNORECASE only for ASCII; other input is
+        # checked against every pattern
+        lowered = value.lower() if value.isascii() else None
+        
+        threats = []
+        for label, scanners in self._threat_scanners:
+            found = tuple(
+                regex.pattern for literal, regex in scanners
+                if (lowered is None or literal in lowered) and regex.search(value)
+            )
+            if found:
+                threats.append((label, found))
+        return tuple(threats)
+    
+    def detect_threats(self, value: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """
+        Matched patterns per threat category, in reporting order.
+        
+        Values made only of word characters, dots, hyphens and @ cannot match
+        any pattern and skip the scan; verdicts for short values are memoized.
+        """
+        if _SAFE_VALUE.fullmatch(value):
+            return ()
+        if len(value) > _MAX_CACHED_VALUE_LENGTH:
+            return self._find_threats(value)
+        return self._cached_threats(value)
     
     def validate_string(self, value: str, field_name: str = "input") -> ValidationResult:
         """Validate and sanitize a string input."""
+        return self._validate_string(value, field_name)
+    
+    def _validate_string(self, value: str, field_name: str, sanitize: bool = True) -> ValidationResult:
         if not isinstance(value, str):
             return ValidationResult(False, None, [f"{field_name}: Input must be a string"])
         
+        # Plain identifiers, numbers and slugs need neither scanning nor escaping
+        if len(value) <= self.max_string_length and _SAFE_VALUE.fullmatch(value):
+            return ValidationResult(True, value, [])
+        
         errors = []
         
         # Check length
@@ -146,63 +263,14 @@ class InputValidator:
             errors.append(f"{field_name}: Null bytes not allowed")
             value = value.replace('\x00', '')
         
-        # Check for XSS patterns
-        xss_found = []
-        for pattern in self.xss_regex:
-            if pattern.search(value):
-                xss_found.append(pattern.pattern)
-        
-        if xss_found:
-            errors.append(f"{field_name}: XSS patterns detected: {', '.join(xss_found[:3])}")
-            if self.strict_mode:
-                return ValidationResult(False, None, errors)
-        
-        # Check for SQL injection patterns
-        sql_found = []
-        for pattern in self.sql_regex:
-            if pattern.search(value):
-                sql_found.append(pattern.pattern)
-        
-        if sql_found:
-            errors.append(f"{field_name}: SQL injection patterns detected: {', '.join(sql_found[:3])}")
-            if self.strict_mode:
-                return ValidationResult(False, None, errors)
-        
-        # Check for command injection patterns
-        cmd_found = []
-        for pattern in self.cmd_regex:
-            if pattern.search(value):
-                cmd_found.append(pattern.pattern)
-        
-        if cmd_found:
-            errors.append(f"{field_name}: Command injection patterns detected: {', '.join(cmd_found[:3])}")
-            if self.strict_mode:
-                return ValidationResult(False, None, errors)
-        
-        # Check for path traversal patterns
-        path_found = []
-        for pattern in self.path_regex:
-            if pattern.search(value):
-                path_found.append(pattern.pattern)
-        
-        if path_found:
-            errors.append(f"{field_name}: Path traversal patterns detected: {', '.join(path_found[:3])}")
-            if self.strict_mode:
-                return ValidationResult(False, None, errors)
-        
-        # Check for LDAP injection patterns
-        ldap_found = []
-        for pattern in self.ldap_regex:
-            if pattern.search(value):
-                ldap_found.append(pattern.pattern)
-        
-        if ldap_found:
-            errors.append(f"{field_name}: LDAP injection patterns detected: {', '.join(ldap_found[:3])}")
+        # Check for XSS, SQL, command, path traversal and LDAP patterns
+        for label, found in self.detect_threats(value):
+            errors.append(f"{field_name}: {label} patterns detected: {', '.join(found[:3])}")
             if self.strict_mode:
                 return ValidationResult(False, None, errors)
         
         # Sanitize the string
-        sanitized = self._sanitize_string(value)
+        sanitized = self._sanitize_string(value) if sanitize else value
         
         return ValidationResult(
             is_valid=len(errors) == 0 or not self.strict_mode,
@@ -302,8 +370,17 @@ class InputValidator:
         
         return ValidationResult(True, url, errors)
     
-    def validate_json(self, json_str: str, field_name: str = "json") -> ValidationResult:
-        """Validate JSON string."""
+    def validate_json(self, json_str: str, field_name: str = "json",
+                      parse: Optional[Callable[[], Any]] = None) -> ValidationResult:
+        """
+        Validate JSON string.
+        
+        Args:
+            json_str: JSON text
+            field_name: Name used in error messages
+            parse: Returns the decoded document, for callers that already
+                cache it; defaults to json.loads(json_str)
+        """
         if not isinstance(json_str, str):
             return ValidationResult(False, None, [f"{field_name}: Must be a string"])
         
@@ -312,14 +389,15 @@ class InputValidator:
         if size_mb > self.max_json_size:
             return ValidationResult(False, None, [f"{field_name}: JSON too large ({size_mb:.1f}MB > {self.max_json_size}MB)"])
         
-        # Basic string validation
-        string_result = self.validate_string(json_str, field_name)
+        # Basic string validation; the sanitized text is discarded in favour
+        # of the parsed document, so skip escaping it
+        string_result = self._validate_string(json_str, field_name, sanitize=False)
         if not string_result.is_valid and self.strict_mode:
             return string_result
         
         # JSON parsing validation
         try:
-            parsed = json.loads(json_str)
+            parsed = parse() if parse is not None else json.loads(json_str)
         except json.JSONDecodeError as e:
             return ValidationResult(False, None, [f"{field_name}: Invalid JSON: {str(e)}"])
         
@@ -0,0 +1,272 @@
+"""
+Batched multi-cluster PromQL execution.
+
+Per-cluster query templates (PromQL with a "{cluster}" placeholder, as in
+app.utils.prometheus_queries) are rewritten into a single query selecting
+every cluster with a regex matcher, with the cluster label added to each
+aggregation's grouping. Results are split back out per cluster by that
+label, so refreshing N clusters costs one request per template instead of N.
+Templates that cannot be rewritten safely, including any selector without
+the cluster matcher, fall back to per-cluster queries.
+All requests run concurrently under a semaphore.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+from app.utils.prometheus_queries import QueryTemplate
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_LABEL = "cluster"
+
+# Substituted for {cluster} so the rendered matcher can be found and rewritten
+_PLACEHOLDER = "__opssight_cluster__"
+_STRING = re.compile(r'("(?:[^"\\]|\\.)*")')
+_AGGREGATION = re.compile(
+    r"\b(sum|avg|min|max|count|group|stddev|stdvar|topk|bottomk|quantile|count_values)"
+    r"\s*(?:\b(by|without)\s*\(([^)]*)\)\s*)?\("
+)
+# Constructs whose result loses or mismatches the cluster label once several clusters are selected
+_UNSUPPORTED = re.compile(
+    r"\b(scalar|vector|absent|absent_over_time|on|ignoring|group_left|group_right)\s*\("
+    r"|\)\s*(by|without)\s*\("
+)
+# Pieces of a query that are not vector selectors, removed before looking for bare metric names
+_SCOPED = "__opssight_scoped__"
+_SELECTOR = re.compile(r"(?:[a-zA-Z_:][\w:]*\s*)?\{[^{}]*\}")
+_NON_SELECTOR = re.compile(
+    r"\b(?:by|without|on|ignoring|group_left|group_right)\s*\([^)]*\)"
+    r"|\[[^\]]*\]"
+    r"|\boffset\s+-?\w+"
+)
+_IDENTIFIER = re.compile(r"(?<![\w.])[a-zA-Z_:][\w:]*\b(?!\s*\()")
+_KEYWORDS = {"and", "or", "unless", "bool", "start", "end", "inf", "nan", _SCOPED}
+
+QueryFetcher = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def cluster_regex(clusters: Sequence[str]) -> str:
+    """PromQL string literal of a regex matching exactly the given cluster names."""
+    pattern = "|".join(re.escape(name) for name in clusters)
+    return '"' + pattern.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _group_by_label(segment: str, label: str) -> Optional[str]:
+    def rewrite(match: "re.Match") -> str:
+        operator, modifier, labels = match.groups()
+        if modifier is None:
+            return f"{operator} by ({label}) ("
+        names = [name.strip() for name in labels.split(",") if name.strip()]
+        if modifier == "without":
+            if label in names:
+                raise ValueError(f"aggregation drops the {label} label")
+            return match.group(0)
+        if label not in names:
+            names.append(label)
+        return f"{operator} by ({', '.join(names)}) ("
+
+    try:
+        return _AGGREGATION.sub(rewrite, segment)
+    except ValueError:
+        return None
+
+
+def _every_selector_scoped(rendered: str, matcher: "re.Pattern") -> bool:
+    """Whether every vector selector of a query carries the cluster matcher.
+
+    A selector without it (e.g. the denominator of
+    'sum(a{cluster="x"}) / sum(b)') would read every cluster in a batched
+    query, while its per-cluster query reads the same global series.
+    """
+    text = _STRING.sub('""', matcher.sub(_SCOPED, rendered))
+    for selector in _SELECTOR.findall(text):
+        if _SCOPED not in selector:
+            return False
+    text = _NON_SELECTOR.sub(" ", _SELECTOR.sub(f" {_SCOPED} ", text))
+    return all(name.lower() in _KEYWORDS for name in _IDENTIFIER.findall(text))
+
+
+def batch_cluster_query(
+    template: Union[str, QueryTemplate],
+    clusters: Sequence[str],
+    label: str = CLUSTER_LABEL,
+    **variables: Any,
+) -> Optional[str]:
+    """
+    Rewrite a per-cluster query template into one query covering several clusters.
+
+    Args:
+        template: Query template with a {cluster} placeholder used only as
+            the value of label matchers, e.g. 'sum(up{{cluster="{cluster}"}})'
+        clusters: Cluster names to select
+        label: Label holding the cluster name
+        **variables: Other template variables, e.g. interval
+
+    Returns:
+        Optional[str]: Batched query, or None if the template cannot be batched
+    """
+    text = template.query if isinstance(template, QueryTemplate) else template
+    try:
+        rendered = text.format(cluster=_PLACEHOLDER, **variables)
+    except (KeyError, IndexError):
+        return None
+
+    matcher = re.compile(rf'\b{re.escape(label)}\s*=\s*"{_PLACEHOLDER}"')
+    if not matcher.search(rendered) or not _every_selector_scoped(rendered, matcher):
+        return None
+    selector = f"{label}=~{cluster_regex(clusters)}"
+    rendered = matcher.sub(lambda match: selector, rendered)
+    if _PLACEHOLDER in rendered:
+        return None
+
+    # Rewrite outside string literals only
+    segments = _STRING.split(rendered)
+    for index in range(0, len(segments), 2):
+        if _UNSUPPORTED.search(segments[index]):
+            return None
+        segment = _group_by_label(segments[index], label)
+        if segment is None:
+            return None
+        segments[index] = segment
+    return "".join(segments)
+
+
+def split_by_cluster(
+    data: Optional[Dict[str, Any]], clusters: Sequence[str], label: str = CLUSTER_LABEL
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Demultiplex a batched query result into per-cluster results.
+
+    Clusters without series get an empty result; if the query failed
+    (data is None) every cluster gets None.
+    """
+    if data is None:
+        return {cluster: None for cluster in clusters}
+
+    result_type = data.get("resultType", "vector")
+    split: Dict[str, Dict[str, Any]] = {
+        cluster: {"resultType": result_type, "result": []} for cluster in clusters
+    }
+    for series in data.get("result") or []:
+        cluster = series.get("metric", {}).get(label)
+        if cluster in split:
+            split[cluster]["result"].append(series)
+    return split
+
+
+@dataclass
+class PlannedQuery:
+    """One request of a query plan and the clusters its result covers."""
+
+    name: Hashable
+    query: str
+    clusters: List[str]
+    batched: bool = True
+
+
+@dataclass
+class ClusterQueryPlanner:
+    """
+    Plans and runs query templates across many clusters.
+
+    Attributes:
+        max_concurrency: Maximum number of requests in flight
+        max_clusters_per_query: Clusters selected by one batched query, bounding its length
+        label: Label holding the cluster name
+    """
+
+    max_concurrency: int = 8
+    max_clusters_per_query: int = 50
+    label: str = CLUSTER_LABEL
+    stats: Dict[str, int] = field(default_factory=lambda: {"batched": 0, "per_cluster": 0})
+
+    def plan(
+        self,
+        templates: Dict[Hashable, Union[str, QueryTemplate]],
+        clusters: Sequence[str],
+        **variables: Any,
+    ) -> List[PlannedQuery]:
+        """
+        Build the requests needed to evaluate every template for every cluster.
+
+        Args:
+            templates: Query templates by name
+            clusters: Cluster names
+            **variables: Other template variables, e.g. interval
+
+        Returns:
+            List[PlannedQuery]: Batched queries, plus per-cluster queries for
+            templates that cannot be batched
+        """
+        clusters = list(dict.fromkeys(clusters))
+        chunk_size = max(1, self.max_clusters_per_query)
+        chunks = [clusters[i:i + chunk_size] for i in range(0, len(clusters), chunk_size)]
+
+        planned = []
+        for name, template in templates.items():
+            batched = [
+                (chunk, batch_cluster_query(template, chunk, self.label, **variables))
+                for chunk in chunks
+            ]
+            if all(query is not None for _, query in batched):
+                planned.extend(PlannedQuery(name, query, chunk) for chunk, query in batched)
+                continue
+
+            logger.debug(f"Query template {name} cannot be batched; querying per cluster")
+            text = template.query if isinstance(template, QueryTemplate) else template
+            planned.extend(
+                PlannedQuery(name, text.format(cluster=cluster, **variables), [cluster], False)
+                for cluster in clusters
+            )
+        return planned
+
+    async def execute(
+        self,
+        fetch: QueryFetcher,
+        templates: Dict[Hashable, Union[str, QueryTemplate]],
+        clusters: Sequence[str],
+        **variables: Any,
+    ) -> Dict[str, Dict[Hashable, Optional[Dict[str, Any]]]]:
+        """
+        Evaluate every template for every cluster.
+
+        Args:
+            fetch: Coroutine running an instant query and returning its data
+                ({"resultType", "result"}) or None on failure
+            templates: Query templates by name
+            clusters: Cluster names
+            **variables: Other template variables, e.g. interval
+
+        Returns:
+            Dict[str, Dict[Hashable, Optional[Dict[str, Any]]]]: Query data
+            by cluster name, then template name
+        """
+        planned = self.plan(templates, clusters, **variables)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def run(query: PlannedQuery) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await fetch(query.query)
+                except Exception as e:
+                    logger.error(f"Error executing query {query.name}: {e}")
+                    return None
+
+        responses = await asyncio.gather(*(run(query) for query in planned))
+
+        results: Dict[str, Dict[Hashable, Optional[Dict[str, Any]]]] = {
+            cluster: {} for cluster in clusters
+        }
+        for query, data in zip(planned, responses):
+            if query.batched:
+                self.stats["batched"] += 1
+                for cluster, cluster_data in split_by_cluster(data, query.clusters, self.label).items():
+                    results[cluster][query.name] = cluster_data
+            else:
+                self.stats["per_cluster"] += 1
+                results[query.clusters[0]][query.name] = data
+        return results
@@ -4,7 +4,11 @@ Provides robust integration with Prometheus for Kubernetes cluster monitoring.
 """
 
 import asyncio
+import heapq
 import logging
+import math
+import re
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple
 import json
@@ -54,6 +58,10 @@ class PrometheusConfig(BaseModel):
     )
     pool_connections: int = Field(default=10, description="HTTP connection pool size")
     pool_maxsize: int = Field(default=10, description="Maximum pool size")
+    cache_size: int = Field(default=2048, description="Maximum number of cached query results")
+    cache_ttl: float = Field(
+        default=30.0, description="Seconds a query result is reused; 0 disables caching"
+    )
 
 
 class PrometheusMetric(BaseModel):
@@ -197,6 +205,188 @@ class PromQLQueryBuilder:
         return " ".join(self.query_parts) if self.query_parts else ""
 
 
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+_DURATION_SECONDS = {
+    "ms": 0.001,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+    "y": 31536000,
+}
+_TEMPLATE_LITERAL = re.compile(r'"(?:[^"\\]|\\.)*"|\b\d+(?:\.\d+)?\b')
+
+
+def parse_step(step: Union[str, int, float, timedelta]) -> float:
+    """
+    Convert a Prometheus step or duration to seconds.
+
+    Args:
+        step: Duration such as "30s", "5m" or "1h30m", or a number of seconds
+
+    Returns:
+        float: Step in seconds
+    """
+    if isinstance(step, timedelta):
+        return step.total_seconds()
+    if isinstance(step, (int, float)):
+        return float(step)
+    try:
+        return float(step)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(step)
+    if not parts or "".join(value + unit for value, unit in parts) != step:
+        raise ValueError(f"Invalid Prometheus duration: {step}")
+    return sum(float(value) * _DURATION_SECONDS[unit] for value, unit in parts)
+
+
+def align_range(start: float, end: float, step: float) -> Tuple[float, float]:
+    """
+    Snap a range query window to multiples of its step.
+
+    Prometheus evaluates range queries at start + k * step, so aligned windows
+    return the same samples and can share cache entries across callers whose
+    requested windows differ by less than a step.
+    """
+    if step <= 0:
+        return start, end
+    return math.floor(start / step) * step, math.floor(end / step) * step
+
+
+def query_template(query: str) -> str:
+    """PromQL query with label values and numbers replaced, for grouping metrics."""
+    return _TEMPLATE_LITERAL.sub("?", query)
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results with heap-ordered expiry.
+
+    Expired entries are dropped from the top of an expiry heap, so inserts
+    cost O(log n) rather than a scan of the whole cache, and the least
+    recently used entry is evicted once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Default seconds a result is reused; 0 disables caching
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._expiry: List[Tuple[float, int, Any]] = []
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Cached result for a key, if present and unexpired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache a result for ttl seconds (the cache default if omitted)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        self._purge_expired(now)
+
+        expires_at = now + ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        self._sequence += 1
+        heapq.heappush(self._expiry, (expires_at, self._sequence, key))
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if len(self._expiry) > 2 * self.max_entries:
+            self._rebuild_expiry()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiry.clear()
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            # Skip heap records superseded by a later put of the same key
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+
+    def _rebuild_expiry(self) -> None:
+        # Drop heap records of evicted or replaced entries
+        self._expiry = [
+            (expires_at, index, key)
+            for index, (key, (_, expires_at)) in enumerate(self._entries.items())
+        ]
+        heapq.heapify(self._expiry)
+        self._sequence = len(self._expiry)
+
+
+class QueryStats:
+    """Cache hit/miss counts and Prometheus latency per query template."""
+
+    def __init__(self):
+        self._templates: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, query: str) -> Dict[str, float]:
+        template = query_template(query)
+        entry = self._templates.get(template)
+        if entry is None:
+            entry = self._templates[template] = {
+                "hits": 0,
+                "misses": 0,
+                "errors": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+            }
+        return entry
+
+    def record_hit(self, query: str) -> None:
+        self._entry(query)["hits"] += 1
+
+    def record_miss(self, query: str, latency: float, error: bool = False) -> None:
+        entry = self._entry(query)
+        entry["misses"] += 1
+        entry["total_latency"] += latency
+        entry["max_latency"] = max(entry["max_latency"], latency)
+        if error:
+            entry["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        stats = {}
+        for template, entry in self._templates.items():
+            lookups = entry["hits"] + entry["misses"]
+            stats[template] = {
+                "hits": entry["hits"],
+                "misses": entry["misses"],
+                "errors": entry["errors"],
+                "hit_rate": entry["hits"] / lookups if lookups else 0.0,
+                "avg_latency": entry["total_latency"] / entry["misses"] if entry["misses"] else 0.0,
+                "max_latency": entry["max_latency"],
+            }
+        return stats
+
+    def clear(self) -> None:
+        self._templates.clear()
+
+
 class EnhancedPrometheusClient:
     """
     Enhanced Prometheus API client with authentication, connection pooling, and advanced features.
@@ -207,7 +397,8 @@ class EnhancedPrometheusClient:
     - Automatic retries with exponential backoff
     - Query builders for complex PromQL
     - Connection health monitoring
-    - Response caching
+    - Bounded LRU response cache with step-aligned range query keys
+    - Hit/miss and latency statistics per query template
     """
 
     def __init__(self, config: PrometheusConfig):
@@ -225,8 +416,8 @@ class EnhancedPrometheusClient:
         self.health_check_interval = 60  # seconds
 
         # Response cache for frequently accessed data
-        self._cache: Dict[str, Tuple[Any, float]] = {}
-        self.cache_ttl = 30  # seconds
+        self.cache = QueryCache(max_entries=config.cache_size, ttl=config.cache_ttl)
+        self.stats = QueryStats()
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -237,8 +428,22 @@ class EnhancedPrometheusClient:
         """Async context manager exit."""
         await self.close()
 
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled keep-alive HTTP client, created on first use."""
+        if self.client is None:
+            self._build_client()
+        return self.client
+
     async def _initialize_client(self):
-        """Initialize the HTTP client with proper configuration."""
+        """Initialize the HTTP client and check the server's health."""
+        self._build_client()
+
+        # Perform initial health check
+        await self.health_check()
+
+    def _build_client(self):
+        """Create the HTTP client with proper configuration."""
         # Configure SSL context
         ssl_context = ssl.create_default_context()
         if not self.config.verify_ssl:
@@ -283,15 +488,12 @@ class EnhancedPrometheusClient:
             limits=limits,
         )
 
-        # Perform initial health check
-        await self.health_check()
-
     async def close(self):
         """Close the HTTP client and cleanup resources."""
         if self.client:
             await self.client.aclose()
             self.client = None
-        self._cache.clear()
+        self.cache.clear()
 
     async def health_check(self, force: bool = False) -> bool:
         """
@@ -311,10 +513,7 @@ class EnhancedPrometheusClient:
             return self._connection_healthy
 
         try:
-            if not self.client:
-                await self._initialize_client()
-
-            response = await self.client.get("/-/healthy")
+            response = await self.http_client.get("/-/healthy")
             self._connection_healthy = response.status_code == 200
             self._last_health_check = current_time
 
@@ -332,37 +531,64 @@ class EnhancedPrometheusClient:
 
         return self._connection_healthy
 
-    def _get_cache_key(self, query: str, params: Optional[Dict] = None) -> str:
-        """Generate cache key for query."""
-        key = f"query:{query}"
-        if params:
-            param_str = json.dumps(params, sort_keys=True)
-            key += f":params:{param_str}"
-        return key
-
-    def _get_cached_result(self, cache_key: str) -> Optional[Any]:
-        """Get result from cache if still valid."""
-        if cache_key in self._cache:
-            result, timestamp = self._cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return result
-            else:
-                del self._cache[cache_key]
-        return None
+    @staticmethod
+    def _cache_key(path: str, params: Dict[str, Any]) -> str:
+        """Generate cache key for an API request."""
+        return f"{path}:{json.dumps(params, sort_keys=True, default=str)}"
 
-    def _cache_result(self, cache_key: str, result: Any):
-        """Cache query result."""
-        self._cache[cache_key] = (result, time.time())
+    async def get_data(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        use_cache: bool = True,
+        check_health: bool = False,
+    ) -> Optional[Any]:
+        """
+        GET a Prometheus API endpoint and return the data of a successful response.
 
-        # Clean old cache entries
-        current_time = time.time()
-        expired_keys = [
-            key
-            for key, (_, timestamp) in self._cache.items()
-            if current_time - timestamp >= self.cache_ttl
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+        Results are cached by path and parameters. HTTP and connection errors
+        are raised to the caller.
+
+        Args:
+            path (str): API path, e.g. "/api/v1/query"
+            params (Dict[str, Any]): Query parameters
+            use_cache (bool): Whether to use cached results
+            check_health (bool): Return None without querying if the server is unhealthy
+
+        Returns:
+            Optional[Any]: Response data, or None if Prometheus reported an error
+        """
+        query = params.get("query", path)
+        cache_key = self._cache_key(path, params)
+        if use_cache:
+            cached_result = self.cache.get(cache_key)
+            if cached_result is not None:
+                self.stats.record_hit(query)
+                return cached_result
+
+        if check_health and not await self.health_check():
+            logger.error("Prometheus client not available or unhealthy")
+            return None
+
+        start_time = time.perf_counter()
+        failed = True
+        try:
+            response = await self.http_client.get(path, params=params)
+            response.raise_for_status()
+            body = response.json()
+            if body.get("status") != "success":
+                logger.error(
+                    f"Prometheus query failed: {body.get('error', 'Unknown error')}"
+                )
+                return None
+            failed = False
+        finally:
+            self.stats.record_miss(query, time.perf_counter() - start_time, failed)
+
+        data = body.get("data", {})
+        if use_cache:
+            self.cache.put(cache_key, data)
+        return data
 
     @retry(
         stop=stop_after_attempt(3),
@@ -383,45 +609,22 @@ class EnhancedPrometheusClient:
         Returns:
             Optional[PrometheusQueryResult]: Query results or None if failed
         """
-        # Check cache first
-        cache_key = self._get_cache_key(query, params)
-        if use_cache:
-            cached_result = self._get_cached_result(cache_key)
-            if cached_result:
-                return cached_result
-
-        # Ensure client is initialized and healthy
-        if not self.client or not await self.health_check():
-            logger.error("Prometheus client not available or unhealthy")
-            return None
+        query_params = {"query": query}
+        if params:
+            query_params.update(params)
 
         try:
-            query_params = {"query": query}
-            if params:
-                query_params.update(params)
-
-            response = await self.client.get("/api/v1/query", params=query_params)
-            response.raise_for_status()
-
-            data = response.json()
-            if data.get("status") == "success":
-                result = PrometheusQueryResult(
-                    resultType=data["data"]["resultType"],
-                    result=[
-                        PrometheusMetric(**metric) for metric in data["data"]["result"]
-                    ],
-                )
-
-                # Cache the result
-                if use_cache:
-                    self._cache_result(cache_key, result)
-
-                return result
-            else:
-                error_msg = data.get("error", "Unknown error")
-                logger.error(f"Prometheus query failed: {error_msg}")
+            data = await self.get_data(
+                "/api/v1/query", query_params, use_cache=use_cache, check_health=True
+            )
+            if data is None:
                 return None
 
+            return PrometheusQueryResult(
+                resultType=data["resultType"],
+                result=[PrometheusMetric(**metric) for metric in data["result"]],
+            )
+
         except httpx.HTTPStatusError as e:
             logger.error(
                 f"HTTP error querying Prometheus: {e.response.status_code} - {e.response.text}"
@@ -460,30 +663,23 @@ class EnhancedPrometheusClient:
         Returns:
             Optional[Dict]: Query results or None if failed
         """
-        if not self.client or not await self.health_check():
-            logger.error("Prometheus client not available or unhealthy")
-            return None
-
         try:
+            # Align the window to the step so callers share cache entries
+            range_start, range_end = align_range(
+                start.timestamp(), end.timestamp(), parse_step(step)
+            )
             query_params = {
                 "query": query,
-                "start": start.timestamp(),
-                "end": end.timestamp(),
+                "start": range_start,
+                "end": range_end,
                 "step": step,
             }
             if params:
                 query_params.update(params)
 
-            response = await self.client.get("/api/v1/query_range", params=query_params)
-            response.raise_for_status()
-
-            data = response.json()
-            if data.get("status") == "success":
-                return data.get("data", {})
-            else:
-                error_msg = data.get("error", "Unknown error")
-                logger.error(f"Prometheus range query failed: {error_msg}")
-                return None
+            return await self.get_data(
+                "/api/v1/query_range", query_params, check_health=True
+            )
 
         except httpx.HTTPStatusError as e:
             logger.error(
@@ -507,7 +703,7 @@ class EnhancedPrometheusClient:
         Returns:
             Optional[Dict]: Metadata information
         """
-        if not self.client or not await self.health_check():
+        if not await self.health_check():
             return None
 
         try:
@@ -515,7 +711,7 @@ class EnhancedPrometheusClient:
             if metric:
                 params["metric"] = metric
 
-            response = await self.client.get("/api/v1/metadata", params=params)
+            response = await self.http_client.get("/api/v1/metadata", params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -537,11 +733,11 @@ class EnhancedPrometheusClient:
         Returns:
             List[str]: List of label values
         """
-        if not self.client or not await self.health_check():
+        if not await self.health_check():
             return []
 
         try:
-            response = await self.client.get(f"/api/v1/label/{label}/values")
+            response = await self.http_client.get(f"/api/v1/label/{label}/values")
             response.raise_for_status()
 
             data = response.json()
@@ -553,6 +749,21 @@ class EnhancedPrometheusClient:
             logger.error(f"Error getting label values: {e}")
             return []
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Query cache size and per-template statistics.
+
+        Returns:
+            Dict[str, Any]: Cached entry count and hits, misses, errors and
+            latency (seconds) grouped by query template
+        """
+        return {
+            "entries": len(self.cache),
+            "max_entries": self.cache.max_entries,
+            "ttl": self.cache.ttl,
+            "templates": self.stats.get_stats(),
+        }
+
     def query_builder(self) -> PromQLQueryBuilder:
         """
         Create a new PromQL query builder.
@@ -581,12 +792,8 @@ class EnhancedPrometheusClient:
         start_time = time.time()
 
         try:
-            # Test basic connectivity
-            if not self.client:
-                await self._initialize_client()
-
             # Get Prometheus status
-            response = await self.client.get("/api/v1/status/config")
+            response = await self.http_client.get("/api/v1/status/config")
             result["response_time"] = time.time() - start_time
 
             if response.status_code == 200:
@@ -596,12 +803,12 @@ class EnhancedPrometheusClient:
                     result["config"] = data.get("data", {})
 
             # Test health endpoint
-            health_response = await self.client.get("/-/healthy")
+            health_response = await self.http_client.get("/-/healthy")
             result["healthy"] = health_response.status_code == 200
 
             # Get version info if possible
             try:
-                build_response = await self.client.get("/api/v1/status/buildinfo")
+                build_response = await self.http_client.get("/api/v1/status/buildinfo")
                 if build_response.status_code == 200:
                     build_data = build_response.json()
                     if build_data.get("status") == "success":
@@ -616,22 +823,28 @@ class EnhancedPrometheusClient:
         return result
 
 
-# Global client instance
-_prometheus_client: Optional[EnhancedPrometheusClient] = None
+# Shared client instances, one per Prometheus server
+_prometheus_clients: Dict[str, EnhancedPrometheusClient] = {}
 
 
-async def get_prometheus_client() -> EnhancedPrometheusClient:
+def get_shared_prometheus_client(url: Optional[str] = None) -> EnhancedPrometheusClient:
     """
-    Get or create the global Prometheus client instance.
+    Get or create the shared client for a Prometheus server.
+
+    Every caller querying the same server shares one connection pool and
+    query cache. The HTTP client is created on first request.
+
+    Args:
+        url (Optional[str]): Prometheus server URL; defaults to PROMETHEUS_URL
 
     Returns:
-        EnhancedPrometheusClient: Configured Prometheus client
+        EnhancedPrometheusClient: Shared client for the server
     """
-    global _prometheus_client
-
-    if _prometheus_client is None:
+    url = (url or getattr(settings, "PROMETHEUS_URL", "http://prometheus:9090")).rstrip("/")
+    client = _prometheus_clients.get(url)
+    if client is None:
         config = PrometheusConfig(
-            url=getattr(settings, "PROMETHEUS_URL", "http://prometheus:9090"),
+            url=url,
             timeout=getattr(settings, "PROMETHEUS_TIMEOUT", 30.0),
             auth_type=getattr(settings, "PROMETHEUS_AUTH_TYPE", None),
             username=getattr(settings, "PROMETHEUS_USERNAME", None),
@@ -639,19 +852,35 @@ async def get_prometheus_client() -> EnhancedPrometheusClient:
             token=getattr(settings, "PROMETHEUS_TOKEN", None),
             verify_ssl=getattr(settings, "PROMETHEUS_VERIFY_SSL", True),
             max_retries=getattr(settings, "PROMETHEUS_MAX_RETRIES", 3),
+            cache_size=settings.PROMETHEUS_QUERY_CACHE_SIZE,
+            cache_ttl=settings.PROMETHEUS_QUERY_CACHE_TTL,
         )
-        _prometheus_client = EnhancedPrometheusClient(config)
-        await _prometheus_client._initialize_client()
+        client = _prometheus_clients[url] = EnhancedPrometheusClient(config)
+    return client
 
-    return _prometheus_client
+
+async def get_prometheus_client(url: Optional[str] = None) -> EnhancedPrometheusClient:
+    """
+    Get the shared Prometheus client, connecting it if needed.
+
+    Args:
+        url (Optional[str]): Prometheus server URL; defaults to PROMETHEUS_URL
+
+    Returns:
+        EnhancedPrometheusClient: Configured Prometheus client
+    """
+    client = get_shared_prometheus_client(url)
+    if client.client is None:
+        await client._initialize_client()
+    return client
 
 
 async def close_prometheus_client():
-    """Close the global Prometheus client."""
-    global _prometheus_client
-    if _prometheus_client:
-        await _prometheus_client.close()
-        _prometheus_client = None
+    """Close the shared Prometheus clients."""
+    clients = list(_prometheus_clients.values())
+    _prometheus_clients.clear()
+    for client in clients:
+        await client.close()
 
 
 class PrometheusClient:
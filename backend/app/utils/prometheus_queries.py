@@ -141,6 +141,8 @@ class AdvancedQueryBuilder:
     Advanced query builder for complex Kubernetes monitoring scenarios.
     """
 
+    CLUSTER_OVERVIEW_TEMPLATES = ["cluster_cpu_capacity", "cluster_memory_capacity"]
+
     def __init__(self, cluster_name: str, interval: str = "5m"):
         """
         Initialize the advanced query builder.
@@ -165,6 +167,23 @@ class AdvancedQueryBuilder:
         """
         return getattr(self.templates, template_name.upper(), None)
 
+    def get_templates(self, template_names: List[str]) -> Dict[str, QueryTemplate]:
+        """
+        Get query templates by name, skipping unknown names.
+
+        Args:
+            template_names (List[str]): Names of the templates
+
+        Returns:
+            Dict[str, QueryTemplate]: Templates by name
+        """
+        templates = {}
+        for template_name in template_names:
+            template = self.get_template(template_name)
+            if template:
+                templates[template_name] = template
+        return templates
+
     def build_query(self, template_name: str, **kwargs) -> Optional[str]:
         """
         Build a query from a template with substitutions.
@@ -214,9 +233,8 @@ class AdvancedQueryBuilder:
             Dict[str, str]: Dictionary of query names to PromQL queries
         """
         queries = {}
-        cluster_templates = ["cluster_cpu_capacity", "cluster_memory_capacity"]
 
-        for template_name in cluster_templates:
+        for template_name in self.CLUSTER_OVERVIEW_TEMPLATES:
             query = self.build_query(template_name)
             if query:
                 queries[template_name] = query
@@ -9,6 +9,8 @@ import json
 import time
 import logging
 import asyncio
+import math
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from enum import Enum
@@ -24,6 +26,69 @@ class RateLimitAlgorithm(Enum):
     SLIDING_WINDOW = "sliding_window"
     TOKEN_BUCKET = "token_bucket"
     LEAKY_BUCKET = "leaky_bucket"
+    GCRA = "gcra"
+
+
+# Generic Cell Rate Algorithm evaluated atomically inside Redis.
+#
+# Each key stores a single float: the theoretical arrival time (TAT) of the
+# next request. KEYS are the limits to enforce together (main, optional
+# burst); ARGV[1] is the lease size, followed by (limit, window) pairs.
+# Server time is used so that all workers share one clock.
+#
+# When every limit has at least twice the lease size available, `lease`
+# requests are charged at once and the caller may admit the extra ones
+# locally without another round trip. Times are returned in milliseconds
+# because Lua numbers are truncated to integers on the way back.
+GCRA_LUA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local lease = tonumber(ARGV[1])
+local allowed = 1
+local retry_after = 0
+local remaining = nil
+local tats = {}
+local intervals = {}
+
+for i = 1, #KEYS do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    local interval = window / limit
+    local tat = tonumber(redis.call('GET', KEYS[i])) or now
+    if tat < now then
+        tat = now
+    end
+    local available = math.floor((window - (tat - now)) / interval)
+    if available < 1 then
+        allowed = 0
+        retry_after = math.max(retry_after, (tat - now) - window + interval)
+    end
+    if available < 2 * lease then
+        lease = 1
+    end
+    if remaining == nil or available < remaining then
+        remaining = available
+    end
+    tats[i] = tat
+    intervals[i] = interval
+end
+
+if allowed == 0 then
+    return {0, 0, math.ceil(retry_after * 1000), 0}
+end
+
+local reset_after = 0
+for i = 1, #KEYS do
+    local new_tat = tats[i] + lease * intervals[i]
+    local ttl = math.ceil((new_tat - now) * 1000)
+    redis.call('SET', KEYS[i], string.format('%.6f', new_tat), 'PX', ttl)
+    if ttl > reset_after then
+        reset_after = ttl
+    end
+end
+
+return {1, remaining - lease, reset_after, lease}
+"""
 
 
 class RateLimitResult:
@@ -59,6 +124,19 @@ class AdvancedRateLimiter:
         self.redis_client = redis_client
         self.config = config or {}
         self.fallback_cache = {}  # In-memory fallback when Redis is unavailable
+        self.default_algorithm = RateLimitAlgorithm(
+            self.config.get("algorithm", RateLimitAlgorithm.GCRA.value)
+        )
+        
+        # GCRA state. The Lua script is registered lazily so that EVALSHA is
+        # used after the first call. Local state (fallback TATs and pre-check
+        # leases) holds one entry per key and is LRU-bounded.
+        self._gcra_script = None
+        self.max_local_keys = self.config.get("max_local_keys", 10000)
+        self.lease_size = self.config.get("lease_size", 5)
+        self.lease_ttl = self.config.get("lease_ttl", 1.0)
+        self._local_tats: "OrderedDict[str, float]" = OrderedDict()
+        self._leases: "OrderedDict[str, List[float]]" = OrderedDict()
         
         # Default rate limits
         self.default_limits = {
@@ -86,7 +164,7 @@ class AdvancedRateLimiter:
         self, 
         identifier: str, 
         limit_type: str = "api",
-        algorithm: RateLimitAlgorithm = RateLimitAlgorithm.SLIDING_WINDOW
+        algorithm: Optional[RateLimitAlgorithm] = None
     ) -> RateLimitResult:
         """
         Check if request is within rate limits.
@@ -94,7 +172,8 @@ class AdvancedRateLimiter:
         Args:
             identifier: Unique identifier (IP, user ID, API key)
             limit_type: Type of limit (api, auth, upload, admin)
-            algorithm: Rate limiting algorithm to use
+            algorithm: Rate limiting algorithm to use (defaults to the
+                configured algorithm, GCRA unless overridden)
             
         Returns:
             RateLimitResult with limit status and headers
@@ -102,9 +181,12 @@ class AdvancedRateLimiter:
         # Get rate limit configuration
         limits = self.default_limits.get(limit_type, self.default_limits["api"])
         burst_limits = self.burst_limits.get(limit_type)
+        algorithm = algorithm or self.default_algorithm
         
         try:
-            if algorithm == RateLimitAlgorithm.SLIDING_WINDOW:
+            if algorithm == RateLimitAlgorithm.GCRA:
+                return await self._gcra_check(identifier, limit_type, limits, burst_limits)
+            elif algorithm == RateLimitAlgorithm.SLIDING_WINDOW:
                 return await self._sliding_window_check(identifier, limit_type, limits, burst_limits)
             elif algorithm == RateLimitAlgorithm.TOKEN_BUCKET:
                 return await self._token_bucket_check(identifier, limit_type, limits)
@@ -119,6 +201,140 @@ class AdvancedRateLimiter:
             # Fallback to in-memory rate limiting
             return await self._fallback_rate_limit(identifier, limit_type, limits)
     
+    async def _gcra_check(
+        self,
+        identifier: str,
+        limit_type: str,
+        limits: Dict,
+        burst_limits: Optional[Dict] = None
+    ) -> RateLimitResult:
+        """
+        GCRA rate limit implementation.
+        
+        Requests first try a local lease granted by an earlier Redis call;
+        otherwise the main and burst limits are evaluated together in a
+        single Lua script call, keeping O(1) state per key.
+        """
+        key = f"{limit_type}:{identifier}"
+        leased = self._take_lease(key, limits)
+        if leased is not None:
+            return leased
+        
+        if not self.redis_client:
+            return self._gcra_local_check(key, limits, burst_limits)
+        
+        if self._gcra_script is None:
+            self._gcra_script = self.redis_client.register_script(GCRA_LUA_SCRIPT)
+        
+        keys = [f"gcra:{limit_type}:{identifier}"]
+        args = [self.lease_size, limits["requests"], limits["window"]]
+        if burst_limits:
+            keys.append(f"gcra:burst:{limit_type}:{identifier}")
+            args.extend([burst_limits["requests"], burst_limits["window"]])
+        
+        allowed, remaining, after_ms, granted = await self._gcra_script(keys=keys, args=args)
+        now = time.time()
+        
+        if not allowed:
+            retry_after = max(1, math.ceil(int(after_ms) / 1000))
+            return RateLimitResult(
+                allowed=False,
+                limit=limits["requests"],
+                remaining=0,
+                reset_time=int(now + retry_after),
+                retry_after=retry_after
+            )
+        
+        granted = int(granted)
+        if granted > 1:
+            self._store_lease(key, granted - 1, int(remaining), now)
+        
+        return RateLimitResult(
+            allowed=True,
+            limit=limits["requests"],
+            remaining=max(0, int(remaining)),
+            reset_time=int(now + math.ceil(int(after_ms) / 1000))
+        )
+    
+    def _take_lease(self, key: str, limits: Dict) -> Optional[RateLimitResult]:
+        """Admit a request from a local lease without contacting Redis."""
+        lease = self._leases.get(key)
+        if lease is None:
+            return None
+        
+        tokens, remaining, expires_at = lease
+        now = time.time()
+        if tokens < 1 or now >= expires_at:
+            del self._leases[key]
+            return None
+        
+        lease[0] = tokens - 1
+        return RateLimitResult(
+            allowed=True,
+            limit=limits["requests"],
+            remaining=int(remaining),
+            reset_time=int(now + limits["window"])
+        )
+    
+    def _store_lease(self, key: str, tokens: int, remaining: int, now: float):
+        """Keep pre-charged requests for local admission, bounded in size."""
+        self._leases[key] = [tokens, remaining, now + self.lease_ttl]
+        self._leases.move_to_end(key)
+        while len(self._leases) > self.max_local_keys:
+            self._leases.popitem(last=False)
+    
+    def _gcra_local_check(
+        self,
+        key: str,
+        limits: Dict,
+        burst_limits: Optional[Dict] = None
+    ) -> RateLimitResult:
+        """
+        In-process GCRA used when Redis is unavailable.
+        
+        State is one TAT per key in an LRU-bounded dict. The check runs
+        without awaiting, so it is atomic on the event loop and needs no lock.
+        """
+        now = time.time()
+        checks = [(f"main:{key}", limits)]
+        if burst_limits:
+            checks.append((f"burst:{key}", burst_limits))
+        
+        remaining = None
+        retry_after = 0.0
+        new_tats = []
+        for state_key, limit in checks:
+            interval = limit["window"] / limit["requests"]
+            tat = max(self._local_tats.get(state_key, now), now)
+            available = math.floor((limit["window"] - (tat - now)) / interval)
+            if available < 1:
+                retry_after = max(retry_after, (tat - now) - limit["window"] + interval)
+            remaining = available if remaining is None else min(remaining, available)
+            new_tats.append((state_key, tat + interval))
+        
+        if retry_after > 0 or remaining < 1:
+            retry_after = max(1, math.ceil(retry_after))
+            return RateLimitResult(
+                allowed=False,
+                limit=limits["requests"],
+                remaining=0,
+                reset_time=int(now + retry_after),
+                retry_after=retry_after
+            )
+        
+        for state_key, new_tat in new_tats:
+            self._local_tats[state_key] = new_tat
+            self._local_tats.move_to_end(state_key)
+        while len(self._local_tats) > self.max_local_keys:
+            self._local_tats.popitem(last=False)
+        
+        return RateLimitResult(
+            allowed=True,
+            limit=limits["requests"],
+            remaining=remaining - 1,
+            reset_time=int(max(tat for _, tat in new_tats))
+        )
+    
     async def _sliding_window_check(
         self, 
         identifier: str, 
@@ -316,43 +532,7 @@ class AdvancedRateLimiter:
         limits: Dict
     ) -> RateLimitResult:
         """Fallback in-memory rate limiting when Redis is unavailable."""
-        now = time.time()
-        window = limits["window"]
-        max_requests = limits["requests"]
-        
-        key = f"{limit_type}:{identifier}"
-        
-        if key not in self.fallback_cache:
-            self.fallback_cache[key] = []
-        
-        # Clean old entries
-        cutoff = now - window
-        self.fallback_cache[key] = [
-            timestamp for timestamp in self.fallback_cache[key] 
-            if timestamp > cutoff
-        ]
-        
-        current_requests = len(self.fallback_cache[key])
-        
-        if current_requests >= max_requests:
-            return RateLimitResult(
-                allowed=False,
-                limit=max_requests,
-                remaining=0,
-                reset_time=int(now + window),
-                retry_after=window
-            )
-        
-        # Add current request
-        self.fallback_cache[key].append(now)
-        
-        remaining = max(0, max_requests - current_requests - 1)
-        return RateLimitResult(
-            allowed=True,
-            limit=max_requests,
-            remaining=remaining,
-            reset_time=int(now + window)
-        )
+        return self._gcra_local_check(f"{limit_type}:{identifier}", limits)
     
     async def is_ip_blocked(self, ip: str) -> bool:
         """Check if IP is blocked due to abuse."""
@@ -432,7 +612,7 @@ class AdvancedRateLimiter:
         return {
             "identifier": identifier,
             "limit_type": limit_type,
-            "algorithm": "sliding_window",
+            "algorithm": self.default_algorithm.value,
             "limit": result.limit,
             "remaining": result.remaining,
             "reset_time": result.reset_time,
@@ -442,6 +622,12 @@ class AdvancedRateLimiter:
     
     async def cleanup_expired_entries(self):
         """Clean up expired entries to prevent memory leaks."""
+        now = time.time()
+        for key in [k for k, tat in self._local_tats.items() if tat <= now]:
+            del self._local_tats[key]
+        for key in [k for k, lease in self._leases.items() if lease[2] <= now]:
+            del self._leases[key]
+        
         if not self.redis_client:
             # Clean fallback cache
             now = time.time()
@@ -0,0 +1,144 @@
+"""
+Request-scoped body cache.
+
+The request body is read from the ASGI stream once, with the size limit
+enforced chunk by chunk, and parsed as JSON at most once. Middlewares
+(security validation, audit capture) and endpoints share the same bytes and
+decoded document through the request scope instead of each buffering and
+parsing the body again.
+"""
+
+import json
+import re
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_UNSET = object()
+
+# 2**63 has 19 digits; longer runs may be integers beyond orjson's range
+_LONG_DIGIT_RUN = re.compile(rb"\d{19,}")
+
+
+def json_loads(data: bytes) -> Any:
+    """
+    Decode JSON, using orjson when installed.
+
+    Documents with integers that may not fit in 64 bits (which orjson turns
+    into floats or rejects, depending on version), input orjson rejects but
+    the standard library accepts (NaN, Infinity) and invalid input all go
+    through json.loads, so results and JSONDecodeError details match the
+    standard library.
+    """
+    if orjson is not None and not _LONG_DIGIT_RUN.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+class CachedBody:
+    """Raw bytes of a request body with lazily decoded text and JSON."""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._text: Optional[str] = None
+        self._json: Any = _UNSET
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def text(self) -> str:
+        """Body decoded as UTF-8; raises UnicodeDecodeError."""
+        if self._text is None:
+            self._text = self.raw.decode("utf-8")
+        return self._text
+
+    def json(self) -> Any:
+        """Body parsed as JSON, decoded once per request."""
+        if self._json is _UNSET:
+            self._json = json_loads(self.raw)
+        return self._json
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request size exceeds limit of {max_size} bytes"
+    )
+
+
+async def read_body(request: Request, max_size: Optional[int] = None) -> CachedBody:
+    """
+    Read the request body once per request.
+
+    The body is cached in the request scope state, so later middlewares and
+    endpoints receive the same CachedBody. The bytes are also set on the
+    Request so Starlette replays them to the downstream app.
+
+    Args:
+        request: Incoming request
+        max_size: Maximum body size in bytes, checked while streaming
+
+    Raises:
+        HTTPException: 413 if the body exceeds max_size
+    """
+    cached = getattr(request.state, "cached_body", None)
+    if cached is None:
+        if max_size is not None:
+            content_length = request.headers.get("content-length")
+            if content_length and content_length.isdigit() and int(content_length) > max_size:
+                raise _too_large(max_size)
+
+        chunks = []
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            # Enforce the limit on the bytes actually received, which also
+            # covers chunked bodies without a Content-Length
+            if max_size is not None and received > max_size:
+                raise _too_large(max_size)
+            chunks.append(chunk)
+
+        cached = CachedBody(b"".join(chunks))
+        request.state.cached_body = cached
+    elif max_size is not None and len(cached) > max_size:
+        raise _too_large(max_size)
+
+    request._body = cached.raw
+    return cached
+
+
+def get_cached_body(request: Request) -> Optional[CachedBody]:
+    """The body already read for this request, if any."""
+    return getattr(request.state, "cached_body", None)
+
+
+class CachedBodyRoute(APIRoute):
+    """
+    Route that reuses the body cached by the middlewares.
+
+    FastAPI reads and decodes the body itself for request models and
+    request.json(); seeding the endpoint's Request with the cached bytes and
+    document skips the second read and parse.
+    """
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def cached_body_route_handler(request: Request):
+            cached = get_cached_body(request)
+            if cached is not None:
+                request._body = cached.raw
+                if cached._json is not _UNSET:
+                    request._json = cached._json
+            return await original_route_handler(request)
+
+        return cached_body_route_handler
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+InputValidator Benchmark
+
+Measures the per-request cost of SecurityMiddleware input validation: every
+query parameter through validate_string and the JSON body through
+validate_json. Compares the literal-prefiltered scanner against
+the previous pattern-by-pattern scan over realistic request payloads.
+
+Usage:
+    python scripts/benchmarks/input_validator_benchmark.py [--iterations N]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.utils.input_validator import InputValidator, ValidationResult  # noqa: E402
+
+
+class PatternByPatternValidator(InputValidator):
+    """String validation as it was before the prefiltered scanner, for comparison."""
+
+    def _validate_string(self, value: str, field_name: str, sanitize: bool = True) -> ValidationResult:
+        errors = []
+        if len(value) > self.max_string_length:
+            errors.append(f"{field_name}: String length exceeds maximum of {self.max_string_length}")
+            value = value[:self.max_string_length]
+        if '\x00' in value:
+            errors.append(f"{field_name}: Null bytes not allowed")
+            value = value.replace('\x00', '')
+        for label, patterns in (
+            ("XSS", self.xss_regex),
+            ("SQL injection", self.sql_regex),
+            ("Command injection", self.cmd_regex),
+            ("Path traversal", self.path_regex),
+            ("LDAP injection", self.ldap_regex),
+        ):
+            found = [pattern.pattern for pattern in patterns if pattern.search(value)]
+            if found:
+                errors.append(f"{field_name}: {label} patterns detected: {', '.join(found[:3])}")
+                if self.strict_mode:
+                    return ValidationResult(False, None, errors)
+        return ValidationResult(
+            len(errors) == 0 or not self.strict_mode, self._sanitize_string(value), errors
+        )
+
+
+# (query params, JSON body) pairs modelled on dashboard, pipeline and alert traffic
+REQUESTS = [
+    ({"page": "1", "per_page": "50", "sort_by": "timestamp", "sort_order": "desc"}, None),
+    ({"cluster": "prod-eu-west-1", "namespace": "payments", "range": "24h"}, None),
+    ({"search": "deploy failed on staging", "status": "failed"}, None),
+    (
+        {"team_id": "42"},
+        {
+            "name": "Nightly build",
+            "repository": "org/opssight-api",
+            "branch": "main",
+            "trigger": {"type": "schedule", "cron": "0 2 * * *"},
+            "steps": [
+                {"name": "lint", "command": "make lint"},
+                {"name": "test", "command": "pytest -q tests/"},
+                {"name": "build", "command": "docker build -t opssight/api:latest ."},
+            ],
+        },
+    ),
+    (
+        {},
+        {
+            "title": "High error rate on checkout-service",
+            "severity": "critical",
+            "labels": {"service": "checkout", "env": "production", "region": "us-east-1"},
+            "description": "Error rate above 5% for 10 minutes. Runbook: https://wiki.example.com/runbooks/checkout",
+            "annotations": {"summary": "5xx responses spiking", "value": "7.3"},
+        },
+    ),
+]
+
+
+def run_request(validator: InputValidator, params: dict, body) -> None:
+    for name, value in params.items():
+        validator.validate_string(value, f"query.{name}")
+    if body is not None:
+        validator.validate_json(json.dumps(body), "request_body")
+
+
+def measure(validator: InputValidator, iterations: int) -> float:
+    """Mean microseconds of validation per request."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for params, body in REQUESTS:
+            run_request(validator, params, body)
+    return (time.perf_counter() - start) / (iterations * len(REQUESTS)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    candidates = {
+        "pattern-by-pattern": PatternByPatternValidator(),
+        "prefiltered (no cache)": InputValidator({"verdict_cache_size": 0}),
+        "prefiltered + cache": InputValidator(),
+    }
+
+    print(f"{len(REQUESTS)} request shapes x {args.iterations} iterations")
+    baseline = None
+    for label, validator in candidates.items():
+        per_request = measure(validator, args.iterations)
+        baseline = baseline or per_request
+        print(f"  {label:<22} {per_request:8.1f} us/request  ({baseline / per_request:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Middleware Chain Benchmark
+
+Drives the application's middleware chain in-process over ASGI and reports
+p50/p99 latency and requests/sec for the BaseHTTPMiddleware chain it replaced
+and the pure ASGI chain. Both chains have the same depth and do the same
+per-request work: the request context and security header middleware as
+they were in main.py, plus one header-adding layer for each of the security,
+RBAC, logging and audit middlewares, so the difference is the cost of the
+middleware plumbing itself.
+
+Usage:
+    python scripts/benchmarks/middleware_benchmark.py [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.types import Send  # noqa: E402
+
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo  # noqa: E402
+from app.middleware.request_context import (  # noqa: E402
+    SECURITY_HEADERS,
+    RequestContextMiddleware,
+    SecurityHeadersMiddleware,
+)
+
+# Security, RBAC, logging and audit layers wrapped around the request context ones
+EXTRA_LAYERS = ["Security", "RBAC", "Logging", "Audit"]
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+class LegacyRequestContextMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+def legacy_layer(name: str):
+    class Layer(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            response = await call_next(request)
+            response.headers[f"X-{name}"] = "1"
+            return response
+
+    return Layer
+
+
+def asgi_layer(name: str):
+    class Layer(ASGIMiddleware):
+        async def handle(self, request: Request, send: Send) -> None:
+            def add_header(response: ResponseInfo) -> None:
+                response.headers[f"X-{name}"] = "1"
+
+            await self.call_next(request, send, ResponseInfo(on_start=add_header))
+
+    return Layer
+
+
+def build_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/items")
+    async def items():
+        return {"items": [{"id": i, "name": f"item-{i}"} for i in range(20)]}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(8):
+                yield b"x" * 1024
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    if pure_asgi:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RequestContextMiddleware)
+        for name in EXTRA_LAYERS:
+            app.add_middleware(asgi_layer(name))
+    else:
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyRequestContextMiddleware)
+        for name in EXTRA_LAYERS:
+            app.add_middleware(legacy_layer(name))
+    return app
+
+
+async def call(app, path: str) -> float:
+    """Send one GET through the app and return its latency in seconds."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"user-agent", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a server, report the disconnect once the response is done
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def run(app, path: str, requests: int, concurrency: int):
+    # Warm up routing, middleware stack construction and the event loop
+    for _ in range(50):
+        await call(app, path)
+
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        batch = min(concurrency, requests - offset)
+        latencies.extend(await asyncio.gather(*(call(app, path) for _ in range(batch))))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    return p50, p99, requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    chains = {
+        "BaseHTTPMiddleware": build_app(pure_asgi=False),
+        "pure ASGI": build_app(pure_asgi=True),
+    }
+
+    print(
+        f"{len(EXTRA_LAYERS) + 2} middleware layers, {args.requests} requests, "
+        f"concurrency {args.concurrency}"
+    )
+    for path in ("/api/v1/items", "/api/v1/stream"):
+        print(f"\n{path}")
+        print(f"  {'chain':<20} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>9}")
+        for label, app in chains.items():
+            p50, p99, rps = asyncio.run(run(app, path, args.requests, args.concurrency))
+            print(f"  {label:<20} {p50:>8.3f} {p99:>8.3f} {rps:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
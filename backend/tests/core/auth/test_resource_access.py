@@ -0,0 +1,128 @@
+"""
+Tests for batch resource authorization.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from app.core.auth.rbac import RBACContext
+from app.core.auth.resource_access import (
+    accessible_project_ids,
+    can_access_project,
+    filter_accessible_projects,
+    filter_accessible_resources,
+)
+from app.models.alert import Alert
+from app.models.project import Project
+from app.models.role import PermissionType
+from app.models.user_team import UserTeam
+
+USER_ID = 7
+
+# id, team_id, is_public
+PROJECTS = [(1, 10, False), (2, 20, False), (3, 30, True), (4, 40, False)]
+# user_id, team_id, is_active
+MEMBERSHIPS = [(USER_ID, 10, True), (USER_ID, 40, False), (8, 20, True)]
+# alert id -> project id
+ALERTS = {100: 1, 101: 2, 102: 3, 103: 4}
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    tables = [Project.__table__, UserTeam.__table__, Alert.__table__]
+    async with engine.begin() as conn:
+        for table in tables:
+            await conn.run_sync(lambda sync_conn, table=table: table.create(sync_conn))
+        await conn.execute(
+            Project.__table__.insert(),
+            [
+                {"id": id, "team_id": team_id, "is_public": is_public, "name": f"p{id}",
+                 "slug": f"p{id}", "organization_id": 1, "is_active": True,
+                 "created_by_user_id": 1}
+                for id, team_id, is_public in PROJECTS
+            ],
+        )
+        await conn.execute(
+            UserTeam.__table__.insert(),
+            [
+                {"user_id": user_id, "team_id": team_id, "is_active": is_active, "role": "member"}
+                for user_id, team_id, is_active in MEMBERSHIPS
+            ],
+        )
+        await conn.execute(
+            Alert.__table__.insert(),
+            [
+                {"id": id, "project_id": project_id, "alert_id": f"a{id}",
+                 "title": f"a{id}", "message": "test", "source": "test"}
+                for id, project_id in ALERTS.items()
+            ],
+        )
+
+    async with AsyncSession(engine) as session:
+        statements.clear()
+        session.statements = statements
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_filter_accessible_projects_in_one_query(db):
+    allowed = await filter_accessible_projects(db, USER_ID, [1, 2, 3, 4, 5])
+
+    assert allowed == {1, 3}
+    assert len(db.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_filter_accessible_resources(db):
+    allowed = await filter_accessible_resources(db, USER_ID, Alert, ALERTS)
+
+    assert allowed == {100, 102}
+    assert len(db.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_batch_skips_query(db):
+    assert await filter_accessible_projects(db, USER_ID, []) == set()
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_single_project_and_listing(db):
+    assert await can_access_project(db, USER_ID, 1)
+    assert not await can_access_project(db, USER_ID, 4)
+    assert sorted(await accessible_project_ids(db, USER_ID)) == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_owned_resources_check_permission_once():
+    context = RBACContext(SimpleNamespace(id=USER_ID), db=None)
+    context.has_system_permission = AsyncMock(return_value=False)
+    owners = {1: USER_ID, 2: 8, 3: USER_ID}
+
+    assert await context.accessible_owned_resources(owners, PermissionType.VIEW_USERS) == {1, 3}
+    context.has_system_permission.assert_awaited_once_with(PermissionType.VIEW_USERS)
+
+    context.has_system_permission = AsyncMock(return_value=True)
+    assert await context.accessible_owned_resources(owners, PermissionType.VIEW_USERS) == {1, 2, 3}
+
+
+@pytest.mark.asyncio
+async def test_owned_resources_skip_permission_check_for_owner():
+    context = RBACContext(SimpleNamespace(id=USER_ID), db=None)
+    context.has_system_permission = AsyncMock()
+
+    assert await context.accessible_owned_resources({1: USER_ID}, PermissionType.VIEW_USERS) == {1}
+    context.has_system_permission.assert_not_awaited()
@@ -0,0 +1,227 @@
+"""
+Tests for the auth context cache and its use in the RBAC middleware
+"""
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.core.auth.rbac import PermissionDeniedError
+from app.core.auth_context import (
+    ALL_PERMISSIONS,
+    AuthContextCache,
+    Principal,
+    mask_permissions,
+    permission_mask,
+)
+from app.middleware.rbac_middleware import RBACMiddleware
+from app.models.role import PermissionType
+from app.services.effective_permission_index import EffectivePermissionIndex
+
+
+def make_user(**overrides):
+    values = dict(
+        id=7,
+        email="dev@example.com",
+        github_username="dev",
+        full_name="Dev User",
+        organization_id=3,
+        role_id=2,
+        is_active=True,
+        is_superuser=False,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def make_request(token="header.payload.signature", path="/api/v1/users", method="GET"):
+    request = Mock()
+    request.headers = {"authorization": f"Bearer {token}"}
+    request.url.path = path
+    request.method = method
+    request.client.host = "127.0.0.1"
+    return request
+
+
+def fake_db(user=None):
+    db = Mock()
+    db.get = AsyncMock(return_value=user)
+
+    async def get_async_db():
+        yield db
+
+    return db, get_async_db
+
+
+class TestPermissionMask:
+    """Test permission bitsets."""
+
+    def test_round_trip(self):
+        permissions = [PermissionType.VIEW_USERS, PermissionType.MANAGE_ROLES]
+        mask = permission_mask(permissions)
+
+        assert mask_permissions(mask) == permissions
+
+    def test_accepts_values_and_ignores_unknown(self):
+        assert permission_mask(["view_users", "not_a_permission"]) == permission_mask(
+            [PermissionType.VIEW_USERS]
+        )
+
+    def test_all_permissions(self):
+        assert mask_permissions(ALL_PERMISSIONS) == list(PermissionType)
+
+
+class TestAuthContextCache:
+    """Test the auth context cache."""
+
+    def test_tokens_keyed_on_whole_token(self):
+        cache = AuthContextCache()
+        shared_header = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+        alice, bob = Principal(id=1), Principal(id=2)
+
+        cache.put_principal(f"{shared_header}.alice.sig", alice)
+        cache.put_principal(f"{shared_header}.bob.sig", bob)
+
+        assert cache.get_principal(f"{shared_header}.alice.sig") == alice
+        assert cache.get_principal(f"{shared_header}.bob.sig") == bob
+
+    def test_principal_expires_with_token(self):
+        cache = AuthContextCache(max_ttl=60)
+
+        cache.put_principal("expired", Principal(id=1), expires_at=time.time() - 1)
+        cache.put_principal("valid", Principal(id=1), expires_at=time.time() + 30)
+
+        assert cache.get_principal("expired") is None
+        assert cache.get_principal("valid") == Principal(id=1)
+
+    def test_max_ttl_bounds_entries(self):
+        cache = AuthContextCache(max_ttl=60)
+        cache.put_principal("token", Principal(id=1), expires_at=time.time() + 3600)
+
+        with patch("app.core.auth_context.time.monotonic", return_value=time.monotonic() + 61):
+            assert cache.get_principal("token") is None
+
+    def test_disabled_with_zero_ttl(self):
+        cache = AuthContextCache(max_ttl=0)
+        cache.put_principal("token", Principal(id=1))
+        cache.put_permissions(1, None, 1)
+
+        assert cache.get_principal("token") is None
+        assert cache.get_permissions(1, None) is None
+
+    def test_least_recently_used_evicted(self):
+        cache = AuthContextCache(max_tokens=2)
+        cache.put_principal("a", Principal(id=1))
+        cache.put_principal("b", Principal(id=2))
+        cache.get_principal("a")
+        cache.put_principal("c", Principal(id=3))
+
+        assert cache.get_principal("b") is None
+        assert cache.get_principal("a") == Principal(id=1)
+
+    def test_invalidate_user(self):
+        cache = AuthContextCache()
+        cache.put_principal("a", Principal(id=1))
+        cache.put_principal("b", Principal(id=2))
+        cache.put_permissions(1, 3, 5)
+        cache.put_permissions(2, 3, 5)
+
+        cache.invalidate_user("1")
+
+        assert cache.get_principal("a") is None
+        assert cache.get_permissions(1, 3) is None
+        assert cache.get_principal("b") == Principal(id=2)
+        assert cache.get_permissions(2, 3) == 5
+
+    def test_invalidate_permissions_keeps_principals(self):
+        cache = AuthContextCache()
+        cache.put_principal("a", Principal(id=1))
+        cache.put_permissions(1, None, 5)
+
+        cache.invalidate_permissions()
+
+        assert cache.get_permissions(1, None) is None
+        assert cache.get_principal("a") == Principal(id=1)
+
+    def test_principal_serializable(self):
+        principal = Principal.from_user(make_user())
+
+        assert Principal.from_dict(principal.to_dict()) == principal
+        assert principal.username == "dev"
+
+
+class TestRBACMiddlewareAuthCache:
+    """Test that the RBAC middleware hot path is served from the cache."""
+
+    @pytest.fixture
+    def middleware(self):
+        middleware = RBACMiddleware(app=None)
+        middleware.auth_cache = AuthContextCache()
+        middleware.permission_index = EffectivePermissionIndex(middleware.auth_cache)
+        return middleware
+
+    @pytest.mark.asyncio
+    async def test_token_verified_once(self, middleware):
+        db, get_async_db = fake_db(make_user())
+        payload = {"user_id": 7, "exp": time.time() + 300}
+
+        with patch("app.middleware.rbac_middleware.verify_jwt_token", return_value=payload) as verify, \
+                patch("app.middleware.rbac_middleware.get_async_db", get_async_db):
+            first = await middleware._get_current_user(make_request())
+            second = await middleware._get_current_user(make_request())
+
+        assert first == second == Principal.from_user(make_user())
+        verify.assert_called_once()
+        db.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_not_cached(self, middleware):
+        db, get_async_db = fake_db(make_user(is_active=False))
+
+        with patch("app.middleware.rbac_middleware.verify_jwt_token", return_value={"user_id": 7}) as verify, \
+                patch("app.middleware.rbac_middleware.get_async_db", get_async_db):
+            assert await middleware._get_current_user(make_request()) is None
+            assert await middleware._get_current_user(make_request()) is None
+
+        assert verify.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_permissions_checked_against_cached_mask(self, middleware):
+        principal = Principal.from_user(make_user())
+        middleware.auth_cache.put_permissions(
+            principal.id, principal.organization_id, permission_mask([PermissionType.VIEW_USERS])
+        )
+        middleware._check_rate_limit = AsyncMock()
+
+        with patch("app.middleware.rbac_middleware.get_async_db") as get_db:
+            await middleware._check_endpoint_permissions(make_request(), principal, None)
+            with pytest.raises(PermissionDeniedError, match="manage_users"):
+                await middleware._check_endpoint_permissions(
+                    make_request(method="POST"), principal, None
+                )
+
+        get_db.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_permission_mask_loaded_once(self, middleware):
+        principal = Principal.from_user(make_user())
+        db, get_async_db = fake_db()
+        result = Mock()
+        result.first.return_value = (False, ["view_users", "manage_users"], None)
+        db.execute = AsyncMock(return_value=result)
+
+        with patch("app.middleware.rbac_middleware.get_async_db", get_async_db):
+            first = await middleware._get_permission_mask(principal, 3)
+            second = await middleware._get_permission_mask(principal, 3)
+
+        assert first == second == permission_mask(
+            [PermissionType.VIEW_USERS, PermissionType.MANAGE_USERS]
+        )
+        db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_superuser_has_all_permissions(self, middleware):
+        principal = Principal.from_user(make_user(is_superuser=True))
+
+        assert await middleware._get_permission_mask(principal, None) == ALL_PERMISSIONS
@@ -0,0 +1,94 @@
+"""
+Tests for per-request N+1 query detection.
+"""
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database_monitoring import DatabaseMonitor
+from app.core.query_profiler import NPlusOneDetector, n_plus_one_detector
+from app.middleware.query_profiler_middleware import QueryProfilerMiddleware
+
+
+class TestNPlusOneDetector:
+    """Test the detector without a database."""
+
+    def test_flags_repeated_selects(self):
+        detector = NPlusOneDetector(threshold=3)
+        detector.enabled = True
+
+        token = detector.start_request("GET", "/teams/1/dashboard")
+        for member_id in range(4):
+            detector.record(f"SELECT count(*) FROM projects WHERE owner_id = {member_id}")
+        detector.record("SELECT * FROM teams WHERE id = 1")
+        reports = detector.finish_request(token, "/teams/{team_id}/dashboard")
+
+        assert len(reports) == 1
+        assert reports[0].endpoint == "GET /teams/{team_id}/dashboard"
+        assert reports[0].max_repetitions == 4
+        assert reports[0].table == "projects"
+
+    def test_ignores_writes_and_unprofiled_code(self):
+        detector = NPlusOneDetector(threshold=2)
+        detector.enabled = True
+
+        detector.record("SELECT 1")  # outside a request: ignored
+        token = detector.start_request("POST", "/items")
+        for i in range(5):
+            detector.record(f"INSERT INTO items (id) VALUES ({i})")
+        reports = detector.finish_request(token)
+
+        assert reports == []
+        assert detector.get_reports() == []
+
+    def test_disabled_detector_is_inert(self):
+        detector = NPlusOneDetector(threshold=1)
+
+        assert detector.start_request("GET", "/") is None
+        assert detector.finish_request(None) == []
+
+    def test_reports_aggregate_across_requests(self):
+        detector = NPlusOneDetector(threshold=2)
+        detector.enabled = True
+
+        for repetitions in (2, 6):
+            token = detector.start_request("GET", "/alerts")
+            for _ in range(repetitions):
+                detector.record("SELECT * FROM alerts WHERE id = 1")
+            detector.finish_request(token)
+
+        reports = detector.get_reports()
+        assert len(reports) == 1
+        assert reports[0]["occurrences"] == 2
+        assert reports[0]["max_repetitions"] == 6
+
+
+@pytest.mark.asyncio
+async def test_middleware_detects_queries_from_engine_hooks():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    DatabaseMonitor().setup_engine_monitoring(engine)
+    n_plus_one_detector.clear()
+
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware, config={"threshold": 3})
+
+    @app.get("/loop/{count}")
+    async def loop(count: int):
+        async with engine.connect() as conn:
+            for i in range(count):
+                await conn.execute(text("SELECT :value"), {"value": i})
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/loop/5")
+
+    await engine.dispose()
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "5"
+    reports = n_plus_one_detector.get_reports()
+    assert reports[0]["endpoint"] == "GET /loop/{count}"
+    assert reports[0]["max_repetitions"] == 5
@@ -0,0 +1,129 @@
+"""
+Tests for statement fingerprinting and aggregated query statistics.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database_monitoring import DatabaseMonitor
+from app.core.query_stats import (
+    LatencyHistogram,
+    QueryStatsRegistry,
+    extract_table_name,
+    fingerprint_statement,
+)
+
+
+class TestFingerprinting:
+    """Test SQL statement normalization."""
+
+    def test_literals_are_normalized(self):
+        a = fingerprint_statement("SELECT * FROM users WHERE id = 42 AND name = 'bob'")
+        b = fingerprint_statement("select * from users where id = 7 and name = 'o''hara'")
+
+        assert a == "SELECT * FROM users WHERE id = ? AND name = ?"
+        assert b.lower() == a.lower()
+
+    def test_placeholders_and_in_lists_collapse(self):
+        a = fingerprint_statement("SELECT id FROM t WHERE id IN (%(id_1)s, %(id_2)s)")
+        b = fingerprint_statement("SELECT id FROM t WHERE id IN ($1, $2, $3, $4)")
+
+        assert a == b == "SELECT id FROM t WHERE id IN (...)"
+
+    def test_multi_row_values_collapse(self):
+        statement = "INSERT INTO audit_logs (a, b) VALUES (1, 'x'), (2, 'y')"
+
+        assert fingerprint_statement(statement) == "INSERT INTO audit_logs (a, b) VALUES (...)"
+
+    def test_identifiers_with_digits_are_kept(self):
+        assert fingerprint_statement("SELECT col1 FROM table2 LIMIT 10") == (
+            "SELECT col1 FROM table2 LIMIT ?"
+        )
+
+    @pytest.mark.parametrize(
+        "statement,table",
+        [
+            ("SELECT * FROM users WHERE id = 1", "users"),
+            ("INSERT INTO public.audit_logs (id) VALUES (1)", "audit_logs"),
+            ('UPDATE "projects" SET name = 1', "projects"),
+            ("DELETE FROM metrics WHERE ts < now()", "metrics"),
+            ("SELECT 1", None),
+        ],
+    )
+    def test_extract_table_name(self, statement, table):
+        assert extract_table_name(statement) == table
+
+
+class TestLatencyHistogram:
+    """Test the log-bucketed histogram."""
+
+    def test_quantiles_within_precision(self):
+        histogram = LatencyHistogram(precision=0.05)
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.05)
+        assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.05)
+
+    def test_bucket_count_is_bounded(self):
+        histogram = LatencyHistogram()
+        for i in range(100000):
+            histogram.record((i % 5000) * 0.001)
+
+        assert len(histogram.buckets) <= histogram.max_bucket + 1
+
+
+class TestQueryStatsRegistry:
+    """Test aggregation and eviction."""
+
+    def test_groups_by_fingerprint(self):
+        registry = QueryStatsRegistry()
+        for user_id in range(10):
+            registry.record(f"SELECT * FROM users WHERE id = {user_id}", 0.01)
+        registry.record("SELECT * FROM teams WHERE id = 1", 0.5, slow=True)
+
+        top = registry.top_statements(order_by="calls")
+
+        assert len(top) == 2
+        assert top[0]["calls"] == 10
+        assert top[0]["table"] == "users"
+        assert registry.top_statements(order_by="max_time")[0]["table"] == "teams"
+        assert registry.table_statistics()["users"]["count"] == 10
+
+    def test_memory_is_bounded(self):
+        registry = QueryStatsRegistry(max_statements=5, max_tables=3)
+        for i in range(20):
+            registry.record(f"SELECT * FROM table_{chr(97 + i)} WHERE x = 1", 0.01)
+
+        summary = registry.summary()
+        assert summary["tracked_statements"] == 5
+        assert summary["tracked_tables"] == 3
+        assert summary["evicted_statements"] == 15
+
+    def test_invalid_order_field(self):
+        with pytest.raises(ValueError):
+            QueryStatsRegistry().top_statements(order_by="rows")
+
+
+class TestDatabaseMonitor:
+    """Test that engine hooks feed the statement registry."""
+
+    @pytest.mark.asyncio
+    async def test_engine_queries_are_aggregated_once(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        monitor = DatabaseMonitor()
+        monitor.setup_engine_monitoring(engine)
+        monitor.setup_engine_monitoring(engine)
+
+        try:
+            async with engine.connect() as conn:
+                for value in range(3):
+                    await conn.execute(text(f"SELECT {value} AS value"))
+        finally:
+            await engine.dispose()
+
+        statements = monitor.get_statement_statistics(order_by="calls")["statements"]
+        assert statements[0]["calls"] == 3
+        assert statements[0]["query_type"] == "SELECT"
@@ -0,0 +1,242 @@
+"""
+Tests for monthly partition management and partition-based retention.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.db.partitioning import (
+    PARTITIONED_TABLES,
+    Partition,
+    PartitionManager,
+    add_months,
+    create_partition_sql,
+    expired_partitions,
+    month_start,
+    parse_partition_bound,
+)
+from app.services import partition_maintenance_service as maintenance_module
+from app.services.audit_service import AuditService
+from app.services.partition_maintenance_service import PartitionMaintenanceService
+
+
+def _partition(year: int, month: int, rows: int = 0) -> Partition:
+    start = datetime(year, month, 1)
+    return Partition(f"audit_logs_p{year}_{month:02d}", start, add_months(start, 1), rows)
+
+
+def _postgres_session(rows=()):
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    session.execute = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+    return session
+
+
+def _executed_sql(session):
+    return [str(call.args[0]) for call in session.execute.call_args_list]
+
+
+class TestMonthArithmetic:
+    """Tests for month boundary helpers."""
+
+    def test_month_start_normalizes_to_naive_utc(self):
+        value = datetime(2024, 3, 1, 1, 30, tzinfo=timezone(timedelta(hours=5)))
+        assert month_start(value) == datetime(2024, 2, 1)
+
+    def test_add_months_crosses_years(self):
+        assert add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+        assert add_months(datetime(2024, 1, 1), -1) == datetime(2023, 12, 1)
+
+
+class TestPartitionBounds:
+    """Tests for partition DDL and bound parsing."""
+
+    def test_create_partition_sql_for_naive_timestamps(self):
+        sql = create_partition_sql(PARTITIONED_TABLES["audit_logs"], datetime(2024, 12, 17))
+        assert sql == (
+            "CREATE TABLE IF NOT EXISTS audit_logs_p2024_12 PARTITION OF audit_logs "
+            "FOR VALUES FROM ('2024-12-01 00:00:00') TO ('2025-01-01 00:00:00')"
+        )
+
+    def test_create_partition_sql_for_timezone_aware_timestamps(self):
+        sql = create_partition_sql(PARTITIONED_TABLES["metrics"], datetime(2024, 5, 2))
+        assert "FROM ('2024-05-01 00:00:00+00') TO ('2024-06-01 00:00:00+00')" in sql
+
+    def test_parse_partition_bound(self):
+        bound = "FOR VALUES FROM ('2024-05-01 00:00:00+00') TO ('2024-06-01 00:00:00+00')"
+        assert parse_partition_bound(bound) == (datetime(2024, 5, 1), datetime(2024, 6, 1))
+
+    def test_default_partition_has_no_bounds(self):
+        assert parse_partition_bound("DEFAULT") is None
+
+    def test_expired_partitions_only_includes_whole_months(self):
+        partitions = [_partition(2024, 1), _partition(2024, 2), _partition(2024, 3)]
+        expired = expired_partitions(partitions, datetime(2024, 3, 15))
+        assert [p.name for p in expired] == ["audit_logs_p2024_01", "audit_logs_p2024_02"]
+
+
+class TestPartitionManager:
+    """Tests for PartitionManager against a mocked PostgreSQL session."""
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_creates_missing_months(self):
+        session = _postgres_session(
+            rows=[("audit_logs_p2024_06", "FOR VALUES FROM ('2024-06-01 00:00:00') TO ('2024-07-01 00:00:00')", 10)]
+        )
+
+        created = await PartitionManager(months_ahead=2).ensure_partitions(
+            session, "audit_logs", now=datetime(2024, 6, 20)
+        )
+
+        assert created == ["audit_logs_p2024_07", "audit_logs_p2024_08"]
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_moves_rows_out_of_default(self):
+        session = _postgres_session(rows=[("audit_logs_default", "DEFAULT", 42)])
+        session.execute.return_value.scalar.return_value = True
+
+        created = await PartitionManager(months_ahead=0).ensure_partitions(
+            session, "audit_logs", now=datetime(2024, 6, 20)
+        )
+
+        in_range = (
+            "\"timestamp\" >= '2024-06-01 00:00:00' AND \"timestamp\" < '2024-07-01 00:00:00'"
+        )
+        assert created == ["audit_logs_p2024_06"]
+        assert _executed_sql(session)[1:] == [
+            f"SELECT EXISTS (SELECT 1 FROM audit_logs_default WHERE {in_range})",
+            "ALTER TABLE audit_logs DETACH PARTITION audit_logs_default",
+            create_partition_sql(PARTITIONED_TABLES["audit_logs"], datetime(2024, 6, 1)),
+            f"INSERT INTO audit_logs_p2024_06 SELECT * FROM audit_logs_default WHERE {in_range}",
+            f"DELETE FROM audit_logs_default WHERE {in_range}",
+            "ALTER TABLE audit_logs ATTACH PARTITION audit_logs_default DEFAULT",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_leaves_empty_default_attached(self):
+        session = _postgres_session(rows=[("audit_logs_default", "DEFAULT", 0)])
+        session.execute.return_value.scalar.return_value = False
+
+        await PartitionManager(months_ahead=0).ensure_partitions(
+            session, "audit_logs", now=datetime(2024, 6, 20)
+        )
+
+        assert _executed_sql(session)[2:] == [
+            create_partition_sql(PARTITIONED_TABLES["audit_logs"], datetime(2024, 6, 1))
+        ]
+
+    @pytest.mark.asyncio
+    async def test_expire_partitions_detaches_and_drops(self):
+        session = _postgres_session()
+        manager = PartitionManager()
+        manager.list_partitions = AsyncMock(
+            return_value=[_partition(2024, 1, rows=500), _partition(2024, 2)]
+        )
+
+        expired = await manager.expire_partitions(session, "audit_logs", datetime(2024, 2, 10))
+
+        assert [p.name for p in expired] == ["audit_logs_p2024_01"]
+        assert _executed_sql(session) == [
+            "ALTER TABLE audit_logs DETACH PARTITION audit_logs_p2024_01",
+            "DROP TABLE audit_logs_p2024_01",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_expire_partitions_can_detach_only(self):
+        session = _postgres_session()
+        manager = PartitionManager()
+        manager.list_partitions = AsyncMock(return_value=[_partition(2024, 1)])
+
+        await manager.expire_partitions(
+            session, "audit_logs", datetime(2024, 3, 1), detach_only=True
+        )
+
+        assert _executed_sql(session) == [
+            "ALTER TABLE audit_logs DETACH PARTITION audit_logs_p2024_01"
+        ]
+
+    def test_unknown_table_is_rejected(self):
+        with pytest.raises(ValueError):
+            PartitionManager.get_table("users")
+
+
+class TestAuditRetention:
+    """Tests for AuditService retention horizon."""
+
+    @pytest.mark.asyncio
+    async def test_retention_honours_longest_active_policy(self, monkeypatch):
+        from app.services import audit_service as audit_service_module
+
+        monkeypatch.setattr(audit_service_module.settings, "AUDIT_LOG_RETENTION_DAYS", 365)
+        session = MagicMock()
+        result = MagicMock()
+        result.scalar.return_value = 3650
+        session.execute = AsyncMock(return_value=result)
+
+        assert await AuditService(session).get_retention_days() == 3650
+
+        result.scalar.return_value = None
+        assert await AuditService(session).get_retention_days() == 365
+
+
+class TestPartitionMaintenanceService:
+    """Tests for locking and per-table isolation of maintenance cycles."""
+
+    @staticmethod
+    def _session_factory(locked=True):
+        sessions = []
+
+        def factory():
+            session = _postgres_session()
+            session.execute.return_value.scalar.return_value = locked
+            session.rollback = AsyncMock()
+            session.__aenter__ = AsyncMock(return_value=session)
+            session.__aexit__ = AsyncMock(return_value=False)
+            sessions.append(session)
+            return session
+
+        factory.sessions = sessions
+        return factory
+
+    @pytest.mark.asyncio
+    async def test_cycle_skipped_when_another_worker_holds_the_lock(self, monkeypatch):
+        factory = self._session_factory(locked=False)
+        maintain = AsyncMock()
+        monkeypatch.setattr(PartitionMaintenanceService, "_maintain_table", maintain)
+
+        summary = await PartitionMaintenanceService(session_factory=factory).run_maintenance()
+
+        assert summary == {}
+        maintain.assert_not_awaited()
+        assert _executed_sql(factory.sessions[0]) == ["SELECT pg_try_advisory_xact_lock(:key)"]
+
+    @pytest.mark.asyncio
+    async def test_failed_table_is_rolled_back_and_others_still_run(self, monkeypatch):
+        factory = self._session_factory()
+        monkeypatch.setattr(
+            maintenance_module.partition_manager, "is_partitioned", AsyncMock(return_value=True)
+        )
+
+        async def ensure_partitions(session, table):
+            if table == "audit_logs":
+                raise RuntimeError("default partition constraint would be violated")
+            return ["metrics_p2024_07"]
+
+        monkeypatch.setattr(maintenance_module.partition_manager, "ensure_partitions", ensure_partitions)
+        monkeypatch.setattr(
+            maintenance_module.partition_manager, "expire_partitions", AsyncMock(return_value=[])
+        )
+
+        summary = await PartitionMaintenanceService(session_factory=factory).run_maintenance()
+
+        assert "would be violated" in summary["audit_logs"]["error"]
+        assert summary["metrics"] == {"created": ["metrics_p2024_07"], "expired": []}
+        _, audit_session, metrics_session = factory.sessions
+        audit_session.rollback.assert_awaited_once()
+        metrics_session.rollback.assert_not_awaited()
@@ -0,0 +1,168 @@
+"""
+Tests for the pure ASGI middleware base and request context middleware
+"""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.types import Send
+
+from app.middleware.asgi import ASGIMiddleware, ResponseInfo
+from app.middleware.request_context import (
+    SECURITY_HEADERS,
+    RequestContextMiddleware,
+    SecurityHeadersMiddleware,
+)
+from app.utils.request_body import read_body
+
+
+class HeaderMiddleware(ASGIMiddleware):
+    """Adds a header and records the response it saw."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.seen = []
+
+    async def handle(self, request: Request, send: Send) -> None:
+        def add_header(response: ResponseInfo) -> None:
+            response.headers["X-Test"] = "1"
+
+        response = await self.call_next(request, send, ResponseInfo(on_start=add_header))
+        self.seen.append((response.status_code, response.media_type))
+
+
+class BodyReadingMiddleware(ASGIMiddleware):
+    """Reads the body before the app, like the security middleware does."""
+
+    async def handle(self, request: Request, send: Send) -> None:
+        body = await read_body(request)
+        request.state.body_length = len(body)
+        await self.call_next(request, send)
+
+
+class ErrorHandlingMiddleware(ASGIMiddleware):
+    """Answers errors with a 500 unless the response has started."""
+
+    async def handle(self, request: Request, send: Send) -> None:
+        from fastapi.responses import JSONResponse
+
+        response = ResponseInfo()
+        try:
+            await self.call_next(request, send, response)
+        except RuntimeError:
+            if response.started:
+                raise
+            await self.send_response(
+                request, send, JSONResponse(status_code=500, content={"error": "boom"})
+            )
+
+
+def make_app(*middleware):
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items():
+        return {"items": []}
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        payload = await request.json()
+        return {"payload": payload, "seen": request.state.body_length}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"first,"
+            yield b"second"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/fail")
+    async def fail():
+        raise RuntimeError("failed before start")
+
+    @app.get("/fail-streaming")
+    async def fail_streaming():
+        async def chunks():
+            yield b"partial"
+            raise RuntimeError("failed after start")
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    for cls in middleware:
+        app.add_middleware(cls)
+    return app
+
+
+class TestASGIMiddleware:
+    """Test the ASGIMiddleware base class."""
+
+    def test_headers_added_on_start(self):
+        app = make_app(HeaderMiddleware)
+        client = TestClient(app)
+
+        response = client.get("/items")
+
+        assert response.status_code == 200
+        assert response.headers["X-Test"] == "1"
+        assert response.json() == {"items": []}
+
+    def test_response_info_collected(self):
+        app = make_app(HeaderMiddleware)
+        client = TestClient(app)
+        client.get("/items")
+
+        middleware = app.middleware_stack
+        while not isinstance(middleware, HeaderMiddleware):
+            middleware = middleware.app
+        assert middleware.seen == [(200, "application/json")]
+
+    def test_streaming_response_passed_through(self):
+        app = make_app(HeaderMiddleware)
+        client = TestClient(app)
+
+        response = client.get("/stream")
+
+        assert response.text == "first,second"
+        assert response.headers["X-Test"] == "1"
+
+    def test_body_read_by_middleware_replayed_downstream(self):
+        app = make_app(BodyReadingMiddleware)
+        client = TestClient(app)
+
+        response = client.post("/echo", json={"name": "web-1"})
+
+        assert response.status_code == 200
+        assert response.json() == {"payload": {"name": "web-1"}, "seen": 16}
+
+    def test_error_before_start_answered(self):
+        app = make_app(ErrorHandlingMiddleware)
+        client = TestClient(app)
+
+        response = client.get("/fail")
+
+        assert response.status_code == 500
+        assert response.json() == {"error": "boom"}
+
+    def test_error_after_start_propagates(self):
+        app = make_app(ErrorHandlingMiddleware)
+        client = TestClient(app)
+
+        with pytest.raises(RuntimeError, match="failed after start"):
+            client.get("/fail-streaming")
+
+
+class TestRequestContextMiddleware:
+    """Test the request ID, timing and security header middleware."""
+
+    def test_request_context_headers(self):
+        app = make_app(SecurityHeadersMiddleware, RequestContextMiddleware)
+        client = TestClient(app)
+
+        response = client.get("/items")
+
+        assert response.status_code == 200
+        assert len(response.headers["X-Request-ID"]) == 36
+        assert float(response.headers["X-Process-Time"]) >= 0
+        for name, value in SECURITY_HEADERS.items():
+            assert response.headers[name] == value
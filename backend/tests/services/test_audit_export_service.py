@@ -0,0 +1,158 @@
+"""
+Tests for streamed audit log exports.
+"""
+
+import csv
+import gzip
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.audit_log import AuditLog
+from app.services.audit_export_service import XLSX_MAX_ROWS, AuditExportService
+from app.services.audit_service import AuditService
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: AuditLog.__table__.create(sync_conn))
+        # Several rows share a timestamp so the keyset must break ties on id
+        await conn.execute(
+            insert(AuditLog.__table__),
+            [
+                {
+                    "id": i,
+                    "event_type": "login_success" if i % 3 else "login_failure",
+                    "event_category": "authentication",
+                    "level": "info",
+                    "message": f"event {i}",
+                    "user_email": f"user{i % 4}@example.com",
+                    "organization_id": "org-1" if i % 2 else "org-2",
+                    "event_metadata": {"seq": i},
+                    "tags": ["auth"],
+                    "success": bool(i % 3),
+                    "timestamp": BASE_TIME + timedelta(minutes=i // 2),
+                }
+                for i in range(1, 26)
+            ],
+        )
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _export(session_factory, format, filters=None, **kwargs):
+    async with session_factory() as session:
+        service = AuditExportService(
+            AuditService(session), session_factory=session_factory, batch_size=4
+        )
+        response = await service.export_logs(format, filters or {}, **kwargs)
+    chunks = [chunk async for chunk in response.body_iterator]
+    return response, chunks
+
+
+class TestKeysetBatches:
+    """Tests for AuditService.iter_audit_log_batches."""
+
+    @pytest.mark.asyncio
+    async def test_batches_cover_all_rows_newest_first(self, session_factory):
+        async with session_factory() as session:
+            service = AuditService(session)
+            batches = [b async for b in service.iter_audit_log_batches(batch_size=4)]
+
+        ids = [row.id for batch in batches for row in batch]
+        assert len(ids) == 25
+        assert len(set(ids)) == 25
+        assert ids == sorted(ids, reverse=True)
+        assert max(len(batch) for batch in batches) == 4
+
+    @pytest.mark.asyncio
+    async def test_filters_and_max_records(self, session_factory):
+        async with session_factory() as session:
+            service = AuditService(session)
+            batches = [
+                b
+                async for b in service.iter_audit_log_batches(
+                    batch_size=4, max_records=6, organization_id="org-1"
+                )
+            ]
+
+        rows = [row for batch in batches for row in batch]
+        assert len(rows) == 6
+        assert all(row.organization_id == "org-1" for row in rows)
+
+
+class TestStreamedExport:
+    """Tests for AuditExportService.export_logs."""
+
+    @pytest.mark.asyncio
+    async def test_csv_is_streamed_per_batch(self, session_factory):
+        response, chunks = await _export(session_factory, "csv")
+
+        # Header chunk plus one chunk per batch of four rows
+        assert len(chunks) == 1 + 7
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        assert rows[0][0] == "ID"
+        assert len(rows) == 26
+        assert json.loads(rows[1][23]) == {"seq": 25}
+        assert "filename=audit_logs_" in response.headers["content-disposition"]
+
+    @pytest.mark.asyncio
+    async def test_json_array_is_valid(self, session_factory):
+        _, chunks = await _export(session_factory, "json", {"success": False})
+
+        document = json.loads(b"".join(chunks))
+        assert document["export_info"]["format"] == "json"
+        assert len(document["audit_logs"]) == 8
+        assert document["export_summary"]["total_records"] == 8
+        assert all(log["success"] is False for log in document["audit_logs"])
+
+    @pytest.mark.asyncio
+    async def test_ndjson_with_gzip(self, session_factory):
+        response, chunks = await _export(
+            session_factory, "ndjson", max_records=10, compress=True
+        )
+
+        lines = gzip.decompress(b"".join(chunks)).decode("utf-8").splitlines()
+        assert len(lines) == 10
+        assert json.loads(lines[0])["id"] == 25
+        assert response.media_type == "application/gzip"
+        assert response.headers["content-disposition"].endswith(".ndjson.gz")
+
+    @pytest.mark.asyncio
+    async def test_zip_contains_all_formats(self, session_factory):
+        _, chunks = await _export(session_factory, "zip")
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        names = archive.namelist()
+        assert any(name.endswith(".csv") for name in names)
+        assert any(name.endswith(".xlsx") for name in names)
+        json_name = next(name for name in names if name.endswith(".json") and name != "export_metadata.json")
+        assert len(json.loads(archive.read(json_name))["audit_logs"]) == 25
+        metadata = json.loads(archive.read("export_metadata.json"))
+        assert metadata["export_info"]["total_records"] == 25
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("format", ["xlsx", "zip"])
+    async def test_xlsx_limited_to_one_worksheet(self, session_factory, format):
+        with pytest.raises(HTTPException) as exc_info:
+            await _export(session_factory, format, max_records=XLSX_MAX_ROWS)
+        assert exc_info.value.status_code == 400
+
+        response, _ = await _export(session_factory, format, max_records=XLSX_MAX_ROWS - 1)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_no_matching_logs_raises_404(self, session_factory):
+        with pytest.raises(HTTPException) as exc_info:
+            await _export(session_factory, "csv", {"user_email": "nobody@example.com"})
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,165 @@
+"""
+Tests for audit log cursor pagination, counts and search conditions.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import and_, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.audit_log import AuditLog
+from app.services import audit_service as audit_service_module
+from app.services.audit_service import (
+    AUDIT_SEARCH_DOCUMENT,
+    AuditService,
+    decode_cursor,
+    encode_cursor,
+)
+
+BASE_TIME = datetime(2024, 3, 1, 8, 0, 0)
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: AuditLog.__table__.create(sync_conn))
+        await conn.execute(
+            insert(AuditLog.__table__),
+            [
+                {
+                    "id": i,
+                    "event_type": "user_updated",
+                    "event_category": "user_management",
+                    "level": "info",
+                    "message": f"update {i}",
+                    "success": i % 2 == 0,
+                    "timestamp": BASE_TIME + timedelta(seconds=i // 3),
+                }
+                for i in range(1, 31)
+            ],
+        )
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+def _compile(conditions) -> str:
+    return str(
+        select(AuditLog.__table__.c.id)
+        .where(and_(*conditions))
+        .compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+
+class TestCursor:
+    """Tests for cursor encoding."""
+
+    def test_round_trip(self):
+        timestamp = datetime(2024, 5, 4, 3, 2, 1, 123456)
+        cursor = encode_cursor(timestamp, 987)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (timestamp, 987)
+
+    def test_invalid_cursor_raises(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestKeysetWalk:
+    """Walking all rows by (timestamp, id) position."""
+
+    @pytest.mark.asyncio
+    async def test_keyset_condition_visits_every_row_once(self, session):
+        seen = []
+        position = None
+        while True:
+            query = select(AuditLog.__table__)
+            if position is not None:
+                query = query.where(AuditService._keyset_condition(position))
+            query = query.order_by(
+                AuditLog.timestamp.desc(), AuditLog.id.desc()
+            ).limit(7)
+            rows = (await session.execute(query)).all()
+            if not rows:
+                break
+            seen.extend(row.id for row in rows)
+            position = decode_cursor(encode_cursor(rows[-1].timestamp, rows[-1].id))
+
+        assert seen == list(range(30, 0, -1))
+
+
+class TestCounts:
+    """Tests for AuditService.count_audit_logs."""
+
+    @pytest.mark.asyncio
+    async def test_exact_count_outside_postgres(self, session):
+        service = AuditService(session)
+        conditions = service._build_filter_conditions(success=True)
+
+        total, is_estimate = await service.count_audit_logs(conditions)
+
+        assert total == 15
+        assert is_estimate is False
+
+    @pytest.mark.asyncio
+    async def test_large_estimate_skips_exact_count(self):
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "postgresql"
+        session.execute = AsyncMock()
+        service = AuditService(session)
+        service._estimate_rows = AsyncMock(return_value=48_000_000)
+
+        total, is_estimate = await service.count_audit_logs([])
+
+        assert (total, is_estimate) == (48_000_000, True)
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_small_estimate_falls_back_to_exact(self):
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "postgresql"
+        result = MagicMock()
+        result.scalar.return_value = 42
+        session.execute = AsyncMock(return_value=result)
+        service = AuditService(session)
+        service._estimate_rows = AsyncMock(
+            return_value=audit_service_module.EXACT_COUNT_THRESHOLD - 1
+        )
+
+        total, is_estimate = await service.count_audit_logs([])
+
+        assert (total, is_estimate) == (42, False)
+
+    @pytest.mark.asyncio
+    async def test_failed_estimate_leaves_session_usable(self, session):
+        service = AuditService(session)
+
+        # SQLite rejects EXPLAIN (FORMAT JSON); only the savepoint is rolled back
+        assert await service._estimate_rows([]) is None
+        assert not session.in_nested_transaction()
+
+        total, is_estimate = await service.count_audit_logs([], exact=True)
+        assert (total, is_estimate) == (30, False)
+
+
+class TestSearchConditions:
+    """Tests for substring and full-text search conditions."""
+
+    def test_substring_search_uses_ilike(self):
+        sql = _compile(AuditService._build_filter_conditions(search_query="deploy"))
+        assert sql.count(" ILIKE ") == 4
+        assert "deploy" in sql
+
+    def test_fulltext_search_matches_index_expression(self):
+        sql = _compile(
+            AuditService._build_filter_conditions(
+                search_query="failed login", search_mode="fulltext"
+            )
+        )
+        assert AUDIT_SEARCH_DOCUMENT in sql
+        assert "websearch_to_tsquery('simple'::regconfig, 'failed login')" in sql
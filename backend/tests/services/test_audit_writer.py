@@ -0,0 +1,190 @@
+"""
+Tests for the buffered, batched audit log writer.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.audit_log import AuditEventType, AuditLog
+from app.services.audit_service import AuditService
+from app.services.audit_writer import AuditLogWriter
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: AuditLog.__table__.create(sync_conn))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class FailingSessionFactory:
+    """Session factory whose sessions fail to write, simulating an outage."""
+
+    def __call__(self):
+        raise ConnectionError("database unavailable")
+
+
+def _event(i: int) -> dict:
+    return AuditService.build_event_record(
+        event_type=AuditEventType.SENSITIVE_DATA_ACCESS,
+        message=f"GET /api/v1/items/{i} - 200",
+        request_id=f"req-{i}",
+        metadata={"i": i},
+    )
+
+
+async def _count(session_factory) -> int:
+    async with session_factory() as session:
+        result = await session.execute(select(func.count()).select_from(AuditLog.__table__))
+        return result.scalar()
+
+
+class TestAuditLogWriter:
+    """Tests for AuditLogWriter."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_full_batches_and_drains_on_stop(self, session_factory):
+        writer = AuditLogWriter(
+            batch_size=10,
+            flush_interval=60,
+            session_factory=session_factory,
+            check_alerts=False,
+        )
+        await writer.start()
+
+        for i in range(25):
+            assert writer.enqueue(_event(i))
+        # Two full batches are written without waiting for the interval
+        for _ in range(50):
+            if writer.stats["written"] >= 20:
+                break
+            await asyncio.sleep(0.01)
+        assert writer.stats["written"] == 20
+        assert writer.queue_depth == 5
+
+        await writer.stop()
+        assert await _count(session_factory) == 25
+        assert writer.get_stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushed_after_interval(self, session_factory):
+        writer = AuditLogWriter(
+            batch_size=100,
+            flush_interval=0.05,
+            session_factory=session_factory,
+            check_alerts=False,
+        )
+        await writer.start()
+        writer.enqueue(_event(1))
+
+        await asyncio.sleep(0.3)
+        assert await _count(session_factory) == 1
+
+        async with session_factory() as session:
+            row = (await session.execute(select(AuditLog.__table__))).one()
+        assert row.event_type == AuditEventType.SENSITIVE_DATA_ACCESS.value
+        assert row.event_category == "data"
+        assert row.event_metadata == {"i": 1}
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_overflow_spills_and_replays(self, session_factory, tmp_path):
+        spill_path = str(tmp_path / "audit-spill.jsonl")
+        writer = AuditLogWriter(
+            max_queue_size=3,
+            batch_size=10,
+            flush_interval=60,
+            spill_path=spill_path,
+            session_factory=session_factory,
+            check_alerts=False,
+        )
+
+        # Not started: the queue fills and the overflow goes to disk
+        results = [writer.enqueue(_event(i)) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert writer.stats["spilled"] == 2
+
+        await writer.start()
+        await writer.stop()
+
+        assert await _count(session_factory) == 5
+        assert writer.stats["replayed"] == 2
+        assert not (tmp_path / "audit-spill.jsonl").exists()
+
+    @pytest.mark.asyncio
+    async def test_replay_quarantines_malformed_lines(self, session_factory, tmp_path):
+        spill_path = tmp_path / "audit-spill.jsonl"
+        writer = AuditLogWriter(
+            max_queue_size=1,
+            batch_size=10,
+            flush_interval=60,
+            spill_path=str(spill_path),
+            session_factory=session_factory,
+            check_alerts=False,
+        )
+        for i in range(3):
+            writer.enqueue(_event(i))
+        # A torn write from a crashed worker, between two valid events
+        with open(spill_path, "r+", encoding="utf-8") as spill_file:
+            lines = spill_file.readlines()
+            spill_file.seek(0)
+            spill_file.writelines([lines[0], '{"event_type": "sensitive_data\n', lines[1]])
+            spill_file.truncate()
+
+        await writer.start()
+        await writer.stop()
+
+        assert await _count(session_factory) == 3
+        assert writer.stats["replayed"] == 2
+        assert writer.stats["rejected"] == 1
+        assert (tmp_path / "audit-spill.jsonl.rejected").read_text().startswith('{"event_type"')
+        assert not spill_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_replay_skipped_while_another_process_holds_the_lock(
+        self, session_factory, tmp_path
+    ):
+        import fcntl
+
+        spill_path = tmp_path / "audit-spill.jsonl"
+        writer = AuditLogWriter(
+            max_queue_size=0,
+            batch_size=10,
+            flush_interval=60,
+            spill_path=str(spill_path),
+            session_factory=session_factory,
+            check_alerts=False,
+        )
+        writer.enqueue(_event(1))
+
+        with open(f"{spill_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            await writer._replay_spill()
+            assert writer.stats["replayed"] == 0
+            assert spill_path.exists()
+
+        await writer._replay_spill()
+        assert writer.stats["replayed"] == 1
+        assert await _count(session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_dropped_without_spill(self):
+        writer = AuditLogWriter(
+            batch_size=5,
+            flush_interval=60,
+            overflow_policy="drop",
+            session_factory=FailingSessionFactory(),
+            check_alerts=False,
+        )
+        for i in range(3):
+            writer.enqueue(_event(i))
+
+        await writer.stop()
+
+        assert writer.stats["dropped"] == 3
+        assert writer.stats["failed_batches"] == 1
@@ -0,0 +1,195 @@
+"""
+Tests for the materialized effective permission index
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.auth_context import ALL_PERMISSIONS, AuthContextCache, permission_mask
+from app.models.role import PermissionType
+from app.services.effective_permission_index import (
+    EffectivePermissionIndex,
+    effective_mask,
+    grants_valid_until,
+)
+
+
+def make_db(*results):
+    db = Mock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+def first_result(row):
+    result = Mock()
+    result.first.return_value = row
+    return result
+
+
+def all_result(rows):
+    result = Mock()
+    result.all.return_value = rows
+    return result
+
+
+class StoreSessions:
+    """Session factory recording the sessions computed rows are stored with."""
+
+    def __init__(self):
+        self.sessions = []
+        self.error = None
+
+    def __call__(self):
+        session = make_db(self.error or Mock())
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        self.sessions.append(session)
+        return session
+
+
+@pytest.fixture
+def store_sessions():
+    return StoreSessions()
+
+
+@pytest.fixture
+def index(store_sessions):
+    return EffectivePermissionIndex(AuthContextCache(), session_factory=store_sessions)
+
+
+class TestEffectiveMask:
+    """Test organization scoping of grants."""
+
+    def test_grants_scoped_to_organization(self):
+        grants = [
+            (None, "view_users", None),
+            (3, "manage_users", None),
+            (4, "manage_roles", None),
+            (None, "manage_teams", 4),
+        ]
+
+        assert effective_mask(grants, 3) == permission_mask(
+            [PermissionType.VIEW_USERS, PermissionType.MANAGE_USERS]
+        )
+        assert effective_mask(grants, None) == permission_mask([PermissionType.VIEW_USERS])
+
+    def test_valid_until_is_earliest_applicable_expiry(self):
+        soon = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        later = soon + timedelta(days=1)
+        grants = [
+            (None, "view_users", None),
+            (3, "manage_users", None),
+            (4, "manage_roles", None),
+        ]
+
+        assert grants_valid_until(grants, [later, None, soon], 3) == later
+        assert grants_valid_until(grants, [later, None, soon], 4) == soon
+        assert grants_valid_until(grants, [None, None, None], 3) is None
+
+
+class TestEffectivePermissionIndex:
+    """Test lookups and refreshes of the index."""
+
+    @pytest.mark.asyncio
+    async def test_stored_row_read_once(self, index):
+        db = make_db(first_result((False, ["view_users"], None)))
+
+        assert await index.get_mask(db, 7, 3) == permission_mask([PermissionType.VIEW_USERS])
+        assert await index.get_mask(db, 7, 3) == permission_mask([PermissionType.VIEW_USERS])
+        db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_superuser_has_all_permissions(self, index):
+        db = make_db(first_result((True, None, None)))
+
+        assert await index.get_mask(db, 7, None) == ALL_PERMISSIONS
+
+    @pytest.mark.asyncio
+    async def test_missing_row_computed_and_stored(self, index, store_sessions):
+        db = make_db(
+            first_result((False, None, None)),
+            all_result([(7, None, "view_users", None, None), (7, 4, "manage_users", None, None)]),
+        )
+
+        assert await index.get_mask(db, 7, 3) == permission_mask([PermissionType.VIEW_USERS])
+        assert db.execute.await_count == 2
+        # The caller's request session is left alone
+        db.commit.assert_not_awaited()
+        db.rollback.assert_not_awaited()
+        (store,) = store_sessions.sessions
+        store.execute.assert_awaited_once()
+        store.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_expiring_grant_bounds_stored_row(self, index, store_sessions):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=20)
+        db = make_db(
+            first_result((False, None, None)),
+            all_result([(7, 3, "manage_users", None, expires_at), (7, None, "view_users", None, None)]),
+        )
+
+        assert await index.get_mask(db, 7, 3) == permission_mask(
+            [PermissionType.VIEW_USERS, PermissionType.MANAGE_USERS]
+        )
+
+        # Stored rows past valid_until read as missing and are recomputed
+        lookup = str(db.execute.await_args_list[0].args[0].compile())
+        assert "valid_until IS NULL OR user_effective_permissions.valid_until > now()" in lookup
+        stored = store_sessions.sessions[0].execute.await_args.args[0].compile().params
+        assert stored["valid_until_m0"] == expires_at
+        # The cached mask does not outlive the grant either
+        _, cached_until = index.cache._permissions[(7, 3)]
+        assert cached_until <= time.monotonic() + 20
+
+    @pytest.mark.asyncio
+    async def test_failed_store_does_not_roll_back_caller(self, index, store_sessions):
+        db = make_db(
+            first_result((False, None, None)),
+            all_result([(7, None, "view_users", None, None)]),
+        )
+        store_sessions.error = RuntimeError("connection reset")
+
+        assert await index.get_mask(db, 7, 3) == permission_mask([PermissionType.VIEW_USERS])
+        db.rollback.assert_not_awaited()
+        store_sessions.sessions[0].rollback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_check_permissions(self, index):
+        index.cache.put_permissions(7, 3, permission_mask([PermissionType.VIEW_USERS]))
+
+        checks = await index.check_permissions(
+            Mock(), 7, [PermissionType.VIEW_USERS, "manage_users"], 3
+        )
+
+        assert checks == {"view_users": True, "manage_users": False}
+
+    @pytest.mark.asyncio
+    async def test_refresh_users_recomputes_stored_scopes(self, index, store_sessions):
+        index.cache.put_permissions(7, 3, ALL_PERMISSIONS)
+        index.cache.put_permissions(8, 3, ALL_PERMISSIONS)
+        db = make_db(
+            all_result([(7, 3), (7, 0)]),
+            all_result([(7, 3, "view_users", None, None)]),
+        )
+
+        await index.refresh_users(db, [7])
+
+        assert index.cache.get_permissions(7, 3) is None
+        assert index.cache.get_permissions(8, 3) == ALL_PERMISSIONS
+        stored = store_sessions.sessions[0].execute.await_args.args[0].compile().params
+        assert stored["permissions_m0"] == ["view_users"]
+        assert stored["permissions_m1"] == []
+
+    @pytest.mark.asyncio
+    async def test_refresh_all_clears_cache(self, index):
+        index.cache.put_permissions(7, 3, ALL_PERMISSIONS)
+        db = make_db(Mock())
+
+        await index.refresh_all(db)
+
+        assert index.cache.get_permissions(7, 3) is None
+        db.commit.assert_awaited_once()
@@ -0,0 +1,211 @@
+"""
+Tests for the team dashboard snapshot service.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.team_dashboard_service import TeamDashboardService
+
+
+class FakeCacheManager:
+    """Minimal in-memory stand-in for EnhancedCacheManager."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key, data_type=None):
+        return self.data.get(key)
+
+    async def set(self, key, data, data_type=None, ttl=None, cache_levels=None, tags=None):
+        self.data[key] = data
+        return True
+
+
+@pytest.fixture
+def cache_manager():
+    manager = FakeCacheManager()
+    with patch(
+        "app.services.team_dashboard_service.get_cache_manager",
+        AsyncMock(return_value=manager),
+    ):
+        yield manager
+
+
+def _snapshot(team_id, period_days):
+    return {
+        "team_id": team_id,
+        "period_days": period_days,
+        "generated_at": datetime.utcnow().isoformat(),
+        "members": [],
+        "projects": [],
+        "activity_metrics": {},
+        "performance_metrics": {},
+        "collaboration_metrics": {},
+        "section_timings": {"total": 1.0},
+        "cached": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_cached_per_team_and_period(cache_manager):
+    service = TeamDashboardService()
+    service.build_snapshot = AsyncMock(side_effect=_snapshot)
+
+    first = await service.get_snapshot(1, 30)
+    second = await service.get_snapshot(1, 30)
+    other_period = await service.get_snapshot(1, 7)
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert other_period["cached"] is False
+    assert service.build_snapshot.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bumps_generation(cache_manager):
+    service = TeamDashboardService()
+    service.build_snapshot = AsyncMock(side_effect=_snapshot)
+
+    await service.get_snapshot(1, 30)
+    await service.invalidate_team(1)
+    refreshed = await service.get_snapshot(1, 30)
+
+    assert refreshed["cached"] is False
+    assert service.build_snapshot.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_build(cache_manager):
+    service = TeamDashboardService()
+
+    async def slow_build(team_id, period_days):
+        await asyncio.sleep(0.01)
+        return _snapshot(team_id, period_days)
+
+    service.build_snapshot = AsyncMock(side_effect=slow_build)
+
+    results = await asyncio.gather(*(service.get_snapshot(1, 30) for _ in range(5)))
+
+    assert service.build_snapshot.await_count == 1
+    assert all(result["team_id"] == 1 for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_build(cache_manager):
+    service = TeamDashboardService()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_build(team_id, period_days):
+        started.set()
+        await release.wait()
+        return _snapshot(team_id, period_days)
+
+    service.build_snapshot = AsyncMock(side_effect=slow_build)
+
+    first = asyncio.create_task(service.get_snapshot(1, 30))
+    await started.wait()
+    waiter = asyncio.create_task(service.get_snapshot(1, 30))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    result = await asyncio.wait_for(waiter, timeout=1)
+
+    assert result["team_id"] == 1
+    assert first.cancelled()
+    assert service.build_snapshot.await_count == 1
+    assert list(cache_manager.data.values()) == [result]
+    assert not service._inflight
+
+
+@pytest.mark.asyncio
+async def test_sections_run_concurrently_on_separate_sessions():
+    opened = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            opened.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    service = TeamDashboardService(session_factory=FakeSession)
+
+    async def section(session, *args):
+        await asyncio.sleep(0.05)
+        return []
+
+    async def activity(session, *args):
+        await asyncio.sleep(0.05)
+        return {}
+
+    service._members_section = section
+    service._projects_section = section
+    service._activity_section = activity
+    service._collaboration_section = activity
+
+    snapshot = await service.build_snapshot(1, 30)
+
+    assert len(opened) == 4
+    assert set(snapshot["section_timings"]) == {
+        "members", "projects", "activity", "collaboration", "total"
+    }
+    # Four 50ms sections finish in roughly the time of one
+    assert snapshot["section_timings"]["total"] < 150
+
+
+@pytest.mark.asyncio
+async def test_activity_section_counts_previous_period_only():
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    import app.models.push_token  # noqa: F401  (User maps a relationship to it)
+    from app.models.audit_log import AuditLog
+
+    end_date = datetime(2024, 3, 31, 12, 0, 0)
+    start_date = end_date - timedelta(days=7)
+    previous_start_date = start_date - timedelta(days=7)
+    # Three events in the period, two in the previous period and four older
+    # ones that fall inside the month window but not the previous period
+    ages = [1, 2, 3, 8, 10, 20, 22, 25, 29]
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: AuditLog.__table__.create(sync_conn))
+        await conn.execute(
+            insert(AuditLog.__table__),
+            [
+                {
+                    "id": i,
+                    "event_type": "project_updated",
+                    "event_category": "project_management",
+                    "level": "info",
+                    "message": f"event {i}",
+                    "team_id": "1",
+                    "success": True,
+                    "timestamp": end_date - timedelta(days=age),
+                }
+                for i, age in enumerate(ages, start=1)
+            ],
+        )
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with factory() as session:
+            activity = await TeamDashboardService()._activity_section(
+                session, 1, start_date, end_date, previous_start_date
+            )
+    finally:
+        await engine.dispose()
+
+    assert activity["total_activities"] == 3
+    assert activity["activities_this_month"] == 9
+    assert activity["activity_trend"] == 50.0
+    assert activity["top_activity_types"] == {"project_updated": 3}
@@ -45,7 +45,10 @@ class TestKubernetesMonitoringService:
         Returns:
             KubernetesMonitoringService: Service instance for testing
         """
-        return KubernetesMonitoringService(prometheus_url="http://test-prometheus:9090")
+        service = KubernetesMonitoringService(prometheus_url="http://test-prometheus:9090")
+        # The Prometheus client and its query cache are shared between instances
+        service.prometheus.cache.clear()
+        return service
 
     @pytest.fixture
     def sample_cluster(self, test_project):
@@ -517,16 +520,33 @@ class TestKubernetesMonitoringService:
         db_session.add_all([cluster1, cluster2])
         db_session.commit()
 
-        with patch.object(monitoring_service, "update_cluster_status") as mock_update:
-            mock_update.return_value = cluster1
+        metrics = {
+            "cluster-1": {
+                "node": {"total_nodes": 3, "ready_nodes": 3, "not_ready_nodes": 0},
+                "pod": {"total_pods": 10, "running_pods": 10},
+                "resource": {},
+                "workload": {"namespaces": 4},
+            }
+        }
 
+        with (
+            patch(
+                "app.services.kubernetes_service.ClusterService.get_clusters_by_project",
+                new=AsyncMock(return_value=[cluster1, cluster2]),
+            ),
+            patch.object(
+                monitoring_service, "get_clusters_metrics", return_value=metrics
+            ) as mock_metrics,
+        ):
             results = await monitoring_service.monitor_all_clusters(
                 db_session, test_project.id, test_user.id
             )
 
-            # Only monitoring-enabled cluster should be updated
-            assert len(results) == 1
-            mock_update.assert_called_once()
+            # Only monitoring-enabled cluster should be queried and updated
+            assert results == [cluster1]
+            mock_metrics.assert_called_once_with(["cluster-1"])
+            assert cluster1.total_nodes == 3
+            assert cluster1.total_namespaces == 4
 
     @pytest.mark.asyncio
     async def test_prometheus_query_edge_cases(self, monitoring_service):
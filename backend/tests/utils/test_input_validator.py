@@ -0,0 +1,127 @@
+"""
+Tests for the prefiltered threat scanner in InputValidator.
+"""
+
+import pytest
+
+from app.utils.input_validator import InputValidator, _required_literal
+
+ATTACKS = [
+    "<script>alert(1)</script>",
+    "<IFRAME src=x>",
+    "javascript:alert(1)",
+    "img onerror = steal()",
+    "1 UNION SELECT password FROM users",
+    "x' or '1'='1",
+    "id=1 or 1=1",
+    "name; DROP TABLE users; --",
+    "a; cat /etc/passwd",
+    "$(whoami)",
+    "`id`",
+    "foo && rm -rf /",
+    "../../etc/passwd",
+    "..\\..\\windows",
+    "%2e%2e%2fsecret",
+    "*)(uid=*))(|(uid=*)",
+    "(&(objectClass=*))",
+]
+
+
+def _pattern_by_pattern(validator: InputValidator, value: str):
+    """Threats found by running every pattern, as the scanner must report them."""
+    threats = []
+    for label, patterns in [
+        ("XSS", validator.xss_regex),
+        ("SQL injection", validator.sql_regex),
+        ("Command injection", validator.cmd_regex),
+        ("Path traversal", validator.path_regex),
+        ("LDAP injection", validator.ldap_regex),
+    ]:
+        found = tuple(p.pattern for p in patterns if p.search(value))
+        if found:
+            threats.append((label, found))
+    return tuple(threats)
+
+
+class TestRequiredLiteral:
+    """Tests for literal extraction used by the prefilter."""
+
+    @pytest.mark.parametrize(
+        "pattern,literal",
+        [
+            (r"<script[^>]*>.*?</script>", "</script>"),
+            (r"\bselect\s+.*\bfrom\b", "select"),
+            (r"\.\./+", "../"),
+            (r"..%2f", "%2f"),
+            (r"\$\(.*\)", "$("),
+            (r"a|b", ""),
+            (r"x(abc)?y", ""),
+        ],
+    )
+    def test_extracts_longest_required_literal(self, pattern, literal):
+        assert _required_literal(pattern) == literal
+
+    def test_literal_occurs_in_every_attack_match(self):
+        validator = InputValidator()
+        for _, scanners in validator._threat_scanners:
+            for literal, regex in scanners:
+                for value in ATTACKS:
+                    match = regex.search(value)
+                    if match:
+                        assert literal in match.group(0).lower(), regex.pattern
+
+
+class TestThreatScanner:
+    """Tests for InputValidator.detect_threats and validate_string."""
+
+    @pytest.mark.parametrize("value", ATTACKS + ["deploy failed on staging", "{\"a\": 1}"])
+    def test_matches_pattern_by_pattern_scan(self, value):
+        validator = InputValidator()
+        assert validator.detect_threats(value) == _pattern_by_pattern(validator, value)
+
+    @pytest.mark.parametrize("value", ATTACKS)
+    def test_attacks_are_rejected(self, value):
+        assert not InputValidator().validate_string(value, "q").is_valid
+
+    def test_non_ascii_input_bypasses_prefilter(self):
+        # U+017F folds to 's' under re.IGNORECASE but not under str.lower()
+        result = InputValidator().validate_string("ſelect * from users", "q")
+        assert not result.is_valid
+        assert "SQL injection" in result.errors[0]
+
+    def test_safe_values_skip_scan(self):
+        validator = InputValidator()
+        validator._find_threats = None  # would fail if called
+
+        result = validator.validate_string("prod-eu-west-1.svc@team_42", "q")
+
+        assert result.is_valid
+        assert result.sanitized_value == "prod-eu-west-1.svc@team_42"
+
+    def test_verdicts_are_memoized(self):
+        validator = InputValidator()
+        for _ in range(3):
+            validator.validate_string("deploy failed on staging", "q")
+
+        info = validator._cached_threats.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+    def test_error_messages_keep_reporting_order(self):
+        result = InputValidator({"strict_mode": False}).validate_string(
+            "<script>x</script>; ls", "q"
+        )
+        assert [error.split(":")[1].strip() for error in result.errors] == [
+            "XSS patterns detected",
+            "Command injection patterns detected",
+        ]
+
+    def test_json_body_is_validated_without_sanitizing(self):
+        validator = InputValidator()
+        validator._sanitize_string = None  # would fail if called
+
+        result = validator.validate_json('{"title": "Deploy <b>ok</b> & done"}')
+
+        assert not result.is_valid  # '& done' matches the command pattern
+        assert validator.validate_json('{"title": "Deploy ok"}').sanitized_value == {
+            "title": "Deploy ok"
+        }
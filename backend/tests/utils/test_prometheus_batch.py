@@ -0,0 +1,231 @@
+"""
+Tests for batched multi-cluster Prometheus queries.
+"""
+
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from app.utils.prometheus_batch import (
+    ClusterQueryPlanner,
+    batch_cluster_query,
+    cluster_regex,
+    split_by_cluster,
+)
+from app.utils.prometheus_client import EnhancedPrometheusClient, PrometheusConfig
+from app.utils.prometheus_queries import KubernetesQueryTemplates
+
+CLUSTERS = ["prod-east", "prod-west", "staging"]
+CLUSTER_MATCHER = re.compile(r'cluster(=~?)"((?:[^"\\]|\\.)*)"')
+
+TEMPLATES = {
+    "ready_nodes": 'kube_node_status_condition{{cluster="{cluster}", condition="Ready", status="true"}}',
+    "cpu_allocatable": 'sum(kube_node_status_allocatable{{cluster="{cluster}", resource="cpu"}})',
+    "cpu_usage": '100 - (avg(irate(node_cpu_seconds_total{{mode="idle",cluster="{cluster}"}}[5m])) * 100)',
+    "scalar_ratio": 'scalar(sum(up{{cluster="{cluster}"}}))',
+}
+
+
+def selected_clusters(query):
+    """Clusters selected by a query's cluster matcher, as Prometheus would."""
+    operator, value = CLUSTER_MATCHER.search(query).groups()
+    value = value.replace('\\"', '"').replace("\\\\", "\\")
+    if operator == "=":
+        return [value]
+    return [name for name in CLUSTERS if re.fullmatch(value, name)]
+
+
+def prometheus_handler(requests):
+    """Prometheus stand-in returning one labelled sample per selected cluster."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/-/healthy":
+            return httpx.Response(200)
+        query = request.url.params["query"]
+        requests.append(query)
+        result = [
+            {
+                "metric": {"cluster": cluster},
+                "value": [1700000000, str(CLUSTERS.index(cluster) + len(query) % 7)],
+            }
+            for cluster in selected_clusters(query)
+        ]
+        return httpx.Response(
+            200,
+            json={"status": "success", "data": {"resultType": "vector", "result": result}},
+        )
+
+    return handler
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+@pytest.fixture
+def prometheus(requests):
+    client = EnhancedPrometheusClient(PrometheusConfig(url="http://prometheus:9090", cache_ttl=0))
+    client.client = httpx.AsyncClient(
+        base_url=client.base_url, transport=httpx.MockTransport(prometheus_handler(requests))
+    )
+    return client
+
+
+def fetcher(prometheus):
+    return lambda query: prometheus.get_data("/api/v1/query", {"query": query})
+
+
+class TestBatchClusterQuery:
+    """Test rewriting per-cluster templates into batched queries."""
+
+    def test_selector_uses_regex(self):
+        query = batch_cluster_query(TEMPLATES["ready_nodes"], ["a", "b"])
+
+        assert query == 'kube_node_status_condition{cluster=~"a|b", condition="Ready", status="true"}'
+
+    def test_aggregation_grouped_by_cluster(self):
+        assert (
+            batch_cluster_query(TEMPLATES["cpu_allocatable"], ["a", "b"])
+            == 'sum by (cluster) (kube_node_status_allocatable{cluster=~"a|b", resource="cpu"})'
+        )
+
+    def test_existing_grouping_extended(self):
+        query = batch_cluster_query('avg by (instance) (up{{cluster="{cluster}"}})', ["a"])
+
+        assert query == 'avg by (instance, cluster) (up{cluster=~"a"})'
+
+    def test_names_escaped(self):
+        query = batch_cluster_query('up{{cluster="{cluster}"}}', ["eu.1", "x+y"])
+
+        assert query == 'up{cluster=~"eu\\\\.1|x\\\\+y"}'
+        assert cluster_regex(["eu.1"]) == '"eu\\\\.1"'
+
+    def test_label_values_not_rewritten(self):
+        query = batch_cluster_query('up{{cluster="{cluster}", job="sum("}}', ["a"])
+
+        assert query == 'up{cluster=~"a", job="sum("}'
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            TEMPLATES["scalar_ratio"],
+            'up{{cluster="{cluster}"}} * on (instance) group_left node_uname_info',
+            'sum(up{{cluster="{cluster}"}}) by (job)',
+            'sum without (cluster) (up{{cluster="{cluster}"}})',
+            'up{{job="{cluster}"}}',
+            "up",
+            'sum(a{{cluster="{cluster}"}}) / sum(b)',
+            'sum(a{{cluster="{cluster}"}}) / sum(b{{job="api"}})',
+            'sum(rate(a{{cluster="{cluster}"}}[5m])) / sum(rate({{__name__="b"}}[5m]))',
+            'a{{cluster="{cluster}"}} / ignoring (instance) b{{cluster="{cluster}"}}',
+        ],
+    )
+    def test_unsupported_templates(self, template):
+        assert batch_cluster_query(template, ["a", "b"]) is None
+
+    def test_every_selector_scoped(self):
+        query = batch_cluster_query(
+            'sum(rate(a{{cluster="{cluster}"}}[5m] offset 1h)) / sum(b{{cluster="{cluster}"}}) > bool 0.5',
+            ["a", "b"],
+        )
+
+        assert query == (
+            'sum by (cluster) (rate(a{cluster=~"a|b"}[5m] offset 1h)) '
+            '/ sum by (cluster) (b{cluster=~"a|b"}) > bool 0.5'
+        )
+
+    def test_query_template_variables(self):
+        template = KubernetesQueryTemplates.CLUSTER_CPU_CAPACITY
+
+        assert batch_cluster_query(template, ["a"], interval="5m") == (
+            'sum by (cluster) (kube_node_status_capacity{cluster=~"a",resource="cpu"})'
+        )
+
+
+def test_split_by_cluster():
+    data = {
+        "resultType": "vector",
+        "result": [
+            {"metric": {"cluster": "a"}, "value": [0, "1"]},
+            {"metric": {"cluster": "other"}, "value": [0, "2"]},
+        ],
+    }
+
+    split = split_by_cluster(data, ["a", "b"])
+
+    assert split["a"]["result"] == [data["result"][0]]
+    assert split["b"] == {"resultType": "vector", "result": []}
+    assert split_by_cluster(None, ["a"]) == {"a": None}
+
+
+class TestClusterQueryPlanner:
+    """Test planning and concurrent execution across clusters."""
+
+    def test_plan_chunks_clusters(self):
+        planner = ClusterQueryPlanner(max_clusters_per_query=2)
+
+        planned = planner.plan({"ready": TEMPLATES["ready_nodes"]}, CLUSTERS)
+
+        assert [query.clusters for query in planned] == [CLUSTERS[:2], CLUSTERS[2:]]
+
+    @pytest.mark.asyncio
+    async def test_batched_matches_per_cluster(self, prometheus, requests):
+        planner = ClusterQueryPlanner()
+        templates = {name: TEMPLATES[name] for name in ("ready_nodes", "cpu_allocatable", "cpu_usage")}
+
+        batched = await planner.execute(fetcher(prometheus), templates, CLUSTERS)
+
+        assert len(requests) == len(templates)
+        for cluster in CLUSTERS:
+            for name, template in templates.items():
+                expected = await prometheus.get_data(
+                    "/api/v1/query", {"query": template.format(cluster=cluster)}
+                )
+                assert [series["metric"] for series in batched[cluster][name]["result"]] == [
+                    series["metric"] for series in expected["result"]
+                ]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_template_falls_back(self, prometheus, requests):
+        planner = ClusterQueryPlanner()
+
+        results = await planner.execute(
+            fetcher(prometheus), {"ratio": TEMPLATES["scalar_ratio"]}, CLUSTERS
+        )
+
+        assert sorted(requests) == sorted(
+            TEMPLATES["scalar_ratio"].format(cluster=cluster) for cluster in CLUSTERS
+        )
+        assert planner.stats == {"batched": 0, "per_cluster": len(CLUSTERS)}
+        assert results["staging"]["ratio"]["result"][0]["metric"] == {"cluster": "staging"}
+
+    @pytest.mark.asyncio
+    async def test_failed_query_yields_none(self):
+        async def fetch(query):
+            raise httpx.ConnectError("unreachable")
+
+        results = await ClusterQueryPlanner().execute(
+            fetch, {"ready": TEMPLATES["ready_nodes"]}, ["a", "b"]
+        )
+
+        assert results == {"a": {"ready": None}, "b": {"ready": None}}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self):
+        in_flight = peak = 0
+
+        async def fetch(query):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"resultType": "vector", "result": []}
+
+        planner = ClusterQueryPlanner(max_concurrency=2)
+        await planner.execute(fetch, {"ratio": TEMPLATES["scalar_ratio"]}, [f"c{i}" for i in range(6)])
+
+        assert peak == 2
@@ -1,3 +1,179 @@
+"""
+Tests for the shared Prometheus client, its query cache and range alignment.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import httpx
 import pytest
 
-# Migrate all test functions to async def, use @pytest.mark.asyncio, and await async fixtures/calls
+from app.utils.prometheus_client import (
+    EnhancedPrometheusClient,
+    PrometheusConfig,
+    QueryCache,
+    align_range,
+    get_shared_prometheus_client,
+    parse_step,
+    query_template,
+)
+
+
+def vector_response(value="1"):
+    return {
+        "status": "success",
+        "data": {
+            "resultType": "vector",
+            "result": [{"metric": {"job": "api"}, "value": [1700000000, value]}],
+        },
+    }
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+@pytest.fixture
+def client(requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/-/healthy":
+            return httpx.Response(200)
+        requests.append(request)
+        return httpx.Response(200, json=vector_response())
+
+    client = EnhancedPrometheusClient(PrometheusConfig(url="http://prometheus:9090"))
+    client.client = httpx.AsyncClient(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+class TestQueryCache:
+    """Test the bounded LRU query cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
+
+    def test_expired_entries_purged_on_insert(self):
+        cache = QueryCache(max_entries=10, ttl=30)
+        cache.put("old", 1)
+        cache.put("short", 2, ttl=5)
+
+        with patch("app.utils.prometheus_client.time.monotonic", return_value=1e12):
+            cache.put("new", 3)
+
+        assert len(cache) == 1
+
+    def test_replaced_entry_keeps_new_expiry(self):
+        cache = QueryCache(max_entries=10, ttl=30)
+        cache.put("key", 1, ttl=5)
+        cache.put("key", 2, ttl=60)
+        later = __import__("time").monotonic() + 10
+
+        with patch("app.utils.prometheus_client.time.monotonic", return_value=later):
+            cache.put("other", 3)
+            assert cache.get("key") == 2
+
+    def test_expiry_heap_stays_bounded(self):
+        cache = QueryCache(max_entries=4)
+        for index in range(100):
+            cache.put(index % 8, index)
+
+        assert len(cache) == 4
+        assert len(cache._expiry) <= 8
+
+    def test_disabled_with_zero_ttl(self):
+        cache = QueryCache(ttl=0)
+        cache.put("a", 1)
+
+        assert cache.get("a") is None
+
+
+class TestRangeAlignment:
+    """Test step parsing and range alignment."""
+
+    @pytest.mark.parametrize(
+        "step,seconds",
+        [("30s", 30), ("5m", 300), ("1h30m", 5400), ("250ms", 0.25), ("15", 15), (60, 60)],
+    )
+    def test_parse_step(self, step, seconds):
+        assert parse_step(step) == seconds
+
+    def test_parse_step_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            parse_step("5 minutes")
+
+    def test_windows_within_a_step_align(self):
+        assert align_range(1000, 4000, 60) == (960, 3960)
+        assert align_range(1019, 4019, 60) == align_range(1000, 4000, 60)
+
+    def test_query_template(self):
+        assert (
+            query_template('sum(rate(http_requests_total{job="api",code="500"}[5m])) > 0.5')
+            == 'sum(rate(http_requests_total{job=?,code=?}[5m])) > ?'
+        )
+
+
+class TestEnhancedPrometheusClient:
+    """Test caching and statistics of the client."""
+
+    @pytest.mark.asyncio
+    async def test_query_cached(self, client, requests):
+        first = await client.query('up{job="api"}')
+        second = await client.query('up{job="api"}')
+
+        assert first.get_single_value() == second.get_single_value() == 1.0
+        assert len(requests) == 1
+
+        stats = client.get_cache_stats()["templates"]["up{job=?}"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_range_queries_share_aligned_entries(self, client, requests):
+        base = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+        for offset in (0, 10, 45):
+            await client.query_range(
+                "up",
+                datetime.fromtimestamp(base + offset, timezone.utc),
+                datetime.fromtimestamp(base + 3600 + offset, timezone.utc),
+                step="1m",
+            )
+
+        assert len(requests) == 1
+        assert float(requests[0].url.params["start"]) == base
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, requests):
+        responses = iter(
+            [httpx.Response(200, json={"status": "error", "error": "timeout"}),
+             httpx.Response(200, json=vector_response("2"))]
+        )
+        client = EnhancedPrometheusClient(PrometheusConfig())
+        client.client = httpx.AsyncClient(
+            base_url=client.base_url,
+            transport=httpx.MockTransport(lambda request: next(responses)),
+        )
+
+        assert await client.get_data("/api/v1/query", {"query": "up"}) is None
+        data = await client.get_data("/api/v1/query", {"query": "up"})
+
+        assert data["result"][0]["value"][1] == "2"
+        assert client.get_cache_stats()["templates"]["up"]["errors"] == 1
+
+    def test_shared_client_per_server(self):
+        assert get_shared_prometheus_client("http://a:9090/") is get_shared_prometheus_client(
+            "http://a:9090"
+        )
+        assert get_shared_prometheus_client("http://a:9090") is not get_shared_prometheus_client(
+            "http://b:9090"
+        )
@@ -0,0 +1,93 @@
+"""
+Tests for the GCRA rate limiting path of AdvancedRateLimiter.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.utils.rate_limiter import AdvancedRateLimiter, RateLimitAlgorithm
+
+
+@pytest.fixture
+def limiter():
+    """Rate limiter without Redis, using the in-process GCRA."""
+    limiter = AdvancedRateLimiter(redis_client=None, config={"max_local_keys": 3})
+    limiter.default_limits["test"] = {"requests": 3, "window": 60}
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_local_gcra_enforces_limit(limiter):
+    results = [await limiter.check_rate_limit("client", "test") for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results[:3]] == [2, 1, 0]
+    assert results[3].retry_after == 20
+
+
+@pytest.mark.asyncio
+async def test_local_gcra_state_is_bounded(limiter):
+    for i in range(10):
+        await limiter.check_rate_limit(f"client-{i}", "test")
+
+    assert len(limiter._local_tats) == 3
+
+
+@pytest.mark.asyncio
+async def test_local_gcra_applies_burst_limit(limiter):
+    limiter.burst_limits["test"] = {"requests": 1, "window": 10}
+
+    first = await limiter.check_rate_limit("client", "test")
+    second = await limiter.check_rate_limit("client", "test")
+
+    assert first.allowed
+    assert not second.allowed
+    assert second.retry_after == 10
+
+
+@pytest.mark.asyncio
+async def test_redis_gcra_uses_single_script_call():
+    script = AsyncMock(return_value=[1, 94, 600, 1])
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = script
+    limiter = AdvancedRateLimiter(redis_client=redis_client)
+
+    result = await limiter.check_rate_limit("client", "api")
+
+    assert result.allowed
+    assert result.remaining == 94
+    script.assert_awaited_once()
+    keys = script.await_args.kwargs["keys"]
+    assert keys == ["gcra:api:client", "gcra:burst:api:client"]
+
+
+@pytest.mark.asyncio
+async def test_redis_gcra_lease_skips_round_trips():
+    script = AsyncMock(return_value=[1, 80, 3000, 5])
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = script
+    limiter = AdvancedRateLimiter(redis_client=redis_client)
+
+    results = [await limiter.check_rate_limit("client", "api") for _ in range(5)]
+
+    assert all(r.allowed for r in results)
+    assert script.await_count == 1
+
+    await limiter.check_rate_limit("client", "api")
+    assert script.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_gcra_denial_sets_retry_after():
+    script = AsyncMock(return_value=[0, 0, 2500, 0])
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = script
+    limiter = AdvancedRateLimiter(redis_client=redis_client)
+
+    result = await limiter.check_rate_limit(
+        "client", "api", algorithm=RateLimitAlgorithm.GCRA
+    )
+
+    assert not result.allowed
+    assert result.retry_after == 3
+    assert "Retry-After" in result.to_headers()
@@ -0,0 +1,131 @@
+"""
+Tests for the request-scoped body cache.
+"""
+
+import json
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.utils import request_body as request_body_module
+from app.utils.request_body import CachedBodyRoute, json_loads, read_body
+
+
+class Payload(BaseModel):
+    name: str
+    count: int
+
+
+class ReadingMiddleware(BaseHTTPMiddleware):
+    """Stands in for the security and audit middlewares."""
+
+    def __init__(self, app, max_size=None):
+        super().__init__(app)
+        self.max_size = max_size
+
+    async def dispatch(self, request, call_next):
+        try:
+            body = await read_body(request, self.max_size)
+        except HTTPException as e:
+            return JSONResponse({"detail": e.detail}, status_code=e.status_code)
+        if body.raw:
+            body.json()
+        return await call_next(request)
+
+
+def _app(max_size=None, layers=2) -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(route_class=CachedBodyRoute)
+
+    @router.post("/model")
+    async def model_endpoint(payload: Payload):
+        return {"name": payload.name, "count": payload.count}
+
+    @router.post("/raw")
+    async def raw_endpoint(request: Request):
+        return {"size": len(await request.body()), "json": await request.json()}
+
+    app.include_router(router)
+    for _ in range(layers):
+        app.add_middleware(ReadingMiddleware, max_size=max_size)
+    return app
+
+
+async def _post(app, path, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(path, **kwargs)
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    original = request_body_module.json_loads
+
+    def counting_loads(data):
+        calls.append(data)
+        return original(data)
+
+    monkeypatch.setattr(request_body_module, "json_loads", counting_loads)
+    return calls
+
+
+class TestReadOnce:
+    """The body is read and parsed once across middlewares and the endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_request_model_uses_cached_document(self, parse_count):
+        response = await _post(_app(), "/model", json={"name": "deploy", "count": 3})
+
+        assert response.status_code == 200
+        assert response.json() == {"name": "deploy", "count": 3}
+        assert len(parse_count) == 1
+
+    @pytest.mark.asyncio
+    async def test_raw_endpoint_sees_same_bytes(self, parse_count):
+        body = json.dumps({"alerts": [{"id": i} for i in range(50)]})
+        response = await _post(
+            _app(), "/raw", content=body, headers={"content-type": "application/json"}
+        )
+
+        assert response.json() == {"size": len(body), "json": json.loads(body)}
+        assert len(parse_count) == 1
+
+
+class TestSizeLimit:
+    """The size limit is enforced while streaming."""
+
+    @pytest.mark.asyncio
+    async def test_declared_length_over_limit_is_rejected(self):
+        response = await _post(_app(max_size=10), "/raw", json={"name": "x" * 50})
+        assert response.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_chunked_body_over_limit_is_rejected(self):
+        async def chunks():
+            for _ in range(10):
+                yield b'{"padding": "' + b"x" * 20 + b'"}'
+
+        response = await _post(
+            _app(max_size=64), "/raw", content=chunks(),
+            headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 413
+
+
+class TestJsonLoads:
+    """json_loads matches the standard library."""
+
+    def test_values_orjson_rejects_fall_back_to_stdlib(self):
+        assert json_loads(b'{"big": 123456789012345678901234567890}') == {
+            "big": 123456789012345678901234567890
+        }
+
+    def test_invalid_json_raises_stdlib_error(self):
+        with pytest.raises(json.JSONDecodeError) as exc_info:
+            json_loads(b'{"a": }')
+        assert exc_info.value.pos == 6
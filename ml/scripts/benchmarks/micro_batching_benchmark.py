@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-Batching Inference Benchmark
+
+Sends many concurrent single-instance predictions through the inference
+API's MicroBatcher and compares throughput with the previous per-request
+path (one-row DataFrame, predict then predict_proba, on the event loop).
+The model is a NumPy logistic classifier with a fixed per-call overhead,
+standing in for the per-call cost of sklearn/MLflow models; both paths are
+checked to return the same predictions and probabilities.
+
+Usage:
+    python scripts/benchmarks/micro_batching_benchmark.py [--requests N]
+        [--concurrency N] [--max-batch-size N] [--max-wait-ms MS] [--call-overhead-ms MS]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.inference.batching import MicroBatcher  # noqa: E402
+
+FEATURES = ["cpu_usage", "memory_usage", "error_rate", "response_time"]
+
+
+class OverheadClassifier:
+    """Logistic model whose every call pays a fixed overhead, like input validation."""
+
+    def __init__(self, call_overhead_ms: float, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.weights = rng.normal(size=len(FEATURES))
+        self.classes_ = np.array([0, 1])
+        self.feature_names_in_ = np.array(FEATURES)
+        self.call_overhead = call_overhead_ms / 1000.0
+
+    def predict_proba(self, frame: pd.DataFrame) -> np.ndarray:
+        time.sleep(self.call_overhead)
+        positive = 1.0 / (1.0 + np.exp(-frame[FEATURES].to_numpy(dtype=float) @ self.weights))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, frame: pd.DataFrame) -> np.ndarray:
+        return self.classes_.take(self.predict_proba(frame).argmax(axis=1))
+
+
+def make_requests(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(count, len(FEATURES)))
+    return [dict(zip(FEATURES, row.tolist())) for row in values]
+
+
+async def per_request(model, requests, concurrency: int):
+    """The previous /predict body, run by concurrent handlers on the event loop."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(features):
+        async with semaphore:
+            frame = pd.DataFrame([features])
+            prediction = model.predict(frame)[0]
+            probability = model.predict_proba(frame)[0].tolist()
+            return prediction.item(), probability
+
+    return await asyncio.gather(*(handle(features) for features in requests))
+
+
+async def micro_batched(model, requests, concurrency: int, batcher: MicroBatcher):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(features):
+        async with semaphore:
+            return await batcher.submit("benchmark:latest", model, features)
+
+    return await asyncio.gather(*(handle(features) for features in requests))
+
+
+async def run(args):
+    model = OverheadClassifier(args.call_overhead_ms)
+    requests = make_requests(args.requests, seed=1)
+
+    start = time.perf_counter()
+    expected = await per_request(model, requests, args.concurrency)
+    baseline = time.perf_counter() - start
+
+    batcher = MicroBatcher(args.max_batch_size, args.max_wait_ms, workers=args.workers)
+    start = time.perf_counter()
+    actual = await micro_batched(model, requests, args.concurrency, batcher)
+    batched = time.perf_counter() - start
+    stats = batcher.get_stats()
+    await batcher.shutdown()
+
+    assert [p for p, _ in actual] == [p for p, _ in expected], "predictions differ"
+    np.testing.assert_allclose([q for _, q in actual], [q for _, q in expected])
+
+    print(f"Requests: {args.requests}, concurrency {args.concurrency}, "
+          f"model call overhead {args.call_overhead_ms} ms")
+    print(f"Per-request predict + predict_proba: {baseline:7.2f} s   {args.requests / baseline:8.0f} req/s")
+    print(f"Micro-batched:                       {batched:7.2f} s   {args.requests / batched:8.0f} req/s"
+          f"   (mean batch {stats['avg_batch_size']:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--call-overhead-ms", type=float, default=1.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Online Feature Serving Benchmark
+
+Measures online feature store throughput against a running Redis: writing
+a batch of entities and fetching them back for inference. Compares the
+batched path (column-built records, msgpack codec, pipelined MGET, optional
+in-process cache) against the previous per-row pickle writes and one GET
+per entity per feature group.
+
+Usage:
+    python scripts/benchmarks/online_feature_benchmark.py [--host HOST] [--port PORT]
+        [--entities N] [--feature-groups N] [--features N] [--iterations N]
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.feature_store.online import (  # noqa: E402
+    OnlineFeatureCache,
+    encode_features,
+    entity_keys,
+    feature_records,
+    read_online_records,
+    write_online_records,
+)
+
+KEY_PREFIX = "benchmark:features"
+TTL = 600
+
+
+def make_frame(entities: int, features: int, seed: int) -> pd.DataFrame:
+    """Feature rows for entities identified by (service, host)."""
+    rng = np.random.default_rng(seed)
+    data = {
+        "service": [f"svc-{i % 50}" for i in range(entities)],
+        "host": [f"node-{i}" for i in range(entities)],
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(entities), unit="s"),
+    }
+    for index in range(features):
+        data[f"feature_{index}"] = rng.normal(size=entities)
+    data["error_count"] = rng.integers(0, 100, entities)
+    return pd.DataFrame(data)
+
+
+def legacy_write(client, group: str, frame: pd.DataFrame):
+    """_write_online_features as it was: iterrows and pickle per row."""
+    pipe = client.pipeline()
+    for _, row in frame.iterrows():
+        redis_key = f"{KEY_PREFIX}:legacy:{group}:{row['service']}:{row['host']}"
+        feature_data = row.drop(["service", "host", "timestamp"]).to_dict()
+        feature_data["timestamp"] = row["timestamp"].isoformat()
+        pipe.set(redis_key, pickle.dumps(feature_data), ex=TTL)
+    pipe.execute()
+
+
+def legacy_read(client, groups, services, hosts, features):
+    """get_online_features as it was: one GET and unpickle per entity per group."""
+    results = []
+    for service, host in zip(services, hosts):
+        entity_features = {"service": service, "host": host}
+        for group in groups:
+            data = client.get(f"{KEY_PREFIX}:legacy:{group}:{service}:{host}")
+            if data:
+                feature_data = pickle.loads(data)
+                entity_features.update({f: feature_data[f] for f in features if f in feature_data})
+        results.append(entity_features)
+    return pd.DataFrame(results)
+
+
+def batched_write(client, group: str, frame: pd.DataFrame, cache=None):
+    keys = [f"{KEY_PREFIX}:batched:{group}:{key}" for key in entity_keys(frame, ["service", "host"])]
+    records = feature_records(frame, ["service", "host"], "timestamp")
+    write_online_records(client, keys, records, ttl=TTL, cache=cache)
+
+
+def batched_read(client, groups, services, hosts, features, cache=None):
+    entity_frame = pd.DataFrame({"service": services, "host": hosts})
+    keys = entity_keys(entity_frame, ["service", "host"])
+    results = entity_frame.to_dict("records")
+    for group in groups:
+        records = read_online_records(
+            client, [f"{KEY_PREFIX}:batched:{group}:{key}" for key in keys], cache=cache
+        )
+        for entity_features, feature_data in zip(results, records):
+            if feature_data:
+                entity_features.update({f: feature_data[f] for f in features if f in feature_data})
+    return pd.DataFrame(results)
+
+
+def timed(fn, iterations: int, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(*args)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--entities", type=int, default=1000, help="Entities per inference batch")
+    parser.add_argument("--feature-groups", type=int, default=3)
+    parser.add_argument("--features", type=int, default=20, help="Features per group")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    client = redis.Redis(host=args.host, port=args.port, decode_responses=False)
+    client.ping()
+
+    groups = [f"group_{index}" for index in range(args.feature_groups)]
+    frames = {group: make_frame(args.entities, args.features, seed) for seed, group in enumerate(groups)}
+    sample = frames[groups[0]]
+    services, hosts = sample["service"].tolist(), sample["host"].tolist()
+    features = [f"feature_{index}" for index in range(args.features)] + ["error_count"]
+
+    write_legacy = sum(timed(legacy_write, args.iterations, client, g, f) for g, f in frames.items())
+    write_batched = sum(timed(batched_write, args.iterations, client, g, f) for g, f in frames.items())
+
+    expected = legacy_read(client, groups, services, hosts, features)
+    actual = batched_read(client, groups, services, hosts, features)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    read_legacy = timed(legacy_read, args.iterations, client, groups, services, hosts, features)
+    read_batched = timed(batched_read, args.iterations, client, groups, services, hosts, features)
+
+    cache = OnlineFeatureCache(max_entries=args.entities * args.feature_groups, ttl=60)
+    batched_read(client, groups, services, hosts, features, cache)
+    read_cached = timed(batched_read, args.iterations, client, groups, services, hosts, features, cache)
+
+    record = feature_records(sample.head(1), ["service", "host"], "timestamp")[0]
+    legacy_row = sample.iloc[0].drop(["service", "host", "timestamp"]).to_dict()
+    legacy_row["timestamp"] = sample.iloc[0]["timestamp"].isoformat()
+
+    print(f"Batch: {args.entities} entities x {args.feature_groups} groups x {args.features} features")
+    print(f"Record size:   pickle {len(pickle.dumps(legacy_row)):6d} B   msgpack {len(encode_features(record)):6d} B")
+    print(f"Write batch:   legacy {write_legacy * 1000:8.1f} ms   batched {write_batched * 1000:8.1f} ms")
+    print(f"Read batch:    legacy {read_legacy * 1000:8.1f} ms   batched {read_batched * 1000:8.1f} ms"
+          f"   cached {read_cached * 1000:8.1f} ms")
+    print(f"Read throughput: {args.entities / read_legacy:10.0f} -> {args.entities / read_batched:10.0f} entities/s")
+
+    for pattern in (f"{KEY_PREFIX}:legacy:*", f"{KEY_PREFIX}:batched:*"):
+        keys = list(client.scan_iter(pattern, count=1000))
+        for start in range(0, len(keys), 1000):
+            client.delete(*keys[start:start + 1000])
+
+
+if __name__ == "__main__":
+    main()
@@ -6,5 +6,6 @@ Provides comprehensive anomaly detection capabilities including:
 - Autoencoder neural networks
 - Time series decomposition
 - Statistical methods
+- Streaming per-sample scoring for live metrics
 - Model explanation and interpretability
 """
\ No newline at end of file
@@ -11,6 +11,8 @@ Multi-algorithm anomaly detection system for DevOps monitoring with:
 
 import logging
 import pickle
+import uuid
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Any, Tuple, Union
@@ -372,7 +374,11 @@ class AnomalyDetector:
     anomaly detection in DevOps monitoring data.
     """
     
-    def __init__(self, algorithm: AnomalyAlgorithm = AnomalyAlgorithm.ENSEMBLE):
+    def __init__(
+        self,
+        algorithm: AnomalyAlgorithm = AnomalyAlgorithm.ENSEMBLE,
+        explanation_cache_size: int = 10000
+    ):
         self.algorithm = algorithm
         self.models = {}
         self.feature_engineering = FeatureEngineering()
@@ -386,6 +392,15 @@ class AnomalyDetector:
         # Performance tracking
         self.performance_metrics = {}
         self.explainer = None
+        
+        # Explanations are cached per model version and sample
+        self.model_version: Optional[str] = None
+        self.explanation_cache: 'OrderedDict[Tuple[Optional[str], bytes], Dict[str, float]]' = OrderedDict()
+        self.explanation_cache_size = explanation_cache_size
+        
+        # Features and scores of the latest time series detection, for explanations on request
+        self.last_features: Optional[np.ndarray] = None
+        self.last_scores: Optional[np.ndarray] = None
     
     def _initialize_models(self, X: np.ndarray):
         """Initialize all anomaly detection models."""
@@ -455,15 +470,26 @@ class AnomalyDetector:
         if self.algorithm == AnomalyAlgorithm.ENSEMBLE or self.algorithm == AnomalyAlgorithm.STATISTICAL:
             self.models['statistical'].fit(X)
         
-        # Initialize SHAP explainer for Isolation Forest
+        self._initialize_explainer()
+        self._set_model_version(uuid.uuid4().hex)
+        
+        self.logger.info(f"Trained anomaly detection models with {len(X)} samples")
+        self.metrics.increment('models_trained')
+    
+    def _initialize_explainer(self):
+        """Initialize SHAP explainer for Isolation Forest."""
         try:
             if 'isolation_forest' in self.models:
                 self.explainer = shap.TreeExplainer(self.models['isolation_forest'])
         except Exception as e:
             self.logger.warning(f"Could not initialize SHAP explainer: {e}")
-        
-        self.logger.info(f"Trained anomaly detection models with {len(X)} samples")
-        self.metrics.increment('models_trained')
+    
+    def _set_model_version(self, model_version: str):
+        """Switch model version, dropping explanations of the previous one."""
+        self.model_version = model_version
+        self.explanation_cache.clear()
+        self.last_features = None
+        self.last_scores = None
     
     def predict(self, X: np.ndarray) -> np.ndarray:
         """Predict anomalies using the selected algorithm(s)."""
@@ -539,41 +565,100 @@ class AnomalyDetector:
     
     def explain_anomaly(self, X: np.ndarray, index: int) -> Dict[str, Any]:
         """Explain why a sample was classified as anomaly."""
-        explanation = {
-            'sample_index': index,
-            'feature_contributions': {},
-            'algorithm': self.algorithm.value,
-            'anomaly_score': None
-        }
-        
-        if index >= len(X):
-            return explanation
-        
-        sample = X[index:index+1]
+        return self.explain_anomalies(X, [index])[index]
+    
+    def explain_anomalies(
+        self,
+        X: np.ndarray,
+        indices: List[int],
+        scores: Optional[np.ndarray] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Explain several samples at once.
+        
+        Feature contributions of samples already explained under the current
+        model version come from the cache; SHAP values and z-scores for the
+        rest are computed in one batch. Anomaly scores are not cached, since
+        ensemble scores are normalized per batch: they are taken from scores
+        when given, otherwise computed for the samples being explained.
+        """
+        explanations = {}
+        valid = []
+        for index in map(int, indices):
+            if index >= len(X):
+                explanations[index] = {
+                    'sample_index': index,
+                    'feature_contributions': {},
+                    'algorithm': self.algorithm.value,
+                    'anomaly_score': None
+                }
+            else:
+                valid.append(index)
+        
+        if not valid:
+            return explanations
+        
+        contributions = {}
+        missing = []
+        for index in valid:
+            cache_key = (self.model_version, X[index].tobytes())
+            cached = self.explanation_cache.get(cache_key)
+            if cached is not None:
+                self.explanation_cache.move_to_end(cache_key)
+                contributions[index] = dict(cached)
+            else:
+                missing.append(index)
+        
+        if missing:
+            contributions.update(zip(missing, self._feature_contributions(X[missing])))
+        
+        sample_scores = scores[valid] if scores is not None else self.decision_function(X[valid])
+        for index, score in zip(valid, sample_scores):
+            explanations[index] = {
+                'sample_index': index,
+                'feature_contributions': contributions[index],
+                'algorithm': self.algorithm.value,
+                'anomaly_score': float(score)
+            }
         
-        # Get anomaly score
-        explanation['anomaly_score'] = self.decision_function(sample)[0]
+        return explanations
+    
+    def _feature_contributions(self, samples: np.ndarray) -> List[Dict[str, float]]:
+        """SHAP values and z-scores of samples, cached unless SHAP failed."""
+        contributions = [{} for _ in range(len(samples))]
+        cacheable = True
         
         # SHAP explanation for tree-based models
         if self.explainer is not None and self.algorithm in [AnomalyAlgorithm.ISOLATION_FOREST, AnomalyAlgorithm.ENSEMBLE]:
             try:
-                shap_values = self.explainer.shap_values(sample)
-                for i, feature_name in enumerate(self.feature_names):
-                    explanation['feature_contributions'][feature_name] = float(shap_values[0][i])
+                shap_values = np.asarray(self.explainer.shap_values(samples))
+                for contribution, row in zip(contributions, shap_values):
+                    contribution.update(zip(self.feature_names, map(float, row)))
             except Exception as e:
                 self.logger.warning(f"SHAP explanation failed: {e}")
+                cacheable = False
         
         # Statistical explanation
         if self.algorithm == AnomalyAlgorithm.STATISTICAL or self.algorithm == AnomalyAlgorithm.ENSEMBLE:
             stats_model = self.models['statistical']
-            sample_flat = sample.flatten()
-            z_scores = np.abs((sample_flat - stats_model.statistics['mean']) / (stats_model.statistics['std'] + 1e-8))
-            
-            for i, feature_name in enumerate(self.feature_names):
-                if i < len(z_scores):
-                    explanation['feature_contributions'][f'{feature_name}_z_score'] = float(z_scores[i])
-        
-        return explanation
+            z_scores = np.abs((samples - stats_model.statistics['mean']) / (stats_model.statistics['std'] + 1e-8))
+            z_score_names = [f'{feature_name}_z_score' for feature_name in self.feature_names]
+            for contribution, row in zip(contributions, z_scores):
+                contribution.update(zip(z_score_names, map(float, row)))
+        
+        if cacheable:
+            for sample, contribution in zip(samples, contributions):
+                self.explanation_cache[(self.model_version, sample.tobytes())] = dict(contribution)
+            while len(self.explanation_cache) > self.explanation_cache_size:
+                self.explanation_cache.popitem(last=False)
+        
+        return contributions
+    
+    def explain_detection(self, index: int) -> Dict[str, Any]:
+        """Explain a data point of the latest detect_anomalies_in_timeseries call."""
+        if self.last_features is None:
+            raise ValueError("No time series detection to explain")
+        return self.explain_anomalies(self.last_features, [index], self.last_scores)[index]
     
     def evaluate_performance(
         self, 
@@ -636,11 +721,16 @@ class AnomalyDetector:
         df: pd.DataFrame,
         value_cols: List[str],
         timestamp_col: str = 'timestamp',
-        window_size: int = 50
+        window_size: int = 50,
+        explain_top_k: int = 10
     ) -> List[AnomalyResult]:
-        """Detect anomalies in time series data."""
-        results = []
+        """
+        Detect anomalies in time series data.
         
+        Only the explain_top_k highest-scoring anomalies are explained, in one
+        batch; the others carry a deferred explanation that explain_detection
+        computes on request.
+        """
         # Sort by timestamp
         df_sorted = df.sort_values(timestamp_col)
         
@@ -668,27 +758,46 @@ class AnomalyDetector:
             X = normalized_df.values
         
         # Predict anomalies
-        predictions = self.predict(X)
-        scores = self.decision_function(X)
+        predictions = np.asarray(self.predict(X))
+        scores = np.asarray(self.decision_function(X), dtype=float)
+        self.last_features = X
+        self.last_scores = scores
+        
+        # Explain the most anomalous points only
+        flagged = np.flatnonzero(predictions)
+        top_k = flagged[np.argsort(-scores[flagged], kind='stable')[:max(0, explain_top_k)]]
+        explanations = self.explain_anomalies(X, top_k, scores)
         
         # Create results
-        for i, (_, row) in enumerate(df_sorted.iterrows()):
-            if i < len(predictions):
-                result = AnomalyResult(
-                    timestamp=pd.to_datetime(row[timestamp_col]),
-                    value=row[value_cols[0]] if value_cols else 0,
-                    is_anomaly=bool(predictions[i]),
-                    anomaly_score=float(scores[i]),
-                    anomaly_type=AnomalyType.POINT_ANOMALY,
-                    confidence=min(1.0, float(scores[i]) / (np.std(scores) + 1e-8)),
-                    explanation=self.explain_anomaly(X, i) if predictions[i] else {},
-                    metadata={
-                        'algorithm': self.algorithm.value,
-                        'feature_count': len(feature_cols),
-                        'window_size': window_size
-                    }
-                )
-                results.append(result)
+        n_points = min(len(df_sorted), len(predictions))
+        timestamps = pd.to_datetime(df_sorted[timestamp_col].iloc[:n_points])
+        values = df_sorted[value_cols[0]].iloc[:n_points].tolist() if value_cols else [0] * n_points
+        confidences = np.minimum(1.0, scores / (np.std(scores) + 1e-8))
+        
+        results = []
+        for i, (timestamp, value) in enumerate(zip(timestamps, values)):
+            is_anomaly = bool(predictions[i])
+            if i in explanations:
+                explanation = explanations[i]
+            elif is_anomaly:
+                explanation = {'sample_index': i, 'deferred': True}
+            else:
+                explanation = {}
+            
+            results.append(AnomalyResult(
+                timestamp=timestamp,
+                value=value,
+                is_anomaly=is_anomaly,
+                anomaly_score=float(scores[i]),
+                anomaly_type=AnomalyType.POINT_ANOMALY,
+                confidence=float(confidences[i]),
+                explanation=explanation,
+                metadata={
+                    'algorithm': self.algorithm.value,
+                    'feature_count': len(feature_cols),
+                    'window_size': window_size
+                }
+            ))
         
         self.logger.info(f"Detected {sum(predictions)} anomalies in {len(predictions)} data points")
         self.metrics.increment('anomalies_detected', value=sum(predictions))
@@ -779,6 +888,9 @@ class AnomalyDetector:
                 else:
                     self.models[name] = joblib.load(f"{model_artifacts}/{path}")
             
+            self._initialize_explainer()
+            self._set_model_version(f"{model_name}:{version or 'Production'}")
+            
             self.logger.info(f"Loaded anomaly detection model {model_name}")
             return True
             
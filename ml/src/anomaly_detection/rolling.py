@@ -0,0 +1,129 @@
+"""
+Vectorized Rolling-Window Engine
+
+Array-level building blocks for the time series anomaly detectors:
+- Rolling least-squares slopes in closed form from cumulative sums
+- Trend change flags comparing the slopes before and after each point
+- Residual thresholding and scoring over whole series at once
+
+Each function does the work of a per-point Python loop in a handful of
+NumPy operations, so cost grows linearly with series length and does not
+depend on the window size.
+"""
+
+import numpy as np
+from typing import Tuple
+
+
+def rolling_slopes(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Least-squares slope of every contiguous window of a series.
+
+    Equivalent to np.polyfit(np.arange(window), values[j:j + window], 1)[0]
+    for every start index j, computed from cumulative sums of y and i * y.
+
+    Args:
+        values: 1-D series
+        window: Window length (at least 2)
+
+    Returns:
+        Array of len(values) - window + 1 slopes, indexed by window start
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2")
+
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if n < window:
+        return np.empty(0)
+
+    # Centering keeps the cumulative sums small for large-valued metrics
+    y = y - y.mean()
+    index = np.arange(n, dtype=np.float64)
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sum_iy = np.concatenate(([0.0], np.cumsum(index * y)))
+
+    starts = np.arange(n - window + 1)
+    window_sum = sum_y[starts + window] - sum_y[starts]
+    # Sum of (position within window) * y, shifting global indices by the start
+    window_moment = sum_iy[starts + window] - sum_iy[starts] - starts * window_sum
+
+    x_mean = (window - 1) / 2.0
+    x_var_sum = window * (window * window - 1) / 12.0
+    return (window_moment - x_mean * window_sum) / x_var_sum
+
+
+def trend_change_flags(
+    values: np.ndarray, window: int, threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flag points where the trend after the point departs from the trend before it.
+
+    For each point i with a full window on both sides, compares the slope of
+    values[i - window:i] with the slope of values[i:i + window]; the change
+    is flagged when it exceeds threshold times the standard deviation of the
+    two slopes.
+
+    Args:
+        values: 1-D series
+        window: Window length on each side of a point
+        threshold: Multiple of the slope standard deviation
+
+    Returns:
+        Tuple of (flags for every point, slopes before, slopes after), the
+        slope arrays covering points window .. len(values) - window - 1
+    """
+    n = len(values)
+    flags = np.zeros(n, dtype=bool)
+    if n < 2 * window:
+        return flags, np.empty(0), np.empty(0)
+
+    slopes = rolling_slopes(values, window)
+    before = slopes[: n - 2 * window]
+    after = slopes[window : n - window]
+
+    trend_change = np.abs(after - before)
+    trend_std = np.std(np.stack([before, after]), axis=0)
+    flags[window : n - window] = (trend_std > 0) & (trend_change > threshold * trend_std)
+    return flags, before, after
+
+
+def residual_flags(
+    residuals: np.ndarray, length: int, center: float, threshold: float
+) -> np.ndarray:
+    """
+    Flag points whose residual deviates from center by more than threshold.
+
+    Args:
+        residuals: Residuals aligned with the start of the series
+        length: Series length; points without a residual are not flagged
+        center: Residual center, e.g. the residual mean
+        threshold: Maximum absolute deviation from center
+
+    Returns:
+        Boolean array of the series length
+    """
+    flags = np.zeros(length, dtype=bool)
+    residuals = np.asarray(residuals, dtype=np.float64)[:length]
+    flags[: len(residuals)] = np.abs(residuals - center) > threshold
+    return flags
+
+
+def residual_scores(residuals: np.ndarray, length: int) -> np.ndarray:
+    """
+    Absolute residuals in units of the residual standard deviation.
+
+    Args:
+        residuals: Residuals aligned with the start of the series, without NaNs
+        length: Series length; points without a residual score 0
+
+    Returns:
+        Score array of the series length
+    """
+    scores = np.zeros(length)
+    residuals = np.asarray(residuals, dtype=np.float64)
+    # Sample standard deviation, as pandas computes it
+    std = residuals.std(ddof=1) if len(residuals) > 1 else np.nan
+    residuals = residuals[:length]
+    scores[: len(residuals)] = np.abs(residuals) / (std + 1e-8)
+    return scores
@@ -0,0 +1,270 @@
+"""
+Streaming Anomaly Detection
+
+Online anomaly scoring for live metric streams. Each series keeps a small
+incremental state that is updated in O(1) per sample:
+- EWMA level and variance of the deseasonalized value
+- Rolling seasonal profile (EWMA offset per time-of-week bucket)
+- Streaming quantile estimates of the raw value
+- Bounded buffer of recent samples
+
+Series states can be checkpointed to disk and restored, so consumers can
+restart without re-warming every series.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .anomaly_detector import AnomalyResult, AnomalyType
+
+
+@dataclass
+class SeriesState:
+    """Incremental detection state of one metric series."""
+    count: int = 0
+    level: float = 0.0
+    variance: float = 0.0
+    last_timestamp: Optional[float] = None
+    seasonal_offsets: List[float] = field(default_factory=list)
+    seasonal_counts: List[int] = field(default_factory=list)
+    quantiles: List[float] = field(default_factory=list)
+    history: Deque[Tuple[float, float]] = field(default_factory=deque)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'level': self.level,
+            'variance': self.variance,
+            'last_timestamp': self.last_timestamp,
+            'seasonal_offsets': self.seasonal_offsets,
+            'seasonal_counts': self.seasonal_counts,
+            'quantiles': self.quantiles,
+            'history': list(self.history)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], history_size: int) -> 'SeriesState':
+        return cls(
+            count=data['count'],
+            level=data['level'],
+            variance=data['variance'],
+            last_timestamp=data.get('last_timestamp'),
+            seasonal_offsets=list(data['seasonal_offsets']),
+            seasonal_counts=list(data['seasonal_counts']),
+            quantiles=list(data['quantiles']),
+            history=deque((tuple(sample) for sample in data.get('history', [])), maxlen=history_size)
+        )
+
+
+class StreamingAnomalyDetector:
+    """
+    Per-sample anomaly scoring over many live metric series.
+
+    A sample's expected value is the series level plus the seasonal offset of
+    its time-of-week bucket; its score is the absolute deviation from that in
+    EWMA standard deviations. States are updated after scoring, with the
+    deviation clipped to the threshold so anomalies do not drag the baseline.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        threshold_std: float = 3.0,
+        warmup: int = 30,
+        seasonal_alpha: float = 0.1,
+        season_buckets: int = 168,
+        bucket_seconds: int = 3600,
+        seasonal_min_count: int = 2,
+        quantile_levels: Tuple[float, ...] = (0.01, 0.5, 0.99),
+        quantile_rate: float = 0.05,
+        history_size: int = 256,
+        max_series: int = 100000
+    ):
+        self.alpha = alpha
+        self.threshold_std = threshold_std
+        self.warmup = warmup
+        self.seasonal_alpha = seasonal_alpha
+        self.season_buckets = season_buckets
+        self.bucket_seconds = bucket_seconds
+        self.seasonal_min_count = seasonal_min_count
+        self.quantile_levels = tuple(quantile_levels)
+        self.quantile_rate = quantile_rate
+        self.history_size = history_size
+        self.max_series = max_series
+
+        self.states: 'OrderedDict[str, SeriesState]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def update(self, series_key: str, timestamp: datetime, value: float) -> AnomalyResult:
+        """Score a new sample of a series and fold it into the series state."""
+        value = float(value)
+        seconds = _to_seconds(timestamp)
+
+        with self._lock:
+            state = self._get_state(series_key)
+            bucket = int(seconds // self.bucket_seconds) % self.season_buckets
+
+            if state.count == 0:
+                state.level = value
+                state.quantiles = [value] * len(self.quantile_levels)
+
+            seasonal = state.seasonal_counts[bucket] >= self.seasonal_min_count
+            offset = state.seasonal_offsets[bucket] if seasonal else 0.0
+            expected = state.level + offset
+            std = math.sqrt(state.variance)
+            warmed_up = state.count >= self.warmup
+
+            deviation = value - expected
+            z_score = abs(deviation) / (std + 1e-8) if warmed_up else 0.0
+            is_anomaly = warmed_up and z_score > self.threshold_std
+
+            quantiles = dict(zip(self.quantile_levels, state.quantiles))
+            self._update_state(state, bucket, seconds, value, offset, std, warmed_up)
+            count = state.count
+
+        return AnomalyResult(
+            timestamp=timestamp,
+            value=value,
+            is_anomaly=is_anomaly,
+            anomaly_score=z_score,
+            anomaly_type=AnomalyType.CONTEXTUAL_ANOMALY if seasonal else AnomalyType.POINT_ANOMALY,
+            confidence=min(1.0, z_score / self.threshold_std),
+            explanation={
+                'expected': expected,
+                'std': std,
+                'z_score': z_score,
+                'seasonal_offset': offset,
+                'quantiles': quantiles,
+                'series': series_key
+            },
+            metadata={
+                'series': series_key,
+                'samples': count,
+                'warmed_up': warmed_up
+            }
+        )
+
+    def update_many(self, samples: Iterable[Tuple[str, datetime, float]]) -> List[AnomalyResult]:
+        """Score samples in order; returns one result per sample."""
+        return [self.update(series_key, timestamp, value) for series_key, timestamp, value in samples]
+
+    def _get_state(self, series_key: str) -> SeriesState:
+        state = self.states.get(series_key)
+        if state is None:
+            state = SeriesState(
+                seasonal_offsets=[0.0] * self.season_buckets,
+                seasonal_counts=[0] * self.season_buckets,
+                history=deque(maxlen=self.history_size)
+            )
+            self.states[series_key] = state
+            if len(self.states) > self.max_series:
+                evicted, _ = self.states.popitem(last=False)
+                self.logger.debug(f"Evicted streaming state of series {evicted}")
+        else:
+            self.states.move_to_end(series_key)
+        return state
+
+    def _update_state(
+        self,
+        state: SeriesState,
+        bucket: int,
+        seconds: float,
+        value: float,
+        offset: float,
+        std: float,
+        warmed_up: bool
+    ):
+        # Level and variance of the deseasonalized value (exponentially weighted)
+        delta = value - offset - state.level
+        if warmed_up and std > 0:
+            limit = self.threshold_std * std
+            delta = max(-limit, min(limit, delta))
+        clipped_value = state.level + offset + delta
+        state.level += self.alpha * delta
+        state.variance = (1 - self.alpha) * (state.variance + self.alpha * delta * delta)
+
+        # Seasonal offset of this bucket relative to the updated level
+        seasonal_delta = clipped_value - state.level - state.seasonal_offsets[bucket]
+        state.seasonal_offsets[bucket] += self.seasonal_alpha * seasonal_delta
+        state.seasonal_counts[bucket] += 1
+
+        # Streaming quantiles: stochastic approximation with a scale-aware step
+        step = self.quantile_rate * (math.sqrt(state.variance) or abs(value) or 1.0)
+        for index, level in enumerate(self.quantile_levels):
+            estimate = state.quantiles[index]
+            state.quantiles[index] = estimate + step * (level - (1.0 if value < estimate else 0.0))
+
+        state.count += 1
+        state.last_timestamp = seconds
+        state.history.append((seconds, value))
+
+    def get_state(self, series_key: str) -> Optional[SeriesState]:
+        """Current state of a series, if tracked."""
+        return self.states.get(series_key)
+
+    def get_history(self, series_key: str) -> List[Tuple[float, float]]:
+        """Recent (epoch seconds, value) samples of a series."""
+        state = self.states.get(series_key)
+        return list(state.history) if state else []
+
+    def save_checkpoint(self, path: str):
+        """Write every series state to path, replacing it atomically."""
+        with self._lock:
+            payload = {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'season_buckets': self.season_buckets,
+                'quantile_levels': list(self.quantile_levels),
+                'states': {key: state.to_dict() for key, state in self.states.items()}
+            }
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_suffix(target.suffix + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(payload, f)
+        os.replace(temporary, target)
+        self.logger.info(f"Checkpointed {len(payload['states'])} streaming series states to {path}")
+
+    def load_checkpoint(self, path: str) -> int:
+        """
+        Restore series states from a checkpoint written by save_checkpoint.
+
+        Returns the number of series restored; a missing or incompatible
+        checkpoint restores nothing.
+        """
+        if not Path(path).exists():
+            return 0
+
+        with open(path, 'r') as f:
+            payload = json.load(f)
+
+        if (payload.get('season_buckets') != self.season_buckets
+                or tuple(payload.get('quantile_levels', ())) != self.quantile_levels):
+            self.logger.warning(f"Ignoring streaming checkpoint {path}: detector configuration changed")
+            return 0
+
+        with self._lock:
+            for key, data in payload['states'].items():
+                self.states[key] = SeriesState.from_dict(data, self.history_size)
+            while len(self.states) > self.max_series:
+                self.states.popitem(last=False)
+
+        self.logger.info(f"Restored {len(payload['states'])} streaming series states from {path}")
+        return len(payload['states'])
+
+
+def _to_seconds(timestamp: Any) -> float:
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
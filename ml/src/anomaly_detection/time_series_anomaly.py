@@ -10,6 +10,8 @@ Specialized algorithms for detecting anomalies in time series data including:
 """
 
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
@@ -29,11 +31,12 @@ import ruptures as rpt
 
 # Scientific computing
 from scipy import stats
-from scipy.signal import find_peaks
+from scipy.signal import find_peaks, lfilter
 import warnings
 warnings.filterwarnings('ignore')
 
 from .anomaly_detector import AnomalyResult, AnomalyType
+from .rolling import residual_flags, residual_scores, trend_change_flags
 
 
 class TimeSeriesAnomalyType(str, Enum):
@@ -101,15 +104,9 @@ class SeasonalAnomalyDetector:
         threshold = self.threshold_multiplier * residual_std
         
         # Detect anomalies
-        anomalies = []
-        for i, value in enumerate(ts):
-            if i < len(residuals):
-                is_anomaly = abs(residuals.iloc[i] - residual_mean) > threshold
-                anomalies.append(is_anomaly)
-            else:
-                anomalies.append(False)
-        
-        return anomalies
+        return residual_flags(
+            residuals.to_numpy(), len(ts), residual_mean, threshold
+        ).tolist()
 
 
 class ChangePointDetector:
@@ -188,17 +185,28 @@ class ChangePointDetector:
 
 
 class ForecastingAnomalyDetector:
-    """Detect anomalies using forecasting models."""
+    """
+    Detect anomalies using forecasting models.
+
+    Forecasts are made online: the model is fitted once per block of
+    refit_interval observations and its state is then updated one
+    observation at a time (Kalman filtering for ARIMA, the recursive level
+    update for exponential smoothing), rather than refitted for every point.
+    """
     
-    def __init__(self, model_type: str = 'arima', forecast_horizon: int = 1):
+    def __init__(self, model_type: str = 'arima', forecast_horizon: int = 1,
+                 refit_interval: int = 200):
         self.model_type = model_type
         self.forecast_horizon = forecast_horizon
+        self.refit_interval = refit_interval
+        self.order = (1, 1, 1)
         self.model = None
         self.prediction_interval = 0.95
         self.logger = logging.getLogger(__name__)
     
     def fit(self, ts: pd.Series, order: Tuple[int, int, int] = (1, 1, 1)):
         """Fit forecasting model."""
+        self.order = order
         try:
             if self.model_type == 'arima':
                 self.model = ARIMA(ts, order=order)
@@ -217,52 +225,67 @@ class ForecastingAnomalyDetector:
             self.fitted_model = None
     
     def detect_anomalies(self, ts: pd.Series, window_size: int = 50) -> List[bool]:
-        """Detect anomalies using rolling forecasts."""
+        """
+        Detect anomalies using online one-step-ahead forecasts.
+
+        Each block of refit_interval observations is forecast by a model
+        fitted on the window_size observations preceding it; an observation
+        is anomalous when it falls outside its forecast's prediction interval.
+        """
         if self.fitted_model is None:
             return [False] * len(ts)
         
-        anomalies = [False] * len(ts)
+        if self.model_type == 'arima':
+            forecast_bounds = self._arima_bounds
+        elif self.model_type == 'exponential_smoothing':
+            forecast_bounds = self._exponential_smoothing_bounds
+        else:
+            return [False] * len(ts)
+        
+        values = ts.to_numpy(dtype=np.float64)
+        anomalies = np.zeros(len(values), dtype=bool)
         
-        for i in range(window_size, len(ts)):
+        for start in range(window_size, len(values), max(1, self.refit_interval)):
+            end = min(start + max(1, self.refit_interval), len(values))
+            block = values[start:end]
             try:
-                # Use rolling window for prediction
-                train_data = ts.iloc[i-window_size:i]
-                
-                # Refit model on rolling window
-                if self.model_type == 'arima':
-                    temp_model = ARIMA(train_data, order=(1, 1, 1))
-                    temp_fitted = temp_model.fit()
-                    forecast = temp_fitted.forecast(steps=1)
-                    conf_int = temp_fitted.get_forecast(steps=1).conf_int()
-                elif self.model_type == 'exponential_smoothing':
-                    temp_model = ExponentialSmoothing(train_data)
-                    temp_fitted = temp_model.fit()
-                    forecast = temp_fitted.forecast(steps=1)
-                    # Simple confidence interval for exponential smoothing
-                    residuals = temp_fitted.resid
-                    std_error = residuals.std()
-                    z_score = stats.norm.ppf((1 + self.prediction_interval) / 2)
-                    margin = z_score * std_error
-                    conf_int = pd.DataFrame({
-                        'lower': [forecast[0] - margin],
-                        'upper': [forecast[0] + margin]
-                    })
-                else:
-                    continue
-                
-                # Check if actual value is outside prediction interval
-                actual_value = ts.iloc[i]
-                lower_bound = conf_int.iloc[0, 0]
-                upper_bound = conf_int.iloc[0, 1]
-                
-                if actual_value < lower_bound or actual_value > upper_bound:
-                    anomalies[i] = True
-                
+                lower, upper = forecast_bounds(values[start - window_size:start], block)
             except Exception as e:
-                self.logger.debug(f"Forecast anomaly detection failed at index {i}: {e}")
+                self.logger.debug(f"Forecast anomaly detection failed for indices {start}-{end}: {e}")
                 continue
+            
+            # Check if actual values are outside prediction intervals
+            anomalies[start:end] = (block < lower) | (block > upper)
         
-        return anomalies
+        return anomalies.tolist()
+    
+    def _arima_bounds(self, train: np.ndarray, block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Prediction intervals for a block from a Kalman filter run over it."""
+        fitted = ARIMA(train, order=self.order).fit()
+        
+        # Extend the fitted state space model with the block, keeping its parameters
+        prediction = fitted.extend(block).get_prediction()
+        conf_int = np.asarray(prediction.conf_int(alpha=1 - self.prediction_interval))
+        return conf_int[:, 0], conf_int[:, 1]
+    
+    def _exponential_smoothing_bounds(
+        self, train: np.ndarray, block: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Prediction intervals for a block from recursive level updates."""
+        fitted = ExponentialSmoothing(train).fit()
+        alpha = fitted.params['smoothing_level']
+        level = np.asarray(fitted.level)[-1]
+        
+        # Forecast for each point is the level after the previous observation:
+        # level_t = alpha * y_t + (1 - alpha) * level_(t-1)
+        levels, _ = lfilter([alpha], [1.0, alpha - 1.0], block, zi=[(1 - alpha) * level])
+        forecasts = np.concatenate(([level], levels[:-1]))
+        
+        # Simple confidence interval for exponential smoothing
+        std_error = np.std(np.asarray(fitted.resid), ddof=1)
+        z_score = stats.norm.ppf((1 + self.prediction_interval) / 2)
+        margin = z_score * std_error
+        return forecasts - margin, forecasts + margin
 
 
 class TrendAnomalyDetector:
@@ -278,30 +301,11 @@ class TrendAnomalyDetector:
         if len(ts) < 2 * self.window_size:
             return [False] * len(ts)
         
-        anomalies = [False] * len(ts)
-        
-        # Calculate rolling trends
-        trends = []
-        for i in range(self.window_size, len(ts) - self.window_size):
-            # Calculate trend before and after current point
-            before_window = ts.iloc[i-self.window_size:i]
-            after_window = ts.iloc[i:i+self.window_size]
-            
-            # Linear regression to get trend slopes
-            x_before = np.arange(len(before_window))
-            x_after = np.arange(len(after_window))
-            
-            slope_before = np.polyfit(x_before, before_window.values, 1)[0]
-            slope_after = np.polyfit(x_after, after_window.values, 1)[0]
-            
-            # Check for significant trend change
-            trend_change = abs(slope_after - slope_before)
-            trend_std = np.std([slope_before, slope_after])
-            
-            if trend_std > 0 and trend_change > self.threshold * trend_std:
-                anomalies[i] = True
-        
-        return anomalies
+        # Compare rolling trend slopes before and after each point
+        anomalies, _, _ = trend_change_flags(
+            ts.to_numpy(dtype=np.float64), self.window_size, self.threshold
+        )
+        return anomalies.tolist()
 
 
 class TimeSeriesAnomalyDetector:
@@ -313,11 +317,14 @@ class TimeSeriesAnomalyDetector:
     """
     
     def __init__(self, enable_seasonal: bool = True, enable_changepoint: bool = True,
-                 enable_forecasting: bool = True, enable_trend: bool = True):
+                 enable_forecasting: bool = True, enable_trend: bool = True,
+                 n_jobs: int = 1):
         self.enable_seasonal = enable_seasonal
         self.enable_changepoint = enable_changepoint
         self.enable_forecasting = enable_forecasting
         self.enable_trend = enable_trend
+        # Worker processes for scoring entities in parallel; None uses all CPUs
+        self.n_jobs = n_jobs
         
         self.seasonal_detector = SeasonalAnomalyDetector() if enable_seasonal else None
         self.changepoint_detector = ChangePointDetector() if enable_changepoint else None
@@ -341,12 +348,23 @@ class TimeSeriesAnomalyDetector:
         
         if entity_col:
             # Process each entity separately
-            for entity in df_sorted[entity_col].unique():
-                entity_data = df_sorted[df_sorted[entity_col] == entity]
-                entity_results = self._detect_anomalies_single_series(
-                    entity_data, value_col, timestamp_col, entity
-                )
-                results.extend(entity_results)
+            groups = list(df_sorted.groupby(entity_col, sort=False))
+            entities = [entity for entity, _ in groups]
+            frames = [entity_data for _, entity_data in groups]
+            
+            if self.n_jobs != 1 and len(groups) > 1:
+                with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                    entity_results = executor.map(
+                        self._detect_anomalies_single_series,
+                        frames, repeat(value_col), repeat(timestamp_col), entities
+                    )
+                    for results_for_entity in entity_results:
+                        results.extend(results_for_entity)
+            else:
+                for entity, entity_data in zip(entities, frames):
+                    results.extend(self._detect_anomalies_single_series(
+                        entity_data, value_col, timestamp_col, entity
+                    ))
         else:
             # Process single time series
             results = self._detect_anomalies_single_series(
@@ -370,34 +388,21 @@ class TimeSeriesAnomalyDetector:
         timestamps = pd.to_datetime(df[timestamp_col])
         
         # Initialize anomaly flags
-        anomaly_flags = {
-            'seasonal': [False] * len(ts),
-            'changepoint': [False] * len(ts),
-            'forecasting': [False] * len(ts),
-            'trend': [False] * len(ts)
-        }
-        
-        anomaly_scores = {
-            'seasonal': [0.0] * len(ts),
-            'changepoint': [0.0] * len(ts),
-            'forecasting': [0.0] * len(ts),
-            'trend': [0.0] * len(ts)
-        }
+        methods = ['seasonal', 'changepoint', 'forecasting', 'trend']
+        anomaly_flags = {method: np.zeros(len(ts), dtype=bool) for method in methods}
+        anomaly_scores = {method: np.zeros(len(ts)) for method in methods}
         
         # Seasonal anomaly detection
         if self.enable_seasonal and self.seasonal_detector:
             try:
                 self.seasonal_detector.fit(ts)
                 seasonal_anomalies = self.seasonal_detector.detect_anomalies(ts)
-                anomaly_flags['seasonal'] = seasonal_anomalies
+                anomaly_flags['seasonal'] = np.asarray(seasonal_anomalies, dtype=bool)
                 
                 # Calculate seasonal anomaly scores
                 if self.seasonal_detector.decomposition:
                     residuals = self.seasonal_detector.decomposition.resid.fillna(0)
-                    residual_std = residuals.std()
-                    for i, residual in enumerate(residuals):
-                        if i < len(ts):
-                            anomaly_scores['seasonal'][i] = abs(residual) / (residual_std + 1e-8)
+                    anomaly_scores['seasonal'] = residual_scores(residuals.to_numpy(), len(ts))
                             
             except Exception as e:
                 self.logger.error(f"Seasonal anomaly detection failed: {e}")
@@ -418,11 +423,10 @@ class TimeSeriesAnomalyDetector:
             try:
                 self.forecasting_detector.fit(ts)
                 forecast_anomalies = self.forecasting_detector.detect_anomalies(ts)
-                anomaly_flags['forecasting'] = forecast_anomalies
+                anomaly_flags['forecasting'] = np.asarray(forecast_anomalies, dtype=bool)
                 
                 # Simple scoring for forecasting anomalies
-                for i, is_anomaly in enumerate(forecast_anomalies):
-                    anomaly_scores['forecasting'][i] = 1.0 if is_anomaly else 0.0
+                anomaly_scores['forecasting'] = anomaly_flags['forecasting'].astype(float)
                     
             except Exception as e:
                 self.logger.error(f"Forecasting anomaly detection failed: {e}")
@@ -431,54 +435,45 @@ class TimeSeriesAnomalyDetector:
         if self.enable_trend and self.trend_detector:
             try:
                 trend_anomalies = self.trend_detector.detect_trend_changes(ts)
-                anomaly_flags['trend'] = trend_anomalies
+                anomaly_flags['trend'] = np.asarray(trend_anomalies, dtype=bool)
                 
                 # Simple scoring for trend anomalies
-                for i, is_anomaly in enumerate(trend_anomalies):
-                    anomaly_scores['trend'][i] = 1.0 if is_anomaly else 0.0
+                anomaly_scores['trend'] = anomaly_flags['trend'].astype(float)
                     
             except Exception as e:
                 self.logger.error(f"Trend anomaly detection failed: {e}")
         
-        # Combine results
+        # Combine results across detectors
+        flag_matrix = np.vstack([anomaly_flags[method] for method in methods])
+        score_matrix = np.vstack([anomaly_scores[method] for method in methods])
+        is_anomaly = flag_matrix.any(axis=0)
+        combined_scores = score_matrix.max(axis=0)
+        contextual = anomaly_flags['changepoint'] | anomaly_flags['seasonal']
+        values = ts.to_numpy(dtype=np.float64)
+        
+        # Only points flagged or scored by some detector produce a result
         results = []
-        for i in range(len(ts)):
-            # Check if any detector flagged this point
-            is_anomaly_list = [anomaly_flags[method][i] for method in anomaly_flags.keys()]
-            is_anomaly = any(is_anomaly_list)
-            
-            # Combine anomaly scores
-            scores = [anomaly_scores[method][i] for method in anomaly_scores.keys()]
-            combined_score = max(scores) if scores else 0.0
-            
-            # Determine anomaly type
-            anomaly_type = AnomalyType.POINT_ANOMALY
-            if anomaly_flags['changepoint'][i]:
-                anomaly_type = AnomalyType.CONTEXTUAL_ANOMALY
-            elif anomaly_flags['seasonal'][i]:
-                anomaly_type = AnomalyType.CONTEXTUAL_ANOMALY
-            
-            # Create result
-            if is_anomaly or combined_score > 0:
-                result = AnomalyResult(
-                    timestamp=timestamps.iloc[i],
-                    value=float(ts.iloc[i]),
-                    is_anomaly=is_anomaly,
-                    anomaly_score=combined_score,
-                    anomaly_type=anomaly_type,
-                    confidence=min(1.0, combined_score),
-                    explanation={
-                        'methods_triggered': [method for method, flag in anomaly_flags.items() if flag[i]],
-                        'method_scores': {method: score[i] for method, score in anomaly_scores.items()},
-                        'entity': entity
-                    },
-                    metadata={
-                        'ts_index': i,
-                        'entity': entity,
-                        'detection_methods': list(anomaly_flags.keys())
-                    }
-                )
-                results.append(result)
+        for i in np.flatnonzero(is_anomaly | (combined_scores > 0)):
+            combined_score = float(combined_scores[i])
+            result = AnomalyResult(
+                timestamp=timestamps.iloc[i],
+                value=float(values[i]),
+                is_anomaly=bool(is_anomaly[i]),
+                anomaly_score=combined_score,
+                anomaly_type=AnomalyType.CONTEXTUAL_ANOMALY if contextual[i] else AnomalyType.POINT_ANOMALY,
+                confidence=min(1.0, combined_score),
+                explanation={
+                    'methods_triggered': [method for method in methods if anomaly_flags[method][i]],
+                    'method_scores': {method: float(score_matrix[row, i]) for row, method in enumerate(methods)},
+                    'entity': entity
+                },
+                metadata={
+                    'ts_index': int(i),
+                    'entity': entity,
+                    'detection_methods': methods
+                }
+            )
+            results.append(result)
         
         self.logger.info(f"Detected {len([r for r in results if r.is_anomaly])} anomalies in time series")
         return results
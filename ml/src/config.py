@@ -143,8 +143,12 @@ class InferenceConfig:
     port: int = 8000
     workers: int = 4
     max_batch_size: int = 32
+    max_batch_wait_ms: float = 5.0  # longest a request waits for its micro-batch to fill
     timeout: int = 30
     cache_size: int = 1000
+    model_cache_max_models: int = 8
+    model_cache_memory_mb: float = 2048  # 0 disables the memory budget
+    warmup_production_models: bool = True
     enable_metrics: bool = True
     
     @classmethod
@@ -154,12 +158,64 @@ class InferenceConfig:
             port=int(os.getenv('INFERENCE_PORT', '8000')),
             workers=int(os.getenv('INFERENCE_WORKERS', '4')),
             max_batch_size=int(os.getenv('INFERENCE_MAX_BATCH_SIZE', '32')),
+            max_batch_wait_ms=float(os.getenv('INFERENCE_MAX_BATCH_WAIT_MS', '5')),
             timeout=int(os.getenv('INFERENCE_TIMEOUT', '30')),
             cache_size=int(os.getenv('INFERENCE_CACHE_SIZE', '1000')),
+            model_cache_max_models=int(os.getenv('INFERENCE_MODEL_CACHE_MAX_MODELS', '8')),
+            model_cache_memory_mb=float(os.getenv('INFERENCE_MODEL_CACHE_MEMORY_MB', '2048')),
+            warmup_production_models=os.getenv('INFERENCE_WARMUP_PRODUCTION_MODELS', 'true').lower() == 'true',
             enable_metrics=os.getenv('INFERENCE_ENABLE_METRICS', 'true').lower() == 'true'
         )
 
 
+@dataclass
+class FeatureStoreConfig:
+    """Feature store serving and retrieval configuration."""
+    online_ttl: int = 86400  # seconds records live in Redis
+    online_batch_size: int = 500  # keys per MGET
+    online_cache_size: int = 10000
+    online_cache_ttl: float = 0.0  # seconds; 0 disables the in-process cache
+    historical_engine: str = "database"  # database (PostgreSQL as-of joins) or local (pandas)
+    historical_chunk_size: int = 100000  # entity rows per streamed chunk
+    offline_partition_interval: str = "month"  # day, week or month partitions of fg_* tables
+    
+    @classmethod
+    def from_env(cls) -> 'FeatureStoreConfig':
+        return cls(
+            online_ttl=int(os.getenv('FEATURE_STORE_ONLINE_TTL', '86400')),
+            online_batch_size=int(os.getenv('FEATURE_STORE_ONLINE_BATCH_SIZE', '500')),
+            online_cache_size=int(os.getenv('FEATURE_STORE_ONLINE_CACHE_SIZE', '10000')),
+            online_cache_ttl=float(os.getenv('FEATURE_STORE_ONLINE_CACHE_TTL', '0')),
+            historical_engine=os.getenv('FEATURE_STORE_HISTORICAL_ENGINE', 'database'),
+            historical_chunk_size=int(os.getenv('FEATURE_STORE_HISTORICAL_CHUNK_SIZE', '100000')),
+            offline_partition_interval=os.getenv('FEATURE_STORE_OFFLINE_PARTITION_INTERVAL', 'month')
+        )
+
+
+@dataclass
+class StreamingConfig:
+    """Streaming anomaly detection configuration."""
+    enabled: bool = True
+    checkpoint_path: str = "./checkpoints/streaming_anomaly_state.json"
+    checkpoint_interval: int = 300  # seconds
+    alpha: float = 0.05
+    threshold_std: float = 3.0
+    warmup: int = 30
+    max_series: int = 100000
+    
+    @classmethod
+    def from_env(cls) -> 'StreamingConfig':
+        return cls(
+            enabled=os.getenv('STREAMING_ANOMALY_ENABLED', 'true').lower() == 'true',
+            checkpoint_path=os.getenv('STREAMING_CHECKPOINT_PATH', './checkpoints/streaming_anomaly_state.json'),
+            checkpoint_interval=int(os.getenv('STREAMING_CHECKPOINT_INTERVAL', '300')),
+            alpha=float(os.getenv('STREAMING_ALPHA', '0.05')),
+            threshold_std=float(os.getenv('STREAMING_THRESHOLD_STD', '3.0')),
+            warmup=int(os.getenv('STREAMING_WARMUP', '30')),
+            max_series=int(os.getenv('STREAMING_MAX_SERIES', '100000'))
+        )
+
+
 @dataclass
 class MLConfig:
     """Complete ML infrastructure configuration."""
@@ -170,6 +226,8 @@ class MLConfig:
     s3: S3Config = field(default_factory=S3Config.from_env)
     model: ModelConfig = field(default_factory=ModelConfig.from_env)
     inference: InferenceConfig = field(default_factory=InferenceConfig.from_env)
+    feature_store: FeatureStoreConfig = field(default_factory=FeatureStoreConfig.from_env)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig.from_env)
     
     @classmethod
     def from_file(cls, config_path: str) -> 'MLConfig':
@@ -184,7 +242,9 @@ class MLConfig:
             mlflow=MLflowConfig(**config_data.get('mlflow', {})),
             s3=S3Config(**config_data.get('s3', {})),
             model=ModelConfig(**config_data.get('model', {})),
-            inference=InferenceConfig(**config_data.get('inference', {}))
+            inference=InferenceConfig(**config_data.get('inference', {})),
+            feature_store=FeatureStoreConfig(**config_data.get('feature_store', {})),
+            streaming=StreamingConfig(**config_data.get('streaming', {}))
         )
 
 
@@ -245,6 +305,19 @@ def get_feature_store_config() -> Dict[str, Any]:
             'database': config.postgresql.database,
             'user': config.postgresql.user,
             'password': config.postgresql.password
+        },
+        'online': {
+            'ttl': config.feature_store.online_ttl,
+            'batch_size': config.feature_store.online_batch_size,
+            'cache_size': config.feature_store.online_cache_size,
+            'cache_ttl': config.feature_store.online_cache_ttl
+        },
+        'historical': {
+            'engine': config.feature_store.historical_engine,
+            'chunk_size': config.feature_store.historical_chunk_size
+        },
+        'offline': {
+            'partition_interval': config.feature_store.offline_partition_interval
         }
     }
 
@@ -283,12 +356,30 @@ def get_inference_config() -> Dict[str, Any]:
         'port': config.inference.port,
         'workers': config.inference.workers,
         'max_batch_size': config.inference.max_batch_size,
+        'max_batch_wait_ms': config.inference.max_batch_wait_ms,
         'timeout': config.inference.timeout,
         'cache_size': config.inference.cache_size,
+        'model_cache_max_models': config.inference.model_cache_max_models,
+        'model_cache_memory_mb': config.inference.model_cache_memory_mb,
+        'warmup_production_models': config.inference.warmup_production_models,
         'enable_metrics': config.inference.enable_metrics
     }
 
 
+def get_streaming_config() -> Dict[str, Any]:
+    """Get streaming anomaly detection configuration as dictionary."""
+    config = get_config()
+    return {
+        'enabled': config.streaming.enabled,
+        'checkpoint_path': config.streaming.checkpoint_path,
+        'checkpoint_interval': config.streaming.checkpoint_interval,
+        'alpha': config.streaming.alpha,
+        'threshold_std': config.streaming.threshold_std,
+        'warmup': config.streaming.warmup,
+        'max_series': config.streaming.max_series
+    }
+
+
 # Environment-specific configurations
 DEVELOPMENT_CONFIG = {
     'kafka': {
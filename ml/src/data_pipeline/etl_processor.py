@@ -5,9 +5,10 @@ Handles Extract, Transform, Load operations for ML feature engineering.
 """
 
 import logging
+import threading
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -17,11 +18,23 @@ import polars as pl
 
 from ..config import get_database_config, get_feature_store_config
 from ..utils.database import DatabaseManager
-from ..utils.feature_store import FeatureStore
+from ..feature_store.feature_store import FeatureStore
 from ..utils.data_validation import DataValidator
 from ..utils.monitoring import MetricsCollector
 
 
+# Resample period of transforms that aggregate rows into time buckets. An
+# incremental slice must cover whole buckets: a partial bucket would be
+# upserted over the complete one written by a neighbouring slice.
+TRANSFORM_BUCKETS = {
+    'deployment_features': '1h',
+    'alert_features': '1h',
+    'performance_features': '1h',
+    'cost_features': '1d',
+    'security_features': '1h',
+}
+
+
 @dataclass
 class ETLJob:
     """Configuration for an ETL job."""
@@ -34,6 +47,9 @@ class ETLJob:
     dependencies: List[str] = field(default_factory=list)
     enabled: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
+    incremental: bool = False  # resume from the persisted watermark instead of now - window_size
+    chunk_size: Optional[str] = None  # time slice loaded at once; defaults to the transform's bucket
+    lookback: str = '0h'  # history read before each slice for rolling and lag features
 
 
 class ETLProcessor:
@@ -43,8 +59,9 @@ class ETLProcessor:
     Handles data extraction, transformation, and loading into feature store.
     """
     
-    def __init__(self, max_workers: int = 8):
+    def __init__(self, max_workers: int = 8, stream_batch_size: int = 50000):
         self.max_workers = max_workers
+        self.stream_batch_size = stream_batch_size
         self.db_config = get_database_config()
         self.fs_config = get_feature_store_config()
         
@@ -56,8 +73,13 @@ class ETLProcessor:
         self.validator = DataValidator()
         
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Chunks of incremental jobs get their own pool: job threads wait on them
+        self.chunk_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='etl-chunk')
         self.transform_functions: Dict[str, Callable] = {}
         
+        self._watermark_lock = threading.Lock()
+        self._watermark_table_ready = False
+        
         self._register_transforms()
     
     def _register_transforms(self):
@@ -101,6 +123,9 @@ class ETLProcessor:
     
     def _process_single_job(self, job: ETLJob) -> Dict[str, Any]:
         """Process a single ETL job."""
+        if job.incremental:
+            return self._process_incremental_job(job)
+        
         start_time = datetime.utcnow()
         self.logger.info(f"Starting ETL job: {job.name}")
         
@@ -140,6 +165,218 @@ class ETLProcessor:
             self.logger.error(f"ETL job {job.name} failed: {e}")
             raise
     
+    def _process_incremental_job(self, job: ETLJob) -> Dict[str, Any]:
+        """
+        Process a job incrementally from its watermark, one time slice at a time.
+        
+        Complete slices between the watermark and now are extracted,
+        transformed, validated and loaded independently across the chunk
+        pool, so at most max_workers slices are in memory. The watermark
+        advances past every slice that completed together with all slices
+        before it; after a failure the next run resumes from the first
+        unfinished slice (re-loading later slices is an idempotent upsert).
+        
+        Slices finish in any order, so they only load the offline store. The
+        online store is written once at the end, with the newest row of each
+        entity among the slices the watermark advanced over.
+        """
+        start_time = datetime.utcnow()
+        chunks = self._plan_chunks(job, start_time)
+        if not chunks:
+            return {
+                'status': 'completed',
+                'message': 'No new data to process',
+                'records_processed': 0,
+                'duration': 0,
+                'watermark': self._get_watermark(job.name)
+            }
+        
+        self.logger.info(
+            f"Starting incremental ETL job {job.name}: {len(chunks)} chunks "
+            f"from {chunks[0][0]} to {chunks[-1][1]}"
+        )
+        lookback = self._parse_window_size(job.lookback)
+        futures = {
+            self.chunk_executor.submit(self._process_chunk, job, chunk_start, chunk_end, lookback): index
+            for index, (chunk_start, chunk_end) in enumerate(chunks)
+        }
+        
+        completed = [False] * len(chunks)
+        latest_rows: Dict[int, pd.DataFrame] = {}
+        online_rows = pd.DataFrame()
+        next_pending = 0
+        records_processed = 0
+        errors = []
+        
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                records, latest_rows[index] = future.result()
+                records_processed += records
+                completed[index] = True
+            except Exception as e:
+                chunk_start, chunk_end = chunks[index]
+                self.logger.error(f"ETL job {job.name} chunk {chunk_start} - {chunk_end} failed: {e}")
+                errors.append(f"{chunk_start} - {chunk_end}: {e}")
+                self.metrics.increment('chunks_failed')
+                continue
+            
+            self.metrics.increment('chunks_completed')
+            if index == next_pending:
+                advanced = []
+                while next_pending < len(chunks) and completed[next_pending]:
+                    advanced.append(latest_rows.pop(next_pending))
+                    next_pending += 1
+                self._set_watermark(job.name, chunks[next_pending - 1][1])
+                online_rows = self._merge_latest_rows(job, [online_rows, *advanced])
+        
+        if not online_rows.empty:
+            try:
+                self._load_data(job, online_rows, write_offline=False)
+            except Exception as e:
+                self.logger.error(f"ETL job {job.name} online store update failed: {e}")
+                errors.append(f"online store: {e}")
+        
+        watermark = self._get_watermark(job.name)
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} of {len(chunks)} chunks failed, watermark at {watermark}: {errors[0]}"
+            )
+        
+        return {
+            'status': 'completed',
+            'records_processed': records_processed,
+            'chunks_processed': len(chunks),
+            'duration': (datetime.utcnow() - start_time).total_seconds(),
+            'watermark': watermark,
+            'timestamp': start_time.isoformat()
+        }
+    
+    def _chunk_delta(self, job: ETLJob) -> timedelta:
+        """Slice length of an incremental job, checked against its transform's buckets."""
+        bucket = TRANSFORM_BUCKETS.get(job.transform_function)
+        if job.chunk_size is None:
+            return self._parse_window_size(bucket or '1h')
+        
+        chunk_delta = self._parse_window_size(job.chunk_size)
+        if bucket and chunk_delta % self._parse_window_size(bucket):
+            raise ValueError(
+                f"ETL job {job.name}: chunk_size {job.chunk_size} is not a multiple of the "
+                f"{bucket} buckets produced by {job.transform_function}"
+            )
+        return chunk_delta
+    
+    def _plan_chunks(self, job: ETLJob, now: datetime) -> List[Tuple[datetime, datetime]]:
+        """Complete time slices between the job watermark and now."""
+        chunk_delta = self._chunk_delta(job)
+        end_time = pd.Timestamp(now).floor(chunk_delta).to_pydatetime()
+        
+        start_time = self._get_watermark(job.name)
+        if start_time is None:
+            window_delta = self._parse_window_size(job.window_size)
+            start_time = end_time - window_delta
+        # Slices start on bucket boundaries even after reset_watermark to an arbitrary time
+        start_time = pd.Timestamp(start_time).floor(chunk_delta).to_pydatetime()
+        
+        chunks = []
+        while start_time < end_time:
+            chunk_end = min(start_time + chunk_delta, end_time)
+            chunks.append((start_time, chunk_end))
+            start_time = chunk_end
+        return chunks
+    
+    def _process_chunk(
+        self,
+        job: ETLJob,
+        chunk_start: datetime,
+        chunk_end: datetime,
+        lookback: timedelta
+    ) -> Tuple[int, pd.DataFrame]:
+        """
+        Extract, transform, validate and load one time slice into the offline store.
+        
+        Returns:
+            Tuple of (rows loaded, newest row of each entity in the slice)
+        """
+        raw_data = self._extract_range(job, chunk_start - lookback, chunk_end)
+        if raw_data.empty:
+            return 0, pd.DataFrame()
+        
+        transformed_data = self._transform_data(job, raw_data)
+        if lookback and not transformed_data.empty:
+            # Lookback rows only feed rolling and lag features of this slice
+            timestamps = pd.to_datetime(transformed_data['timestamp'])
+            transformed_data = transformed_data[timestamps >= chunk_start].reset_index(drop=True)
+        if transformed_data.empty:
+            return 0, pd.DataFrame()
+        
+        validation_result = self.validator.validate_features(transformed_data)
+        if not validation_result.is_valid:
+            raise ValueError(f"Data validation failed: {validation_result.errors}")
+        
+        self._load_data(job, transformed_data, write_online=False)
+        return len(transformed_data), self._merge_latest_rows(job, [transformed_data])
+    
+    def _merge_latest_rows(self, job: ETLJob, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Newest row of each entity across frames."""
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return self.feature_store.latest_feature_rows(
+            job.target_feature_group, pd.concat(frames, ignore_index=True), 'timestamp'
+        )
+    
+    def _ensure_watermark_table(self):
+        """Create the watermark table on first use."""
+        with self._watermark_lock:
+            if self._watermark_table_ready:
+                return
+            self.db_manager.execute_non_query("""
+                CREATE TABLE IF NOT EXISTS etl_watermarks (
+                    job_name VARCHAR(255) PRIMARY KEY,
+                    watermark TIMESTAMP NOT NULL,
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+            """)
+            self._watermark_table_ready = True
+    
+    def _get_watermark(self, job_name: str) -> Optional[datetime]:
+        """End of the data a job has fully processed, if it has run incrementally."""
+        self._ensure_watermark_table()
+        with self.db_manager.engine.connect() as conn:
+            watermark = conn.execute(
+                text("SELECT watermark FROM etl_watermarks WHERE job_name = :job_name"),
+                {'job_name': job_name}
+            ).scalar()
+        return watermark
+    
+    def _set_watermark(self, job_name: str, watermark: datetime):
+        """Persist a job watermark; it only ever moves forward."""
+        self._ensure_watermark_table()
+        self.db_manager.execute_non_query(
+            """
+            INSERT INTO etl_watermarks (job_name, watermark, updated_at)
+            VALUES (:job_name, :watermark, NOW())
+            ON CONFLICT (job_name) DO UPDATE
+            SET watermark = GREATEST(etl_watermarks.watermark, EXCLUDED.watermark),
+                updated_at = NOW()
+            """,
+            {'job_name': job_name, 'watermark': watermark}
+        )
+    
+    def reset_watermark(self, job_name: str, watermark: Optional[datetime] = None):
+        """Move a job watermark back (or clear it) to reprocess data on the next run."""
+        self._ensure_watermark_table()
+        if watermark is None:
+            self.db_manager.execute_non_query(
+                "DELETE FROM etl_watermarks WHERE job_name = :job_name", {'job_name': job_name}
+            )
+        else:
+            self.db_manager.execute_non_query(
+                "UPDATE etl_watermarks SET watermark = :watermark, updated_at = NOW() WHERE job_name = :job_name",
+                {'job_name': job_name, 'watermark': watermark}
+            )
+    
     def _extract_data(self, job: ETLJob) -> pd.DataFrame:
         """Extract data from source table."""
         # Calculate time window
@@ -147,14 +384,20 @@ class ETLProcessor:
         window_delta = self._parse_window_size(job.window_size)
         start_time = end_time - window_delta
         
-        # Build query based on source table
+        return self._extract_range(job, start_time, end_time)
+    
+    def _extract_range(self, job: ETLJob, start_time: datetime, end_time: datetime) -> pd.DataFrame:
+        """Extract a time range, streamed from a server-side cursor in batches."""
         query = self._build_extraction_query(job, start_time, end_time)
         
-        # Execute query
-        with self.db_manager.get_connection() as conn:
-            df = pd.read_sql(query, conn)
+        frames = []
+        with self.db_manager.engine.connect() as conn:
+            stream = conn.execution_options(stream_results=True, max_row_buffer=self.stream_batch_size)
+            for frame in pd.read_sql(text(query), stream, chunksize=self.stream_batch_size):
+                frames.append(frame)
         
-        self.logger.info(f"Extracted {len(df)} records from {job.source_table}")
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        self.logger.info(f"Extracted {len(df)} records from {job.source_table} ({start_time} - {end_time})")
         return df
     
     def _build_extraction_query(self, job: ETLJob, start_time: datetime, end_time: datetime) -> str:
@@ -276,12 +519,22 @@ class ETLProcessor:
         
         return transform_func(data, job.metadata)
     
-    def _load_data(self, job: ETLJob, data: pd.DataFrame):
+    def _load_data(
+        self,
+        job: ETLJob,
+        data: pd.DataFrame,
+        write_online: bool = True,
+        write_offline: bool = True
+    ):
         """Load transformed data into feature store."""
         self.feature_store.write_features(
             feature_group=job.target_feature_group,
             data=data,
-            timestamp_column='timestamp'
+            timestamp_column='timestamp',
+            write_online=write_online,
+            write_offline=write_offline,
+            # Online-only writes repeat rows already counted by their offline load
+            update_statistics=write_offline
         )
     
     def _parse_window_size(self, window_size: str) -> timedelta:
@@ -566,6 +819,7 @@ class ETLProcessor:
         return {
             'name': job_name,
             'status': 'unknown',
+            'watermark': self._get_watermark(job_name),
             'last_run': None,
             'next_run': None,
             'metrics': {}
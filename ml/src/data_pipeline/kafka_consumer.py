@@ -16,7 +16,8 @@ import pandas as pd
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
-from ..config import get_kafka_config, get_database_config
+from ..anomaly_detection.streaming import StreamingAnomalyDetector
+from ..config import get_kafka_config, get_database_config, get_streaming_config
 from ..utils.database import DatabaseManager
 from ..utils.monitoring import MetricsCollector
 
@@ -49,6 +50,7 @@ class KafkaDataConsumer:
         self.max_workers = max_workers
         self.kafka_config = get_kafka_config()
         self.db_config = get_database_config()
+        self.streaming_config = get_streaming_config()
         
         self.logger = logging.getLogger(__name__)
         self.metrics = MetricsCollector("kafka_consumer")
@@ -59,7 +61,11 @@ class KafkaDataConsumer:
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.message_handlers: Dict[str, Callable] = {}
         
+        self.anomaly_detector: Optional[StreamingAnomalyDetector] = None
+        self.last_checkpoint = time.time()
+        
         self._setup_consumer()
+        self._setup_anomaly_detector()
         self._setup_message_handlers()
     
     def _setup_consumer(self):
@@ -90,6 +96,35 @@ class KafkaDataConsumer:
         
         self.logger.info(f"Kafka consumer initialized for topics: {self.topics}")
     
+    def _setup_anomaly_detector(self):
+        """Initialize streaming anomaly detection, restoring checkpointed state."""
+        if not self.streaming_config['enabled']:
+            return
+        
+        self.anomaly_detector = StreamingAnomalyDetector(
+            alpha=self.streaming_config['alpha'],
+            threshold_std=self.streaming_config['threshold_std'],
+            warmup=self.streaming_config['warmup'],
+            max_series=self.streaming_config['max_series']
+        )
+        try:
+            self.anomaly_detector.load_checkpoint(self.streaming_config['checkpoint_path'])
+        except Exception as e:
+            self.logger.error(f"Failed to restore streaming anomaly state: {e}")
+    
+    def _checkpoint_anomaly_detector(self, force: bool = False):
+        """Checkpoint streaming anomaly state when the interval has elapsed."""
+        if self.anomaly_detector is None:
+            return
+        if not force and time.time() - self.last_checkpoint < self.streaming_config['checkpoint_interval']:
+            return
+        
+        try:
+            self.anomaly_detector.save_checkpoint(self.streaming_config['checkpoint_path'])
+            self.last_checkpoint = time.time()
+        except Exception as e:
+            self.logger.error(f"Failed to checkpoint streaming anomaly state: {e}")
+    
     def _setup_message_handlers(self):
         """Setup handlers for different message types."""
         self.message_handlers = {
@@ -166,6 +201,7 @@ class KafkaDataConsumer:
         if self.consumer:
             self.consumer.close()
         self.executor.shutdown(wait=True)
+        self._checkpoint_anomaly_detector(force=True)
         self.logger.info("Kafka consumer stopped")
     
     def _parse_message(self, message) -> Optional[DataRecord]:
@@ -237,6 +273,7 @@ class KafkaDataConsumer:
         
         self.logger.info(f"Processed batch of {len(batch)} records")
         self.metrics.increment('batches_processed')
+        self._checkpoint_anomaly_detector()
     
     def _handle_infrastructure_metrics(self, records: List[DataRecord]):
         """Handle infrastructure monitoring metrics."""
@@ -259,6 +296,43 @@ class KafkaDataConsumer:
             df = pd.DataFrame(df_data)
             self.db_manager.insert_dataframe('infrastructure_metrics', df)
             self.logger.debug(f"Stored {len(df_data)} infrastructure metrics")
+        
+        if self.anomaly_detector is not None:
+            self._score_infrastructure_metrics(records)
+    
+    def _score_infrastructure_metrics(self, records: List[DataRecord]):
+        """Score infrastructure metric samples with the streaming anomaly detector."""
+        anomalies = []
+        for record in records:
+            data = record.data
+            try:
+                value = float(data.get('value'))
+            except (TypeError, ValueError):
+                continue
+            
+            series_key = '/'.join(
+                str(data.get(key) or '') for key in ('host', 'service', 'metric_name')
+            )
+            result = self.anomaly_detector.update(series_key, record.timestamp, value)
+            if result.is_anomaly:
+                anomalies.append({
+                    'timestamp': record.timestamp,
+                    'source': record.source,
+                    'host': data.get('host'),
+                    'service': data.get('service'),
+                    'metric_name': data.get('metric_name'),
+                    'metric_value': value,
+                    'expected_value': result.explanation['expected'],
+                    'anomaly_score': result.anomaly_score,
+                    'anomaly_type': result.anomaly_type.value,
+                    'labels': json.dumps(data.get('labels', {}))
+                })
+        
+        self.metrics.increment('stream_samples_scored', len(records))
+        if anomalies:
+            self.metrics.increment('stream_anomalies_detected', len(anomalies))
+            self.db_manager.insert_dataframe('metric_anomalies', pd.DataFrame(anomalies))
+            self.logger.info(f"Detected {len(anomalies)} anomalies in infrastructure metrics")
     
     def _handle_application_logs(self, records: List[DataRecord]):
         """Handle application log events."""
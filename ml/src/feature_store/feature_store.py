@@ -6,9 +6,8 @@ High-performance feature storage and retrieval using Redis and PostgreSQL.
 
 import json
 import logging
-import pickle
 import hashlib
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Union, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 import pandas as pd
@@ -21,6 +20,22 @@ import uuid
 
 from ..config import get_feature_store_config, get_database_config
 from ..utils.monitoring import MetricsCollector
+from .online import (
+    OnlineFeatureCache,
+    entity_keys,
+    feature_records,
+    read_online_records,
+    write_online_records,
+)
+from .offline import OfflineFeatureTable, quote_identifier
+from .point_in_time import (
+    as_of_join,
+    build_as_of_query,
+    iter_chunks,
+    prepare_entities,
+    unique_columns,
+    upload_entities,
+)
 
 
 @dataclass
@@ -74,6 +89,25 @@ class FeatureStore:
         # Feature metadata cache
         self._feature_groups_cache: Dict[str, FeatureGroup] = {}
         self._feature_views_cache: Dict[str, FeatureView] = {}
+        
+        # Online serving settings and hot entity cache
+        online_config = config.get('online', {})
+        self.online_ttl = online_config.get('ttl', 86400)
+        self.online_batch_size = online_config.get('batch_size', 500)
+        self.online_cache = OnlineFeatureCache(
+            max_entries=online_config.get('cache_size', 10000),
+            ttl=online_config.get('cache_ttl', 0.0)
+        )
+        
+        # Historical retrieval: 'database' joins in PostgreSQL, 'local' with pandas
+        historical_config = config.get('historical', {})
+        self.historical_engine = historical_config.get('engine', 'database')
+        self.historical_chunk_size = historical_config.get('chunk_size', 100000)
+        
+        # Offline storage: partitioned fg_* tables, loaded with COPY
+        offline_config = config.get('offline', {})
+        self.offline_partition_interval = offline_config.get('partition_interval', 'month')
+        self._offline_tables: Dict[str, OfflineFeatureTable] = {}
     
     def _setup_redis(self):
         """Setup Redis connection for online feature serving."""
@@ -84,7 +118,7 @@ class FeatureStore:
             port=redis_config['port'],
             db=redis_config['db'],
             password=redis_config.get('password'),
-            decode_responses=False,  # Keep binary for pickled data
+            decode_responses=False,  # Keep binary for encoded feature records
             socket_connect_timeout=5,
             socket_timeout=5,
             retry_on_timeout=True,
@@ -259,7 +293,8 @@ class FeatureStore:
         data: pd.DataFrame,
         timestamp_column: str = 'timestamp',
         write_online: bool = True,
-        write_offline: bool = True
+        write_offline: bool = True,
+        update_statistics: bool = True
     ):
         """Write features to both online and offline stores."""
         if data.empty:
@@ -276,35 +311,60 @@ class FeatureStore:
         
         # Write to offline store (PostgreSQL)
         if write_offline:
-            self._write_offline_features(feature_group, data, timestamp_column)
+            self._write_offline_features(feature_group, data, timestamp_column, fg.entity_columns)
         
         # Write to online store (Redis)
         if write_online:
             self._write_online_features(feature_group, data, timestamp_column, fg.entity_columns)
         
         # Update feature statistics
-        self._update_feature_statistics(feature_group, data)
+        if update_statistics:
+            self._update_feature_statistics(feature_group, data)
         
         self.metrics.increment('features_written', tags={'feature_group': feature_group})
         self.logger.info(f"Wrote {len(data)} records to feature group: {feature_group}")
     
-    def _write_offline_features(self, feature_group: str, data: pd.DataFrame, timestamp_column: str):
-        """Write features to PostgreSQL for historical storage."""
-        table_name = f"fg_{feature_group}"
+    def latest_feature_rows(
+        self,
+        feature_group: str,
+        data: pd.DataFrame,
+        timestamp_column: str = 'timestamp'
+    ) -> pd.DataFrame:
+        """Newest row of each entity in data, i.e. the rows the online store serves."""
+        fg = self._get_feature_group(feature_group)
+        if not fg:
+            raise ValueError(f"Feature group not found: {feature_group}")
+        if not fg.entity_columns or data.empty:
+            return data.iloc[0:0]
+        
+        return data.sort_values(timestamp_column, kind='stable').drop_duplicates(
+            subset=fg.entity_columns, keep='last'
+        ).reset_index(drop=True)
+    
+    def _write_offline_features(
+        self,
+        feature_group: str,
+        data: pd.DataFrame,
+        timestamp_column: str,
+        entity_columns: List[str]
+    ):
+        """Write features to PostgreSQL for historical storage, upserting by entity and timestamp."""
+        table = self._offline_tables.get(feature_group)
+        if table is None:
+            table = OfflineFeatureTable(
+                f"fg_{feature_group}",
+                entity_columns,
+                timestamp_column,
+                partition_interval=self.offline_partition_interval
+            )
+            self._offline_tables[feature_group] = table
         
         # Ensure timestamp is datetime
         if timestamp_column in data.columns:
             data[timestamp_column] = pd.to_datetime(data[timestamp_column])
         
-        # Write to PostgreSQL
-        data.to_sql(
-            table_name,
-            self.pg_engine,
-            if_exists='append',
-            index=False,
-            method='multi',
-            chunksize=1000
-        )
+        # Bulk load with COPY
+        table.write(self.pg_engine, data)
     
     def _write_online_features(
         self,
@@ -318,25 +378,15 @@ class FeatureStore:
             self.logger.warning(f"No entity columns defined for feature group: {feature_group}")
             return
         
-        # Create Redis pipeline for batch operations
-        pipe = self.redis_client.pipeline()
+        keys = [
+            f"features:{feature_group}:{entity_key}"
+            for entity_key in entity_keys(data, entity_columns)
+        ]
+        records = feature_records(data, entity_columns, timestamp_column)
         
-        for _, row in data.iterrows():
-            # Create entity key
-            entity_values = [str(row[col]) for col in entity_columns]
-            entity_key = ":".join(entity_values)
-            redis_key = f"features:{feature_group}:{entity_key}"
-            
-            # Prepare feature data
-            feature_data = row.drop(entity_columns + [timestamp_column]).to_dict()
-            feature_data[timestamp_column] = row[timestamp_column].isoformat()
-            
-            # Serialize and store
-            serialized_data = pickle.dumps(feature_data)
-            pipe.set(redis_key, serialized_data, ex=86400)  # 24 hour TTL
-        
-        # Execute batch
-        pipe.execute()
+        write_online_records(
+            self.redis_client, keys, records, ttl=self.online_ttl, cache=self.online_cache
+        )
     
     def get_online_features(
         self,
@@ -348,33 +398,27 @@ class FeatureStore:
         if not fv:
             raise ValueError(f"Feature view not found: {feature_view}")
         
-        results = []
+        entity_frame = pd.DataFrame({col: list(entities[col]) for col in fv.entities})
+        keys = entity_keys(entity_frame, fv.entities)
+        results = entity_frame.to_dict('records')
         
-        # Get features for each entity combination
-        for i in range(len(list(entities.values())[0])):
-            entity_values = [str(entities[col][i]) for col in fv.entities]
-            
-            entity_features = {}
-            entity_features.update({col: entities[col][i] for col in fv.entities})
-            
-            # Get features from each feature group
-            for fg_name in fv.feature_groups:
-                entity_key = ":".join(entity_values)
-                redis_key = f"features:{fg_name}:{entity_key}"
-                
-                try:
-                    data = self.redis_client.get(redis_key)
-                    if data:
-                        feature_data = pickle.loads(data)
-                        
-                        # Filter to only requested features
-                        fg_features = [f for f in fv.features if f in feature_data]
-                        entity_features.update({f: feature_data[f] for f in fg_features})
-                    
-                except Exception as e:
-                    self.logger.error(f"Error getting online features: {e}")
+        # Get features from each feature group, all entities at once
+        for fg_name in fv.feature_groups:
+            try:
+                records = read_online_records(
+                    self.redis_client,
+                    [f"features:{fg_name}:{entity_key}" for entity_key in keys],
+                    batch_size=self.online_batch_size,
+                    cache=self.online_cache
+                )
+            except Exception as e:
+                self.logger.error(f"Error getting online features: {e}")
+                continue
             
-            results.append(entity_features)
+            for entity_features, feature_data in zip(results, records):
+                if feature_data:
+                    # Filter to only requested features
+                    entity_features.update({f: feature_data[f] for f in fv.features if f in feature_data})
         
         df = pd.DataFrame(results)
         self.metrics.increment('online_features_retrieved', tags={'feature_view': feature_view})
@@ -389,89 +433,170 @@ class FeatureStore:
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None
     ) -> pd.DataFrame:
-        """Get historical features for training data."""
+        """
+        Get point-in-time correct historical features for training data.
+        
+        Every entity row gets the latest value of each feature recorded at or
+        before its timestamp (and within the feature view TTL, if set); rows
+        are returned in the order of the entity frame.
+        """
+        chunks = list(self.iter_historical_features(
+            feature_view, entities, timestamp_column, start_time, end_time
+        ))
+        if not chunks:
+            return pd.DataFrame()
+        
+        self.metrics.increment('historical_features_retrieved', tags={'feature_view': feature_view})
+        return pd.concat(chunks, ignore_index=True)
+    
+    def iter_historical_features(
+        self,
+        feature_view: str,
+        entities: pd.DataFrame,
+        timestamp_column: str = 'timestamp',
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream point-in-time correct historical features in chunks of entity rows.
+        
+        With the database engine the entity frame is uploaded once with COPY
+        and joined as of each entity timestamp inside PostgreSQL; the local
+        engine reads the feature rows and joins them with merge_asof.
+        """
         fv = self._get_feature_view(feature_view)
         if not fv:
             raise ValueError(f"Feature view not found: {feature_view}")
         
-        # Build query for point-in-time correctness
-        results = []
+        plan = self._plan_point_in_time_join(fv, entities)
+        if not plan:
+            return
+        
+        chunk_size = chunk_size or self.historical_chunk_size
+        join_columns = unique_columns(*(fg.entity_columns for fg, _ in plan))
+        prepared = prepare_entities(entities, unique_columns(fv.entities, join_columns), timestamp_column)
         
+        if self.historical_engine == 'local':
+            yield from self._local_point_in_time_join(
+                fv, plan, prepared, timestamp_column, start_time, end_time, chunk_size
+            )
+        else:
+            yield from self._database_point_in_time_join(
+                fv, plan, prepared, timestamp_column, start_time, end_time, chunk_size
+            )
+    
+    def _plan_point_in_time_join(
+        self,
+        fv: FeatureView,
+        entities: pd.DataFrame
+    ) -> List[Tuple[FeatureGroup, List[str]]]:
+        """Feature groups to join and the view features each one provides."""
+        plan = []
+        claimed = set()
         for fg_name in fv.feature_groups:
             fg = self._get_feature_group(fg_name)
             if not fg:
                 continue
             
-            # Build SQL query
-            table_name = f"fg_{fg_name}"
-            
-            # Get features for this feature group
-            fg_features = [f for f in fv.features if f in fg.features]
+            # A feature provided by several groups is read from the first one
+            fg_features = [f for f in fv.features if f in fg.features and f not in claimed]
             if not fg_features:
                 continue
             
-            # Build point-in-time query
-            query = self._build_point_in_time_query(
-                table_name, fg, entities, fg_features, timestamp_column, start_time, end_time
+            missing = [col for col in fg.entity_columns if col not in entities.columns]
+            if missing:
+                raise ValueError(f"Entity frame is missing entity columns of {fg_name}: {missing}")
+            
+            claimed.update(fg_features)
+            plan.append((fg, fg_features))
+        
+        return plan
+    
+    def _database_point_in_time_join(
+        self,
+        fv: FeatureView,
+        plan: List[Tuple[FeatureGroup, List[str]]],
+        entities: pd.DataFrame,
+        timestamp_column: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """As-of join in PostgreSQL over a COPY-uploaded entity table, streamed with a server-side cursor."""
+        with self.pg_engine.begin() as conn:
+            entity_table = upload_entities(conn, entities)
+            query, params = build_as_of_query(
+                entity_table,
+                fv.entities,
+                timestamp_column,
+                [(f"fg_{fg.name}", fg.entity_columns, fg.timestamp_column, features) for fg, features in plan],
+                ttl=fv.ttl,
+                start_time=start_time,
+                end_time=end_time
             )
             
-            # Execute query
-            with self.pg_engine.connect() as conn:
-                fg_result = pd.read_sql(query, conn)
-                results.append(fg_result)
-        
-        # Merge all feature groups
-        if results:
-            final_result = results[0]
-            for result in results[1:]:
-                final_result = pd.merge(
-                    final_result, result,
-                    on=fv.entities + [timestamp_column],
-                    how='outer'
+            stream = conn.execution_options(stream_results=True)
+            yield from pd.read_sql(text(query), stream, params=params, chunksize=chunk_size)
+    
+    def _local_point_in_time_join(
+        self,
+        fv: FeatureView,
+        plan: List[Tuple[FeatureGroup, List[str]]],
+        entities: pd.DataFrame,
+        timestamp_column: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        chunk_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """As-of join with merge_asof over feature rows read for the entity time range."""
+        result = entities
+        timestamps = entities[timestamp_column].dropna()
+        
+        for fg, features in plan:
+            if timestamps.empty:
+                feature_rows = pd.DataFrame(columns=fg.entity_columns + [fg.timestamp_column] + features)
+            else:
+                feature_rows = self._read_feature_rows(
+                    fg, features, timestamps.min(), timestamps.max(), fv.ttl, start_time, end_time
                 )
-            
-            self.metrics.increment('historical_features_retrieved', tags={'feature_view': feature_view})
-            return final_result
+            result = as_of_join(
+                result, feature_rows, fg.entity_columns, timestamp_column,
+                fg.timestamp_column, features, ttl=fv.ttl
+            )
         
-        return pd.DataFrame()
+        columns = fv.entities + [timestamp_column] + [f for _, features in plan for f in features]
+        yield from iter_chunks(result[columns], chunk_size)
     
-    def _build_point_in_time_query(
+    def _read_feature_rows(
         self,
-        table_name: str,
-        feature_group: FeatureGroup,
-        entities: pd.DataFrame,
+        fg: FeatureGroup,
         features: List[str],
-        timestamp_column: str,
+        earliest: datetime,
+        latest: datetime,
+        ttl: Optional[timedelta],
         start_time: Optional[datetime],
         end_time: Optional[datetime]
-    ) -> str:
-        """Build SQL query for point-in-time feature retrieval."""
-        # This is a simplified version - in production, you'd want more sophisticated point-in-time logic
-        entity_conditions = []
-        for entity_col in feature_group.entity_columns:
-            if entity_col in entities.columns:
-                values = entities[entity_col].unique()
-                values_str = "','".join(str(v) for v in values)
-                entity_conditions.append(f"{entity_col} IN ('{values_str}')")
-        
-        where_clause = " AND ".join(entity_conditions)
-        
-        if start_time:
-            where_clause += f" AND {timestamp_column} >= '{start_time}'"
-        if end_time:
-            where_clause += f" AND {timestamp_column} <= '{end_time}'"
-        
-        feature_cols = ", ".join(features)
-        entity_cols = ", ".join(feature_group.entity_columns)
-        
-        query = f"""
-        SELECT {entity_cols}, {timestamp_column}, {feature_cols}
-        FROM {table_name}
-        WHERE {where_clause}
-        ORDER BY {timestamp_column}
-        """
-        
-        return query
+    ) -> pd.DataFrame:
+        """Feature rows of a group that can match entity timestamps in [earliest, latest]."""
+        timestamp = quote_identifier(fg.timestamp_column)
+        columns = ", ".join(quote_identifier(col) for col in fg.entity_columns + [fg.timestamp_column] + features)
+        conditions = [f"{timestamp} <= :latest"]
+        params: Dict[str, Any] = {'latest': latest}
+        
+        if ttl is not None:
+            conditions.append(f"{timestamp} >= :earliest")
+            params['earliest'] = earliest - ttl
+        if start_time is not None:
+            conditions.append(f"{timestamp} >= :start_time")
+            params['start_time'] = start_time
+        if end_time is not None:
+            conditions.append(f"{timestamp} <= :end_time")
+            params['end_time'] = end_time
+        
+        query = f"SELECT {columns} FROM {quote_identifier(f'fg_{fg.name}')} WHERE {' AND '.join(conditions)}"
+        with self.pg_engine.connect() as conn:
+            return pd.read_sql(text(query), conn, params=params)
     
     def _validate_feature_data(self, feature_group: FeatureGroup, data: pd.DataFrame, timestamp_column: str):
         """Validate feature data before writing."""
@@ -638,6 +763,7 @@ class FeatureStore:
         
         # Remove from cache
         self._feature_groups_cache.pop(name, None)
+        self._offline_tables.pop(name, None)
         
         self.logger.info(f"Deleted feature group: {name}")
     
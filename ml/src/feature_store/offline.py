@@ -0,0 +1,278 @@
+"""
+Offline Feature Storage
+
+PostgreSQL access for the offline feature store:
+- Bulk loads with COPY from an in-memory CSV buffer
+- Feature group tables range-partitioned by timestamp, with partitions
+  created on demand and a primary key on (entity columns, timestamp)
+- Idempotent upserts, so re-running a load replaces rows instead of
+  duplicating them
+"""
+
+import io
+import logging
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+PARTITION_INTERVALS = {
+    'day': 'D',
+    'week': 'W-SUN',
+    'month': 'M',
+}
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a PostgreSQL identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def postgres_type(series: pd.Series) -> str:
+    """Column type for a frame column, mirroring pandas.to_sql's mapping."""
+    if pd.api.types.is_bool_dtype(series):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(series):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(series):
+        return 'DOUBLE PRECISION'
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return 'TIMESTAMP WITH TIME ZONE'
+    if pd.api.types.is_datetime64_dtype(series):
+        return 'TIMESTAMP WITHOUT TIME ZONE'
+    return 'TEXT'
+
+
+def copy_frame(connection, table_name: str, data: pd.DataFrame):
+    """
+    COPY a frame into an existing table through an in-memory CSV buffer.
+
+    Args:
+        connection: SQLAlchemy connection on a psycopg2 engine
+        table_name: Target table, already quoted if needed
+        data: Rows to load; columns must exist in the table
+    """
+    buffer = io.StringIO()
+    data.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d %H:%M:%S.%f%z')
+    buffer.seek(0)
+
+    column_list = ", ".join(quote_identifier(column) for column in data.columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def partition_ranges(
+    timestamps: pd.Series, interval: str
+) -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
+    """
+    Partitions covering a set of timestamps.
+
+    Args:
+        timestamps: Row timestamps
+        interval: Partition width: 'day', 'week' or 'month'
+
+    Returns:
+        (partition suffix, inclusive start, exclusive end) per partition
+    """
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(f"Unknown partition interval: {interval}")
+
+    timestamps = pd.to_datetime(timestamps).dropna()
+    if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+        timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    periods = timestamps.dt.to_period(PARTITION_INTERVALS[interval]).unique()
+    ranges = []
+    for period in sorted(periods):
+        start = period.start_time.normalize()
+        end = (period + 1).start_time.normalize()
+        ranges.append((f"p{start:%Y%m%d}", start, end))
+    return ranges
+
+
+class OfflineFeatureTable:
+    """
+    A feature group table in PostgreSQL.
+
+    Tables are created on first write as range-partitioned on the timestamp
+    column with a primary key on (entity columns, timestamp); the key both
+    backs the upserts and serves point-in-time lookups. Tables created before
+    partitioning (plain appends, no key) and groups without entity columns
+    are written by COPY only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        entity_columns: Sequence[str],
+        timestamp_column: str,
+        partition_interval: str = 'month'
+    ):
+        self.name = name
+        self.entity_columns = list(entity_columns)
+        self.timestamp_column = timestamp_column
+        self.partition_interval = partition_interval
+
+        self._columns: Optional[set] = None
+        self._partitioned = True
+        self._partitions: set = set()
+
+    @property
+    def key_columns(self) -> List[str]:
+        return self.entity_columns + [self.timestamp_column]
+
+    @property
+    def upsert(self) -> bool:
+        """Rows are keyed (and upserted) only when the group has entity columns."""
+        return self._partitioned and bool(self.entity_columns)
+
+    def ensure_schema(self, engine, data: pd.DataFrame):
+        """
+        Create the table, missing columns and partitions needed for data.
+
+        DDL runs in its own short transaction under an advisory lock, so
+        concurrent writers of the same group do not race on creating it.
+        """
+        # Tables found unpartitioned (created before partitioning) never get partitions
+        ranges = [
+            partition for partition in partition_ranges(data[self.timestamp_column], self.partition_interval)
+            if partition[0] not in self._partitions
+        ] if self._partitioned else []
+        new_columns = [column for column in data.columns if self._columns is None or column not in self._columns]
+        if not ranges and not new_columns:
+            return
+
+        table = quote_identifier(self.name)
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {'name': self.name})
+
+            if self._columns is None:
+                self._load_table_state(conn, data)
+
+            for column in data.columns:
+                if column not in self._columns:
+                    conn.execute(text(
+                        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS "
+                        f"{quote_identifier(column)} {postgres_type(data[column])}"
+                    ))
+                    self._columns.add(column)
+
+            if not self._partitioned:
+                return
+
+            tz_aware = isinstance(data[self.timestamp_column].dtype, pd.DatetimeTZDtype)
+            for suffix, start, end in ranges:
+                bounds = (start.isoformat(), end.isoformat())
+                if tz_aware:
+                    bounds = tuple(f"{bound}+00:00" for bound in bounds)
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {quote_identifier(f'{self.name}_{suffix}')} "
+                    f"PARTITION OF {table} FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+                ))
+                self._partitions.add(suffix)
+
+    def _load_table_state(self, conn, data: pd.DataFrame):
+        """Read the existing table layout, creating the partitioned table if absent."""
+        exists = conn.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {'name': quote_identifier(self.name)}
+        ).scalar()
+
+        if not exists:
+            columns = ",\n    ".join(
+                f"{quote_identifier(column)} {postgres_type(data[column])}"
+                + (" NOT NULL" if column in self.key_columns else "")
+                for column in data.columns
+            )
+            if self.entity_columns:
+                key = ", ".join(quote_identifier(column) for column in self.key_columns)
+                columns += f",\n    PRIMARY KEY ({key})"
+            table = quote_identifier(self.name)
+            conn.execute(text(
+                f"CREATE TABLE {table} (\n    {columns}\n)"
+                f" PARTITION BY RANGE ({quote_identifier(self.timestamp_column)})"
+            ))
+            # Cheap time-range index for scans that do not filter on entity
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {quote_identifier(f'{self.name}_ts_brin')} "
+                f"ON {table} USING BRIN ({quote_identifier(self.timestamp_column)})"
+            ))
+            logger.info(f"Created partitioned feature table {self.name}")
+
+        self._columns = set(conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :name"
+            ),
+            {'name': self.name}
+        ).scalars())
+        self._partitioned = conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name))"),
+            {'name': quote_identifier(self.name)}
+        ).scalar()
+        if not self._partitioned:
+            logger.warning(
+                f"Feature table {self.name} is not partitioned; writing by COPY without upserts"
+            )
+        else:
+            self._partitions.update(
+                name[len(self.name) + 1:] for name in conn.execute(
+                    text(
+                        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                        "WHERE i.inhparent = to_regclass(:name)"
+                    ),
+                    {'name': quote_identifier(self.name)}
+                ).scalars()
+            )
+
+    def write(self, engine, data: pd.DataFrame) -> int:
+        """
+        Load rows with COPY, replacing rows that already exist for the same key.
+
+        Rows are staged into a temporary table and merged with
+        INSERT ... ON CONFLICT DO UPDATE, so reloading a window is idempotent.
+        Within one batch the last row of a key wins.
+
+        Returns:
+            Number of rows written
+        """
+        missing_keys = data[self.key_columns].isna().any(axis=1)
+        if missing_keys.any():
+            logger.warning(f"Dropping {int(missing_keys.sum())} rows without a key from {self.name}")
+            data = data[~missing_keys]
+        if data.empty:
+            return 0
+
+        self.ensure_schema(engine, data)
+        table = quote_identifier(self.name)
+
+        with engine.begin() as conn:
+            if not self.upsert:
+                copy_frame(conn, table, data)
+                return len(data)
+
+            data = data.drop_duplicates(subset=self.key_columns, keep='last')
+            stage = f"fg_stage_{uuid.uuid4().hex[:12]}"
+            conn.execute(text(
+                f"CREATE TEMPORARY TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+            ))
+            copy_frame(conn, stage, data)
+
+            columns = ", ".join(quote_identifier(column) for column in data.columns)
+            key = ", ".join(quote_identifier(column) for column in self.key_columns)
+            updates = ", ".join(
+                f"{quote_identifier(column)} = EXCLUDED.{quote_identifier(column)}"
+                for column in data.columns if column not in self.key_columns
+            )
+            conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            conn.execute(text(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage} "
+                f"ON CONFLICT ({key}) {conflict}"
+            ))
+
+        return len(data)
@@ -0,0 +1,190 @@
+"""
+Online Feature Serving
+
+Redis access for the online feature store:
+- Compact versioned binary codec (msgpack) for feature records
+- Batched reads with MGET, pipelined in chunks, and pipelined writes
+- Optional in-process TTL cache for hot entities
+"""
+
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import msgpack
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# First byte of every encoded record; bump when the payload layout changes
+CODEC_VERSION = 1
+_HEADER = bytes([CODEC_VERSION])
+# Records written before the codec were pickled (protocol 2+ starts with this byte)
+_PICKLE_PROTOCOL = 0x80
+
+
+def _encode_default(value: Any) -> Any:
+    """Convert values msgpack cannot pack natively."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Cannot encode feature value of type {type(value).__name__}")
+
+
+def encode_features(record: Dict[str, Any]) -> bytes:
+    """Encode a feature record as a versioned msgpack blob."""
+    return _HEADER + msgpack.packb(record, default=_encode_default, use_bin_type=True)
+
+
+def decode_features(blob: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    """
+    Decode a feature record written by encode_features.
+
+    Records pickled by earlier versions are still read until they expire.
+    """
+    if not blob:
+        return None
+    if blob[0] == CODEC_VERSION:
+        return msgpack.unpackb(blob[1:], raw=False)
+    if blob[0] == _PICKLE_PROTOCOL:
+        return pickle.loads(blob)
+    raise ValueError(f"Unknown feature codec version: {blob[0]}")
+
+
+def entity_keys(data: pd.DataFrame, entity_columns: Sequence[str]) -> List[str]:
+    """Entity keys ("value1:value2") of every row, built column by column."""
+    keys = data[entity_columns[0]].astype(str)
+    for column in entity_columns[1:]:
+        keys = keys + ":" + data[column].astype(str)
+    return keys.tolist()
+
+
+def feature_records(
+    data: pd.DataFrame, entity_columns: Sequence[str], timestamp_column: str
+) -> List[Dict[str, Any]]:
+    """Feature records of every row, without the entity columns."""
+    feature_columns = [
+        column for column in data.columns
+        if column not in entity_columns and column != timestamp_column
+    ]
+    records = data[feature_columns].to_dict('records')
+    timestamps = pd.to_datetime(data[timestamp_column])
+    for record, timestamp in zip(records, timestamps):
+        record[timestamp_column] = timestamp.isoformat()
+    return records
+
+
+class OnlineFeatureCache:
+    """Bounded in-process LRU cache of decoded feature records with a TTL."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, record = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return record
+
+    def put(self, key: str, record: Optional[Dict[str, Any]]):
+        if not self.enabled or record is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def write_online_records(
+    redis_client,
+    keys: Sequence[str],
+    records: Sequence[Dict[str, Any]],
+    ttl: int,
+    batch_size: int = 1000,
+    cache: Optional[OnlineFeatureCache] = None
+):
+    """Write encoded feature records, one pipelined round trip per batch."""
+    for start in range(0, len(keys), batch_size):
+        pipe = redis_client.pipeline(transaction=False)
+        for key, record in zip(keys[start:start + batch_size], records[start:start + batch_size]):
+            pipe.set(key, encode_features(record), ex=ttl)
+        pipe.execute()
+
+    if cache is not None:
+        for key, record in zip(keys, records):
+            cache.put(key, record)
+
+
+def read_online_records(
+    redis_client,
+    keys: Sequence[str],
+    batch_size: int = 500,
+    cache: Optional[OnlineFeatureCache] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Read and decode feature records for many keys.
+
+    Keys missing from the cache are fetched with MGET in chunks of
+    batch_size, all chunks sent in a single pipelined round trip.
+    """
+    records: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+    missing = []
+    for index, key in enumerate(keys):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            records[index] = cached
+        else:
+            missing.append(index)
+
+    if not missing:
+        return records
+
+    pipe = redis_client.pipeline(transaction=False)
+    for start in range(0, len(missing), batch_size):
+        pipe.mget([keys[index] for index in missing[start:start + batch_size]])
+    blobs = [blob for chunk in pipe.execute() for blob in chunk]
+
+    for index, blob in zip(missing, blobs):
+        try:
+            record = decode_features(blob)
+        except Exception as e:
+            logger.error(f"Error decoding online features for {keys[index]}: {e}")
+            continue
+        records[index] = record
+        if cache is not None:
+            cache.put(keys[index], record)
+
+    return records
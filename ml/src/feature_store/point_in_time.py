@@ -0,0 +1,205 @@
+"""
+Point-in-Time Joins
+
+As-of joins of an entity frame (entity keys plus an event timestamp per row)
+against feature group tables, returning for every entity row the latest
+feature values recorded at or before its timestamp:
+- In PostgreSQL: entity rows uploaded with COPY into a temporary table and
+  one LEFT JOIN LATERAL per feature group, streamed back in chunks
+- Locally: a sorted pandas merge_asof over feature frames
+
+Both engines keep the order of the entity frame and leave features missing
+when no row exists within the lookback window.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from .offline import copy_frame, postgres_type, quote_identifier
+
+# Position of each entity row, used to restore the entity frame order
+ROW_ID_COLUMN = '_pit_row'
+_FEATURE_TIMESTAMP = '_pit_feature_ts'
+
+
+def prepare_entities(entities: pd.DataFrame, columns: Sequence[str], timestamp_column: str) -> pd.DataFrame:
+    """Entity columns and parsed timestamps of the entity frame, with row positions."""
+    missing = [column for column in list(columns) + [timestamp_column] if column not in entities.columns]
+    if missing:
+        raise ValueError(f"Entity frame is missing columns: {missing}")
+
+    prepared = entities[list(columns)].copy()
+    prepared[timestamp_column] = pd.to_datetime(entities[timestamp_column])
+    prepared.insert(0, ROW_ID_COLUMN, np.arange(len(entities), dtype=np.int64))
+    return prepared.reset_index(drop=True)
+
+
+def upload_entities(connection, entities: pd.DataFrame) -> str:
+    """
+    COPY a prepared entity frame into a temporary table.
+
+    The table is dropped when the surrounding transaction ends, so the
+    upload and the joins must run on the same connection and transaction.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        entities: Frame returned by prepare_entities
+
+    Returns:
+        Name of the temporary table
+    """
+    table_name = f"pit_entities_{uuid.uuid4().hex[:12]}"
+    columns = ", ".join(
+        f"{quote_identifier(column)} {postgres_type(entities[column])}" for column in entities.columns
+    )
+    connection.execute(text(f"CREATE TEMPORARY TABLE {table_name} ({columns}) ON COMMIT DROP"))
+
+    copy_frame(connection, table_name, entities)
+    connection.execute(text(f"ANALYZE {table_name}"))
+    return table_name
+
+
+def build_as_of_query(
+    entity_table: str,
+    output_columns: Sequence[str],
+    timestamp_column: str,
+    feature_groups: Sequence[Tuple[str, Sequence[str], str, Sequence[str]]],
+    ttl: Optional[timedelta] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the as-of join of an uploaded entity table against feature tables.
+
+    Each feature group is joined with LEFT JOIN LATERAL, picking the newest
+    row of the entity at or before the entity timestamp; with an index on
+    (entity columns, timestamp) every lookup is a single index descent.
+
+    Args:
+        entity_table: Temporary table written by upload_entities
+        output_columns: Entity columns to return, ahead of the timestamp
+        timestamp_column: Entity timestamp column
+        feature_groups: (table name, entity columns, feature timestamp column,
+            features) per feature group
+        ttl: Maximum age of a feature row relative to the entity timestamp
+        start_time: Ignore feature rows recorded before this time
+        end_time: Ignore feature rows recorded after this time
+
+    Returns:
+        Tuple of (SQL, bind parameters)
+    """
+    entity_ts = f"e.{quote_identifier(timestamp_column)}"
+    select_columns = [f"e.{quote_identifier(column)}" for column in output_columns] + [entity_ts]
+    joins = []
+    params: Dict[str, Any] = {}
+    if ttl is not None:
+        params['ttl'] = ttl
+    if start_time is not None:
+        params['start_time'] = start_time
+    if end_time is not None:
+        params['end_time'] = end_time
+
+    for index, (table_name, entity_columns, feature_ts_column, features) in enumerate(feature_groups):
+        alias = f"f{index}"
+        feature_ts = f"{alias}.{quote_identifier(feature_ts_column)}"
+        conditions = [
+            f"{alias}.{quote_identifier(column)} = e.{quote_identifier(column)}" for column in entity_columns
+        ]
+        conditions.append(f"{feature_ts} <= {entity_ts}")
+        if ttl is not None:
+            conditions.append(f"{feature_ts} >= {entity_ts} - :ttl")
+        if start_time is not None:
+            conditions.append(f"{feature_ts} >= :start_time")
+        if end_time is not None:
+            conditions.append(f"{feature_ts} <= :end_time")
+
+        feature_list = ", ".join(f"{alias}.{quote_identifier(feature)}" for feature in features)
+        joins.append(
+            f"LEFT JOIN LATERAL (\n"
+            f"    SELECT {feature_list}\n"
+            f"    FROM {quote_identifier(table_name)} {alias}\n"
+            f"    WHERE {' AND '.join(conditions)}\n"
+            f"    ORDER BY {feature_ts} DESC\n"
+            f"    LIMIT 1\n"
+            f") {alias}_latest ON TRUE"
+        )
+        select_columns.extend(f"{alias}_latest.{quote_identifier(feature)}" for feature in features)
+
+    query = (
+        f"SELECT {', '.join(select_columns)}\n"
+        f"FROM {entity_table} e\n"
+        + "\n".join(joins)
+        + f"\nORDER BY e.{quote_identifier(ROW_ID_COLUMN)}"
+    )
+    return query, params
+
+
+def as_of_join(
+    entities: pd.DataFrame,
+    features: pd.DataFrame,
+    entity_columns: Sequence[str],
+    timestamp_column: str,
+    feature_timestamp_column: str,
+    feature_columns: Sequence[str],
+    ttl: Optional[timedelta] = None
+) -> pd.DataFrame:
+    """
+    Attach the latest feature values at or before each entity timestamp.
+
+    Local counterpart of build_as_of_query for one feature group: both sides
+    are sorted by time and joined with merge_asof by entity.
+
+    Args:
+        entities: Frame returned by prepare_entities
+        features: Feature rows with entity, timestamp and feature columns
+        entity_columns: Columns identifying an entity on both sides
+        timestamp_column: Entity timestamp column
+        feature_timestamp_column: Feature row timestamp column
+        feature_columns: Features to attach
+        ttl: Maximum age of a feature row relative to the entity timestamp
+
+    Returns:
+        The entity frame, in its original order, with the feature columns added
+    """
+    right = features[list(entity_columns) + [feature_timestamp_column] + list(feature_columns)]
+    right = right.rename(columns={feature_timestamp_column: _FEATURE_TIMESTAMP})
+    right[_FEATURE_TIMESTAMP] = pd.to_datetime(right[_FEATURE_TIMESTAMP])
+    right = right.dropna(subset=[_FEATURE_TIMESTAMP])
+
+    timed = entities[timestamp_column].notna()
+    left = entities[timed].sort_values(timestamp_column, kind='mergesort')
+    right[_FEATURE_TIMESTAMP] = right[_FEATURE_TIMESTAMP].astype(left[timestamp_column].dtype)
+    if right.empty:
+        # An empty read has no dtypes to infer; merge_asof still requires matching keys
+        right = right.astype({column: left[column].dtype for column in entity_columns})
+    right = right.sort_values(_FEATURE_TIMESTAMP, kind='mergesort')
+
+    joined = pd.merge_asof(
+        left,
+        right,
+        left_on=timestamp_column,
+        right_on=_FEATURE_TIMESTAMP,
+        by=list(entity_columns),
+        direction='backward',
+        tolerance=pd.Timedelta(ttl) if ttl is not None else None
+    ).drop(columns=[_FEATURE_TIMESTAMP])
+
+    if not timed.all():
+        joined = pd.concat([joined, entities[~timed]], ignore_index=True)
+    return joined.sort_values(ROW_ID_COLUMN, kind='mergesort').reset_index(drop=True)
+
+
+def iter_chunks(frame: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Split a frame into consecutive chunks of at most chunk_size rows."""
+    for start in range(0, len(frame), max(1, chunk_size)):
+        yield frame.iloc[start:start + chunk_size].reset_index(drop=True)
+
+
+def unique_columns(*groups: Sequence[str]) -> List[str]:
+    """Columns of every group in first-seen order, without duplicates."""
+    return list(dict.fromkeys(column for group in groups for column in group))
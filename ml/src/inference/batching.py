@@ -0,0 +1,190 @@
+"""
+Dynamic Micro-Batching
+
+Coalesces concurrent single-instance predictions into vectorized batches:
+- Requests for the same model and feature set share a queue
+- A batch is dispatched when it reaches max_batch_size or when its oldest
+  request has waited max_wait_ms
+- Models run in a worker thread pool, off the event loop
+- A batch that fails is re-scored row by row, so one bad request does not
+  fail the requests it was coalesced with
+- Predictions and class probabilities are computed in the same worker call
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _to_python(value: Any) -> Any:
+    """Convert NumPy scalars and arrays to JSON-friendly Python values."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def predict_with_probabilities(
+    model: Any, features: pd.DataFrame
+) -> Tuple[List[Any], Optional[List[List[float]]]]:
+    """
+    Predict a batch and, for classifiers, its class probabilities.
+
+    predict and predict_proba both run in the same worker call. Predictions
+    are always taken from predict: the most probable class is not what
+    every model predicts (e.g. SVC with Platt scaling, or custom decision
+    thresholds).
+
+    Returns:
+        Tuple of (predictions, class probabilities or None), one entry per row
+    """
+    predictions = model.predict(features)
+    probabilities = None
+    if hasattr(model, 'predict_proba'):
+        probabilities = np.asarray(model.predict_proba(features)).tolist()
+    return [_to_python(p) for p in np.asarray(predictions)], probabilities
+
+
+@dataclass
+class _PendingBatch:
+    """Requests waiting for the same model and feature columns."""
+    model: Any
+    columns: Tuple[str, ...]
+    rows: List[List[Any]] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """
+    Dynamic batcher for single-instance predictions.
+
+    submit() returns once the request's batch has been scored; callers see
+    per-request results while the model sees batches of up to
+    max_batch_size rows.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 5.0, workers: int = 4):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+
+        self._pending: Dict[Hashable, _PendingBatch] = {}
+        self._running: Set[asyncio.Task] = set()
+        self.stats = {'requests': 0, 'batches': 0, 'split_batches': 0}
+
+    async def submit(
+        self, model_key: Hashable, model: Any, features: Dict[str, Any]
+    ) -> Tuple[Any, Optional[List[float]]]:
+        """
+        Queue one instance for prediction.
+
+        Returns:
+            Tuple of (prediction, class probabilities or None)
+        """
+        loop = asyncio.get_running_loop()
+        columns = tuple(features.keys())
+        batch_key = (model_key, columns)
+
+        batch = self._pending.get(batch_key)
+        if batch is None or batch.model is not model:
+            if batch is not None:
+                self._dispatch(batch_key)
+            batch = _PendingBatch(model=model, columns=columns)
+            self._pending[batch_key] = batch
+            batch.timer = loop.call_later(self.max_wait, self._dispatch, batch_key)
+
+        future = loop.create_future()
+        batch.rows.append([features[column] for column in columns])
+        batch.futures.append(future)
+        self.stats['requests'] += 1
+
+        if len(batch.rows) >= self.max_batch_size:
+            self._dispatch(batch_key)
+
+        return await future
+
+    def _dispatch(self, batch_key: Hashable):
+        """Send a pending batch to the worker pool."""
+        batch = self._pending.pop(batch_key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        self.stats['batches'] += 1
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: _PendingBatch):
+        frame = pd.DataFrame(batch.rows, columns=list(batch.columns))
+        try:
+            predictions, probabilities = await self.run(batch.model, frame)
+        except Exception as e:
+            if len(batch.futures) == 1:
+                self._fail(batch.futures, e)
+                return
+            # A single bad row fails the whole call; score the rows one at a
+            # time so only the requests that fail on their own get the error
+            self.stats['split_batches'] += 1
+            await asyncio.gather(*(
+                self._run_rows(batch.model, frame.iloc[[index]], [future])
+                for index, future in enumerate(batch.futures)
+            ))
+            return
+
+        self._resolve(batch.futures, predictions, probabilities)
+
+    async def _run_rows(self, model: Any, frame: pd.DataFrame, futures: List[asyncio.Future]):
+        try:
+            predictions, probabilities = await self.run(model, frame)
+        except Exception as e:
+            self._fail(futures, e)
+            return
+        self._resolve(futures, predictions, probabilities)
+
+    @staticmethod
+    def _resolve(
+        futures: List[asyncio.Future],
+        predictions: List[Any],
+        probabilities: Optional[List[List[float]]]
+    ):
+        for index, future in enumerate(futures):
+            if not future.done():
+                future.set_result((
+                    predictions[index],
+                    probabilities[index] if probabilities is not None else None
+                ))
+
+    @staticmethod
+    def _fail(futures: List[asyncio.Future], error: Exception):
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def run(self, model: Any, features: pd.DataFrame) -> Tuple[List[Any], Optional[List[List[float]]]]:
+        """Score a whole frame in the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, predict_with_probabilities, model, features)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Request and batch counts, and the mean batch size so far."""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'avg_batch_size': self.stats['requests'] / batches if batches else 0.0
+        }
+
+    async def shutdown(self):
+        """Score pending batches, then stop the worker pool."""
+        for batch_key in list(self._pending):
+            self._dispatch(batch_key)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self.executor.shutdown(wait=True)
@@ -6,7 +6,10 @@ High-performance model serving API for real-time predictions.
 
 import logging
 import asyncio
+import pickle
+import sys
 import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from contextlib import asynccontextmanager
@@ -27,6 +30,7 @@ from ..model_registry.model_registry import ModelRegistry
 from ..feature_store.feature_store import FeatureStore
 from ..config import get_inference_config, get_feature_store_config
 from ..utils.monitoring import MetricsCollector
+from .batching import MicroBatcher, predict_with_probabilities
 
 
 # Pydantic models for API
@@ -106,73 +110,147 @@ model_load_counter = Counter('ml_model_loads_total', 'Total number of model load
 
 
 class ModelCache:
-    """In-memory model cache for fast inference."""
+    """
+    LRU model cache for fast inference.
     
-    def __init__(self):
-        self.models: Dict[str, Any] = {}
+    Holds at most max_models models and, when memory_budget_mb is set, at
+    most that much estimated model memory; least recently used models are
+    evicted first. Models are loaded off the event loop, and concurrent
+    requests for a model that is not cached share a single load.
+    """
+    
+    def __init__(self, max_models: int = 8, memory_budget_mb: float = 0):
+        self.models: 'OrderedDict[str, Any]' = OrderedDict()
         self.model_metadata: Dict[str, Dict[str, Any]] = {}
         self.model_stats: Dict[str, Dict[str, Union[int, float]]] = {}
+        self.max_models = max(1, max_models)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self._load_locks: Dict[str, asyncio.Lock] = {}
         self.logger = logging.getLogger(__name__)
     
+    @staticmethod
+    def cache_key(model_name: str, model_version: Optional[str] = None) -> str:
+        return f"{model_name}:{model_version or 'latest'}"
+    
     async def load_model(self, model_name: str, model_version: Optional[str] = None) -> bool:
         """Load model into cache."""
-        try:
-            cache_key = f"{model_name}:{model_version or 'latest'}"
-            
+        cache_key = self.cache_key(model_name, model_version)
+        if cache_key in self.models:
+            self.models.move_to_end(cache_key)
+            return True
+        
+        lock = self._load_locks.setdefault(cache_key, asyncio.Lock())
+        async with lock:
             if cache_key in self.models:
                 return True
             
-            # Load model from MLflow
-            if model_version:
-                model_uri = f"models:/{model_name}/{model_version}"
-            else:
-                model_uri = f"models:/{model_name}/Production"
-            
-            # Try loading as sklearn model first, then tensorflow
             try:
-                model = mlflow.sklearn.load_model(model_uri)
-            except:
-                try:
-                    model = mlflow.tensorflow.load_model(model_uri)
-                except Exception as e:
-                    self.logger.error(f"Failed to load model {model_uri}: {e}")
+                # Load model from MLflow
+                if model_version:
+                    model_uri = f"models:/{model_name}/{model_version}"
+                else:
+                    model_uri = f"models:/{model_name}/Production"
+                
+                model = await asyncio.to_thread(self._load_from_mlflow, model_uri)
+                if model is None:
                     return False
-            
-            # Store model and metadata
-            self.models[cache_key] = model
-            self.model_metadata[cache_key] = {
-                'name': model_name,
-                'version': model_version or 'latest',
-                'loaded_at': datetime.utcnow(),
-                'model_uri': model_uri
-            }
-            self.model_stats[cache_key] = {
-                'prediction_count': 0,
-                'total_latency': 0.0,
-                'error_count': 0
-            }
-            
-            model_load_counter.labels(model_name=model_name).inc()
-            self.logger.info(f"Loaded model {cache_key}")
-            return True
-            
+                size_bytes = await asyncio.to_thread(_estimate_model_size, model)
+                
+                # Store model and metadata
+                self.models[cache_key] = model
+                self.model_metadata[cache_key] = {
+                    'name': model_name,
+                    'version': model_version or 'latest',
+                    'loaded_at': datetime.utcnow(),
+                    'model_uri': model_uri,
+                    'size_bytes': size_bytes
+                }
+                self.model_stats[cache_key] = {
+                    'prediction_count': 0,
+                    'total_latency': 0.0,
+                    'error_count': 0
+                }
+                self._evict()
+                
+                model_load_counter.labels(model_name=model_name).inc()
+                self.logger.info(f"Loaded model {cache_key} ({size_bytes / 1e6:.1f} MB)")
+                return True
+                
+            except Exception as e:
+                self.logger.error(f"Error loading model {model_name}: {e}")
+                return False
+            finally:
+                self._load_locks.pop(cache_key, None)
+    
+    def _load_from_mlflow(self, model_uri: str) -> Optional[Any]:
+        """Load a model, trying the sklearn flavor first, then tensorflow."""
+        try:
+            return mlflow.sklearn.load_model(model_uri)
+        except Exception:
+            try:
+                return mlflow.tensorflow.load_model(model_uri)
+            except Exception as e:
+                self.logger.error(f"Failed to load model {model_uri}: {e}")
+                return None
+    
+    def _evict(self):
+        """Drop least recently used models until the cache fits its limits."""
+        while len(self.models) > 1 and (
+            len(self.models) > self.max_models
+            or (self.memory_budget and self.memory_usage() > self.memory_budget)
+        ):
+            cache_key, _ = self.models.popitem(last=False)
+            self.model_metadata.pop(cache_key, None)
+            self.model_stats.pop(cache_key, None)
+            self.logger.info(f"Evicted model {cache_key} from cache")
+    
+    def memory_usage(self) -> int:
+        """Estimated bytes held by cached models."""
+        return sum(metadata.get('size_bytes', 0) for metadata in self.model_metadata.values())
+    
+    async def warmup(self, registry: ModelRegistry) -> int:
+        """
+        Load the registry's Production models and run a first prediction on each.
+        
+        Returns the number of models warmed up.
+        """
+        production_models = await asyncio.to_thread(registry.get_production_models)
+        warmed = 0
+        for model_info in production_models[:self.max_models]:
+            if not await self.load_model(model_info.name):
+                continue
+            await asyncio.to_thread(self._warm_model, self.get_model(model_info.name))
+            warmed += 1
+        
+        self.logger.info(f"Warmed up {warmed} production models")
+        return warmed
+    
+    def _warm_model(self, model: Any):
+        """Run a throwaway prediction so lazy initialization happens before traffic."""
+        feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is None:
+            return
+        try:
+            sample = pd.DataFrame(np.zeros((1, len(feature_names))), columns=feature_names)
+            predict_with_probabilities(model, sample)
         except Exception as e:
-            self.logger.error(f"Error loading model {model_name}: {e}")
-            return False
+            self.logger.debug(f"Warmup prediction failed: {e}")
     
     def get_model(self, model_name: str, model_version: Optional[str] = None) -> Optional[Any]:
         """Get model from cache."""
-        cache_key = f"{model_name}:{model_version or 'latest'}"
-        return self.models.get(cache_key)
+        cache_key = self.cache_key(model_name, model_version)
+        model = self.models.get(cache_key)
+        if model is not None:
+            self.models.move_to_end(cache_key)
+        return model
     
     def get_model_metadata(self, model_name: str, model_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Get model metadata."""
-        cache_key = f"{model_name}:{model_version or 'latest'}"
-        return self.model_metadata.get(cache_key)
+        return self.model_metadata.get(self.cache_key(model_name, model_version))
     
     def update_stats(self, model_name: str, model_version: Optional[str], latency: float, error: bool = False):
         """Update model statistics."""
-        cache_key = f"{model_name}:{model_version or 'latest'}"
+        cache_key = self.cache_key(model_name, model_version)
         if cache_key in self.model_stats:
             stats = self.model_stats[cache_key]
             stats['prediction_count'] += 1
@@ -182,8 +260,7 @@ class ModelCache:
     
     def get_stats(self, model_name: str, model_version: Optional[str] = None) -> Dict[str, Union[int, float]]:
         """Get model statistics."""
-        cache_key = f"{model_name}:{model_version or 'latest'}"
-        stats = self.model_stats.get(cache_key, {})
+        stats = self.model_stats.get(self.cache_key(model_name, model_version), {})
         if stats.get('prediction_count', 0) > 0:
             stats['avg_latency'] = stats['total_latency'] / stats['prediction_count']
         return stats
@@ -201,15 +278,24 @@ class ModelCache:
     
     def unload_model(self, model_name: str, model_version: Optional[str] = None):
         """Unload model from cache."""
-        cache_key = f"{model_name}:{model_version or 'latest'}"
+        cache_key = self.cache_key(model_name, model_version)
         self.models.pop(cache_key, None)
         self.model_metadata.pop(cache_key, None)
         self.model_stats.pop(cache_key, None)
         self.logger.info(f"Unloaded model {cache_key}")
 
 
+def _estimate_model_size(model: Any) -> int:
+    """Approximate in-memory size of a model from its pickled size."""
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(model)
+
+
 # Global instances
 model_cache = ModelCache()
+batcher = MicroBatcher()
 model_registry = ModelRegistry()
 feature_store = None
 
@@ -218,15 +304,26 @@ feature_store = None
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
-    global feature_store
+    global feature_store, model_cache, batcher
     
     try:
+        # Model cache and micro-batcher
+        config = get_inference_config()
+        model_cache = ModelCache(
+            max_models=config['model_cache_max_models'],
+            memory_budget_mb=config['model_cache_memory_mb']
+        )
+        batcher = MicroBatcher(
+            max_batch_size=config['max_batch_size'],
+            max_wait_ms=config['max_batch_wait_ms'],
+            workers=config['workers']
+        )
+        
         # Initialize feature store
         fs_config = get_feature_store_config()
         feature_store = FeatureStore(fs_config)
         
         # Load default models
-        config = get_inference_config()
         default_models = config.get('default_models', [])
         
         for model_info in default_models:
@@ -234,6 +331,10 @@ async def lifespan(app: FastAPI):
             model_version = model_info.get('version')
             await model_cache.load_model(model_name, model_version)
         
+        # Warm up Production models so first requests do not pay for loading
+        if config['warmup_production_models']:
+            await model_cache.warmup(model_registry)
+        
         logging.info("Inference API started successfully")
         
     except Exception as e:
@@ -242,6 +343,7 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    await batcher.shutdown()
     logging.info("Inference API shutting down")
 
 
@@ -328,16 +430,10 @@ async def predict(request: PredictionRequest, background_tasks: BackgroundTasks)
         model = model_cache.get_model(model_name, request.model_version)
         metadata = model_cache.get_model_metadata(model_name, request.model_version)
         
-        # Prepare features
-        feature_df = pd.DataFrame([request.features])
-        
-        # Make prediction
-        if hasattr(model, 'predict_proba'):
-            prediction = model.predict(feature_df)[0]
-            probability = model.predict_proba(feature_df)[0].tolist()
-        else:
-            prediction = model.predict(feature_df)[0]
-            probability = None
+        # Make prediction, batched with concurrent requests for the same model
+        prediction, probability = await batcher.submit(
+            model_cache.cache_key(model_name, request.model_version), model, request.features
+        )
         
         # Feature importance (explanation)
         explanation = None
@@ -373,6 +469,8 @@ async def predict(request: PredictionRequest, background_tasks: BackgroundTasks)
             timestamp=datetime.utcnow()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         latency = (time.time() - start_time) * 1000
         
@@ -413,12 +511,8 @@ async def predict_batch(request: BatchPredictionRequest, background_tasks: Backg
         # Prepare features
         feature_df = pd.DataFrame(request.instances)
         
-        # Make predictions
-        predictions = model.predict(feature_df).tolist()
-        
-        probabilities = None
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(feature_df).tolist()
+        # Make predictions in the worker pool
+        predictions, probabilities = await batcher.run(model, feature_df)
         
         # Feature importance (explanations)
         explanations = None
@@ -457,6 +551,8 @@ async def predict_batch(request: BatchPredictionRequest, background_tasks: Backg
             timestamp=datetime.utcnow()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         total_latency = (time.time() - start_time) * 1000
         
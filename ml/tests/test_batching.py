@@ -0,0 +1,141 @@
+"""
+Tests for dynamic micro-batching of single-instance predictions.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.inference.batching import MicroBatcher, predict_with_probabilities
+
+
+class ThresholdClassifier:
+    """Classifier with a custom threshold, recording the size of every call."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self.calls = []
+
+    def _positive(self, frame: pd.DataFrame) -> np.ndarray:
+        values = frame["x"].to_numpy(dtype=float)
+        return 1.0 / (1.0 + np.exp(-values))
+
+    def predict_proba(self, frame: pd.DataFrame) -> np.ndarray:
+        positive = self._positive(frame)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, frame: pd.DataFrame) -> np.ndarray:
+        self.calls.append(len(frame))
+        return (self._positive(frame) > self.threshold).astype(int)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_predictions_come_from_predict():
+    model = ThresholdClassifier(threshold=0.8)
+    frame = pd.DataFrame({"x": [0.5, 3.0]})
+
+    predictions, probabilities = predict_with_probabilities(model, frame)
+
+    # argmax of the probabilities would predict 1 for x=0.5
+    assert predictions == [0, 1]
+    assert np.allclose(np.sum(probabilities, axis=1), 1.0)
+
+
+def test_concurrent_requests_are_coalesced():
+    model = ThresholdClassifier()
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*(
+            batcher.submit("model:1", model, {"x": float(x)}) for x in range(-4, 4)
+        ))
+        stats = batcher.get_stats()
+        await batcher.shutdown()
+        return results, stats
+
+    results, stats = run(scenario())
+
+    assert [prediction for prediction, _ in results] == [0] * 5 + [1] * 3
+    assert model.calls == [8]
+    assert stats["batches"] == 1 and stats["avg_batch_size"] == 8
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    model = ThresholdClassifier()
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=32, max_wait_ms=30)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            batcher.submit("model:1", model, {"x": 1.0}) for _ in range(3)
+        ))
+        elapsed = time.perf_counter() - start
+        await batcher.shutdown()
+        return results, elapsed
+
+    results, elapsed = run(scenario())
+
+    assert len(results) == 3
+    assert model.calls == [3]
+    assert 0.02 <= elapsed < 1.0
+
+
+def test_full_batch_is_dispatched_without_waiting():
+    model = ThresholdClassifier()
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=10_000)
+        start = time.perf_counter()
+        await asyncio.gather(*(batcher.submit("model:1", model, {"x": 0.0}) for _ in range(4)))
+        elapsed = time.perf_counter() - start
+        await batcher.shutdown()
+        return elapsed
+
+    assert run(scenario()) < 1.0
+    assert model.calls == [4]
+
+
+def test_bad_request_does_not_fail_its_batch():
+    model = ThresholdClassifier()
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=10_000)
+        results = await asyncio.gather(
+            batcher.submit("model:1", model, {"x": 2.0}),
+            batcher.submit("model:1", model, {"x": "not a number"}),
+            batcher.submit("model:1", model, {"x": -2.0}),
+            batcher.submit("model:1", model, {"x": 3.0}),
+            return_exceptions=True,
+        )
+        stats = batcher.get_stats()
+        await batcher.shutdown()
+        return results, stats
+
+    results, stats = run(scenario())
+
+    assert isinstance(results[1], ValueError)
+    assert [results[i][0] for i in (0, 2, 3)] == [1, 0, 1]
+    assert stats["split_batches"] == 1
+
+
+def test_single_request_failure_is_raised():
+    model = ThresholdClassifier()
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=5)
+        try:
+            with pytest.raises(ValueError):
+                await batcher.submit("model:1", model, {"x": "bad"})
+        finally:
+            await batcher.shutdown()
+        return batcher.get_stats()
+
+    assert run(scenario())["split_batches"] == 0
@@ -0,0 +1,80 @@
+"""
+Tests for schema management of offline feature tables.
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.feature_store.offline import OfflineFeatureTable
+
+
+class FakeEngine:
+    """Engine stand-in answering the table-state queries of a legacy table."""
+
+    def __init__(self, columns, partitioned):
+        self.columns = columns
+        self.partitioned = partitioned
+        self.transactions = 0
+        self.statements = []
+
+    @contextmanager
+    def begin(self):
+        self.transactions += 1
+        yield self
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "to_regclass(:name) IS NOT NULL" in sql:
+            return SimpleNamespace(scalar=lambda: True)
+        if "information_schema.columns" in sql:
+            return SimpleNamespace(scalars=lambda: iter(self.columns))
+        if "pg_partitioned_table" in sql:
+            return SimpleNamespace(scalar=lambda: self.partitioned)
+        if "pg_inherits" in sql:
+            return SimpleNamespace(scalars=lambda: iter([]))
+        return SimpleNamespace()
+
+
+def _frame(start):
+    return pd.DataFrame({
+        "host": ["a", "b"],
+        "timestamp": pd.to_datetime([start, start]) + pd.to_timedelta([0, 40], unit="D"),
+        "cpu": [0.5, 0.7],
+    })
+
+
+def test_legacy_table_state_is_recorded_once():
+    engine = FakeEngine(["host", "timestamp", "cpu"], partitioned=False)
+    table = OfflineFeatureTable("fg_cpu", ["host"], "timestamp")
+
+    table.ensure_schema(engine, _frame("2024-01-01"))
+    table.ensure_schema(engine, _frame("2024-03-01"))
+
+    assert engine.transactions == 1
+    assert not table.upsert
+    assert not any("PARTITION OF" in sql for sql in engine.statements)
+
+
+def test_new_columns_still_added_to_legacy_tables():
+    engine = FakeEngine(["host", "timestamp", "cpu"], partitioned=False)
+    table = OfflineFeatureTable("fg_cpu", ["host"], "timestamp")
+    table.ensure_schema(engine, _frame("2024-01-01"))
+
+    table.ensure_schema(engine, _frame("2024-01-01").assign(memory=1.0))
+
+    assert engine.transactions == 2
+    assert 'ADD COLUMN IF NOT EXISTS "memory" DOUBLE PRECISION' in engine.statements[-1]
+
+
+def test_column_lookup_limited_to_current_schema():
+    engine = FakeEngine(["host", "timestamp", "cpu"], partitioned=True)
+    table = OfflineFeatureTable("fg_cpu", ["host"], "timestamp")
+
+    table.ensure_schema(engine, _frame("2024-01-01"))
+
+    (lookup,) = [sql for sql in engine.statements if "information_schema.columns" in sql]
+    assert "table_schema = current_schema()" in lookup
+    assert sum("PARTITION OF" in sql for sql in engine.statements) == 2
@@ -0,0 +1,125 @@
+"""
+Tests for the vectorized rolling-window engine against the per-point loops it replaced.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.anomaly_detection.rolling import (
+    residual_flags,
+    residual_scores,
+    rolling_slopes,
+    trend_change_flags,
+)
+
+WINDOW = 20
+
+
+def loop_trend_changes(ts: pd.Series, window: int, threshold: float):
+    """TrendAnomalyDetector.detect_trend_changes as it was before the rolling engine."""
+    anomalies = [False] * len(ts)
+    slopes = []
+    for i in range(window, len(ts) - window):
+        before_window = ts.iloc[i - window:i]
+        after_window = ts.iloc[i:i + window]
+        slope_before = np.polyfit(np.arange(len(before_window)), before_window.values, 1)[0]
+        slope_after = np.polyfit(np.arange(len(after_window)), after_window.values, 1)[0]
+        slopes.append((slope_before, slope_after))
+        trend_change = abs(slope_after - slope_before)
+        trend_std = np.std([slope_before, slope_after])
+        if trend_std > 0 and trend_change > threshold * trend_std:
+            anomalies[i] = True
+    return anomalies, slopes
+
+
+def loop_residuals(ts: pd.Series, residuals: pd.Series, multiplier: float):
+    """Seasonal residual thresholding and scoring as they were before the rolling engine."""
+    threshold = multiplier * residuals.std()
+    residual_mean = residuals.mean()
+    anomalies = []
+    for i, _ in enumerate(ts):
+        if i < len(residuals):
+            anomalies.append(abs(residuals.iloc[i] - residual_mean) > threshold)
+        else:
+            anomalies.append(False)
+    scores = [0.0] * len(ts)
+    residual_std = residuals.std()
+    for i, residual in enumerate(residuals):
+        if i < len(ts):
+            scores[i] = abs(residual) / (residual_std + 1e-8)
+    return anomalies, scores
+
+
+def make_series(points: int, seed: int) -> pd.Series:
+    """CPU-like metric: daily seasonality, slow drift, noise and a few bursts."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(points)
+    values = 40 + 15 * np.sin(2 * np.pi * t / 8640) + 0.0005 * t + rng.normal(0, 2, points)
+    bursts = rng.choice(points, size=max(1, points // 200), replace=False)
+    values[bursts] += rng.uniform(20, 40, len(bursts))
+    return pd.Series(values)
+
+
+@pytest.mark.parametrize("window", [2, 5, WINDOW])
+def test_rolling_slopes_match_polyfit(window):
+    values = make_series(500, seed=3).to_numpy() * 1000
+
+    expected = [
+        np.polyfit(np.arange(window), values[start:start + window], 1)[0]
+        for start in range(len(values) - window + 1)
+    ]
+
+    np.testing.assert_allclose(rolling_slopes(values, window), expected, atol=1e-6)
+
+
+def test_rolling_slopes_short_series():
+    assert rolling_slopes(np.arange(3.0), 5).size == 0
+    with pytest.raises(ValueError):
+        rolling_slopes(np.arange(10.0), 1)
+
+
+# The spread of two slopes is half their difference, so the flag rule sits
+# exactly on its boundary at threshold 2 and is decided there by rounding
+@pytest.mark.parametrize("threshold", [1.5, 2.5])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_trend_change_flags_match_loop(threshold, seed):
+    ts = make_series(2000, seed)
+
+    loop_flags, loop_slopes = loop_trend_changes(ts, WINDOW, threshold)
+    flags, before, after = trend_change_flags(ts.to_numpy(), WINDOW, threshold)
+
+    np.testing.assert_allclose(np.column_stack([before, after]), np.array(loop_slopes), atol=1e-9)
+    assert flags.tolist() == loop_flags
+
+
+def test_trend_change_flags_short_series():
+    flags, before, after = trend_change_flags(np.arange(10.0), WINDOW, 1.5)
+
+    assert flags.tolist() == [False] * 10
+    assert before.size == after.size == 0
+
+
+@pytest.mark.parametrize("multiplier", [1.5, 2.5])
+def test_residual_flags_and_scores_match_loop(multiplier):
+    ts = make_series(2000, seed=2)
+    residuals = ts - ts.rolling(25, center=True, min_periods=1).mean()
+
+    loop_anomalies, loop_scores = loop_residuals(ts, residuals, multiplier)
+    anomalies = residual_flags(
+        residuals.to_numpy(), len(ts), residuals.mean(), multiplier * residuals.std()
+    )
+
+    assert anomalies.tolist() == loop_anomalies
+    np.testing.assert_allclose(residual_scores(residuals.to_numpy(), len(ts)), loop_scores)
+
+
+def test_residuals_shorter_than_series():
+    ts = make_series(100, seed=4)
+    residuals = (ts - ts.mean()).iloc[:60]
+
+    loop_anomalies, loop_scores = loop_residuals(ts, residuals, 1.5)
+    anomalies = residual_flags(residuals.to_numpy(), len(ts), residuals.mean(), 1.5 * residuals.std())
+
+    assert anomalies.tolist() == loop_anomalies
+    np.testing.assert_allclose(residual_scores(residuals.to_numpy(), len(ts)), loop_scores)
@@ -0,0 +1,116 @@
+"""
+Tests for per-series streaming anomaly scoring and its checkpoints.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.anomaly_detection.streaming import StreamingAnomalyDetector
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def normal_value(i: int) -> float:
+    """Deterministic noise around 100."""
+    return 100.0 + (i % 5) - 2
+
+
+def feed(detector, series_key, values, offset=0):
+    return [
+        detector.update(series_key, START + timedelta(minutes=offset + i), value)
+        for i, value in enumerate(values)
+    ]
+
+
+@pytest.fixture
+def detector():
+    return StreamingAnomalyDetector(warmup=30, threshold_std=3.0)
+
+
+def test_series_keep_independent_state(detector):
+    feed(detector, 'cpu', [normal_value(i) for i in range(40)])
+    feed(detector, 'latency', [10.0] * 5)
+
+    cpu, latency = detector.get_state('cpu'), detector.get_state('latency')
+    assert cpu.count == 40
+    assert latency.count == 5
+    assert cpu.level == pytest.approx(100.0, abs=2.0)
+    assert latency.level == pytest.approx(10.0)
+    assert len(detector.get_history('cpu')) == 40
+    assert detector.get_history('missing') == []
+
+
+def test_warmup_spike_and_recovery(detector):
+    warmup = feed(detector, 'cpu', [normal_value(i) for i in range(60)])
+    assert not any(result.is_anomaly for result in warmup)
+    assert all(result.anomaly_score == 0.0 for result in warmup[:30])
+    assert not warmup[29].metadata['warmed_up']
+    assert warmup[30].metadata['warmed_up']
+
+    (spike,) = feed(detector, 'cpu', [200.0], offset=60)
+    assert spike.is_anomaly
+    assert spike.anomaly_score > detector.threshold_std
+    assert spike.explanation['series'] == 'cpu'
+
+    recovery = feed(detector, 'cpu', [normal_value(i) for i in range(61, 100)], offset=61)
+    assert not any(result.is_anomaly for result in recovery)
+
+
+def test_anomalous_sample_is_clipped_before_updating_state(detector):
+    feed(detector, 'cpu', [normal_value(i) for i in range(60)])
+    before = detector.get_state('cpu')
+    level, std = before.level, before.variance ** 0.5
+
+    feed(detector, 'cpu', [10_000.0], offset=60)
+
+    after = detector.get_state('cpu')
+    # The level moves by at most alpha * threshold_std standard deviations
+    assert after.level - level == pytest.approx(detector.alpha * detector.threshold_std * std)
+    assert after.variance ** 0.5 < 2 * std
+    # The raw value is still recorded in the history
+    assert detector.get_history('cpu')[-1][1] == 10_000.0
+
+
+def test_least_recently_updated_series_is_evicted():
+    detector = StreamingAnomalyDetector(max_series=2)
+
+    feed(detector, 'a', [1.0])
+    feed(detector, 'b', [1.0])
+    feed(detector, 'a', [1.0], offset=1)
+    feed(detector, 'c', [1.0])
+
+    assert list(detector.states) == ['a', 'c']
+    assert detector.get_state('b') is None
+
+
+def test_checkpoint_round_trip_yields_identical_scores(detector, tmp_path):
+    path = tmp_path / 'checkpoints' / 'streaming.json'
+    feed(detector, 'cpu', [normal_value(i) for i in range(50)])
+    feed(detector, 'latency', [10.0 + i % 3 for i in range(50)])
+    detector.save_checkpoint(str(path))
+
+    restored = StreamingAnomalyDetector(warmup=30, threshold_std=3.0)
+    assert restored.load_checkpoint(str(path)) == 2
+    assert restored.get_history('cpu') == detector.get_history('cpu')
+
+    tail = [normal_value(i) for i in range(50, 70)] + [180.0, 101.0]
+    expected = feed(detector, 'cpu', tail, offset=50)
+    actual = feed(restored, 'cpu', tail, offset=50)
+    assert [r.anomaly_score for r in actual] == [r.anomaly_score for r in expected]
+    assert [r.is_anomaly for r in actual] == [r.is_anomaly for r in expected]
+    assert restored.get_state('cpu').quantiles == detector.get_state('cpu').quantiles
+
+
+def test_checkpoint_from_other_configuration_is_rejected(detector, tmp_path):
+    path = tmp_path / 'streaming.json'
+    feed(detector, 'cpu', [normal_value(i) for i in range(10)])
+    detector.save_checkpoint(str(path))
+
+    other_buckets = StreamingAnomalyDetector(season_buckets=24)
+    other_quantiles = StreamingAnomalyDetector(quantile_levels=(0.05, 0.95))
+
+    assert other_buckets.load_checkpoint(str(path)) == 0
+    assert other_quantiles.load_checkpoint(str(path)) == 0
+    assert not other_buckets.states and not other_quantiles.states
+    assert StreamingAnomalyDetector().load_checkpoint(str(tmp_path / 'missing.json')) == 0